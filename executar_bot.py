@@ -1,22 +1,29 @@
 # -*- coding: utf-8 -*-
+# Primeiro import: marca o início da inicialização (ver relatório no primeiro on_ready)
+from ostervalt.infraestrutura.monitoramento.inicializacao import MODULOS_BOT, relatorio_inicializacao
 import os
-import discord
 import asyncio
 import yaml # Import adicionado
 import sys # Import adicionado para error handler
 import traceback # Import adicionado para error handler
-from discord.ext import commands
 from dotenv import load_dotenv
 
-# Carrega variáveis de ambiente (como o TOKEN)
+# Carrega variáveis de ambiente (como o TOKEN); antes do db, que lê DATABASE_URL ao ser importado
 load_dotenv()
 
+# Importações medidas uma a uma; os imports abaixo só as reaproveitam de sys.modules
+relatorio_inicializacao.importar(MODULOS_BOT)
+import discord
+from discord.ext import commands
+
 # Importações da nossa aplicação
 from ostervalt.infraestrutura.configuracao.db import criar_tabelas
 from ostervalt.infraestrutura.configuracao.container import configurar_container, Container
 from ostervalt.infraestrutura.bot_discord.carregador_cogs import carregar_cogs # Import renomeado
 from ostervalt.infraestrutura.bot_discord.definicao_bot import RPGBot # Import da classe do bot
 from ostervalt.infraestrutura.bot_discord.error_handler import setup_error_handlers # Import do error handler
+from ostervalt.infraestrutura.bot_discord.sincronizacao_comandos import sincronizar_se_alterada
+from ostervalt.infraestrutura.monitoramento.servidor_metricas import iniciar_servidor_metricas
 
 # --- Configuração Inicial ---
 
@@ -40,23 +47,9 @@ def load_config():
 
 config = load_config()
 
-# 1. Cria as tabelas do banco de dados (se não existirem)
-try:
-    criar_tabelas()
-    print("Tabelas do banco de dados verificadas/criadas.")
-except Exception as e:
-    print(f"Erro ao criar/verificar tabelas do banco de dados: {e}")
-    # exit(1) # Descomente para parar se o DB for essencial
-
-# 2. Configura o container de injeção de dependência
-try:
-    container = configurar_container()
-    print("Container de injeção de dependência configurado.")
-except Exception as e:
-    print(f"Erro crítico ao configurar o container de dependências: {e}")
-    exit(1) # Para a execução se o container falhar
-
-# 3. Define as Intents do Bot
+# As tabelas e o container são preparados em main(), não na importação deste módulo
+
+# Define as Intents do Bot
 intents = discord.Intents.default()
 intents.message_content = True # Necessário para comandos de prefixo
 # intents.members = True # Descomente se precisar acessar informações de membros
@@ -69,10 +62,20 @@ class BotExecutor(RPGBot): # Herda da definição base
         # Passa prefixo e intents para a classe base RPGBot
         super().__init__(command_prefix=config.get("prefixo_comando", "!"), intents=intents)
         self.container = container
+        self.servidor_metricas = None # aiohttp AppRunner do endpoint /metrics, se habilitado
+        self.tarefa_sincronizacao = None # Sincronização dos comandos, em segundo plano
         print("Instância do BotExecutor criada.")
 
     async def setup_hook(self):
-        """Carrega Cogs, configura handlers e sincroniza comandos."""
+        """Carrega Cogs, configura handlers e sincroniza comandos (em segundo plano)."""
+        relatorio_inicializacao.marcar("inicio_setup_hook") # Após o login HTTP
+        with relatorio_inicializacao.etapa("setup_hook"):
+            await self._preparar()
+        # A sincronização é uma chamada HTTP que não precisa terminar antes de conectar ao gateway:
+        # roda em segundo plano, e os comandos já registrados no Discord continuam atendendo
+        self.tarefa_sincronizacao = asyncio.create_task(self._sincronizar_comandos())
+
+    async def _preparar(self):
         print("Executando setup_hook do BotExecutor...")
 
         # Carrega Cogs
@@ -94,12 +97,36 @@ class BotExecutor(RPGBot): # Herda da definição base
             print(f"Erro ao configurar handlers de erro: {e}")
             traceback.print_exc()
 
-        # Sincroniza comandos de aplicação
+        # Endpoint Prometheus opcional (metricas.porta no config.yaml)
+        config_metricas = config.get("metricas") or {}
+        if config_metricas.get("porta"):
+            try:
+                self.servidor_metricas = await iniciar_servidor_metricas(
+                    self.container.resolve('metricas'),
+                    host=config_metricas.get("host", "127.0.0.1"),
+                    porta=int(config_metricas["porta"]),
+                )
+            except Exception as e:
+                print(f"Erro ao iniciar o endpoint de métricas: {e}")
+                traceback.print_exc()
+
+        # Manutenção periódica do SQLite (checkpoint do WAL e PRAGMA optimize)
+        manutencao_banco = self.container.resolve('manutencao_banco')
+        if manutencao_banco is not None:
+            manutencao_banco.iniciar()
+
+    async def _sincronizar_comandos(self):
+        """Sincroniza comandos de aplicação."""
         print("Sincronizando comandos de aplicação...")
         try:
-            # Sincronização global
-            synced = await self.tree.sync()
-            print(f"Sincronizados {len(synced)} comandos de aplicação globalmente.")
+            # Sincronização global, só se a árvore mudou desde a última (hash guardado no banco)
+            synced = await sincronizar_se_alterada(
+                self.tree,
+                self.container.resolve('repo_sincronizacao_comandos'),
+                self.container.resolve('escopo_interacao'),
+            )
+            if synced is not None:
+                print(f"Sincronizados {len(synced)} comandos de aplicação globalmente.")
             # Descomente para sincronizar apenas em guild de teste
             # guild_id = os.getenv("TEST_GUILD_ID")
             # if guild_id:
@@ -111,9 +138,13 @@ class BotExecutor(RPGBot): # Herda da definição base
         except Exception as e:
             print(f"Erro ao sincronizar comandos: {e}")
             traceback.print_exc()
+        finally:
+            relatorio_inicializacao.marcar("comandos_sincronizados")
 
     async def on_ready(self):
         """Sobrescreve on_ready para mensagem final."""
+        if relatorio_inicializacao.marcar("pronto"): # Só no primeiro on_ready (não nas reconexões)
+            print(relatorio_inicializacao.formatar())
         print("-" * 30)
         print(f'Bot conectado como: {self.user} (ID: {self.user.id})')
         print(f'Servidores conectados: {len(self.guilds)}')
@@ -121,6 +152,30 @@ class BotExecutor(RPGBot): # Herda da definição base
         print("-" * 30)
         print("Ostervalt (executar_bot.py) está pronto para a aventura!")
 
+    async def close(self):
+        """Encerra o bot e aguarda as operações de banco pendentes no executor."""
+        if self.tarefa_sincronizacao is not None and not self.tarefa_sincronizacao.done():
+            self.tarefa_sincronizacao.cancel()
+        await super().close()
+        manutencao_banco = self.container.resolve('manutencao_banco')
+        if manutencao_banco is not None:
+            await manutencao_banco.parar()
+        if self.servidor_metricas is not None:
+            await self.servidor_metricas.cleanup()
+        try:
+            self.container.resolve('executor_banco').encerrar()
+            print("Executor de banco de dados encerrado.")
+        except Exception as e:
+            print(f"Erro ao encerrar executor de banco de dados: {e}")
+        # Depois do executor: as operações que ele concluiu podem ter deixado escritas no buffer
+        buffer_escrita = self.container.resolve('buffer_escrita')
+        if buffer_escrita is not None:
+            try:
+                buffer_escrita.encerrar()
+                print(f"Buffer de escrita gravado e encerrado ({buffer_escrita.operacoes} escritas em {buffer_escrita.lotes} lotes).")
+            except Exception as e:
+                print(f"Erro ao encerrar o buffer de escrita: {e}")
+
     # Tratamento de erro global movido para error_handler.py
 
 # --- Inicialização do Bot ---
@@ -131,6 +186,24 @@ def main():
     if not TOKEN:
         raise ValueError("Nenhum token encontrado. Certifique-se de que você tem um arquivo .env com DISCORD_TOKEN definido.")
 
+    # 1. Cria as tabelas do banco de dados (se não existirem)
+    try:
+        with relatorio_inicializacao.etapa("criar_tabelas"):
+            criar_tabelas()
+        print("Tabelas do banco de dados verificadas/criadas.")
+    except Exception as e:
+        print(f"Erro ao criar/verificar tabelas do banco de dados: {e}")
+        # exit(1) # Descomente para parar se o DB for essencial
+
+    # 2. Configura o container de injeção de dependência
+    try:
+        with relatorio_inicializacao.etapa("configurar_container"):
+            container = configurar_container()
+        print("Container de injeção de dependência configurado.")
+    except Exception as e:
+        print(f"Erro crítico ao configurar o container de dependências: {e}")
+        exit(1) # Para a execução se o container falhar
+
     # Usa a nova classe BotExecutor que herda de RPGBot
     bot = BotExecutor(container=container, intents=intents)
 
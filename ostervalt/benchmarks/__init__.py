@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks dos caminhos quentes da economia, sobre servidores sintéticos.
+
+Popula um banco novo com um catálogo de itens e um servidor (guild) por tamanho pedido,
+monta o bot com configurar_container/carregar_cogs e executa os callbacks dos Cogs
+com interações falsas. O resultado (vazão e percentis de latência por cenário) sai em
+JSON, para comparar commits.
+
+Ex:
+    python -m ostervalt.benchmarks --tamanhos 1000 10000 100000 --saida bench.json
+
+Para Postgres, suba um banco descartável (ex: docker run --rm -p 5432:5432
+-e POSTGRES_PASSWORD=bench postgres:16) e passe --url com --recriar-tabelas.
+"""
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+import argparse
+import asyncio
+import contextlib
+import json
+import sys
+
+from ostervalt.benchmarks.ambiente import banco_descartavel, metadados_execucao, montar_bot
+from ostervalt.benchmarks.cenarios import CENARIOS, executar_cenario
+from ostervalt.benchmarks.servidor_sintetico import popular_catalogo, popular_servidor
+
+VERSAO_RELATORIO = 1
+
+
+def _argumentos(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m ostervalt.benchmarks",
+        description="Benchmark dos caminhos quentes da economia sobre servidores sintéticos.",
+    )
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="Personagens por servidor sintético (um servidor por tamanho).")
+    parser.add_argument("--cenarios", nargs="+", choices=sorted(CENARIOS), default=list(CENARIOS))
+    parser.add_argument("--iteracoes", type=int, default=1000, help="Execuções medidas por cenário e servidor.")
+    parser.add_argument("--aquecimento", type=int, default=10, help="Execuções descartadas antes de medir.")
+    parser.add_argument("--itens", type=int, default=2000, help="Itens no catálogo.")
+    parser.add_argument("--estoque", type=int, default=100, help="Itens na loja de cada servidor.")
+    parser.add_argument("--itens-por-personagem", type=int, default=5)
+    parser.add_argument("--modo-banco", choices=("executor", "sincrono"), default="executor")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--url", help="URL do banco (padrão: SQLite em um diretório temporário).")
+    parser.add_argument("--recriar-tabelas", action="store_true",
+                        help="Obrigatório com --url: apaga e recria todas as tabelas do banco informado.")
+    parser.add_argument("--saida", default="-", help="Arquivo JSON de saída ('-' para a saída padrão).")
+    argumentos = parser.parse_args(argv)
+    if argumentos.url and not argumentos.recriar_tabelas:
+        parser.error("--url apaga as tabelas do banco informado; confirme com --recriar-tabelas.")
+    return argumentos
+
+
+async def executar(argumentos: argparse.Namespace) -> dict:
+    # O engine do bot é criado na importação de configuracao.db a partir de DATABASE_URL:
+    # os módulos do bot só são importados depois de apontá-la para o banco do benchmark
+    from ostervalt.infraestrutura.configuracao import db
+    from ostervalt.infraestrutura.configuracao.container import configurar_container
+
+    db.Base.metadata.drop_all(db.engine)
+    db.Base.metadata.create_all(db.engine)
+
+    print(f"Populando catálogo com {argumentos.itens} itens...")
+    popular_catalogo(db.engine, argumentos.itens, semente=argumentos.semente)
+    servidores = []
+    for servidor_id, tamanho in enumerate(argumentos.tamanhos, start=1):
+        print(f"Populando servidor {servidor_id} com {tamanho} personagens...")
+        servidores.append(popular_servidor(
+            db.engine, servidor_id, tamanho,
+            estoque=argumentos.estoque,
+            itens_por_personagem=argumentos.itens_por_personagem,
+            semente=argumentos.semente,
+        ))
+
+    container = configurar_container(modo_banco=argumentos.modo_banco)
+    bot = await montar_bot(container)
+    resultados = []
+    try:
+        escopo_interacao = container.resolve('escopo_interacao')
+        for servidor in servidores:
+            for nome in argumentos.cenarios:
+                print(f"Executando {nome} no servidor {servidor.servidor_id} ({servidor.personagens} personagens)...")
+                resultados.append(await executar_cenario(
+                    CENARIOS[nome], bot, servidor, escopo_interacao,
+                    iteracoes=argumentos.iteracoes,
+                    aquecimento=argumentos.aquecimento,
+                    semente=argumentos.semente,
+                ))
+    finally:
+        await bot.close()
+        container.resolve('executor_banco').encerrar()
+        if container.resolve('buffer_escrita') is not None:
+            container.resolve('buffer_escrita').encerrar()
+        db.engine.dispose()
+
+    return {
+        "versao": VERSAO_RELATORIO,
+        **metadados_execucao(db.engine, argumentos.modo_banco),
+        "parametros": {
+            "iteracoes": argumentos.iteracoes,
+            "aquecimento": argumentos.aquecimento,
+            "itens": argumentos.itens,
+            "semente": argumentos.semente,
+        },
+        "servidores": [servidor.resumo() for servidor in servidores],
+        "resultados": resultados,
+    }
+
+
+def main(argv=None) -> None:
+    argumentos = _argumentos(argv)
+    # Os módulos do bot usam print(); o JSON fica sozinho na saída padrão
+    with banco_descartavel(argumentos.url), contextlib.redirect_stdout(sys.stderr):
+        relatorio = asyncio.run(executar(argumentos))
+
+    texto = json.dumps(relatorio, ensure_ascii=False, indent=2)
+    if argumentos.saida == "-":
+        print(texto)
+    else:
+        with open(argumentos.saida, "w", encoding="utf-8") as arquivo:
+            arquivo.write(texto + "\n")
+        print(f"Relatório salvo em {argumentos.saida}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
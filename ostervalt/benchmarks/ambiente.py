@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+import datetime
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import discord
+import sqlalchemy
+
+# ID fictício da aplicação usado nos payloads de interação sintéticos
+ID_APLICACAO = 1_000_000_000_000_000
+
+
+@contextmanager
+def banco_descartavel(url: Optional[str] = None) -> Iterator[str]:
+    """
+    Aponta DATABASE_URL para o banco do benchmark: a URL informada ou um SQLite em um
+    diretório temporário, removido ao final. Deve envolver a importação de
+    ostervalt.infraestrutura.configuracao.db, que cria o engine a partir dessa variável.
+    """
+    diretorio_temporario = None
+    if url is None:
+        diretorio_temporario = tempfile.mkdtemp(prefix="ostervalt_bench_")
+        url = f"sqlite:///{os.path.join(diretorio_temporario, 'bench.db')}"
+    os.environ["DATABASE_URL"] = url
+    try:
+        yield url
+    finally:
+        if diretorio_temporario:
+            shutil.rmtree(diretorio_temporario, ignore_errors=True)
+
+
+def simular_login(bot) -> None:
+    """Preenche o usuário e a aplicação do bot, para que o discord.py aceite payloads de interação sem login."""
+    bot._connection.user = discord.ClientUser(
+        state=bot._connection,
+        data={"id": str(ID_APLICACAO), "username": "ostervalt-bench", "discriminator": "0", "avatar": None, "bot": True},
+    )
+    bot._connection.application_id = ID_APLICACAO
+
+
+async def montar_bot(container):
+    """Monta o bot como o executar_bot faz (RPGBot, carregar_cogs e handlers de erro), sem conectar ao Discord."""
+    from ostervalt.infraestrutura.bot_discord.carregador_cogs import carregar_cogs
+    from ostervalt.infraestrutura.bot_discord.definicao_bot import RPGBot
+    from ostervalt.infraestrutura.bot_discord.error_handler import setup_error_handlers
+
+    bot = RPGBot(command_prefix="!", intents=discord.Intents.default())
+    simular_login(bot)
+    await carregar_cogs(bot, container)
+    await setup_error_handlers(bot)
+    return bot
+
+
+def _commit_atual() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True, timeout=5,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def metadados_execucao(engine, modo_banco: str) -> dict:
+    """Commit, versões e banco da execução, para comparar relatórios entre commits."""
+    return {
+        "data": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "commit": _commit_atual(),
+        "ambiente": {
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "discord.py": discord.__version__,
+            "plataforma": platform.platform(),
+            "banco": engine.dialect.name,
+            "modo_banco": modo_banco,
+        },
+    }
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+import math
+import random
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Sequence
+
+from discord.ext import commands
+
+from ostervalt.benchmarks.interacao_falsa import InteracaoFalsa
+from ostervalt.benchmarks.servidor_sintetico import ServidorSintetico, nome_personagem
+
+# Parâmetros do /estoque nos cenários (quantidade por raridade)
+ESTOQUE_POR_RARIDADE = {"common": 10, "uncommon": 5, "rare": 3, "very_rare": 1}
+
+
+@dataclass(frozen=True)
+class Cenario:
+    """
+    Um caminho quente executado repetidamente pelo benchmark.
+    `executar(bot, servidor, indice, aleatorio)` monta a interação falsa, chama o callback
+    do Cog e devolve a interação, para que o resultado possa ser conferido.
+    """
+    nome: str
+    descricao: str
+    executar: Callable[[commands.Bot, ServidorSintetico, int, random.Random], Awaitable[InteracaoFalsa]]
+
+
+def _interacao_personagem(servidor: ServidorSintetico, indice: int, comando: str):
+    # Cada iteração usa um personagem diferente: com o cooldown padrão, repetir o mesmo
+    # personagem mediria o caminho de "em cooldown" em vez do caminho de sucesso
+    indice = indice % servidor.personagens
+    interacao = InteracaoFalsa(servidor.usuario_do_personagem(indice), servidor.servidor_id, nome_comando=comando)
+    return interacao, nome_personagem(indice)
+
+
+async def _trabalhar(bot, servidor, indice, aleatorio):
+    interacao, nome = _interacao_personagem(servidor, indice, "trabalhar")
+    cog = bot.get_cog("EconomiaCog")
+    await cog.trabalhar.callback(cog, interacao, nome)
+    return interacao
+
+
+async def _crime(bot, servidor, indice, aleatorio):
+    interacao, nome = _interacao_personagem(servidor, indice, "crime")
+    cog = bot.get_cog("EconomiaCog")
+    await cog.crime.callback(cog, interacao, nome)
+    return interacao
+
+
+async def _inventario(bot, servidor, indice, aleatorio):
+    interacao, nome = _interacao_personagem(servidor, aleatorio.randrange(servidor.personagens), "inventario")
+    cog = bot.get_cog("InventarioCog")
+    await cog.ver_inventario.callback(cog, interacao, nome, pagina=1)
+    return interacao
+
+
+async def _autocomplete_personagem(bot, servidor, indice, aleatorio):
+    interacao, nome = _interacao_personagem(servidor, aleatorio.randrange(servidor.personagens), "trabalhar")
+    cog = bot.get_cog("EconomiaCog")
+    interacao.opcoes_autocomplete = await cog.character_autocomplete(interacao, nome[:-2])
+    return interacao
+
+
+async def _autocomplete_item(bot, servidor, indice, aleatorio):
+    interacao = InteracaoFalsa(servidor.usuario_base, servidor.servidor_id, nome_comando="additem")
+    nome_item = aleatorio.choice(servidor.nomes_itens)
+    cog = bot.get_cog("InventarioCog")
+    interacao.opcoes_autocomplete = await cog.autocomplete_item(interacao, nome_item.split()[-1][:4])
+    return interacao
+
+
+async def _estoque(bot, servidor, indice, aleatorio):
+    interacao = InteracaoFalsa(servidor.usuario_base, servidor.servidor_id, nome_comando="estoque")
+    cog = bot.get_cog("AdminCog")
+    await cog.estoque.callback(cog, interacao, **ESTOQUE_POR_RARIDADE)
+    return interacao
+
+
+CENARIOS: Dict[str, Cenario] = {
+    cenario.nome: cenario
+    for cenario in (
+        Cenario("trabalhar", "/trabalhar: RealizarTrabalho com cooldown e recompensa por tier", _trabalhar),
+        Cenario("crime", "/crime: CometerCrime com cooldown", _crime),
+        Cenario("inventario", "/inventario: ListarInventario, primeira página", _inventario),
+        Cenario("autocomplete_personagem", "Autocomplete de personagens ativos do usuário", _autocomplete_personagem),
+        Cenario("autocomplete_item", "Autocomplete de itens pelo catálogo em memória", _autocomplete_item),
+        Cenario("estoque", "/estoque: sorteio e substituição do estoque da loja", _estoque),
+    )
+}
+
+
+def percentis(amostras: Sequence[float], quantis: Sequence[float] = (0.5, 0.9, 0.99)) -> Dict[str, float]:
+    """Percentis exatos (nearest-rank) das amostras, além de média e máximo."""
+    if not amostras:
+        return {}
+    ordenadas = sorted(amostras)
+    resultado = {f"p{q * 100:g}": ordenadas[max(0, math.ceil(q * len(ordenadas)) - 1)] for q in quantis}
+    resultado["media"] = sum(ordenadas) / len(ordenadas)
+    resultado["max"] = ordenadas[-1]
+    return resultado
+
+
+async def executar_cenario(
+    cenario: Cenario,
+    bot: commands.Bot,
+    servidor: ServidorSintetico,
+    escopo_interacao,
+    iteracoes: int,
+    aquecimento: int = 10,
+    semente: int = 0,
+) -> Dict[str, object]:
+    """
+    Executa o cenário `aquecimento + iteracoes` vezes em sequência, cada uma em sua própria
+    unidade de trabalho (como a ArvoreComandos faz), e mede só as iterações após o aquecimento.
+    """
+    aleatorio = random.Random(semente)
+    latencias: List[float] = []
+    falhas = 0
+    inicio_total = None
+    for indice in range(aquecimento + iteracoes):
+        if indice == aquecimento:
+            inicio_total = time.perf_counter()
+        inicio = time.perf_counter()
+        async with escopo_interacao():
+            interacao = await cenario.executar(bot, servidor, indice, aleatorio)
+        if indice >= aquecimento:
+            latencias.append(time.perf_counter() - inicio)
+            falhas += interacao.falhou
+    duracao = time.perf_counter() - inicio_total if inicio_total is not None else 0.0
+    return {
+        "cenario": cenario.nome,
+        "servidor_id": servidor.servidor_id,
+        "personagens": servidor.personagens,
+        "iteracoes": iteracoes,
+        "falhas": falhas,
+        "duracao_s": round(duracao, 6),
+        "vazao_por_s": round(iteracoes / duracao, 3) if duracao else None,
+        "latencia_ms": {nome: round(valor * 1000, 4) for nome, valor in percentis(latencias).items()},
+    }
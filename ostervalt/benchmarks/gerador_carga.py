@@ -0,0 +1,449 @@
+# -*- coding: utf-8 -*-
+"""
+Gerador de carga: empurra milhares de interações concorrentes pela árvore de comandos
+do bot, sem gateway do Discord.
+
+Monta o bot como o executar_bot (configurar_container + carregar_cogs), popula um servidor
+sintético e despacha interações com payloads reais do discord.py por ArvoreComandos._call,
+o mesmo caminho das interações vindas do gateway (escopo de sessão, métricas, checks e
+autocompletes). Apenas response/followup são substituídos por versões que não chamam a API.
+
+Ex:
+    python -m ostervalt.benchmarks.gerador_carga --total 5000 --concorrencia 100 \\
+        --mix trabalhar=40 crime=20 autocomplete:trabalhar=20 inventario=20 --gravar trafego.jsonl
+    python -m ostervalt.benchmarks.gerador_carga --reproduzir trafego.jsonl --velocidade 2
+
+Arquivo de tráfego: JSON por linha, com t (segundos desde o início), comando,
+autocomplete, usuario_id, servidor_id, opcoes e foco (opção focada do autocomplete).
+"""
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import discord
+from discord import app_commands
+
+from ostervalt.benchmarks.ambiente import ID_APLICACAO, banco_descartavel, metadados_execucao, montar_bot
+from ostervalt.benchmarks.cenarios import percentis
+from ostervalt.benchmarks.interacao_falsa import RegistroRespostas
+from ostervalt.benchmarks.servidor_sintetico import ServidorSintetico, nome_personagem, popular_catalogo, popular_servidor
+
+VERSAO_RELATORIO = 1
+PREFIXO_AUTOCOMPLETE = "autocomplete:"
+QUANTIS = (0.5, 0.9, 0.99, 0.999)
+INTERVALO_MONITOR_LAG = 0.01 # segundos
+
+# Comando (ou 'autocomplete:comando') -> peso no sorteio
+MIX_PADRAO = {
+    "trabalhar": 25,
+    "crime": 15,
+    "inventario": 10,
+    "carteira": 10,
+    "perfil": 5,
+    "personagens": 5,
+    "loja": 5,
+    "autocomplete:trabalhar": 15,
+    "autocomplete:inventario": 10,
+}
+
+
+@dataclass
+class RequisicaoCarga:
+    """Uma interação do tráfego, sintético ou gravado (uma linha do arquivo de tráfego)."""
+    t: float
+    comando: str
+    usuario_id: int
+    servidor_id: int
+    opcoes: Dict[str, Any] = field(default_factory=dict)
+    autocomplete: bool = False
+    foco: Optional[str] = None
+
+    @property
+    def rotulo(self) -> str:
+        return f"{PREFIXO_AUTOCOMPLETE}{self.comando}" if self.autocomplete else self.comando
+
+    @classmethod
+    def de_json(cls, linha: str) -> "RequisicaoCarga":
+        return cls(**json.loads(linha))
+
+    def para_json(self) -> str:
+        return json.dumps(asdict(self), ensure_ascii=False)
+
+
+@dataclass
+class Amostra:
+    rotulo: str
+    latencia: float
+    primeira_resposta: Optional[float]
+    falhou: bool
+    erro: Optional[str] = None
+
+
+class InteracaoCarga(RegistroRespostas, discord.Interaction):
+    """discord.Interaction construída a partir de um payload sintético, com response/followup falsos."""
+    def __init__(self, payload: dict, state):
+        discord.Interaction.__init__(self, data=payload, state=state)
+        self._iniciar_registro()
+
+
+def _comando(arvore: app_commands.CommandTree, nome: str) -> app_commands.Command:
+    comando = arvore.get_command(nome)
+    if not isinstance(comando, app_commands.Command):
+        raise ValueError(f"Comando /{nome} não está registrado na árvore de comandos.")
+    return comando
+
+
+def montar_payload(arvore: app_commands.CommandTree, requisicao: RequisicaoCarga, id_interacao: int) -> dict:
+    """Payload INTERACTION_CREATE equivalente ao que o gateway entregaria para a requisição."""
+    comando = _comando(arvore, requisicao.comando)
+    opcoes = []
+    for nome, valor in requisicao.opcoes.items():
+        parametro = comando.get_parameter(nome)
+        if parametro is None:
+            raise ValueError(f"/{requisicao.comando} não tem a opção '{nome}'.")
+        opcao = {"name": nome, "type": parametro.type.value, "value": valor}
+        if requisicao.autocomplete and nome == requisicao.foco:
+            opcao["focused"] = True
+        opcoes.append(opcao)
+    tipo = discord.InteractionType.autocomplete if requisicao.autocomplete else discord.InteractionType.application_command
+    return {
+        "id": str(id_interacao),
+        "application_id": str(ID_APLICACAO),
+        "type": tipo.value,
+        "token": f"carga-{id_interacao}",
+        "version": 1,
+        "guild_id": str(requisicao.servidor_id),
+        "channel_id": str(requisicao.servidor_id),
+        "member": {
+            "user": {"id": str(requisicao.usuario_id), "username": f"usuario{requisicao.usuario_id}", "discriminator": "0", "avatar": None},
+            "roles": [],
+            "flags": 0,
+            "joined_at": "2024-01-01T00:00:00+00:00",
+            "deaf": False,
+            "mute": False,
+            # Administrador, para que comandos com checks de permissão também possam entrar no mix
+            "permissions": str(discord.Permissions.all().value),
+        },
+        "data": {"id": str(ID_APLICACAO + 1), "name": requisicao.comando, "type": 1, "options": opcoes},
+        "locale": "pt-BR",
+        "guild_locale": "pt-BR",
+        "app_permissions": "0",
+        "entitlements": [],
+    }
+
+
+class GeradorMix:
+    """Sorteia requisições conforme os pesos do mix, com usuários e personagens do servidor sintético."""
+    def __init__(self, arvore: app_commands.CommandTree, servidor: ServidorSintetico, mix: Dict[str, float], semente: int = 0):
+        self.servidor = servidor
+        self.aleatorio = random.Random(semente)
+        self.rotulos = list(mix)
+        self.pesos = list(mix.values())
+        self.comandos = {}
+        for rotulo in self.rotulos:
+            nome = rotulo.removeprefix(PREFIXO_AUTOCOMPLETE)
+            comando = _comando(arvore, nome)
+            for parametro in comando.parameters:
+                if parametro.required and parametro.name not in self._GERADORES:
+                    raise ValueError(f"/{nome} tem a opção obrigatória '{parametro.name}', sem gerador de valores no mix.")
+            if rotulo.startswith(PREFIXO_AUTOCOMPLETE) and not any(p.autocomplete for p in comando.parameters):
+                raise ValueError(f"/{nome} não tem opções com autocomplete.")
+            self.comandos[nome] = comando
+
+    # Opção -> valor gerado a partir do personagem sorteado
+    _GERADORES = {
+        "character": lambda gerador, indice: nome_personagem(indice),
+        "nome": lambda gerador, indice: f"Carga {gerador.aleatorio.randrange(10**9)}",
+        "item_id": lambda gerador, indice: gerador.aleatorio.randrange(len(gerador.servidor.nomes_itens)) + 1,
+        "item": lambda gerador, indice: gerador.aleatorio.choice(gerador.servidor.nomes_itens),
+        "quantidade": lambda gerador, indice: 1,
+    }
+
+    def proxima(self, t: float) -> RequisicaoCarga:
+        rotulo = self.aleatorio.choices(self.rotulos, weights=self.pesos)[0]
+        autocomplete = rotulo.startswith(PREFIXO_AUTOCOMPLETE)
+        nome = rotulo.removeprefix(PREFIXO_AUTOCOMPLETE)
+        comando = self.comandos[nome]
+        indice = self.aleatorio.randrange(self.servidor.personagens)
+        opcoes = {
+            parametro.name: self._GERADORES[parametro.name](self, indice)
+            for parametro in comando.parameters
+            if parametro.required
+        }
+        foco = None
+        if autocomplete:
+            foco = next(p.name for p in comando.parameters if p.autocomplete)
+            opcoes[foco] = str(opcoes.get(foco, ""))[:-2] # O usuário ainda está digitando
+        return RequisicaoCarga(
+            t=round(t, 6),
+            comando=nome,
+            usuario_id=self.servidor.usuario_do_personagem(indice),
+            servidor_id=self.servidor.servidor_id,
+            opcoes=opcoes,
+            autocomplete=autocomplete,
+            foco=foco,
+        )
+
+
+class MonitorLagLoop:
+    """Mede o atraso do event loop: quanto um sleep curto demora além do pedido."""
+    def __init__(self, intervalo: float = INTERVALO_MONITOR_LAG):
+        self.intervalo = intervalo
+        self.amostras: List[float] = []
+        self._tarefa: Optional[asyncio.Task] = None
+
+    async def _medir(self) -> None:
+        while True:
+            inicio = time.perf_counter()
+            await asyncio.sleep(self.intervalo)
+            self.amostras.append(max(0.0, time.perf_counter() - inicio - self.intervalo))
+
+    def iniciar(self) -> None:
+        self._tarefa = asyncio.get_running_loop().create_task(self._medir())
+
+    async def parar(self) -> None:
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._tarefa
+
+
+class Despachante:
+    """Constrói a interação de cada requisição e a entrega à árvore de comandos, medindo o tempo."""
+    def __init__(self, bot):
+        self.bot = bot
+        self._ids = itertools.count(1)
+        self.amostras: List[Amostra] = []
+
+    async def despachar(self, requisicao: RequisicaoCarga) -> Amostra:
+        interacao = InteracaoCarga(montar_payload(self.bot.tree, requisicao, next(self._ids)), self.bot._connection)
+        erro = None
+        inicio = time.perf_counter()
+        try:
+            await self.bot.tree._call(interacao)
+        except Exception as e: # Exceções que escaparam do comando e dos handlers de erro
+            erro = f"{e.__class__.__name__}: {e}"
+        fim = time.perf_counter()
+        amostra = Amostra(
+            rotulo=requisicao.rotulo,
+            latencia=fim - inicio,
+            primeira_resposta=interacao.respondida_em - inicio if interacao.respondida_em is not None else None,
+            falhou=interacao.falhou,
+            erro=erro,
+        )
+        self.amostras.append(amostra)
+        return amostra
+
+
+async def executar_mix(despachante: Despachante, gerador: GeradorMix, total: int, concorrencia: int) -> List[RequisicaoCarga]:
+    """Carga em malha fechada: `concorrencia` usuários virtuais, cada um disparando a próxima interação ao receber a anterior."""
+    enviadas: List[RequisicaoCarga] = []
+    inicio = time.perf_counter()
+
+    async def usuario_virtual():
+        while len(enviadas) < total:
+            requisicao = gerador.proxima(time.perf_counter() - inicio)
+            enviadas.append(requisicao)
+            await despachante.despachar(requisicao)
+
+    await asyncio.gather(*(usuario_virtual() for _ in range(concorrencia)))
+    return enviadas
+
+
+async def reproduzir(despachante: Despachante, requisicoes: Sequence[RequisicaoCarga], velocidade: float = 1.0, concorrencia_maxima: Optional[int] = None) -> None:
+    """
+    Carga em malha aberta: dispara cada requisição no instante gravado (dividido por `velocidade`),
+    sem esperar as anteriores terminarem. `concorrencia_maxima` limita as interações em andamento.
+    """
+    limite = asyncio.Semaphore(concorrencia_maxima) if concorrencia_maxima else None
+    inicio = time.perf_counter()
+
+    async def disparar(requisicao: RequisicaoCarga):
+        if limite is None:
+            await despachante.despachar(requisicao)
+            return
+        async with limite:
+            await despachante.despachar(requisicao)
+
+    tarefas = []
+    for requisicao in sorted(requisicoes, key=lambda r: r.t):
+        espera = requisicao.t / velocidade - (time.perf_counter() - inicio)
+        if espera > 0:
+            await asyncio.sleep(espera)
+        tarefas.append(asyncio.create_task(disparar(requisicao)))
+    await asyncio.gather(*tarefas)
+
+
+def ler_trafego(linhas: Iterable[str]) -> List[RequisicaoCarga]:
+    return [RequisicaoCarga.de_json(linha) for linha in linhas if linha.strip()]
+
+
+def _em_ms(valores: Sequence[float]) -> Dict[str, float]:
+    return {nome: round(valor * 1000, 4) for nome, valor in percentis(valores, QUANTIS).items()}
+
+
+def resumir_amostras(amostras: Sequence[Amostra], duracao: float, lags: Sequence[float]) -> dict:
+    """Vazão, latências (total e da primeira resposta) por comando e atraso do event loop."""
+    por_rotulo: Dict[str, List[Amostra]] = defaultdict(list)
+    for amostra in amostras:
+        por_rotulo[amostra.rotulo].append(amostra)
+
+    def resumo(grupo: Sequence[Amostra]) -> dict:
+        return {
+            "total": len(grupo),
+            "falhas": sum(a.falhou for a in grupo),
+            "erros": sum(a.erro is not None for a in grupo),
+            "latencia_ms": _em_ms([a.latencia for a in grupo]),
+            "primeira_resposta_ms": _em_ms([a.primeira_resposta for a in grupo if a.primeira_resposta is not None]),
+        }
+
+    erros = defaultdict(int)
+    for amostra in amostras:
+        if amostra.erro:
+            erros[amostra.erro] += 1
+    return {
+        "duracao_s": round(duracao, 6),
+        "vazao_por_s": round(len(amostras) / duracao, 3) if duracao else None,
+        **resumo(amostras),
+        "lag_loop_ms": _em_ms(lags),
+        "por_comando": {rotulo: resumo(grupo) for rotulo, grupo in sorted(por_rotulo.items())},
+        "exemplos_erros": dict(sorted(erros.items(), key=lambda item: -item[1])[:10]),
+    }
+
+
+def _ler_mix(valores: Optional[Sequence[str]]) -> Dict[str, float]:
+    if not valores:
+        return dict(MIX_PADRAO)
+    mix = {}
+    for valor in valores:
+        rotulo, _, peso = valor.partition("=")
+        try:
+            mix[rotulo] = float(peso) if peso else 1.0
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Peso inválido em '{valor}' (use comando=peso).")
+    return mix
+
+
+def _argumentos(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m ostervalt.benchmarks.gerador_carga",
+        description="Gera carga de interações contra o bot, sem conexão com o Discord.",
+    )
+    parser.add_argument("--personagens", type=int, default=10000, help="Personagens do servidor sintético.")
+    parser.add_argument("--itens", type=int, default=2000, help="Itens no catálogo.")
+    parser.add_argument("--mix", nargs="+", metavar="COMANDO=PESO",
+                        help="Mix de comandos; use autocomplete:comando para autocompletes (padrão: MIX_PADRAO).")
+    parser.add_argument("--total", type=int, default=5000, help="Interações no modo mix.")
+    parser.add_argument("--concorrencia", type=int, default=50, help="Usuários virtuais simultâneos (mix) ou limite de interações em andamento (reprodução).")
+    parser.add_argument("--reproduzir", metavar="ARQUIVO", help="Reproduz um arquivo de tráfego em vez de sortear pelo mix.")
+    parser.add_argument("--velocidade", type=float, default=1.0, help="Multiplicador do ritmo na reprodução.")
+    parser.add_argument("--gravar", metavar="ARQUIVO", help="Grava o tráfego gerado pelo mix, para reproduzir depois.")
+    parser.add_argument("--modo-banco", choices=("executor", "sincrono"), default="executor")
+    parser.add_argument("--buffer-escrita", action=argparse.BooleanOptionalAction, default=None,
+                        help="Liga/desliga o buffer de escrita dos personagens (padrão: config.yaml).")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--url", help="URL do banco (padrão: SQLite em um diretório temporário).")
+    parser.add_argument("--recriar-tabelas", action="store_true",
+                        help="Obrigatório com --url: apaga e recria todas as tabelas do banco informado.")
+    parser.add_argument("--saida", default="-", help="Arquivo JSON de saída ('-' para a saída padrão).")
+    argumentos = parser.parse_args(argv)
+    if argumentos.url and not argumentos.recriar_tabelas:
+        parser.error("--url apaga as tabelas do banco informado; confirme com --recriar-tabelas.")
+    try:
+        argumentos.mix = _ler_mix(argumentos.mix)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    return argumentos
+
+
+async def executar(argumentos: argparse.Namespace) -> dict:
+    # Importados só depois de DATABASE_URL apontar para o banco da carga (ver ambiente.banco_descartavel)
+    from ostervalt.infraestrutura.configuracao import db
+    from ostervalt.infraestrutura.configuracao.container import configurar_container
+
+    db.Base.metadata.drop_all(db.engine)
+    db.Base.metadata.create_all(db.engine)
+    popular_catalogo(db.engine, argumentos.itens, semente=argumentos.semente)
+    servidor = popular_servidor(db.engine, 1, argumentos.personagens, semente=argumentos.semente)
+
+    container = configurar_container(modo_banco=argumentos.modo_banco, buffer_escrita=argumentos.buffer_escrita)
+    buffer_escrita = container.resolve('buffer_escrita')
+    bot = await montar_bot(container)
+    despachante = Despachante(bot)
+    monitor = MonitorLagLoop()
+    try:
+        if argumentos.reproduzir:
+            with open(argumentos.reproduzir, encoding="utf-8") as arquivo:
+                requisicoes = ler_trafego(arquivo)
+            print(f"Reproduzindo {len(requisicoes)} interações de {argumentos.reproduzir}...")
+            monitor.iniciar()
+            inicio = time.perf_counter()
+            await reproduzir(despachante, requisicoes, argumentos.velocidade, argumentos.concorrencia)
+        else:
+            gerador = GeradorMix(bot.tree, servidor, argumentos.mix, semente=argumentos.semente)
+            print(f"Disparando {argumentos.total} interações com {argumentos.concorrencia} usuários virtuais...")
+            monitor.iniciar()
+            inicio = time.perf_counter()
+            requisicoes = await executar_mix(despachante, gerador, argumentos.total, argumentos.concorrencia)
+        duracao = time.perf_counter() - inicio
+        await monitor.parar()
+    finally:
+        await bot.close()
+        container.resolve('executor_banco').encerrar()
+        if buffer_escrita is not None:
+            buffer_escrita.encerrar()
+        db.engine.dispose()
+
+    if argumentos.gravar:
+        with open(argumentos.gravar, "w", encoding="utf-8") as arquivo:
+            arquivo.writelines(requisicao.para_json() + "\n" for requisicao in requisicoes)
+
+    return {
+        "versao": VERSAO_RELATORIO,
+        **metadados_execucao(db.engine, argumentos.modo_banco),
+        "parametros": {
+            "modo": "reproducao" if argumentos.reproduzir else "mix",
+            "mix": None if argumentos.reproduzir else argumentos.mix,
+            "concorrencia": argumentos.concorrencia,
+            "velocidade": argumentos.velocidade if argumentos.reproduzir else None,
+            "buffer_escrita": buffer_escrita is not None,
+            "semente": argumentos.semente,
+        },
+        "servidor": servidor.resumo(),
+        "resultado": resumir_amostras(despachante.amostras, duracao, monitor.amostras),
+        # Histogramas do próprio bot (RegistroMetricas): tempo de banco, consultas SQL etc. por comando
+        "metricas_bot": container.resolve('metricas').resumo(),
+        "buffer_escrita": {
+            "lotes": buffer_escrita.lotes,
+            "escritas": buffer_escrita.operacoes,
+            "escritas_por_lote": round(buffer_escrita.operacoes / buffer_escrita.lotes, 2) if buffer_escrita.lotes else None,
+        } if buffer_escrita is not None else None,
+        "cache_itens": container.resolve('cache_itens').estatisticas(),
+    }
+
+
+def main(argv=None) -> None:
+    argumentos = _argumentos(argv)
+    # Os módulos do bot usam print(); o JSON fica sozinho na saída padrão
+    with banco_descartavel(argumentos.url), contextlib.redirect_stdout(sys.stderr):
+        relatorio = asyncio.run(executar(argumentos))
+
+    texto = json.dumps(relatorio, ensure_ascii=False, indent=2)
+    if argumentos.saida == "-":
+        print(texto)
+    else:
+        with open(argumentos.saida, "w", encoding="utf-8") as arquivo:
+            arquivo.write(texto + "\n")
+        print(f"Relatório salvo em {argumentos.saida}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Mede a inicialização a frio do bot: importações (por módulo), criação das tabelas,
+configuração do container e o equivalente ao setup_hook (RPGBot, Cogs e handlers),
+sem conectar ao Discord.
+
+A medição roda em um interpretador novo (`python -X importtime`), para que nada já
+importado pelo processo que mede entre na conta. Uso:
+
+    python -m ostervalt.benchmarks.inicializacao [--url URL] [--modulos 20] [--saida ARQUIVO]
+
+O relatório JSON vai para a saída padrão (ou --saida). O tempo até o primeiro on_ready
+de verdade depende da rede e é impresso pelo executar_bot ao conectar.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import subprocess
+import sys
+from typing import Optional
+
+# Só módulos leves aqui: este módulo também é o processo medido
+from ostervalt.infraestrutura.monitoramento.inicializacao import (
+    MODULOS_BOT,
+    RelatorioInicializacao,
+    importacoes_por_modulo,
+)
+
+MODULO = "ostervalt.benchmarks.inicializacao" # Não __name__: vale "__main__" com python -m
+ARGUMENTO_PROCESSO_MEDIDO = "--processo-medido"
+
+
+async def _montar_e_fechar(relatorio: RelatorioInicializacao, container) -> None:
+    from ostervalt.benchmarks.ambiente import montar_bot
+
+    with relatorio.etapa("setup_hook"):
+        bot = await montar_bot(container)
+    relatorio.marcar("pronto")
+    await bot.close()
+
+
+def _executar_processo_medido() -> None:
+    """Inicialização medida (no interpretador novo); escreve o resumo do relatório em JSON."""
+    relatorio = RelatorioInicializacao()
+    saida = sys.stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        relatorio.importar(MODULOS_BOT)
+        from ostervalt.infraestrutura.configuracao.container import configurar_container
+        from ostervalt.infraestrutura.configuracao.db import criar_tabelas
+
+        with relatorio.etapa("criar_tabelas"):
+            criar_tabelas()
+        with relatorio.etapa("configurar_container"):
+            container = configurar_container()
+        asyncio.run(_montar_e_fechar(relatorio, container))
+        container.resolve('executor_banco').encerrar()
+    json.dump(relatorio.resumo(), saida, ensure_ascii=False)
+
+
+def medir_inicializacao(url: Optional[str] = None, modulos: int = 20) -> dict:
+    """
+    Executa a inicialização em um interpretador novo e devolve o relatório: etapas e marcos
+    (segundos), importações de MODULOS_BOT e os `modulos` módulos de maior tempo cumulativo
+    segundo o `-X importtime`.
+    """
+    from ostervalt.benchmarks.ambiente import banco_descartavel
+
+    with banco_descartavel(url):
+        processo = subprocess.run(
+            [sys.executable, "-X", "importtime", "-m", MODULO, ARGUMENTO_PROCESSO_MEDIDO],
+            capture_output=True, text=True, env=dict(os.environ),
+        )
+    if processo.returncode != 0:
+        raise RuntimeError(f"A inicialização medida falhou (código {processo.returncode}):\n{processo.stderr[-2000:]}")
+
+    relatorio = json.loads(processo.stdout)
+    importtime = importacoes_por_modulo(processo.stderr)
+    relatorio["importtime_cumulativo_segundos"] = dict(
+        sorted(importtime.items(), key=lambda par: -par[1])[:modulos]
+    )
+    relatorio["modulos_importados"] = len(importtime)
+    return relatorio
+
+
+def _argumentos(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m ostervalt.benchmarks.inicializacao",
+        description="Mede a inicialização a frio do bot (importações, container e setup_hook).",
+    )
+    parser.add_argument("--url", help="URL do banco (padrão: SQLite em um diretório temporário).")
+    parser.add_argument("--modulos", type=int, default=20, help="Módulos mais lentos do importtime no relatório.")
+    parser.add_argument("--saida", default="-", help="Arquivo JSON de saída ('-' para a saída padrão).")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    argumentos = _argumentos(argv)
+    relatorio = medir_inicializacao(argumentos.url, argumentos.modulos)
+
+    texto = json.dumps(relatorio, ensure_ascii=False, indent=2)
+    if argumentos.saida == "-":
+        print(texto)
+    else:
+        with open(argumentos.saida, "w", encoding="utf-8") as arquivo:
+            arquivo.write(texto + "\n")
+        print(f"Relatório salvo em {argumentos.saida}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == [ARGUMENTO_PROCESSO_MEDIDO]:
+        _executar_processo_medido()
+    else:
+        main()
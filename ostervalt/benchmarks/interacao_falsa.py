@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import discord
+
+from ostervalt.infraestrutura.monitoramento.metricas import registrar_resposta
+
+
+class RespostaFalsa:
+    """Substitui interaction.response: registra o defer e as mensagens, sem chamar a API do Discord."""
+    def __init__(self, interacao: "RegistroRespostas"):
+        self._interacao = interacao
+        self._respondida = False
+
+    def is_done(self) -> bool:
+        return self._respondida
+
+    async def _responder(self) -> None:
+        if self._respondida:
+            raise discord.InteractionResponded(self._interacao)
+        self._respondida = True
+        self._interacao.registrar_resposta()
+
+    async def defer(self, *args, **kwargs) -> None:
+        await self._responder()
+
+    async def send_message(self, content: Optional[str] = None, **kwargs) -> None:
+        await self._responder()
+        self._interacao.registrar_mensagem(content, kwargs)
+
+    async def edit_message(self, content: Optional[str] = None, **kwargs) -> None:
+        await self._responder()
+        self._interacao.registrar_mensagem(content, kwargs)
+
+    async def autocomplete(self, choices) -> None:
+        await self._responder()
+        self._interacao.opcoes_autocomplete = list(choices)
+
+
+class FollowupFalso:
+    """Substitui interaction.followup (webhook da interação)."""
+    def __init__(self, interacao: "RegistroRespostas"):
+        self._interacao = interacao
+
+    async def send(self, content: Optional[str] = None, **kwargs) -> None:
+        self._interacao.registrar_mensagem(content, kwargs)
+
+
+class RegistroRespostas:
+    """Guarda o que um comando respondeu: mensagens, opções de autocomplete e o instante da primeira resposta."""
+    def _iniciar_registro(self) -> None:
+        self._resposta_falsa = RespostaFalsa(self)
+        self._followup_falso = FollowupFalso(self)
+        self.mensagens: List[Dict[str, Any]] = []
+        self.opcoes_autocomplete: List[Any] = []
+        self.respondida_em: Optional[float] = None # time.perf_counter() da primeira resposta
+
+    # Propriedades (e não atributos) para também sobrepor as de discord.Interaction nas subclasses
+    @property
+    def response(self) -> RespostaFalsa:
+        return self._resposta_falsa
+
+    @property
+    def followup(self) -> FollowupFalso:
+        return self._followup_falso
+
+    def registrar_resposta(self) -> None:
+        if self.respondida_em is None:
+            self.respondida_em = time.perf_counter()
+        registrar_resposta() # Histograma de latência da primeira resposta, se a interação estiver sendo medida
+
+    def registrar_mensagem(self, content: Optional[str], kwargs: Dict[str, Any]) -> None:
+        self.registrar_resposta()
+        self.mensagens.append({"content": content, **kwargs})
+
+    @property
+    def falhou(self) -> bool:
+        """Indica se o comando respondeu com uma mensagem de erro (prefixo '❌' usado pelos Cogs)."""
+        return any((mensagem["content"] or "").startswith("❌") for mensagem in self.mensagens)
+
+
+class InteracaoFalsa(RegistroRespostas):
+    """
+    Interação mínima para rodar callbacks de comandos e autocompletes fora do Discord.
+    Tem os atributos usados pelos Cogs e pelos discord_helpers (user, guild_id, namespace,
+    response, followup) e guarda as mensagens enviadas para conferência.
+    """
+    def __init__(
+        self,
+        usuario_id: int,
+        servidor_id: Optional[int],
+        nome_comando: str = "",
+        opcoes: Optional[Dict[str, Any]] = None,
+        tipo: discord.InteractionType = discord.InteractionType.application_command,
+    ):
+        self.user = SimpleNamespace(id=usuario_id, mention=f"<@{usuario_id}>", display_name=f"usuario{usuario_id}", roles=[])
+        self.guild_id = servidor_id
+        self.guild = SimpleNamespace(id=servidor_id, filesize_limit=8 * 1024 * 1024) if servidor_id else None
+        self.type = tipo
+        self.namespace = SimpleNamespace(**(opcoes or {}))
+        self.data = {
+            "name": nome_comando,
+            "options": [{"name": nome, "value": valor} for nome, valor in (opcoes or {}).items()],
+        }
+        self._iniciar_registro()
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Sequence
+
+from sqlalchemy import insert, select, func
+from sqlalchemy.engine import Engine
+
+from ostervalt.infraestrutura.persistencia.models import (
+    ConfiguracaoServidorModel,
+    EstoqueLojaItemModel,
+    ItemInventarioModel,
+    ItemModel,
+    PersonagemModel,
+    StatusPersonagem,
+)
+
+RARIDADES = ("common", "uncommon", "rare", "very rare")
+PESOS_RARIDADES = (60, 25, 10, 5)
+PERSONAGENS_POR_USUARIO = 2 # Mesmo limite padrão do config.yaml (limites.personagens_por_usuario)
+TAMANHO_LOTE = 10000
+
+# Tiers iguais aos do config.yaml, gravados na configuração de cada servidor sintético
+TIERS_SINTETICOS = {
+    "Pequeno Entusiasta": {"nivel_min": 1, "nivel_max": 4, "recompensa": 25},
+    "Pequeno Aventureiro": {"nivel_min": 5, "nivel_max": 8, "recompensa": 40},
+    "Aventureiro Experiente": {"nivel_min": 9, "nivel_max": 12, "recompensa": 60},
+    "Herói Lendário": {"nivel_min": 13, "nivel_max": 20, "recompensa": 100},
+}
+
+
+@dataclass
+class ServidorSintetico:
+    """Um servidor (guild) populado para benchmark, com o que os cenários precisam para montar interações."""
+    servidor_id: int
+    personagens: int
+    estoque: int
+    itens_inventario: int
+    usuario_base: int
+    tempo_populacao: float = 0.0
+    nomes_itens: List[str] = field(default_factory=list)
+
+    @property
+    def usuarios(self) -> int:
+        return -(-self.personagens // PERSONAGENS_POR_USUARIO)
+
+    def usuario_do_personagem(self, indice: int) -> int:
+        """ID do dono do i-ésimo personagem do servidor (0 <= indice < personagens)."""
+        return self.usuario_base + indice // PERSONAGENS_POR_USUARIO
+
+    def resumo(self) -> Dict[str, float]:
+        return {
+            "servidor_id": self.servidor_id,
+            "personagens": self.personagens,
+            "usuarios": self.usuarios,
+            "estoque": self.estoque,
+            "itens_inventario": self.itens_inventario,
+            "tempo_populacao_s": round(self.tempo_populacao, 3),
+        }
+
+
+def nome_personagem(indice: int) -> str:
+    """Nome do i-ésimo personagem de um servidor sintético."""
+    return f"Personagem {indice:06d}"
+
+
+def _inserir_em_lotes(conexao, modelo, linhas: Iterable[dict]) -> int:
+    total = 0
+    lote = []
+    for linha in linhas:
+        lote.append(linha)
+        if len(lote) >= TAMANHO_LOTE:
+            conexao.execute(insert(modelo), lote)
+            total += len(lote)
+            lote = []
+    if lote:
+        conexao.execute(insert(modelo), lote)
+        total += len(lote)
+    return total
+
+
+def popular_catalogo(engine: Engine, quantidade: int, semente: int = 0) -> List[str]:
+    """
+    Cadastra `quantidade` itens mestres com raridades na proporção de PESOS_RARIDADES.
+    Retorna os nomes cadastrados (na ordem dos IDs).
+    """
+    aleatorio = random.Random(semente)
+    nomes = [f"Item Sintético {i:05d}" for i in range(quantidade)]
+    with engine.begin() as conexao:
+        _inserir_em_lotes(conexao, ItemModel, (
+            {
+                "nome": nome,
+                "raridade": aleatorio.choices(RARIDADES, weights=PESOS_RARIDADES)[0],
+                "valor": aleatorio.randint(10, 5000),
+                "descricao": f"Descrição do {nome.lower()}, gerada para benchmark.",
+            }
+            for nome in nomes
+        ))
+    return nomes
+
+
+def popular_servidor(
+    engine: Engine,
+    servidor_id: int,
+    personagens: int,
+    estoque: int = 100,
+    itens_por_personagem: int = 5,
+    semente: int = 0,
+) -> ServidorSintetico:
+    """
+    Popula um servidor com `personagens` personagens (dois por usuário), inventários de
+    `itens_por_personagem` itens, `estoque` itens na loja e a configuração de tiers.
+    Os itens vêm do catálogo já cadastrado (ver popular_catalogo).
+    """
+    inicio = time.perf_counter()
+    aleatorio = random.Random(semente * 1_000_003 + servidor_id)
+    usuario_base = servidor_id * 10_000_000 # IDs de usuário distintos entre servidores
+
+    with engine.begin() as conexao:
+        ids_itens: Sequence[int] = conexao.execute(select(ItemModel.id).order_by(ItemModel.id)).scalars().all()
+        if not ids_itens:
+            raise ValueError("O catálogo de itens está vazio: chame popular_catalogo antes de popular_servidor.")
+        nomes_itens = conexao.execute(select(ItemModel.nome).order_by(ItemModel.id)).scalars().all()
+
+        _inserir_em_lotes(conexao, ConfiguracaoServidorModel, (
+            {"servidor_id": servidor_id, "chave": chave, "valor": json.dumps(valor)}
+            for chave, valor in (("tiers", TIERS_SINTETICOS),)
+        ))
+
+        primeiro_id = (conexao.execute(select(func.max(PersonagemModel.id))).scalar() or 0) + 1
+        _inserir_em_lotes(conexao, PersonagemModel, (
+            {
+                "id": primeiro_id + i,
+                "nome": nome_personagem(i),
+                "usuario_id": usuario_base + i // PERSONAGENS_POR_USUARIO,
+                "servidor_id": servidor_id,
+                "nivel": aleatorio.randint(1, 20),
+                "dinheiro": aleatorio.randint(0, 10_000),
+                "marcos": 0,
+                "status": StatusPersonagem.ATIVO,
+            }
+            for i in range(personagens)
+        ))
+
+        quantidade_inventario = min(itens_por_personagem, len(ids_itens))
+        itens_inventario = _inserir_em_lotes(conexao, ItemInventarioModel, (
+            {"personagem_id": primeiro_id + i, "item_id": item_id, "quantidade": aleatorio.randint(1, 3)}
+            for i in range(personagens)
+            for item_id in aleatorio.sample(ids_itens, quantidade_inventario)
+        ))
+
+        itens_estoque = aleatorio.sample(ids_itens, min(estoque, len(ids_itens)))
+        _inserir_em_lotes(conexao, EstoqueLojaItemModel, (
+            {"servidor_id": servidor_id, "item_id": item_id, "quantidade": aleatorio.randint(1, 5), "preco_especifico": None}
+            for item_id in itens_estoque
+        ))
+
+    return ServidorSintetico(
+        servidor_id=servidor_id,
+        personagens=personagens,
+        estoque=len(itens_estoque),
+        itens_inventario=itens_inventario,
+        usuario_base=usuario_base,
+        tempo_populacao=time.perf_counter() - inicio,
+        nomes_itens=list(nomes_itens),
+    )
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+import discord
+from discord import app_commands
+
+from ostervalt.infraestrutura.monitoramento.metricas import nome_interacao
+
+# Chave em `extras` dos comandos que só leem o banco: suas consultas podem ir para a réplica
+EXTRA_SOMENTE_LEITURA = "somente_leitura"
+
+
+def interacao_somente_leitura(interaction: discord.Interaction) -> bool:
+    """Autocompletes sempre só leem; comandos de slash, quando marcados com EXTRA_SOMENTE_LEITURA."""
+    if interaction.type == discord.InteractionType.autocomplete:
+        return True
+    comando = interaction.command
+    return bool(comando is not None and comando.extras.get(EXTRA_SOMENTE_LEITURA))
+
+
+class ArvoreComandos(app_commands.CommandTree):
+    """
+    Árvore de comandos do Ostervalt.
+
+    Envolve cada interação recebida (comandos de slash e autocomplete) em uma
+    unidade de trabalho: uma sessão de banco própria, finalizada uma única vez
+    ao fim da interação. O escopo é configurado por carregar_cogs a partir do container.
+    Autocompletes e comandos com `extras={"somente_leitura": True}` leem da réplica, se houver;
+    essas leituras não preenchem os caches em memória (ver lendo_da_replica).
+
+    Se `metricas` estiver definido, cada interação também é medida (duração, latência da
+    primeira resposta, tempo de banco, consultas SQL e tempo na API do Discord) por comando.
+    """
+    def __init__(self, client: discord.Client, **kwargs):
+        super().__init__(client, **kwargs)
+        self.escopo_interacao = None # EscopoInteracao, definido em carregar_cogs
+        self.metricas = None # RegistroMetricas, definido em carregar_cogs
+
+    async def _call(self, interaction: discord.Interaction) -> None:
+        if self.metricas is None:
+            await self._call_em_escopo(interaction)
+            return
+        # A medição envolve o escopo para incluir a finalização da sessão no tempo de banco
+        async with self.metricas.medir(nome_interacao(interaction)):
+            await self._call_em_escopo(interaction)
+
+    async def _call_em_escopo(self, interaction: discord.Interaction) -> None:
+        if self.escopo_interacao is None:
+            await super()._call(interaction)
+            return
+        async with self.escopo_interacao(somente_leitura=interacao_somente_leitura(interaction)) as resultado:
+            await super()._call(interaction)
+            # O discord.py trata os erros dos comandos (on_error) sem propagá-los: desfaz a sessão
+            resultado.falhou = interaction.command_failed
@@ -1,10 +1,10 @@
 # -*- coding: utf-8 -*-
 import discord
-import os
-import polars as pl
 from discord import app_commands
 from typing import List
 
+from ostervalt.infraestrutura.persistencia.catalogo_itens import CatalogoItens
+
 # TODO: Importar corretamente a função de persistência
 
 # Placeholder para load_server_data
@@ -19,40 +19,18 @@ def load_server_data(server_id):
 
 # --- Funções de Lógica de Autocomplete ---
 
-async def autocomplete_item_by_rarity(interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+async def autocomplete_item_by_rarity(interaction: discord.Interaction, current: str, catalogo_itens: CatalogoItens) -> List[app_commands.Choice[str]]:
     """Autocomplete para itens com base na raridade especificada no comando."""
-    server_id = str(interaction.guild_id)
     # A raridade é acessada via namespace do comando que está usando este autocomplete
     rarity = getattr(interaction.namespace, 'raridade', None)
     if not rarity:
         return [] # Retorna vazio se a raridade não foi especificada ainda
 
+    # Busca no índice em memória do catálogo (partição da raridade, prefixo e depois substring)
     items = []
-    # TODO: Usar repositório de itens em vez de CSV direto
-    csv_file = f"items_{server_id}.csv" if os.path.exists(f"items_{server_id}.csv") else "items.csv"
-    try:
-        # Tentar ler o CSV com tratamento de erro para coluna ausente
-        try:
-            all_items = pl.read_csv(csv_file, infer_schema_length=10000, null_values=["undefined"])
-        except pl.ColumnNotFoundError:
-             print(f"Erro: Coluna 'Rarity' ou 'Name' não encontrada no arquivo CSV '{csv_file}'.")
-             return [] # Retorna vazio se colunas essenciais faltam
-
-        # Filtrar pela raridade e pelo texto atual (case-insensitive)
-        # Usar str.contains com case=False para case-insensitive
-        available_items = all_items.filter(
-            (pl.col("Rarity").str.to_lowercase() == rarity.lower()) &
-            (pl.col("Name").str.contains(f"(?i){current}")) # Regex para case-insensitive
-        )
-        item_names = available_items['Name'].to_list()
-        items = sorted(list(set(item_names))) # Remover duplicatas e ordenar
-
-    except FileNotFoundError:
-        print(f"Arquivo CSV '{csv_file}' não encontrado para autocomplete.")
-        items = []
-    except Exception as e:
-         print(f"Erro ao ler/filtrar CSV para autocomplete por raridade: {e}")
-         items = []
+    for item in catalogo_itens.buscar(current, raridade=rarity, limite=50):
+        if item.nome not in items: # Remover duplicatas
+            items.append(item.nome)
 
     return [
         app_commands.Choice(name=item, value=item)
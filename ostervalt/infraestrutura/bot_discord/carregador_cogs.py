@@ -3,6 +3,9 @@ import os
 import importlib
 from discord.ext import commands
 
+from ostervalt.infraestrutura.persistencia.catalogo_itens import ler_itens_csv
+from ostervalt.infraestrutura.monitoramento.metricas import instrumentar_discord
+
 async def carregar_cogs(bot: commands.Bot, container):
     """
     Descobre e carrega dinamicamente todas as extensões (Cogs)
@@ -13,6 +16,28 @@ async def carregar_cogs(bot: commands.Bot, container):
         container: O container de injeção de dependência (ou similar)
                    que contém as instâncias dos casos de uso.
     """
+    # Cada interação recebida pela árvore de comandos ganha sua própria sessão de banco
+    if hasattr(bot.tree, 'escopo_interacao'):
+        bot.tree.escopo_interacao = container.resolve('escopo_interacao')
+        print("Escopo de sessão por interação configurado na árvore de comandos.")
+    # Histogramas por comando (tempo total, primeira resposta, banco, consultas e API do Discord)
+    if hasattr(bot.tree, 'metricas'):
+        bot.tree.metricas = container.resolve('metricas')
+        instrumentar_discord(bot)
+        print("Métricas por interação configuradas na árvore de comandos.")
+
+    # Indexa o catálogo de itens antes do primeiro autocomplete
+    # (a tabela 'itens' é a fonte; o items.csv legado só é usado se ela estiver vazia)
+    try:
+        catalogo_itens = container.resolve('catalogo_itens')
+        async with container.resolve('escopo_interacao')():
+            itens = await container.resolve('repo_itens').listar_todos()
+        if not itens and os.path.exists('items.csv'):
+            itens = ler_itens_csv('items.csv')
+        catalogo_itens.carregar(itens)
+    except Exception as e:
+        print(f"⚠️ Erro ao indexar o catálogo de itens (será carregado no primeiro autocomplete): {e}")
+
     cogs_dir = os.path.join(os.path.dirname(__file__), 'cogs')
     print(f"Procurando Cogs em: {cogs_dir}")
 
@@ -40,16 +65,24 @@ async def carregar_cogs(bot: commands.Bot, container):
             'remover_item_inventario_uc',
             'listar_personagens_uc',
             'repo_personagens', # Adicionado para autocomplete
+            'repo_itens',
+            'catalogo_itens',
         ),
         'ItemCog': (
             'obter_item_uc',
-            'listar_itens_uc',
+            'repo_estoque_loja',
+            'escopo_interacao',
         ),
         'AdminCog': (
             'repo_config_servidor',
             'repo_estoque_loja',
             'repo_personagens',
             'repo_itens',
+            'catalogo_itens',
+            'backup_servidor',
+            'metricas',
+            'repo_sincronizacao_comandos',
+            'escopo_interacao',
         ),
         'UtilCog': ('repo_personagens', 'repo_config_servidor'),
         # Adicione outros Cogs e suas dependências aqui
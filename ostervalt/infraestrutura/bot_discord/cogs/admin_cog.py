@@ -16,10 +16,17 @@ from ostervalt.infraestrutura.persistencia.repositorio_configuracao_servidor imp
 from ostervalt.infraestrutura.persistencia.repositorio_estoque_loja import RepositorioEstoqueLoja
 from ostervalt.infraestrutura.persistencia.repositorio_personagens import RepositorioPersonagensSQLAlchemy
 from ostervalt.infraestrutura.persistencia.repositorio_itens import RepositorioItensSQLAlchemy
+from ostervalt.infraestrutura.persistencia.catalogo_itens import CatalogoItens
+from ostervalt.infraestrutura.persistencia.backup_servidor import BackupServidor, BackupInvalidoError
+from ostervalt.infraestrutura.persistencia.repositorio_sincronizacao_comandos import RepositorioSincronizacaoComandos
+from ostervalt.infraestrutura.persistencia.unidade_trabalho import EscopoInteracao
+from ostervalt.infraestrutura.monitoramento.metricas import RegistroMetricas
 from ostervalt.infraestrutura.persistencia.models import EstoqueLojaItemModel, ItemModel, StatusPersonagem
 from ostervalt.nucleo.entidades.item import Item
 from ostervalt.nucleo.entidades.personagem import Personagem
+from ostervalt.nucleo.utilitarios import ler_planilha_precos, normalizar_texto
 # Importar utilitários do Cog
+from ostervalt.infraestrutura.bot_discord.sincronizacao_comandos import sincronizar_se_alterada
 from ostervalt.infraestrutura.bot_discord.discord_helpers import (
     obter_contexto_comando,
     buscar_personagem_por_nome_para_usuario, # Função para buscar char de outro user
@@ -31,6 +38,50 @@ from ostervalt.infraestrutura.bot_discord.discord_helpers import (
 )
 
 
+DIRETORIO_BACKUPS = "temp_backups"
+
+
+def _descrever_resumo_backup(resumo) -> str:
+    """Texto curto com as contagens e o tamanho comprimido de um ResumoBackup."""
+    c = resumo.contagens
+    tamanho_kb = resumo.tamanho_comprimido / 1024
+    return (
+        f"{c['personagem']} personagens, {c['inventario']} itens de inventário, "
+        f"{c['estoque']} itens de estoque, {c['configuracao']} configurações ({tamanho_kb:.1f} KB comprimido)"
+    )
+
+
+def _apenas_dono_do_bot():
+    """Check de comandos de slash equivalente ao commands.is_owner() dos comandos de prefixo."""
+    async def predicado(interaction: Interaction) -> bool:
+        return await interaction.client.is_owner(interaction.user)
+    return app_commands.check(predicado)
+
+
+def _ms(segundos) -> str:
+    return "-" if segundos is None else f"{segundos * 1000:.0f}"
+
+
+def _tabela_metricas(resumo: dict, limite: int = 15) -> str:
+    """Tabela de texto com p50/p99 (ms) por comando, dos mais usados para os menos usados."""
+    def total(comando):
+        return resumo[comando].get("duracao_segundos", {}).get("total", 0)
+
+    linhas = [f"{'comando':<24}{'n':>6}  {'total p50/p99':>14}  {'resp. p50/p99':>14}  {'banco p50/p99':>14}  {'sql p50':>7}"]
+    for comando in sorted(resumo, key=total, reverse=True)[:limite]:
+        metricas = resumo[comando]
+        def par(metrica):
+            dados = metricas.get(metrica, {})
+            return f"{_ms(dados.get('p50'))}/{_ms(dados.get('p99'))}"
+        consultas = metricas.get("consultas_sql", {}).get("p50")
+        linhas.append(
+            f"{comando[:23]:<24}{total(comando):>6}  {par('duracao_segundos'):>14}  "
+            f"{par('latencia_resposta_segundos'):>14}  {par('tempo_banco_segundos'):>14}  "
+            f"{'-' if consultas is None else f'{consultas:.0f}':>7}"
+        )
+    return "\n".join(linhas)
+
+
 # Função para carregar config (pode ser movida para um utilitário compartilhado depois)
 def load_config_from_file():
     """Carrega as configurações do arquivo config.yaml."""
@@ -55,12 +106,22 @@ class AdminCog(commands.Cog):
         repo_estoque_loja: RepositorioEstoqueLoja,
         repo_personagens: RepositorioPersonagensSQLAlchemy,
         repo_itens: RepositorioItensSQLAlchemy,
+        catalogo_itens: CatalogoItens,
+        backup_servidor: BackupServidor,
+        metricas: RegistroMetricas,
+        repo_sincronizacao_comandos: RepositorioSincronizacaoComandos,
+        escopo_interacao: EscopoInteracao,
     ):
         self.bot = bot
         self.repo_config_servidor = repo_config_servidor
         self.repo_estoque_loja = repo_estoque_loja
         self.repo_personagens = repo_personagens
         self.repo_itens = repo_itens
+        self.catalogo_itens = catalogo_itens
+        self.backup_servidor = backup_servidor
+        self.metricas = metricas
+        self.repo_sincronizacao_comandos = repo_sincronizacao_comandos
+        self.escopo_interacao = escopo_interacao # Comandos de prefixo não passam pela árvore de comandos
         print("Cog Admin carregado.")
 
     # --- Autocomplete Methods (Usando as funções de cog_utils) ---
@@ -69,23 +130,27 @@ class AdminCog(commands.Cog):
         return await util_autocomplete_character_for_user(interaction, current, self.repo_personagens)
 
     async def autocomplete_item(self, interaction: Interaction, current: str) -> list[app_commands.Choice[str]]:
-        # Chama a função utilitária passando o repositório
-        return await util_autocomplete_item(interaction, current, self.repo_itens)
+        # Chama a função utilitária passando o repositório e o índice do catálogo
+        return await util_autocomplete_item(interaction, current, self.repo_itens, self.catalogo_itens)
 
     # --- Comandos de prefixo (Mantidos como estão) ---
     @commands.command(name="sync_commands")
     @commands.is_owner()
-    async def sync_commands_prefix(self, ctx):
-        """Sincroniza os comandos de slash com o Discord."""
+    async def sync_commands_prefix(self, ctx, modo: Optional[str] = None):
+        """Sincroniza os comandos de slash com o Discord, se mudaram ('!sync_commands forcar' sincroniza sempre)."""
         guild = ctx.guild
+        forcar = modo == "forcar"
         try:
             if guild:
                 self.bot.tree.clear_commands(guild=guild)
-                synced = await self.bot.tree.sync(guild=guild)
-                await ctx.send(f"Sincronizados {len(synced)} comandos para este servidor.")
+            synced = await sincronizar_se_alterada(
+                self.bot.tree, self.repo_sincronizacao_comandos, self.escopo_interacao, guild=guild, forcar=forcar,
+            )
+            destino = "para este servidor" if guild else "globais"
+            if synced is None:
+                await ctx.send(f"Comandos {destino} já estão sincronizados. Use `!sync_commands forcar` para sincronizar mesmo assim.")
             else:
-                 synced = await self.bot.tree.sync()
-                 await ctx.send(f"Sincronizados {len(synced)} comandos globais.")
+                await ctx.send(f"Sincronizados {len(synced)} comandos {destino}.")
         except Exception as e:
             await ctx.send(f"Erro ao sincronizar: {e}")
             traceback.print_exc()
@@ -132,19 +197,19 @@ class AdminCog(commands.Cog):
             _, server_id = await obter_contexto_comando(interaction)
             key = f"cargos_{tipo}_ids"
 
-            cargos_lista = self.repo_config_servidor.obter_valor(server_id, key, default=[])
+            cargos_lista = await self.repo_config_servidor.obter_valor(server_id, key, default=[])
 
             if acao == "add":
                 if cargo.id not in cargos_lista:
                     cargos_lista.append(cargo.id)
-                    self.repo_config_servidor.adicionar_ou_atualizar(server_id, key, cargos_lista)
+                    await self.repo_config_servidor.adicionar_ou_atualizar(server_id, key, cargos_lista)
                     await interaction.response.send_message(f"Cargo {cargo.name} adicionado às permissões de {tipo}.", ephemeral=True)
                 else:
                     await interaction.response.send_message(f"Cargo {cargo.name} já está nas permissões de {tipo}.", ephemeral=True)
             elif acao == "remove":
                 if cargo.id in cargos_lista:
                     cargos_lista.remove(cargo.id)
-                    self.repo_config_servidor.adicionar_ou_atualizar(server_id, key, cargos_lista)
+                    await self.repo_config_servidor.adicionar_ou_atualizar(server_id, key, cargos_lista)
                     await interaction.response.send_message(f"Cargo {cargo.name} removido das permissões de {tipo}.", ephemeral=True)
                 else:
                     await interaction.response.send_message(f"Cargo {cargo.name} não estava nas permissões de {tipo}.", ephemeral=True)
@@ -161,82 +226,77 @@ class AdminCog(commands.Cog):
         common="Número de itens comuns",
         uncommon="Número de itens incomuns",
         rare="Número de itens raros",
-        very_rare="Número de itens muito raros"
+        very_rare="Número de itens muito raros",
+        planilha="Planilha de preços (.csv ou .json com nome e preco). Sem ela, usa o valor base de cada item"
     )
     @app_commands.checks.has_permissions(administrator=True)
-    async def estoque(self, interaction: Interaction, common: int, uncommon: int, rare: int, very_rare: int):
-        """Gera um novo estoque de itens para a loja."""
+    async def estoque(self, interaction: Interaction, common: int, uncommon: int, rare: int, very_rare: int, planilha: Optional[discord.Attachment] = None):
+        """Gera um novo estoque de itens para a loja, com todos os preços definidos de uma vez."""
         try:
             _, server_id = await obter_contexto_comando(interaction)
             await interaction.response.defer(ephemeral=True)
 
-            self.repo_estoque_loja.limpar_estoque_servidor(server_id)
-            await interaction.followup.send("Estoque antigo limpo. Gerando novo estoque...", ephemeral=True)
+            # Preços vêm da planilha anexada (se houver); o restante usa o valor base do item
+            precos_planilha = {}
+            if planilha is not None:
+                try:
+                    precos_planilha = ler_planilha_precos(await planilha.read(), planilha.filename)
+                except (ValueError, UnicodeDecodeError) as e_planilha:
+                    await interaction.followup.send(f"❌ Não foi possível ler a planilha de preços: {e_planilha}", ephemeral=True)
+                    return
 
             rarities = {'common': common, 'uncommon': uncommon, 'rare': rare, 'very rare': very_rare}
-            preco_padrao_fallback = self.repo_config_servidor.obter_valor(server_id, 'preco_item_padrao', default=100)
             itens_adicionados = []
+            novo_estoque = [] # Linhas gravadas de uma vez por substituir_estoque_servidor
+            avisos = []
+            sem_preco_planilha = 0
+
+            # Candidatos de todas as raridades pedidas em uma única consulta
+            raridades_pedidas = [raridade for raridade, count_req in rarities.items() if count_req > 0]
+            candidatos_por_raridade = await self.repo_itens.listar_por_raridades(raridades_pedidas) if raridades_pedidas else {}
 
             for raridade_str, count_req in rarities.items():
                 if count_req <= 0: continue
 
-                itens_disponiveis: list[Item] = self.repo_itens.listar_por_raridade(raridade_str)
+                itens_disponiveis: list[Item] = candidatos_por_raridade.get(raridade_str, [])
 
                 if not itens_disponiveis:
-                    await interaction.followup.send(f"⚠️ Nenhum item encontrado para a raridade: {raridade_str}", ephemeral=True)
+                    avisos.append(f"⚠️ Nenhum item encontrado para a raridade: {raridade_str}")
                     continue
 
                 available_count = len(itens_disponiveis)
                 count = min(count_req, available_count)
 
                 if count_req > available_count:
-                     await interaction.followup.send(f"ℹ️ Solicitados {count_req} itens {raridade_str}, mas apenas {available_count} disponíveis.", ephemeral=True)
-
-                itens_selecionados = random.sample(itens_disponiveis, count)
-                await interaction.followup.send(f"Definindo preços para {count} itens {raridade_str}:", ephemeral=True)
-
-                for item_obj in itens_selecionados:
-                    preco_final = None
-                    attempts = 0
-                    while preco_final is None and attempts < 3:
-                        await interaction.followup.send(f"Digite o preço para **{item_obj.nome}** (em moedas):", ephemeral=True)
-                        try:
-                            price_message = await self.bot.wait_for(
-                                'message',
-                                check=lambda m: m.author == interaction.user and m.channel == interaction.channel and m.content.isdigit(),
-                                timeout=60.0
-                            )
-                            price = int(price_message.content)
-                            if price >= 0: preco_final = price
-                            else:
-                                await interaction.followup.send("O preço não pode ser negativo. Tente novamente.", ephemeral=True)
-                                attempts += 1
-                        except asyncio.TimeoutError:
-                            await interaction.followup.send(f"Tempo esgotado para {item_obj.nome}. Tentativa {attempts + 1} de 3.", ephemeral=True)
-                            attempts += 1
-                        except Exception as e_price:
-                             await interaction.followup.send(f"Erro inesperado ao processar preço para {item_obj.nome}: {e_price}", ephemeral=True)
-                             attempts += 1
+                    avisos.append(f"ℹ️ Solicitados {count_req} itens {raridade_str}, mas apenas {available_count} disponíveis.")
 
+                for item_obj in random.sample(itens_disponiveis, count):
+                    preco_final = precos_planilha.get(normalizar_texto(item_obj.nome))
                     if preco_final is None:
-                        preco_final = item_obj.valor # Usa o valor base do item como fallback
-                        await interaction.followup.send(f"Falha ao definir preço para {item_obj.nome}. Usando preço padrão de {preco_final} moedas.", ephemeral=True)
-
-                    item_estoque = EstoqueLojaItemModel(
-                        servidor_id=server_id,
-                        item_id=item_obj.id,
-                        quantidade=1, # Adiciona 1 de cada item selecionado
-                        preco_especifico=preco_final
-                    )
-                    self.repo_estoque_loja.adicionar(item_estoque)
+                        preco_final = item_obj.valor # Valor base do item como preço padrão
+                        if precos_planilha:
+                            sem_preco_planilha += 1
+
+                    novo_estoque.append({
+                        'item_id': item_obj.id,
+                        'quantidade': 1, # Adiciona 1 de cada item selecionado
+                        'preco_especifico': preco_final,
+                    })
                     itens_adicionados.append(f"{item_obj.nome} ({raridade_str}) - {preco_final} moedas")
-                    await interaction.followup.send(f"✅ Preço de {item_obj.nome} definido como {preco_final} moedas e adicionado ao estoque.", ephemeral=True)
+
+            if sem_preco_planilha:
+                avisos.append(f"ℹ️ {sem_preco_planilha} item(ns) não constavam na planilha e usaram o valor base.")
+
+            # Limpa e repopula o estoque do servidor em uma única transação
+            await self.repo_estoque_loja.substituir_estoque_servidor(server_id, novo_estoque)
 
             if itens_adicionados:
                 summary = "✅ Novo estoque gerado com sucesso:\n" + "\n".join(f"- {item_info}" for item_info in itens_adicionados)
             else:
                 summary = "ℹ️ Nenhum item foi adicionado ao estoque (verifique se existem itens cadastrados no banco de dados)."
-            await interaction.followup.send(summary, ephemeral=True)
+            if avisos:
+                summary = "\n".join(avisos) + "\n\n" + summary
+            await interaction.followup.send(summary[:2000], ephemeral=True) # Limite de caracteres do Discord
 
         except ComandoForaDeServidorError as e:
              await interaction.response.send_message(f"❌ {e.mensagem}", ephemeral=True) # Usa send_message se defer falhou
@@ -281,18 +341,18 @@ class AdminCog(commands.Cog):
                  await interaction.response.send_message("O valor não pode ser negativo.", ephemeral=True)
                  return
 
-            item_mestre = self.repo_itens.obter_por_nome(item)
+            item_mestre = await self.repo_itens.obter_por_nome(item)
             if not item_mestre:
                 await interaction.response.send_message(f"❌ Item mestre '{item}' não encontrado.", ephemeral=True)
                 return
 
-            item_estoque_existente = self.repo_estoque_loja.obter_por_servidor_e_item(server_id, item_mestre.id)
+            item_estoque_existente = await self.repo_estoque_loja.obter_por_servidor_e_item(server_id, item_mestre.id)
 
             if item_estoque_existente:
                 item_estoque_existente.quantidade += quantidade
                 if valor is not None: # Atualiza preço apenas se fornecido
                     item_estoque_existente.preco_especifico = valor
-                self.repo_estoque_loja.atualizar(item_estoque_existente)
+                await self.repo_estoque_loja.atualizar(item_estoque_existente)
                 preco_exibido = item_estoque_existente.preco_especifico if item_estoque_existente.preco_especifico is not None else item_mestre.valor
                 await interaction.response.send_message(f"✅ Quantidade do item '{item}' atualizada para {item_estoque_existente.quantidade}. Preço: {preco_exibido} moedas.", ephemeral=True)
             else:
@@ -304,7 +364,7 @@ class AdminCog(commands.Cog):
                     quantidade=quantidade,
                     preco_especifico=valor # Salva None se não fornecido, repo pode usar valor base
                 )
-                self.repo_estoque_loja.adicionar(novo_item_estoque)
+                await self.repo_estoque_loja.adicionar(novo_item_estoque)
                 await interaction.response.send_message(f"✅ Item '{item}' adicionado ao estoque com quantidade {quantidade} e preço {preco_final} moedas.", ephemeral=True)
 
         except ComandoForaDeServidorError as e:
@@ -337,22 +397,22 @@ class AdminCog(commands.Cog):
                  await interaction.response.send_message("A quantidade a remover deve ser positiva.", ephemeral=True)
                  return
 
-            item_mestre = self.repo_itens.obter_por_nome(item)
+            item_mestre = await self.repo_itens.obter_por_nome(item)
             if not item_mestre:
                 await interaction.response.send_message(f"❌ Item mestre '{item}' não encontrado.", ephemeral=True)
                 return
 
-            item_estoque = self.repo_estoque_loja.obter_por_servidor_e_item(server_id, item_mestre.id)
+            item_estoque = await self.repo_estoque_loja.obter_por_servidor_e_item(server_id, item_mestre.id)
             if not item_estoque:
                 await interaction.response.send_message(f"❌ Item '{item}' não encontrado no estoque deste servidor.", ephemeral=True)
                 return
 
             if quantidade is None or quantidade >= item_estoque.quantidade:
-                self.repo_estoque_loja.remover(item_estoque)
+                await self.repo_estoque_loja.remover(item_estoque)
                 await interaction.response.send_message(f"✅ Item '{item}' removido completamente do estoque.", ephemeral=True)
             else:
                 item_estoque.quantidade -= quantidade
-                self.repo_estoque_loja.atualizar(item_estoque)
+                await self.repo_estoque_loja.atualizar(item_estoque)
                 await interaction.response.send_message(f"✅ Removido {quantidade} de '{item}'. Quantidade restante: {item_estoque.quantidade}", ephemeral=True)
 
         except ComandoForaDeServidorError as e:
@@ -393,8 +453,7 @@ class AdminCog(commands.Cog):
 
             # A função acima já levanta PersonagemNaoEncontradoError se não achar
 
-            personagem_encontrado.dinheiro = amount
-            self.repo_personagens.atualizar(personagem_encontrado)
+            await self.repo_personagens.definir_dinheiro(personagem_encontrado.id, amount)
             await interaction.response.send_message(f"✅ Dinheiro de {personagem_encontrado.nome} (usuário: {usuario.display_name}) definido como {amount} moedas.", ephemeral=True)
 
         except (ComandoForaDeServidorError, PersonagemNaoEncontradoError) as e:
@@ -431,9 +490,10 @@ class AdminCog(commands.Cog):
                 interaction, character, usuario.id, self.repo_personagens
             )
 
-            personagem_encontrado.dinheiro += amount
-            novo_saldo = personagem_encontrado.dinheiro
-            self.repo_personagens.atualizar(personagem_encontrado)
+            # UPDATE atômico (dinheiro = dinheiro + amount): não sobrescreve ganhos simultâneos de /trabalhar ou /crime
+            novo_saldo = await self.repo_personagens.alterar_dinheiro(personagem_encontrado.id, amount)
+            if novo_saldo is None:
+                raise PersonagemNaoEncontradoError(character)
 
             if amount > 0:
                 msg = f"✅ Adicionado {amount} moedas ao saldo de {personagem_encontrado.nome} (usuário: {usuario.display_name}). Novo saldo: {novo_saldo} moedas."
@@ -464,7 +524,7 @@ class AdminCog(commands.Cog):
         """Limpa o estoque atual da loja."""
         try:
             _, server_id = await obter_contexto_comando(interaction)
-            self.repo_estoque_loja.limpar_estoque_servidor(server_id)
+            await self.repo_estoque_loja.limpar_estoque_servidor(server_id)
             await interaction.response.send_message("✅ O estoque da loja foi limpo com sucesso.", ephemeral=True)
         except ComandoForaDeServidorError as e:
              await interaction.response.send_message(f"❌ {e.mensagem}", ephemeral=True)
@@ -479,46 +539,33 @@ class AdminCog(commands.Cog):
                  except discord.HTTPException:
                       pass
 
-    @app_commands.command(name="backup", description="[Admin] Mostra/Envia um backup dos dados do servidor")
+    @app_commands.command(name="backup", description="[Admin] Envia um backup comprimido dos dados do servidor")
     @app_commands.checks.has_permissions(administrator=True)
     async def backup(self, interaction: Interaction):
-        """Mostra um backup de todos os dados do servidor ou envia como arquivo."""
+        """Exporta todos os dados do servidor para um arquivo NDJSON comprimido (gzip) e o envia."""
+        backup_filepath = None
         try:
             _, server_id = await obter_contexto_comando(interaction)
             await interaction.response.defer(ephemeral=True)
 
-            configuracoes = self.repo_config_servidor.listar_por_servidor_como_dict(server_id)
-            estoque_db = self.repo_estoque_loja.listar_por_servidor(server_id)
-            estoque_formatado = [
-                {"item_id": item.item_id, "quantidade": item.quantidade, "preco": item.preco_especifico}
-                for item in estoque_db
-            ]
-            # Usar método específico para backup que retorna dicts
-            personagens_servidor = self.repo_personagens.listar_por_servidor_para_backup(server_id)
-
-            backup_data_dict = {
-                "configuracoes": configuracoes,
-                "estoque_loja": estoque_formatado,
-                "personagens": personagens_servidor,
-                "timestamp": datetime.datetime.now().isoformat()
-            }
-
-            backup_json_str = json.dumps(backup_data_dict, indent=2, ensure_ascii=False)
+            timestamp_file = datetime.datetime.now().strftime('%Y%m%d%H%M%S')
+            os.makedirs(DIRETORIO_BACKUPS, exist_ok=True)
+            backup_filepath = os.path.join(DIRETORIO_BACKUPS, f"backup_{server_id}_{timestamp_file}.ndjson.gz")
 
-            if len(backup_json_str) <= 1900:
-                await interaction.followup.send(f"```json\n{backup_json_str}\n```", ephemeral=True)
-            else:
-                timestamp_file = datetime.datetime.now().strftime('%Y%m%d%H%M%S')
-                backup_filename = f"backup_{server_id}_{timestamp_file}.json"
-                temp_dir = "temp_backups"
-                os.makedirs(temp_dir, exist_ok=True)
-                backup_filepath = os.path.join(temp_dir, backup_filename)
+            # A exportação roda no executor do banco e escreve direto no arquivo, em lotes
+            resumo = await self.backup_servidor.exportar(server_id, backup_filepath)
+            descricao = _descrever_resumo_backup(resumo)
 
-                with open(backup_filepath, "w", encoding='utf-8') as f:
-                    f.write(backup_json_str)
+            limite_arquivo = interaction.guild.filesize_limit if interaction.guild else 8 * 1024 * 1024
+            if resumo.tamanho_comprimido > limite_arquivo:
+                await interaction.followup.send(
+                    f"⚠️ O backup ({descricao}) excede o limite de anexos do servidor e foi mantido em `{backup_filepath}`.",
+                    ephemeral=True
+                )
+                backup_filepath = None # Mantém o arquivo para o administrador do bot
+                return
 
-                await interaction.followup.send("O backup é muito grande para ser enviado como mensagem. Enviando como arquivo...", file=discord.File(backup_filepath), ephemeral=True)
-                os.remove(backup_filepath) # Remove o arquivo temporário após envio
+            await interaction.followup.send(f"✅ Backup gerado: {descricao}.", file=discord.File(backup_filepath), ephemeral=True)
 
         except ComandoForaDeServidorError as e:
              # Tenta responder se defer falhou
@@ -534,6 +581,49 @@ class AdminCog(commands.Cog):
                       await interaction.response.send_message(f"❌ Ocorreu um erro inesperado ao gerar o backup.", ephemeral=True)
                  except discord.InteractionResponded:
                       pass
+        finally:
+            if backup_filepath and os.path.exists(backup_filepath):
+                os.remove(backup_filepath) # Remove o arquivo temporário após envio
+
+    @app_commands.command(name="restaurar_backup", description="[Admin] Substitui os dados do servidor pelos de um backup")
+    @app_commands.describe(arquivo="Arquivo .ndjson.gz gerado pelo /backup")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def restaurar_backup(self, interaction: Interaction, arquivo: discord.Attachment):
+        """Importa um backup gerado pelo /backup, substituindo os dados atuais do servidor."""
+        backup_filepath = None
+        try:
+            _, server_id = await obter_contexto_comando(interaction)
+            await interaction.response.defer(ephemeral=True)
+
+            timestamp_file = datetime.datetime.now().strftime('%Y%m%d%H%M%S')
+            os.makedirs(DIRETORIO_BACKUPS, exist_ok=True)
+            backup_filepath = os.path.join(DIRETORIO_BACKUPS, f"restauracao_{server_id}_{timestamp_file}.ndjson.gz")
+            await arquivo.save(backup_filepath) # Grava o anexo direto em disco
+
+            try:
+                resumo = await self.backup_servidor.importar(server_id, backup_filepath)
+            except BackupInvalidoError as e_backup:
+                await interaction.followup.send(f"❌ Backup inválido, nenhum dado foi alterado: {e_backup}", ephemeral=True)
+                return
+
+            await interaction.followup.send(f"✅ Backup restaurado: {_descrever_resumo_backup(resumo)}.", ephemeral=True)
+
+        except ComandoForaDeServidorError as e:
+             try: await interaction.response.send_message(f"❌ {e.mensagem}", ephemeral=True)
+             except discord.InteractionResponded: pass
+        except Exception as e:
+            print(f"Erro ao restaurar backup para servidor {interaction.guild_id}: {e}")
+            traceback.print_exc()
+            try:
+                await interaction.followup.send(f"❌ Ocorreu um erro inesperado ao restaurar o backup.", ephemeral=True)
+            except (discord.NotFound, discord.InteractionResponded):
+                 try:
+                      await interaction.response.send_message(f"❌ Ocorreu um erro inesperado ao restaurar o backup.", ephemeral=True)
+                 except discord.InteractionResponded:
+                      pass
+        finally:
+            if backup_filepath and os.path.exists(backup_filepath):
+                os.remove(backup_filepath)
 
     @app_commands.command(name="mensagens", description="[Admin] Adiciona uma mensagem para trabalho ou crime")
     @app_commands.describe(
@@ -553,11 +643,11 @@ class AdminCog(commands.Cog):
             _, server_id = await obter_contexto_comando(interaction)
             chave_config = f"mensagens_{tipo}" # Ajustado para corresponder ao config
 
-            lista_mensagens = self.repo_config_servidor.obter_valor(server_id, chave_config, default=[])
+            lista_mensagens = await self.repo_config_servidor.obter_valor(server_id, chave_config, default=[])
             if not isinstance(lista_mensagens, list): # Garante que é uma lista
                 lista_mensagens = []
             lista_mensagens.append(mensagem)
-            self.repo_config_servidor.adicionar_ou_atualizar(server_id, chave_config, lista_mensagens)
+            await self.repo_config_servidor.adicionar_ou_atualizar(server_id, chave_config, lista_mensagens)
             await interaction.response.send_message(f"✅ Mensagem adicionada à lista '{tipo}'.", ephemeral=True)
 
         except ComandoForaDeServidorError as e:
@@ -595,7 +685,7 @@ class AdminCog(commands.Cog):
 
             chave_config = "tiers" # Chave principal para o dict de tiers
 
-            tiers_atuais = self.repo_config_servidor.obter_valor(server_id, chave_config, default={})
+            tiers_atuais = await self.repo_config_servidor.obter_valor(server_id, chave_config, default={})
             if not isinstance(tiers_atuais, dict): # Garante que é um dict
                 tiers_atuais = {}
             tiers_atuais[tier] = {
@@ -603,7 +693,7 @@ class AdminCog(commands.Cog):
                 "nivel_max": nivel_max,
                 "recompensa": recompensa
             }
-            self.repo_config_servidor.adicionar_ou_atualizar(server_id, chave_config, tiers_atuais)
+            await self.repo_config_servidor.adicionar_ou_atualizar(server_id, chave_config, tiers_atuais)
             await interaction.response.send_message(f"✅ Tier '{tier}' definido/atualizado para níveis {nivel_min}-{nivel_max} com recompensa de {recompensa} moedas.", ephemeral=True)
 
         except ComandoForaDeServidorError as e:
@@ -632,7 +722,7 @@ class AdminCog(commands.Cog):
                 return
 
             chave_config = "probabilidade_crime"
-            self.repo_config_servidor.adicionar_ou_atualizar(server_id, chave_config, probabilidade)
+            await self.repo_config_servidor.adicionar_ou_atualizar(server_id, chave_config, probabilidade)
             await interaction.response.send_message(f"✅ Probabilidade de sucesso no crime definida para {probabilidade}%.", ephemeral=True)
 
         except ComandoForaDeServidorError as e:
@@ -675,7 +765,9 @@ class AdminCog(commands.Cog):
                      await interaction_confirm.response.send_message("Apenas o autor do comando pode confirmar.", ephemeral=True)
                      return
                 try:
-                    self.repo_personagens.remover(personagem_a_remover_id)
+                    # Callbacks de views não passam pela árvore de comandos: abrem o próprio escopo
+                    async with self.escopo_interacao():
+                        await self.repo_personagens.remover(personagem_a_remover_id)
                     # TODO: Remover itens do inventário associados? (Considerar um Caso de Uso para isso)
                     await interaction_confirm.response.edit_message(content=f"Personagem **{character}** de {usuario.display_name} foi eliminado com sucesso.", view=None)
                 except Exception as e_rip:
@@ -748,7 +840,7 @@ class AdminCog(commands.Cog):
                 if chave_principal in config_yaml:
                     valor = config_yaml[chave_principal]
                     try:
-                        self.repo_config_servidor.adicionar_ou_atualizar(server_id, chave_principal, valor)
+                        await self.repo_config_servidor.adicionar_ou_atualizar(server_id, chave_principal, valor)
                         configs_sincronizadas.append(chave_principal)
                     except Exception as e_sync:
                         erro_msg = f"Erro ao sincronizar '{chave_principal}': {e_sync}"
@@ -756,6 +848,9 @@ class AdminCog(commands.Cog):
                         traceback.print_exc()
                         erros_sincronizacao.append(f"'{chave_principal}'")
 
+            # Garante que a próxima leitura venha do banco, mesmo se alguma chave falhou no meio
+            await self.repo_config_servidor.invalidar_cache(server_id)
+
             # Mensagem final
             if not erros_sincronizacao:
                 msg_final = f"✅ Configurações sincronizadas com sucesso para este servidor a partir do `config.yaml`:\n`{', '.join(configs_sincronizadas)}`"
@@ -783,6 +878,21 @@ class AdminCog(commands.Cog):
                       pass
 
 
+    @app_commands.command(name="metricas", description="[Dono do bot] Mostra a latência p50/p99 por comando, de todos os servidores")
+    @app_commands.default_permissions(administrator=True) # Oculto para quem não é administrador
+    @_apenas_dono_do_bot() # As métricas são do processo inteiro: incluem todos os servidores atendidos
+    async def metricas_comando(self, interaction: Interaction):
+        """Resume os histogramas por comando (tempo total, primeira resposta, banco e consultas SQL)."""
+        resumo = self.metricas.resumo()
+        if not resumo:
+            await interaction.response.send_message("ℹ️ Nenhuma interação medida ainda.", ephemeral=True)
+            return
+        await interaction.response.send_message(
+            f"Métricas globais (todos os servidores, desde o início do bot):\n```\n{_tabela_metricas(resumo)}\n```",
+            ephemeral=True,
+        )
+
+
 async def setup(bot: commands.Bot):
     """Adiciona o Cog ao bot."""
     # A injeção é feita pelo carregador_cogs.py
@@ -18,7 +18,7 @@ from ostervalt.infraestrutura.persistencia.repositorio_personagens import Reposi
 # Importar utilitários do Cog
 from ostervalt.infraestrutura.bot_discord.discord_helpers import (
     obter_contexto_comando,
-    buscar_personagem_por_nome,
+    buscar_entrada_personagem_por_nome,
     autocomplete_active_character as util_autocomplete_active_character, # Importa e renomeia
     ComandoForaDeServidorError,
     PersonagemNaoEncontradoError,
@@ -65,22 +65,23 @@ class EconomiaCog(commands.Cog):
             user_id, server_id = await obter_contexto_comando(interaction)
 
             # 1. Obter configurações do servidor
-            config_servidor = self.repo_config_servidor.listar_por_servidor_como_dict(server_id)
-            intervalo_trabalhar = config_servidor.get('limites', {}).get('intervalo_trabalhar', 3600) # Padrão 1h
-            tiers_config = config_servidor.get('tiers', {}) # Padrão dict vazio
-            mensagens_trabalho = config_servidor.get('messages', {}).get('trabalho', ["Você trabalhou duro."]) # Padrão lista
-
-            # 2. Buscar personagem ativo selecionado
-            personagem_selecionado = await buscar_personagem_por_nome(
-                interaction, character, self.listar_personagens_uc, apenas_ativos=True
+            config_servidor = await self.repo_config_servidor.obter_snapshot(server_id) # Servido do cache
+            intervalo_trabalhar = config_servidor.intervalo_trabalhar # Padrão 1h
+            progressao = config_servidor.progressao # Tiers compilados uma vez por configuração do servidor
+            mensagens_trabalho = config_servidor.mensagens('trabalho', ["Você trabalhou duro."]) # Padrão lista
+
+            # 2. Buscar personagem ativo selecionado (índice em memória: tentativas em cooldown não consultam o banco)
+            personagem_selecionado = await buscar_entrada_personagem_por_nome(
+                interaction, character, self.repo_personagens, apenas_ativos=True
             )
 
             # 3. Executar caso de uso com parâmetros corretos
-            resultado_dto: ResultadoTrabalhoDTO = self.realizar_trabalho_uc.executar(
-                personagem_id=personagem_selecionado.id,
+            resultado_dto: ResultadoTrabalhoDTO = await self.realizar_trabalho_uc.executar(
+                personagem_id=personagem_selecionado.personagem_id,
                 intervalo_trabalhar=intervalo_trabalhar,
-                tiers_config=tiers_config,
-                mensagens_trabalho=mensagens_trabalho
+                tiers_config=None,
+                mensagens_trabalho=mensagens_trabalho,
+                progressao=progressao,
             )
 
             embed = discord.Embed(
@@ -112,14 +113,14 @@ class EconomiaCog(commands.Cog):
         await interaction.response.defer() # Defer público para crime
         try:
             # 1. Buscar personagem ativo selecionado
-            personagem_encontrado = await buscar_personagem_por_nome(
-                interaction, character, self.listar_personagens_uc, apenas_ativos=True
+            personagem_encontrado = await buscar_entrada_personagem_por_nome(
+                interaction, character, self.repo_personagens, apenas_ativos=True
             )
 
             # 2. Executar o caso de uso CometerCrime com o ID encontrado
             # A lógica de mensagens customizadas está dentro do UC CometerCrime
-            resultado_dto: ResultadoCrimeDTO = self.cometer_crime_uc.executar(
-                personagem_id=personagem_encontrado.id
+            resultado_dto: ResultadoCrimeDTO = await self.cometer_crime_uc.executar(
+                personagem_id=personagem_encontrado.personagem_id
             )
 
             # 3. Enviar a mensagem de resultado em um Embed
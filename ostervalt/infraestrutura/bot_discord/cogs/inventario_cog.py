@@ -10,11 +10,12 @@ from ostervalt.nucleo.casos_de_uso.adicionar_item_inventario import AdicionarIte
 from ostervalt.nucleo.casos_de_uso.remover_item_inventario import RemoverItemInventario
 from ostervalt.nucleo.casos_de_uso.listar_personagens import ListarPersonagens # Adicionado
 from ostervalt.nucleo.casos_de_uso.dtos import InventarioDTO, PersonagemDTO # Removido ComandoDTO
-from ostervalt.nucleo.entidades.item import ItemInventario # Adicionado
 from ostervalt.nucleo.entidades.personagem import Personagem # Adicionado
 from ostervalt.infraestrutura.persistencia.models import StatusPersonagem # Adicionado
 from ostervalt.infraestrutura.persistencia.repositorio_personagens import RepositorioPersonagensSQLAlchemy # Import adicionado
-from ostervalt.infraestrutura.persistencia.repositorio_itens import RepositorioItensSQLAlchemy # Import adicionado
+from ostervalt.infraestrutura.persistencia.repositorio_itens import RepositorioItensSQLAlchemy
+from ostervalt.infraestrutura.persistencia.catalogo_itens import CatalogoItens # Import adicionado
+from ostervalt.infraestrutura.bot_discord.arvore_comandos import EXTRA_SOMENTE_LEITURA
 # Importar utilitários do Cog
 from ostervalt.infraestrutura.bot_discord.discord_helpers import (
     obter_contexto_comando,
@@ -26,6 +27,9 @@ from ostervalt.infraestrutura.bot_discord.discord_helpers import (
     CogUtilsError
 )
 
+# Descrições maiores são cortadas para caber no limite de tamanho do embed
+LIMITE_DESCRICAO_ITEM = 200
+
 class InventarioCog(commands.Cog):
     def __init__(
         self,
@@ -36,6 +40,7 @@ class InventarioCog(commands.Cog):
         listar_personagens_uc: ListarPersonagens,
         repo_personagens: RepositorioPersonagensSQLAlchemy, # Dependência adicionada
         repo_itens: RepositorioItensSQLAlchemy, # Dependência adicionada
+        catalogo_itens: CatalogoItens,
     ):
         self.bot = bot
         self.listar_inventario_uc = listar_inventario_uc
@@ -44,6 +49,7 @@ class InventarioCog(commands.Cog):
         self.listar_personagens_uc = listar_personagens_uc
         self.repo_personagens = repo_personagens # Dependência armazenada
         self.repo_itens = repo_itens # Dependência armazenada
+        self.catalogo_itens = catalogo_itens
         print("Cog Inventario carregado.")
 
     # --- Autocomplete ---
@@ -54,16 +60,16 @@ class InventarioCog(commands.Cog):
 
     # Usa a função centralizada de discord_helpers, passando o repositório injetado
     async def autocomplete_item(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
-        return await util_autocomplete_item(interaction, current, self.repo_itens)
+        return await util_autocomplete_item(interaction, current, self.repo_itens, self.catalogo_itens)
 
     # TODO: Implementar autocomplete_item_in_inventory se necessário para /removeritem
 
     # --- Comandos Slash ---
 
-    @app_commands.command(name="inventario", description="Mostra o inventário de um personagem ativo.")
-    @app_commands.describe(character="Nome do personagem ativo") # Adicionado describe
+    @app_commands.command(name="inventario", description="Mostra o inventário de um personagem ativo.", extras={EXTRA_SOMENTE_LEITURA: True})
+    @app_commands.describe(character="Nome do personagem ativo", pagina="Página do inventário (padrão: 1)") # Adicionado describe
     @app_commands.autocomplete(character=character_autocomplete) # Autocomplete ativado
-    async def ver_inventario(self, interaction: discord.Interaction, character: str): # Adicionado parâmetro character
+    async def ver_inventario(self, interaction: discord.Interaction, character: str, pagina: int = 1): # Adicionado parâmetro character
         """Exibe os itens no inventário do personagem."""
         await interaction.response.defer(ephemeral=True)
         try:
@@ -72,36 +78,31 @@ class InventarioCog(commands.Cog):
                 interaction, character, self.listar_personagens_uc, apenas_ativos=True
             )
 
-            # 2. Executar caso de uso com personagem_id
-            itens_inventario: List[ItemInventario] = self.listar_inventario_uc.executar(personagem_id=personagem_selecionado.id)
+            # 2. Executar caso de uso: uma página já com os dados dos itens (uma única consulta)
+            inventario: InventarioDTO = await self.listar_inventario_uc.executar_detalhado(
+                personagem_id=personagem_selecionado.id,
+                nome_personagem=personagem_selecionado.nome,
+                pagina=pagina,
+            )
 
-            if not itens_inventario:
+            if not inventario.itens:
                 await interaction.followup.send(f"🎒 O inventário de {personagem_selecionado.nome} está vazio.", ephemeral=True)
                 return
 
             embed = discord.Embed(
-                title=f"🎒 Inventário de {personagem_selecionado.nome}",
+                title=f"🎒 Inventário de {inventario.nome_personagem}",
                 color=discord.Color.orange()
             )
-            # TODO: Buscar nomes/descrições dos itens mestres
-            itens_agrupados = {}
-            for item in itens_inventario:
-                nome_item_placeholder = f"Item ID {item.item_id}"
-                descricao_item_placeholder = "Descrição não disponível"
-                if item.item_id not in itens_agrupados:
-                    itens_agrupados[item.item_id] = {'nome': nome_item_placeholder, 'quantidade': 0, 'descricao': descricao_item_placeholder}
-                itens_agrupados[item.item_id]['quantidade'] += item.quantidade
-
-            if not itens_agrupados: # Checagem extra caso a lógica acima falhe
-                 await interaction.followup.send(f"🎒 O inventário de {personagem_selecionado.nome} está vazio.", ephemeral=True)
-                 return
-
-            for item_id, data in itens_agrupados.items():
-                 embed.add_field(
-                    name=f"{data['nome']} (ID: {item_id})",
-                    value=f"Quantidade: {data['quantidade']}\n*'{data['descricao']}'*",
+            for item in inventario.itens:
+                descricao = item.descricao_item or "Sem descrição"
+                if len(descricao) > LIMITE_DESCRICAO_ITEM:
+                    descricao = descricao[:LIMITE_DESCRICAO_ITEM - 3] + "..."
+                embed.add_field(
+                    name=f"{item.nome_item} (ID: {item.item_id})",
+                    value=f"Quantidade: {item.quantidade} · {item.raridade_item} · {item.valor_item} moedas\n*{descricao}*",
                     inline=False
                 )
+            embed.set_footer(text=f"Página {inventario.pagina}/{inventario.total_paginas} · {inventario.total_itens} itens distintos")
 
             await interaction.followup.send(embed=embed, ephemeral=True)
 
@@ -126,7 +127,7 @@ class InventarioCog(commands.Cog):
             return
         try:
             # 1. Buscar o item mestre pelo nome
-            item_mestre = self.repo_itens.obter_por_nome(item)
+            item_mestre = await self.repo_itens.obter_por_nome(item)
             if not item_mestre:
                 await interaction.followup.send(f"❌ Item mestre '{item}' não encontrado.", ephemeral=True)
                 return
@@ -138,7 +139,7 @@ class InventarioCog(commands.Cog):
             #    return
 
             # 2. Executar caso de uso com ID do item encontrado
-            self.adicionar_item_uc.executar(
+            await self.adicionar_item_uc.executar(
                 personagem_id=personagem_id,
                 item_id=item_mestre.id, # Usar ID do item encontrado
                 quantidade=quantidade
@@ -169,7 +170,7 @@ class InventarioCog(commands.Cog):
             )
 
             # 2. Buscar o item mestre pelo nome
-            item_mestre = self.repo_itens.obter_por_nome(item)
+            item_mestre = await self.repo_itens.obter_por_nome(item)
             if not item_mestre:
                 await interaction.followup.send(f"❌ Item mestre '{item}' não encontrado.", ephemeral=True)
                 return
@@ -180,7 +181,7 @@ class InventarioCog(commands.Cog):
             #       verificar a quantidade e chamar o repo.atualizar_quantidade ou modificar o UC.
             #       Por ora, vamos remover o item inteiro se a quantidade for >= 1.
             if quantidade >= 1:
-                self.remover_item_uc.executar(
+                await self.remover_item_uc.executar(
                     item_id=item_mestre.id, # Usar ID do item encontrado
                     personagem_id=personagem_selecionado.id # Usar ID do personagem encontrado
                 )
@@ -5,11 +5,13 @@ from discord import app_commands
 from typing import List
 
 from ostervalt.nucleo.casos_de_uso.obter_item import ObterItem
-from ostervalt.nucleo.casos_de_uso.listar_itens import ListarItens
 # Removido ListaItensDTO, UC retorna List[Item]
 # Removido ComandoDTO, não usado aqui
-from ostervalt.nucleo.casos_de_uso.dtos import ItemDTO
+from ostervalt.nucleo.casos_de_uso.dtos import ItemDTO, PaginaLojaDTO
+from ostervalt.infraestrutura.persistencia.repositorio_estoque_loja import RepositorioEstoqueLoja
+from ostervalt.infraestrutura.persistencia.unidade_trabalho import EscopoInteracao
 from ostervalt.nucleo.entidades.item import Item # Importar entidade
+from ostervalt.infraestrutura.bot_discord.arvore_comandos import EXTRA_SOMENTE_LEITURA
 
 class ItemCog(commands.Cog):
     """Cog para comandos relacionados a itens (informações, loja)."""
@@ -18,13 +20,22 @@ class ItemCog(commands.Cog):
         self,
         bot: commands.Bot,
         obter_item_uc: ObterItem,
-        listar_itens_uc: ListarItens,
+        repo_estoque_loja: RepositorioEstoqueLoja,
+        escopo_interacao: EscopoInteracao,
     ):
         self.bot = bot
         self.obter_item_uc = obter_item_uc
-        self.listar_itens_uc = listar_itens_uc
+        self.repo_estoque_loja = repo_estoque_loja
+        self.escopo_interacao = escopo_interacao
         print("Cog Item carregado.")
 
+    async def cog_load(self):
+        # Botões da loja continuam funcionando em mensagens enviadas antes de um reinício
+        self.bot.add_dynamic_items(BotaoPaginaLoja)
+
+    async def cog_unload(self):
+        self.bot.remove_dynamic_items(BotaoPaginaLoja)
+
     # --- Comandos Slash ---
 
     @app_commands.command(name="iteminfo", description="Mostra informações detalhadas sobre um item.")
@@ -34,7 +45,7 @@ class ItemCog(commands.Cog):
         await interaction.response.defer(ephemeral=True)
         try:
             # O caso de uso ObterItem espera apenas item_id
-            resultado_item: Item | None = self.obter_item_uc.executar(item_id=item_id) # UC retorna Entidade ou None
+            resultado_item: Item | None = await self.obter_item_uc.executar(item_id=item_id) # UC retorna Entidade ou None
 
             if resultado_item is None:
                  await interaction.followup.send(f"❌ Não foi possível encontrar o item com ID {item_id}.", ephemeral=True)
@@ -60,41 +71,115 @@ class ItemCog(commands.Cog):
             await interaction.followup.send(f"❌ Ocorreu um erro inesperado ao buscar informações do item.", ephemeral=True)
 
 
-    @app_commands.command(name="loja", description="Mostra os itens disponíveis para compra.")
+    @app_commands.command(name="loja", description="Mostra os itens disponíveis para compra.", extras={EXTRA_SOMENTE_LEITURA: True})
     async def ver_loja(self, interaction: discord.Interaction):
-        """Exibe os itens disponíveis na loja."""
-        # TODO: Idealmente, a loja deveria mostrar itens do EstoqueLoja, não todos os itens mestres.
-        # Isso requer um novo caso de uso ou modificação do ListarItens/AdminCog.
-        # Por ora, listamos todos os itens mestres como fallback.
+        """Exibe a primeira página do estoque da loja do servidor; as demais são buscadas pelos botões."""
         await interaction.response.defer(ephemeral=True)
         try:
-            # ListarItens.executar retorna List[Item]
-            itens_disponiveis: List[Item] = self.listar_itens_uc.executar() # Chamada corrigida
-
-            if not itens_disponiveis:
-                # Mensagem ajustada - pode não haver itens cadastrados
-                await interaction.followup.send("🛒 Nenhum item encontrado no catálogo mestre.", ephemeral=True)
+            if interaction.guild_id is None:
+                await interaction.followup.send("❌ Este comando só pode ser usado em um servidor.", ephemeral=True)
                 return
 
-            embed = discord.Embed(
-                title="<0xF0><0x9F><0xAA><0x9A> Catálogo Mestre de Itens", # Título ajustado
-                description="Itens existentes no mundo (preços podem variar na loja):",
-                color=discord.Color.dark_blue()
-            )
-            for item in itens_disponiveis:
-                 embed.add_field(
-                    name=f"{item.nome} (ID: {item.id})",
-                    value=f"Valor Padrão: 🪙 {item.valor}\n*'{item.descricao}'*", # Usa dados da entidade Item
-                    inline=False
-                )
-            # TODO: Adicionar paginação se a lista for muito grande
+            pagina: PaginaLojaDTO = await self.repo_estoque_loja.listar_pagina_loja(interaction.guild_id, limite=ITENS_POR_PAGINA_LOJA)
 
-            await interaction.followup.send(embed=embed, ephemeral=True)
+            if not pagina.itens:
+                await interaction.followup.send("🛒 A loja está vazia. Um administrador pode gerar o estoque com /estoque.", ephemeral=True)
+                return
+
+            await interaction.followup.send(embed=_embed_loja(pagina), view=_view_loja(pagina), ephemeral=True)
 
         except Exception as e:
             print(f"Erro ao listar itens da loja: {e}")
             await interaction.followup.send(f"❌ Ocorreu um erro ao buscar os itens.", ephemeral=True)
 
+    async def pagina_loja(self, servidor_id: int, direcao: str, cursor: int, pagina: int) -> PaginaLojaDTO:
+        """Busca a página vizinha da loja a partir do cursor do botão; volta à primeira se o estoque mudou."""
+        # Cliques em botões não passam pela árvore de comandos: abre a unidade de trabalho aqui
+        async with self.escopo_interacao(somente_leitura=True):
+            if direcao == "prox":
+                resultado = await self.repo_estoque_loja.listar_pagina_loja(servidor_id, ITENS_POR_PAGINA_LOJA, apos_id=cursor, pagina=pagina)
+            else:
+                resultado = await self.repo_estoque_loja.listar_pagina_loja(servidor_id, ITENS_POR_PAGINA_LOJA, antes_id=cursor, pagina=pagina)
+            if not resultado.itens or (direcao == "ant" and not resultado.tem_anterior):
+                # Estoque regenerado desde a última página, ou voltamos ao início: recomeça da primeira página
+                resultado = await self.repo_estoque_loja.listar_pagina_loja(servidor_id, ITENS_POR_PAGINA_LOJA)
+        return resultado
+
+
+ITENS_POR_PAGINA_LOJA = 10 # Bem abaixo do limite de 25 campos por embed do Discord
+LIMITE_DESCRICAO_LOJA = 150
+
+
+def _embed_loja(pagina: PaginaLojaDTO) -> discord.Embed:
+    """Monta o embed de uma página da loja."""
+    embed = discord.Embed(
+        title="🛒 Loja",
+        description="Itens disponíveis para compra neste servidor:",
+        color=discord.Color.dark_blue()
+    )
+    for item in pagina.itens:
+        descricao = item.descricao_item or "Sem descrição"
+        if len(descricao) > LIMITE_DESCRICAO_LOJA:
+            descricao = descricao[:LIMITE_DESCRICAO_LOJA - 3] + "..."
+        raridade = f" · {item.raridade_item.capitalize()}" if item.raridade_item else ""
+        embed.add_field(
+            name=f"{item.nome_item} (ID: {item.item_id})",
+            value=f"🪙 {item.preco} · Estoque: {item.quantidade}{raridade}\n*{descricao}*",
+            inline=False
+        )
+    embed.set_footer(text=f"Página {pagina.pagina}")
+    return embed
+
+
+def _view_loja(pagina: PaginaLojaDTO) -> discord.ui.View:
+    """Botões de navegação; o cursor vai no custom_id, então a view não guarda estado nem expira."""
+    view = discord.ui.View(timeout=None)
+    primeiro_id = pagina.itens[0].estoque_id if pagina.itens else 0
+    ultimo_id = pagina.itens[-1].estoque_id if pagina.itens else 0
+    view.add_item(BotaoPaginaLoja("ant", primeiro_id, max(1, pagina.pagina - 1), desabilitado=not pagina.tem_anterior))
+    view.add_item(BotaoPaginaLoja("prox", ultimo_id, pagina.pagina + 1, desabilitado=not pagina.tem_proxima))
+    return view
+
+
+class BotaoPaginaLoja(discord.ui.DynamicItem[discord.ui.Button], template=r"loja:(?P<direcao>ant|prox):(?P<cursor>[0-9]+):(?P<pagina>[0-9]+)"):
+    """
+    Botão persistente de paginação da loja.
+
+    O estado (direção, cursor e número da página) fica no custom_id: o bot reconhece o
+    botão mesmo depois de reiniciar e só busca a próxima página quando ele é clicado.
+    """
+    def __init__(self, direcao: str, cursor: int, pagina: int, desabilitado: bool = False):
+        super().__init__(
+            discord.ui.Button(
+                label="◀ Anterior" if direcao == "ant" else "Próxima ▶",
+                style=discord.ButtonStyle.secondary,
+                custom_id=f"loja:{direcao}:{cursor}:{pagina}",
+                disabled=desabilitado,
+            )
+        )
+        self.direcao = direcao
+        self.cursor = cursor
+        self.pagina = pagina
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(match["direcao"], int(match["cursor"]), int(match["pagina"]))
+
+    async def callback(self, interaction: discord.Interaction):
+        cog = interaction.client.get_cog("ItemCog")
+        if cog is None or interaction.guild_id is None:
+            await interaction.response.send_message("❌ A loja não está disponível no momento.", ephemeral=True)
+            return
+        try:
+            pagina = await cog.pagina_loja(interaction.guild_id, self.direcao, self.cursor, self.pagina)
+            if not pagina.itens:
+                await interaction.response.edit_message(content="🛒 A loja está vazia.", embed=None, view=None)
+                return
+            await interaction.response.edit_message(embed=_embed_loja(pagina), view=_view_loja(pagina))
+        except Exception as e:
+            print(f"Erro ao paginar a loja: {e}")
+            await interaction.response.send_message("❌ Ocorreu um erro ao buscar os itens.", ephemeral=True)
+
 
 async def setup(bot: commands.Bot):
     """Adiciona o Cog ao bot."""
@@ -13,6 +13,7 @@ from ostervalt.infraestrutura.persistencia.models import StatusPersonagem
 # from ostervalt.infraestrutura.bot_discord.autocomplete import autocomplete_character # Removido
 from ostervalt.infraestrutura.persistencia.repositorio_personagens import RepositorioPersonagensSQLAlchemy
 from ostervalt.nucleo.entidades.personagem import Personagem
+from ostervalt.infraestrutura.bot_discord.arvore_comandos import EXTRA_SOMENTE_LEITURA
 # Importar utilitários do Cog
 from ostervalt.infraestrutura.bot_discord.discord_helpers import (
     obter_contexto_comando,
@@ -39,19 +40,19 @@ class PersonagemCog(commands.Cog):
         self.listar_personagens_uc = listar_personagens_uc
         self.repo_personagens = repo_personagens
         print("Cog Personagem carregado.")
-    
-        # --- Autocomplete (Usando funções de cog_utils) ---
-        async def autocomplete_character(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
-            # TODO: Passar ListarPersonagensUC para a função utilitária quando ela for adaptada,
-            #       por enquanto, a função utilitária usa o repo diretamente.
-            return await util_autocomplete_character(interaction, current, self.repo_personagens)
-    
-        async def autocomplete_active_character(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
-            # TODO: Passar ListarPersonagensUC para a função utilitária quando ela for adaptada,
-            #       por enquanto, a função utilitária usa o repo diretamente.
-            return await util_autocomplete_active_character(interaction, current, self.repo_personagens)
-    
-        # --- Comandos Slash ---
+
+    # --- Autocomplete (Usando funções de cog_utils) ---
+    async def autocomplete_character(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+        # TODO: Passar ListarPersonagensUC para a função utilitária quando ela for adaptada,
+        #       por enquanto, a função utilitária usa o repo diretamente.
+        return await util_autocomplete_character(interaction, current, self.repo_personagens)
+
+    async def autocomplete_active_character(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+        # TODO: Passar ListarPersonagensUC para a função utilitária quando ela for adaptada,
+        #       por enquanto, a função utilitária usa o repo diretamente.
+        return await util_autocomplete_active_character(interaction, current, self.repo_personagens)
+
+    # --- Comandos Slash ---
 
     @app_commands.command(name="criar", description="Cria um novo personagem.")
     @app_commands.describe(nome="O nome do seu novo personagem")
@@ -61,7 +62,7 @@ class PersonagemCog(commands.Cog):
         try:
             user_id, server_id = await obter_contexto_comando(interaction)
 
-            resultado_personagem = self.criar_personagem_uc.executar(
+            resultado_personagem = await self.criar_personagem_uc.executar(
                 nome=nome,
                 usuario_id=user_id,
                 servidor_id=server_id
@@ -94,7 +95,7 @@ class PersonagemCog(commands.Cog):
             traceback.print_exc()
             await interaction.followup.send(f"❌ Ocorreu um erro inesperado ao criar o personagem.", ephemeral=True)
 
-    @app_commands.command(name="perfil", description="Exibe o perfil de um personagem.")
+    @app_commands.command(name="perfil", description="Exibe o perfil de um personagem.", extras={EXTRA_SOMENTE_LEITURA: True})
     @app_commands.describe(character="O nome do personagem que você quer ver") # Alterado para nome
     @app_commands.autocomplete(character=autocomplete_character) # Usa autocomplete geral
     async def ver_perfil(self, interaction: discord.Interaction, character: str): # Alterado para receber nome
@@ -140,14 +141,14 @@ class PersonagemCog(commands.Cog):
             traceback.print_exc()
             await interaction.followup.send(f"❌ Ocorreu um erro inesperado ao buscar o perfil.", ephemeral=True)
 
-    @app_commands.command(name="personagens", description="Lista todos os seus personagens.")
+    @app_commands.command(name="personagens", description="Lista todos os seus personagens.", extras={EXTRA_SOMENTE_LEITURA: True})
     async def listar_personagens(self, interaction: discord.Interaction):
         """Lista todos os personagens pertencentes ao usuário."""
         await interaction.response.defer(ephemeral=True)
         try:
             user_id, server_id = await obter_contexto_comando(interaction)
 
-            personagens = self.listar_personagens_uc.executar(usuario_id=user_id, servidor_id=server_id)
+            personagens = await self.listar_personagens_uc.executar(usuario_id=user_id, servidor_id=server_id)
 
             if not personagens:
                 await interaction.followup.send("você ainda não criou nenhum personagem. Use `/criar`!", ephemeral=True)
@@ -194,7 +195,7 @@ class PersonagemCog(commands.Cog):
             # Buscar a entidade completa para atualizar (pode ser necessário se o UC de listar não retornar tudo)
             # Se ListarPersonagens já retorna a entidade completa, podemos usar personagem_encontrado diretamente.
             # Assumindo que precisamos buscar novamente com ObterPersonagem para ter certeza:
-            personagem_para_atualizar = self.obter_personagem_uc.executar(personagem_id=personagem_encontrado.id)
+            personagem_para_atualizar = await self.obter_personagem_uc.executar(personagem_id=personagem_encontrado.id)
             if not personagem_para_atualizar:
                  # Este erro não deveria acontecer se buscar_personagem_por_nome funcionou
                  await interaction.followup.send(f"❌ Erro interno ao re-buscar personagem {personagem_encontrado.nome}.", ephemeral=True)
@@ -205,8 +206,7 @@ class PersonagemCog(commands.Cog):
                  await interaction.followup.send(f"ℹ️ O personagem {personagem_para_atualizar.nome} já está aposentado.", ephemeral=True)
                  return
 
-            personagem_para_atualizar.status = StatusPersonagem.APOSENTADO
-            self.repo_personagens.atualizar(personagem_para_atualizar)
+            await self.repo_personagens.alterar_status(personagem_para_atualizar.id, StatusPersonagem.APOSENTADO)
             await interaction.followup.send(f"✅ Personagem **{personagem_para_atualizar.nome}** foi aposentado com sucesso.", ephemeral=True)
 
         except (ComandoForaDeServidorError, PersonagemNaoEncontradoError) as e:
@@ -12,12 +12,16 @@ from ostervalt.infraestrutura.persistencia.models import StatusPersonagem, Perso
 from ostervalt.nucleo.entidades.personagem import Personagem
 from typing import List, Optional # Adicionado Optional
 # Importar funções utilitárias do núcleo
-from ostervalt.nucleo.utilitarios import calculate_level, formatar_marcos, marcos_to_gain # Corrigido: formatar_marcos
+from ostervalt.nucleo.utilitarios import PARTES_POR_MARCO # Nível, ganho do /up e formatação vêm do ModeloProgressao do servidor
+from ostervalt.infraestrutura.bot_discord.arvore_comandos import EXTRA_SOMENTE_LEITURA
 # Importar utilitários do Cog
 from ostervalt.infraestrutura.bot_discord.discord_helpers import (
     obter_contexto_comando,
     # buscar_personagem_por_nome, # TODO: Usar buscar_personagem_por_nome quando a injeção de ListarPersonagensUC for adicionada
     verificar_permissoes,
+    buscar_nomes_personagens,
+    autocomplete_character as util_autocomplete_character,
+    autocomplete_active_character as util_autocomplete_active_character,
     ComandoForaDeServidorError,
     PersonagemNaoEncontradoError, # Embora não use buscar_personagem_por_nome ainda, pode ser útil no futuro
     PermissaoNegadaError,
@@ -43,38 +47,11 @@ class UtilCog(commands.Cog):
 
     async def autocomplete_character(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
         """Autocompleta com personagens do usuário (incluindo aposentados)."""
-        if not interaction.guild_id: return []
-        user_id = interaction.user.id
-        server_id = interaction.guild_id
-        try:
-            personagens: List[Personagem] = self.repo_personagens.listar_por_usuario(user_id, server_id)
-            choices = [
-                app_commands.Choice(name=f"{p.nome}{' (Aposentado)' if p.status == StatusPersonagem.APOSENTADO else ''}", value=p.nome)
-                for p in personagens
-                if current.lower() in p.nome.lower()
-            ]
-            choices.sort(key=lambda c: '(Aposentado)' in c.name)
-            return choices[:25]
-        except Exception as e:
-            print(f"Erro no autocomplete_character (UtilCog): {e}")
-            return []
+        return await util_autocomplete_character(interaction, current, self.repo_personagens)
 
     async def autocomplete_active_character(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
         """Autocompleta apenas com personagens ATIVOS do usuário."""
-        if not interaction.guild_id: return []
-        user_id = interaction.user.id
-        server_id = interaction.guild_id
-        try:
-            personagens: List[Personagem] = self.repo_personagens.listar_por_usuario(user_id, server_id)
-            choices = [
-                app_commands.Choice(name=p.nome, value=p.nome)
-                for p in personagens
-                if p.status == StatusPersonagem.ATIVO and current.lower() in p.nome.lower()
-            ]
-            return choices[:25]
-        except Exception as e:
-            print(f"Erro no autocomplete_active_character (UtilCog): {e}")
-            return []
+        return await util_autocomplete_active_character(interaction, current, self.repo_personagens)
 
     async def autocomplete_character_for_user(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
         """Autocompleta com personagens de um usuário específico (para comandos admin)."""
@@ -100,14 +77,11 @@ class UtilCog(commands.Cog):
         target_user_id = target_user.id
         server_id = interaction.guild_id
         try:
-            personagens: List[Personagem] = self.repo_personagens.listar_por_usuario(target_user_id, server_id)
-            choices = [
-                 app_commands.Choice(name=f"{p.nome}{' (Aposentado)' if p.status == StatusPersonagem.APOSENTADO else ''}", value=p.nome)
-                for p in personagens
-                if current.lower() in p.nome.lower()
+            entradas = await buscar_nomes_personagens(self.repo_personagens, server_id, target_user_id, current)
+            return [
+                app_commands.Choice(name=f"{e.nome}{' (Aposentado)' if e.status == StatusPersonagem.APOSENTADO else ''}", value=e.nome)
+                for e in entradas
             ]
-            choices.sort(key=lambda c: '(Aposentado)' in c.name)
-            return choices[:25]
         except Exception as e:
             print(f"Erro no autocomplete_character_for_user (UtilCog): {e}")
             return []
@@ -118,7 +92,7 @@ class UtilCog(commands.Cog):
 
 
     # --- Commands ---
-    @app_commands.command(name="carteira", description="Mostra quanto dinheiro um personagem tem")
+    @app_commands.command(name="carteira", description="Mostra quanto dinheiro um personagem tem", extras={EXTRA_SOMENTE_LEITURA: True})
     @app_commands.describe(character="Nome do personagem")
     @app_commands.autocomplete(character=autocomplete_character)
     async def carteira(self, interaction: discord.Interaction, character: str):
@@ -127,13 +101,7 @@ class UtilCog(commands.Cog):
         try:
             user_id, server_id = await obter_contexto_comando(interaction)
 
-            # TODO: Padronizar para usar buscar_personagem_por_nome de cog_utils quando ListarPersonagensUC for injetado
-            target_personagem: Optional[Personagem] = None
-            personagens_usuario = self.repo_personagens.listar_por_usuario(user_id, server_id)
-            for p in personagens_usuario:
-                if p.nome.lower() == character.lower():
-                    target_personagem = p
-                    break
+            target_personagem: Optional[Personagem] = await self.repo_personagens.obter_por_nome(user_id, server_id, character)
 
             if not target_personagem:
                 # Usar a exceção padrão por enquanto, já que não usamos buscar_personagem_por_nome
@@ -191,7 +159,7 @@ class UtilCog(commands.Cog):
             await interaction.response.send_message("Nenhum comando de slash encontrado.", ephemeral=True)
 
 
-    @app_commands.command(name="marcos", description="Mostra os Marcos e nível de um personagem")
+    @app_commands.command(name="marcos", description="Mostra os Marcos e nível de um personagem", extras={EXTRA_SOMENTE_LEITURA: True})
     @app_commands.describe(character="Nome do personagem")
     @app_commands.autocomplete(character=autocomplete_character)
     async def marcos(self, interaction: discord.Interaction, character: str):
@@ -200,13 +168,7 @@ class UtilCog(commands.Cog):
         try:
             user_id, server_id = await obter_contexto_comando(interaction)
 
-            # TODO: Padronizar para usar buscar_personagem_por_nome de cog_utils quando ListarPersonagensUC for injetado
-            target_personagem: Optional[Personagem] = None
-            personagens_usuario = self.repo_personagens.listar_por_usuario(user_id, server_id)
-            for p in personagens_usuario:
-                if p.nome.lower() == character.lower():
-                    target_personagem = p
-                    break
+            target_personagem: Optional[Personagem] = await self.repo_personagens.obter_por_nome(user_id, server_id, character)
 
             if not target_personagem:
                 await interaction.followup.send(f"❌ Personagem '{character}' não encontrado para seu usuário.", ephemeral=True)
@@ -223,8 +185,9 @@ class UtilCog(commands.Cog):
             if not tem_permissao:
                  raise PermissaoNegadaError("Você não tem permissão para ver estes marcos.")
 
-            marcos_val = target_personagem.marcos
-            level = calculate_level(marcos_val) # Usa função importada
+            marcos_val = target_personagem.marcos # Em partes (16 = 1 marco)
+            progressao = (await self.repo_config_servidor.obter_snapshot(server_id)).progressao
+            level = progressao.nivel(marcos_val)
             status_str = target_personagem.status.value.capitalize() if target_personagem.status else "N/A"
 
             embed = discord.Embed(
@@ -233,7 +196,7 @@ class UtilCog(commands.Cog):
             )
             embed.add_field(name="Status", value=status_str, inline=True)
             embed.add_field(name="Nível", value=str(level), inline=True)
-            embed.add_field(name="Marcos", value=formatar_marcos(marcos_val), inline=False) # Usa função importada
+            embed.add_field(name="Marcos", value=progressao.formatar_marcos(marcos_val), inline=False)
 
             await interaction.followup.send(embed=embed, ephemeral=True)
 
@@ -256,14 +219,10 @@ class UtilCog(commands.Cog):
         try:
             user_id, server_id = await obter_contexto_comando(interaction)
 
-            # TODO: Padronizar para usar buscar_personagem_por_nome de cog_utils quando ListarPersonagensUC for injetado
-            target_personagem: Optional[Personagem] = None
-            personagens_usuario = self.repo_personagens.listar_por_usuario(user_id, server_id)
-            for p in personagens_usuario:
-                # Busca apenas ATIVOS implicitamente pelo autocomplete, mas checa aqui também
-                if p.nome.lower() == character.lower() and p.status == StatusPersonagem.ATIVO:
-                    target_personagem = p
-                    break
+            # Busca apenas ATIVOS implicitamente pelo autocomplete, mas checa aqui também
+            target_personagem: Optional[Personagem] = await self.repo_personagens.obter_por_nome(
+                user_id, server_id, character, status=StatusPersonagem.ATIVO
+            )
 
             if not target_personagem:
                 # Usar a exceção padrão por enquanto
@@ -286,22 +245,24 @@ class UtilCog(commands.Cog):
             if not tem_permissao:
                  raise PermissaoNegadaError("Você não tem permissão para usar /up neste personagem.")
 
+            progressao = (await self.repo_config_servidor.obter_snapshot(server_id)).progressao
             current_level = target_personagem.nivel
-            marcos_to_add = marcos_to_gain(current_level) # Usa função importada
-            current_marcos = target_personagem.marcos
-            target_personagem.marcos = current_marcos + marcos_to_add
+            # O ganho sai do nível das partes gravadas (o mesmo que aplicar_ups usa)
+            marcos_to_add = progressao.partes_ganhas(progressao.nivel(target_personagem.marcos))
+            target_personagem.marcos = progressao.aplicar_ups(target_personagem.marcos)
             new_marcos = target_personagem.marcos
-            new_level = calculate_level(new_marcos) # Usa função importada
+            new_level = progressao.nivel(new_marcos) # Marcos em partes: 16 partes = 1 nível
             target_personagem.nivel = new_level
 
             response_message = ""
             if new_level > current_level:
                 response_message = f'🎉 {target_personagem.nome} subiu para o nível {new_level}!'
             else:
-                fraction_added = f"{marcos_to_add}/16"
-                response_message = f'✨ Adicionado {fraction_added} de Marco para {target_personagem.nome}. Total: {formatar_marcos(new_marcos)} (Nível {new_level})' # Usa função importada
+                fraction_added = f"{marcos_to_add}/{PARTES_POR_MARCO}"
+                response_message = f'✨ Adicionado {fraction_added} de Marco para {target_personagem.nome}. Total: {progressao.formatar_marcos(new_marcos)} (Nível {new_level})'
 
-            self.repo_personagens.atualizar(target_personagem)
+            # Só marcos e nível: um /trabalhar ou /crime concluído no meio não é desfeito
+            await self.repo_personagens.alterar_progressao(target_personagem.id, new_marcos, new_level)
             await interaction.followup.send(response_message, ephemeral=True)
 
         except (ComandoForaDeServidorError, PermissaoNegadaError) as e:
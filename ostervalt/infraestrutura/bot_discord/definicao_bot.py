@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 import discord
 from discord.ext import commands
+from ostervalt.infraestrutura.bot_discord.arvore_comandos import ArvoreComandos
 
 class RPGBot(commands.Bot):
     """
@@ -11,7 +12,7 @@ class RPGBot(commands.Bot):
     # Removido container daqui, será passado em executar_bot.py se necessário
     # O __init__ agora recebe intents explicitamente
     def __init__(self, command_prefix: str, intents: discord.Intents):
-        super().__init__(command_prefix=command_prefix, intents=intents)
+        super().__init__(command_prefix=command_prefix, intents=intents, tree_cls=ArvoreComandos)
         print("Instância do RPGBot (definicao_bot.py) criada.")
 
     # Mantendo setup_hook e on_ready aqui por enquanto,
@@ -6,10 +6,13 @@ from discord import Member, app_commands, Interaction # Ajustado imports
 from ostervalt.nucleo.casos_de_uso.listar_personagens import ListarPersonagens
 from ostervalt.nucleo.entidades.personagem import Personagem
 from ostervalt.nucleo.entidades.item import Item
+from ostervalt.nucleo.utilitarios import normalizar_texto
 from ostervalt.infraestrutura.persistencia.models import StatusPersonagem
 from ostervalt.infraestrutura.persistencia.repositorio_configuracao_servidor import RepositorioConfiguracaoServidor
 from ostervalt.infraestrutura.persistencia.repositorio_personagens import RepositorioPersonagensSQLAlchemy
 from ostervalt.infraestrutura.persistencia.repositorio_itens import RepositorioItensSQLAlchemy
+from ostervalt.infraestrutura.persistencia.catalogo_itens import CatalogoItens
+from ostervalt.infraestrutura.persistencia.indice_nomes_personagens import IndiceNomesPersonagens, EntradaNomePersonagem
 
 # --- Exceções Customizadas ---
 
@@ -63,14 +66,40 @@ async def buscar_personagem_por_nome(
     """
     user_id, server_id = await obter_contexto_comando(interaction)
     try:
-        personagens_usuario: List[Personagem] = listar_personagens_uc.executar(
-            usuario_id=user_id, servidor_id=server_id
+        # Busca só o personagem com o nome (índice único por usuário), em vez de listar todos
+        personagens_usuario: List[Personagem] = await listar_personagens_uc.executar(
+            usuario_id=user_id, servidor_id=server_id, nome=nome_personagem,
+            status=StatusPersonagem.ATIVO if apenas_ativos else None,
         )
-        for p in personagens_usuario:
-            if p.nome.lower() == nome_personagem.lower():
-                if apenas_ativos and p.status != StatusPersonagem.ATIVO:
-                    continue
-                return p
+        if personagens_usuario:
+            return personagens_usuario[0]
+        raise PersonagemNaoEncontradoError(nome_personagem)
+    except PersonagemNaoEncontradoError:
+        raise
+    except Exception as e:
+        print(f"Erro inesperado ao buscar personagem '{nome_personagem}' para user {user_id}: {e}")
+        traceback.print_exc()
+        raise CogUtilsError(f"Ocorreu um erro ao buscar o personagem '{nome_personagem}'.") from e
+
+async def buscar_entrada_personagem_por_nome(
+    interaction: Interaction,
+    nome_personagem: str,
+    repo_personagens: RepositorioPersonagensSQLAlchemy,
+    apenas_ativos: bool = False
+) -> EntradaNomePersonagem:
+    """
+    Como buscar_personagem_por_nome, mas resolve o nome pelo índice em memória dos autocompletes
+    (só vai ao banco se o usuário ainda não estiver no índice). Retorna apenas ID, nome e status,
+    o suficiente para comandos que passam o ID adiante, como /trabalhar e /crime.
+    Raises: ComandoForaDeServidorError, PersonagemNaoEncontradoError, CogUtilsError.
+    """
+    user_id, server_id = await obter_contexto_comando(interaction)
+    try:
+        entradas = await buscar_nomes_personagens(repo_personagens, server_id, user_id, nome_personagem, apenas_ativos=apenas_ativos)
+        nome_normalizado = normalizar_texto(nome_personagem)
+        for entrada in entradas:
+            if entrada.nome_normalizado == nome_normalizado: # Mesma comparação de obter_por_nome
+                return entrada
         raise PersonagemNaoEncontradoError(nome_personagem)
     except PersonagemNaoEncontradoError:
         raise
@@ -94,14 +123,12 @@ async def buscar_personagem_por_nome_para_usuario(
     _, server_id = await obter_contexto_comando(interaction)
     try:
         # Usa o usuario_alvo_id fornecido na busca
-        personagens_usuario: List[Personagem] = repo_personagens.listar_por_usuario(
-            usuario_alvo_id, server_id
+        personagem: Optional[Personagem] = await repo_personagens.obter_por_nome(
+            usuario_alvo_id, server_id, nome_personagem,
+            status=StatusPersonagem.ATIVO if apenas_ativos else None,
         )
-        for p in personagens_usuario:
-            if p.nome.lower() == nome_personagem.lower():
-                if apenas_ativos and p.status != StatusPersonagem.ATIVO:
-                    continue
-                return p
+        if personagem:
+            return personagem
         raise PersonagemNaoEncontradoError(nome_personagem, f"Personagem '{nome_personagem}' não encontrado para o usuário ID {usuario_alvo_id}.")
     except PersonagemNaoEncontradoError:
         raise
@@ -129,9 +156,9 @@ async def verificar_permissoes(
     server_id = member.guild.id
     if member.guild_permissions.administrator:
         return True
-    chave_config = f"cargos_{tipo_permissao}_ids"
     try:
-        cargos_permitidos_ids = repo_config_servidor.obter_valor(server_id, chave_config, default=[])
+        config_servidor = await repo_config_servidor.obter_snapshot(server_id) # Servido do cache
+        cargos_permitidos_ids = config_servidor.cargos_ids(tipo_permissao)
         if any(role.id in cargos_permitidos_ids for role in member.roles):
             return True
     except Exception as e:
@@ -142,20 +169,41 @@ async def verificar_permissoes(
 
 # --- Funções de Autocomplete ---
 
+async def buscar_nomes_personagens(
+    repo_personagens: RepositorioPersonagensSQLAlchemy,
+    servidor_id: int,
+    usuario_id: int,
+    current: str,
+    apenas_ativos: bool = False,
+) -> List[EntradaNomePersonagem]:
+    """
+    Busca ranqueada de nomes de personagens de um usuário no índice em memória do repositório.
+    Só consulta o banco na primeira vez que o usuário aparece (ou após ser descartado do índice);
+    o repositório carrega o usuário no índice, exceto se a leitura veio da réplica.
+    """
+    indice: Optional[IndiceNomesPersonagens] = getattr(repo_personagens, 'indice_nomes', None)
+    if indice is None or not indice.usuario_carregado(servidor_id, usuario_id):
+        personagens = await repo_personagens.carregar_nomes_usuario(usuario_id, servidor_id)
+        if indice is None or not indice.usuario_carregado(servidor_id, usuario_id):
+            # Sem índice, leitura da réplica ou escrita concorrente: ranqueia só esta leitura
+            indice = IndiceNomesPersonagens(tamanho_maximo=1)
+            indice.carregar_usuario(servidor_id, usuario_id, personagens, geracao=0)
+    return indice.buscar(servidor_id, usuario_id, current, apenas_ativos=apenas_ativos)
+
+def _choices_personagens(entradas: List[EntradaNomePersonagem], marcar_aposentados: bool) -> List[app_commands.Choice[str]]:
+    return [
+        app_commands.Choice(name=f"{e.nome}{' (Aposentado)' if marcar_aposentados and e.status == StatusPersonagem.APOSENTADO else ''}", value=e.nome)
+        for e in entradas
+    ][:25]
+
 async def autocomplete_character(interaction: Interaction, current: str, repo_personagens: RepositorioPersonagensSQLAlchemy) -> List[app_commands.Choice[str]]:
     """Autocompleta com personagens do usuário da interação (incluindo aposentados)."""
     if not interaction.guild_id: return []
     user_id = interaction.user.id
     server_id = interaction.guild_id
     try:
-        personagens: List[Personagem] = repo_personagens.listar_por_usuario(user_id, server_id)
-        choices = [
-            app_commands.Choice(name=f"{p.nome}{' (Aposentado)' if p.status == StatusPersonagem.APOSENTADO else ''}", value=p.nome)
-            for p in personagens
-            if current.lower() in p.nome.lower()
-        ]
-        choices.sort(key=lambda c: '(Aposentado)' in c.name)
-        return choices[:25]
+        entradas = await buscar_nomes_personagens(repo_personagens, server_id, user_id, current)
+        return _choices_personagens(entradas, marcar_aposentados=True)
     except Exception as e:
         print(f"Erro no autocomplete_character (cog_utils): {e}")
         return []
@@ -166,13 +214,8 @@ async def autocomplete_active_character(interaction: Interaction, current: str,
     user_id = interaction.user.id
     server_id = interaction.guild_id
     try:
-        personagens: List[Personagem] = repo_personagens.listar_por_usuario(user_id, server_id)
-        choices = [
-            app_commands.Choice(name=p.nome, value=p.nome)
-            for p in personagens
-            if p.status == StatusPersonagem.ATIVO and current.lower() in p.nome.lower()
-        ]
-        return choices[:25]
+        entradas = await buscar_nomes_personagens(repo_personagens, server_id, user_id, current, apenas_ativos=True)
+        return _choices_personagens(entradas, marcar_aposentados=False)
     except Exception as e:
         print(f"Erro no autocomplete_active_character (cog_utils): {e}")
         return []
@@ -203,26 +246,28 @@ async def autocomplete_character_for_user(interaction: Interaction, current: str
          return []
     server_id = interaction.guild_id
     try:
-        personagens: List[Personagem] = repo_personagens.listar_por_usuario(target_user_id, server_id)
-        choices = [
-            app_commands.Choice(name=f"{p.nome}{' (Aposentado)' if p.status == StatusPersonagem.APOSENTADO else ''}", value=p.nome)
-            for p in personagens
-            if current.lower() in p.nome.lower()
-        ]
-        choices.sort(key=lambda c: '(Aposentado)' in c.name)
-        return choices[:25]
+        entradas = await buscar_nomes_personagens(repo_personagens, server_id, target_user_id, current)
+        return _choices_personagens(entradas, marcar_aposentados=True)
     except Exception as e:
         print(f"Erro no autocomplete_character_for_user (cog_utils): {e}")
         return []
 
-async def autocomplete_item(interaction: Interaction, current: str, repo_itens: RepositorioItensSQLAlchemy) -> list[app_commands.Choice[str]]:
-    """Autocompleta com nomes de itens mestres."""
+async def autocomplete_item(interaction: Interaction, current: str, repo_itens: RepositorioItensSQLAlchemy, catalogo_itens: CatalogoItens) -> list[app_commands.Choice[str]]:
+    """
+    Autocompleta com nomes de itens mestres, a partir do índice em memória do catálogo.
+    Se o comando tiver a opção 'raridade' preenchida, restringe a busca a ela.
+    """
     try:
-        itens: List[Item] = repo_itens.listar_todos()
-        choices = [
-            app_commands.Choice(name=i.nome, value=i.nome)
-            for i in itens if current.lower() in i.nome.lower()
-        ]
+        if not catalogo_itens.carregado:
+            catalogo_itens.carregar(await repo_itens.listar_todos())
+        raridade = getattr(interaction.namespace, 'raridade', None)
+        nomes_vistos = set()
+        choices = []
+        for item in catalogo_itens.buscar(current, raridade=raridade, limite=50):
+            if item.nome in nomes_vistos:
+                continue
+            nomes_vistos.add(item.nome)
+            choices.append(app_commands.Choice(name=item.nome, value=item.nome))
         return choices[:25]
     except Exception as e:
         print(f"Erro no autocomplete_item (cog_utils): {e}")
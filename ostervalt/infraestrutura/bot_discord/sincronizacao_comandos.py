@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import json
+from typing import List, Optional
+
+import discord
+from discord import app_commands
+
+ESCOPO_GLOBAL = "global"
+
+
+def escopo_sincronizacao(guild: Optional[discord.abc.Snowflake] = None) -> str:
+    """Chave do hash guardado: 'global' ou o ID do servidor."""
+    return ESCOPO_GLOBAL if guild is None else str(guild.id)
+
+
+async def hash_arvore(tree: app_commands.CommandTree, guild: Optional[discord.abc.Snowflake] = None) -> str:
+    """
+    SHA-256 do payload que `tree.sync(guild=guild)` enviaria ao Discord (com as traduções,
+    se houver tradutor), em ordem estável. Inclui o ID da aplicação: trocar de token
+    (outra aplicação) exige uma nova sincronização.
+    """
+    comandos = tree.get_commands(guild=guild)
+    if tree.translator:
+        payload = [await comando.get_translated_payload(tree, tree.translator) for comando in comandos]
+    else:
+        payload = [comando.to_dict(tree) for comando in comandos]
+    payload.sort(key=lambda comando: (comando.get("type", 1), comando["name"]))
+    conteudo = json.dumps(
+        {"aplicacao": tree.client.application_id, "comandos": payload},
+        sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str,
+    )
+    return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+
+async def sincronizar_se_alterada(
+    tree: app_commands.CommandTree,
+    repo_sincronizacao,
+    escopo_interacao,
+    guild: Optional[discord.abc.Snowflake] = None,
+    forcar: bool = False,
+) -> Optional[List[app_commands.AppCommand]]:
+    """
+    Sincroniza os comandos (globais ou do servidor `guild`) só se a árvore mudou desde a
+    última sincronização bem-sucedida, comparando com o hash guardado no banco. A
+    sincronização conta no rate limit do Discord e, sem mudanças, não faz nada.
+
+    Args:
+        repo_sincronizacao: RepositorioSincronizacaoComandos (envolto em ProxyAssincrono).
+        escopo_interacao: EscopoInteracao; as leituras/escritas do hash abrem uma sessão
+            própria, fechada antes da chamada HTTP.
+        forcar: Sincroniza mesmo sem mudanças (ex: comandos alterados por fora do bot).
+
+    Returns:
+        Os comandos sincronizados, ou None se a sincronização foi pulada.
+    """
+    escopo = escopo_sincronizacao(guild)
+    hash_atual = await hash_arvore(tree, guild)
+    if not forcar:
+        async with escopo_interacao():
+            hash_anterior = await repo_sincronizacao.obter_hash(escopo)
+        if hash_anterior == hash_atual:
+            print(f"Comandos de aplicação ({escopo}) inalterados: sincronização pulada.")
+            return None
+
+    sincronizados = await tree.sync(guild=guild)
+    # Guardado só depois do sucesso: uma falha faz a próxima tentativa sincronizar de novo
+    async with escopo_interacao():
+        await repo_sincronizacao.registrar_hash(escopo, hash_atual)
+    return sincronizados
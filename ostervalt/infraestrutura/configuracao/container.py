@@ -1,12 +1,28 @@
 # -*- coding: utf-8 -*-
-from ostervalt.infraestrutura.configuracao.db import get_session
+import os
+from typing import Any, Callable, Optional
+
+from ostervalt.infraestrutura.configuracao.db import SessaoEscopada, SessionLocal, DATABASE_URL, CONEXOES_MAXIMAS, engine, engine_leitura
+from ostervalt.infraestrutura.configuracao.perfil_sqlite import PerfilSQLite, TarefaManutencaoSQLite, aplicar_perfil_sqlite
+from ostervalt.infraestrutura.monitoramento.metricas import RegistroMetricas
+from ostervalt.infraestrutura.monitoramento.consultas import instrumentar_engine
+from ostervalt.infraestrutura.persistencia.executor_banco import ExecutorBancoDados, ExecutorBancoDadosSincrono, ProxyAssincrono
+from ostervalt.infraestrutura.persistencia.unidade_trabalho import EscopoInteracao
 
 # Importar Repositórios
 from ostervalt.infraestrutura.persistencia.repositorio_personagens import RepositorioPersonagensSQLAlchemy
 from ostervalt.infraestrutura.persistencia.repositorio_itens import RepositorioItensSQLAlchemy
 from ostervalt.infraestrutura.persistencia.repositorio_inventario import RepositorioInventarioSQLAlchemy
 from ostervalt.infraestrutura.persistencia.repositorio_configuracao_servidor import RepositorioConfiguracaoServidor # Adicionado
+from ostervalt.infraestrutura.persistencia.cache_configuracao_servidor import CacheConfiguracaoServidor
+from ostervalt.infraestrutura.persistencia.catalogo_itens import CatalogoItens
+from ostervalt.infraestrutura.persistencia.cache_itens import CacheItens
+from ostervalt.infraestrutura.persistencia.indice_nomes_personagens import IndiceNomesPersonagens
+from ostervalt.infraestrutura.persistencia.tabela_cooldowns import TabelaCooldowns
 from ostervalt.infraestrutura.persistencia.repositorio_estoque_loja import RepositorioEstoqueLoja # Adicionado
+from ostervalt.infraestrutura.persistencia.repositorio_sincronizacao_comandos import RepositorioSincronizacaoComandos
+from ostervalt.infraestrutura.persistencia.backup_servidor import BackupServidor
+from ostervalt.infraestrutura.persistencia.buffer_escrita import BufferEscrita
 
 # Importar Casos de Uso
 from ostervalt.nucleo.casos_de_uso.criar_personagem import CriarPersonagem
@@ -20,66 +36,190 @@ from ostervalt.nucleo.casos_de_uso.adicionar_item_inventario import AdicionarIte
 from ostervalt.nucleo.casos_de_uso.remover_item_inventario import RemoverItemInventario
 from ostervalt.nucleo.casos_de_uso.obter_item import ObterItem
 from ostervalt.nucleo.casos_de_uso.listar_itens import ListarItens
-from ostervalt.infraestrutura.bot_discord.cogs.util_cog import UtilCog
 
 class Container:
     """Container simples para injeção de dependência."""
     def __init__(self):
         self._servicos = {}
+        self._fabricas = {} # Serviços preguiçosos: nome -> fábrica, chamada no primeiro resolve
 
     def registrar(self, nome: str, instancia):
         """Registra uma instância de serviço no container."""
+        self._fabricas.pop(nome, None)
         self._servicos[nome] = instancia
 
+    def registrar_fabrica(self, nome: str, fabrica: Callable[[], Any]):
+        """Registra um serviço criado só no primeiro resolve (a instância é reaproveitada depois)."""
+        self._servicos.pop(nome, None)
+        self._fabricas[nome] = fabrica
+
     def resolve(self, nome: str):
         """Resolve (retorna) uma instância de serviço pelo nome."""
         try:
             return self._servicos[nome]
         except KeyError:
+            pass
+        fabrica = self._fabricas.pop(nome, None)
+        if fabrica is None:
             raise ValueError(f"Serviço '{nome}' não encontrado no container.")
+        instancia = self._servicos[nome] = fabrica()
+        return instancia
+
+# Modos de acesso ao banco suportados por configurar_container
+MODOS_BANCO = ("executor", "sincrono")
 
-def configurar_container() -> Container:
-    """Configura e retorna o container de injeção de dependência."""
+def _criar_executor_banco(modo_banco: str, workers_sqlite: int = 1):
+    """Cria o executor de banco conforme o modo escolhido."""
+    if modo_banco not in MODOS_BANCO:
+        raise ValueError(f"Modo de banco '{modo_banco}' inválido. Use um de: {', '.join(MODOS_BANCO)}.")
+    if modo_banco == "sincrono":
+        return ExecutorBancoDadosSincrono()
+    # SQLite serializa escritas: um único worker evita 'database is locked' entre threads
+    # (com o buffer de escrita, as atualizações de personagens passam todas pela thread do buffer)
+    max_workers = workers_sqlite if DATABASE_URL.startswith("sqlite") else int(os.getenv("DB_EXECUTOR_WORKERS", "4"))
+    return ExecutorBancoDados(max_workers=max_workers)
+
+def configurar_container(modo_banco: Optional[str] = None, buffer_escrita: Optional[bool] = None) -> Container:
+    """
+    Configura e retorna o container de injeção de dependência.
+
+    Args:
+        modo_banco (str | None): 'executor' (padrão) executa repositórios e casos de uso
+            em threads dedicadas, fora do event loop; 'sincrono' executa na própria thread
+            do chamador. Se None, usa a variável de ambiente MODO_BANCO.
+        buffer_escrita (bool | None): Habilita o buffer de escrita dos personagens.
+            Se None, usa 'buffer_escrita.habilitado' do config.yaml.
+    """
     container = Container()
+    configuracao = Configuracao('config.yaml')
+
+    # --- Perfil do SQLite (WAL, cache, mmap, busy_timeout...) em cada conexão nova ---
+    perfil_sqlite = PerfilSQLite.de_configuracao(configuracao.obter('sqlite'))
+    sqlite_ativo = aplicar_perfil_sqlite(engine, perfil_sqlite)
+    if engine_leitura is not None:
+        aplicar_perfil_sqlite(engine_leitura, perfil_sqlite)
+    buffer_habilitado = buffer_escrita if buffer_escrita is not None else configuracao.obter('buffer_escrita.habilitado', False)
+    if buffer_habilitado and sqlite_ativo:
+        # A thread do buffer escreve por uma conexão própria, ao mesmo tempo que as sessões das
+        # interações (inventário, itens, estoque): sem espera por lock, uma delas falharia com 'database is locked'
+        if perfil_sqlite.busy_timeout_ms <= 0:
+            raise ValueError("buffer_escrita.habilitado requer sqlite.busy_timeout_ms > 0.")
+        if perfil_sqlite.journal_mode != "wal":
+            print(f"Aviso: buffer de escrita com sqlite.journal_mode={perfil_sqlite.journal_mode}; "
+                  "use 'wal' para que as leituras não esperem pelos commits do buffer.")
 
-    # --- Sessão do Banco de Dados (Fábrica) ---
-    # Registra a função que obtém a sessão, não a sessão em si,
-    # para garantir uma nova sessão por requisição/operação se necessário.
-    # No contexto do bot, podemos passar a mesma sessão para todos os repositórios
-    # dentro de um mesmo comando, mas obter uma nova sessão a cada comando.
-    # Por simplicidade aqui, vamos registrar a função get_session.
-    # Os repositórios podem chamar container.resolve('db_session_factory')()
-    # Ou podemos instanciar a sessão aqui e passá-la diretamente.
-    # Vamos optar pela segunda abordagem por simplicidade inicial no bot.
-    db_session = get_session()
-    container.registrar('db_session', db_session) # Registra a sessão atual
+    modo_banco = modo_banco or os.getenv("MODO_BANCO", "executor")
+    executor_banco = _criar_executor_banco(
+        modo_banco,
+        # Com o buffer, as escritas de personagens não ocupam workers enquanto esperam o commit do lote;
+        # workers extras só paralelizam as leituras (o WAL permite leitores simultâneos ao escritor)
+        workers_sqlite=configuracao.obter('buffer_escrita.workers_executor', 4) if buffer_habilitado else 1,
+    )
+    container.registrar('executor_banco', executor_banco)
+
+    # --- Sessão do Banco de Dados (por interação) ---
+    # Os repositórios recebem a sessão escopada: cada interação (ou thread, fora do bot)
+    # obtém sua própria Session, aberta e finalizada pelo EscopoInteracao.
+    db_session = SessaoEscopada
+    container.registrar('db_session', db_session)
+    # Interações com conexão limitadas ao pool; uma conexão fica livre para o buffer de escrita e as tarefas de fundo
+    container.registrar('escopo_interacao', EscopoInteracao(
+        db_session, executor_banco, max_conexoes=max(1, CONEXOES_MAXIMAS - 1) if CONEXOES_MAXIMAS else None,
+    ))
+    # Checkpoint do WAL e PRAGMA optimize periódicos; iniciada pelo bot (None fora do SQLite)
+    container.registrar_fabrica('manutencao_banco', lambda: TarefaManutencaoSQLite(
+        engine,
+        executor_banco,
+        intervalo_segundos=configuracao.obter('sqlite.manutencao.intervalo_segundos', 3600),
+        modo_checkpoint=configuracao.obter('sqlite.manutencao.checkpoint', 'passive'),
+    ) if sqlite_ativo else None)
+
+    # --- Buffer de escrita (opcional) ---
+    # Junta as atualizações de personagens de várias interações em um único commit
+    buffer_escrita = None # Daqui em diante, a instância (ou None)
+    if buffer_habilitado:
+        buffer_escrita = BufferEscrita(
+            SessionLocal,
+            janela_segundos=configuracao.obter('buffer_escrita.janela_ms', 5) / 1000,
+            tamanho_maximo_lote=configuracao.obter('buffer_escrita.tamanho_maximo_lote', 200),
+        )
+    container.registrar('buffer_escrita', buffer_escrita)
+
+    # --- Métricas por interação ---
+    container.registrar('metricas', RegistroMetricas())
+    # Conta e mede as consultas SQL de cada interação e registra as lentas no log
+    consulta_lenta_ms = configuracao.obter('metricas.consulta_lenta_ms', 100)
+    for engine_instrumentado in (engine, engine_leitura):
+        if engine_instrumentado is not None:
+            instrumentar_engine(engine_instrumentado, limite_consulta_lenta=consulta_lenta_ms / 1000 if consulta_lenta_ms is not None else None)
+
+    # --- Caches em memória ---
+    cache_config_servidor = CacheConfiguracaoServidor(
+        tamanho_maximo=configuracao.obter('cache.configuracao_servidor.tamanho_maximo', 1024),
+        ttl_segundos=configuracao.obter('cache.configuracao_servidor.ttl_segundos'),
+    )
+    container.registrar('cache_config_servidor', cache_config_servidor)
+    # Índice do catálogo para os autocompletes; consultado direto no event loop (sem executor)
+    catalogo_itens = CatalogoItens()
+    container.registrar('catalogo_itens', catalogo_itens)
+    # Itens mestres por ID e nome (read-through); carregado inteiro pelo listar_todos da inicialização
+    cache_itens = CacheItens(tamanho_maximo=configuracao.obter('cache.itens.tamanho_maximo', 10000))
+    container.registrar('cache_itens', cache_itens)
+    # Nomes de personagens por (servidor, usuário); exposto aos autocompletes como repo_personagens.indice_nomes
+    indice_nomes_personagens = IndiceNomesPersonagens(
+        tamanho_maximo=configuracao.obter('cache.nomes_personagens.tamanho_maximo', 10000),
+    )
+    container.registrar('indice_nomes_personagens', indice_nomes_personagens)
+    # Último uso de /trabalhar e /crime por personagem: as tentativas em cooldown são recusadas sem consultas
+    tabela_cooldowns = TabelaCooldowns()
+    container.registrar('tabela_cooldowns', tabela_cooldowns)
 
     # --- Repositórios ---
-    repo_personagens = RepositorioPersonagensSQLAlchemy(db_session)
-    repo_itens = RepositorioItensSQLAlchemy(db_session)
+    repo_personagens = RepositorioPersonagensSQLAlchemy(
+        db_session, indice_nomes=indice_nomes_personagens, buffer_escrita=buffer_escrita, tabela_cooldowns=tabela_cooldowns,
+    )
+    repo_itens = RepositorioItensSQLAlchemy(db_session, catalogo=catalogo_itens, cache=cache_itens)
     repo_inventario = RepositorioInventarioSQLAlchemy(db_session)
-    repo_config_servidor = RepositorioConfiguracaoServidor(db_session) # Adicionado
+    repo_config_servidor = RepositorioConfiguracaoServidor(db_session, cache=cache_config_servidor) # Adicionado
     repo_estoque_loja = RepositorioEstoqueLoja(db_session) # Adicionado
 
-    container.registrar('repo_personagens', repo_personagens)
-    container.registrar('repo_itens', repo_itens)
-    container.registrar('repo_inventario', repo_inventario)
-    container.registrar('repo_config_servidor', repo_config_servidor) # Adicionado
-    container.registrar('repo_estoque_loja', repo_estoque_loja) # Adicionado
+    # Repositórios e casos de uso são registrados envoltos em ProxyAssincrono:
+    # os Cogs fazem `await servico.metodo(...)` e o trabalho síncrono roda no executor.
+    def registrar_assincrono(nome: str, instancia):
+        container.registrar(nome, ProxyAssincrono(instancia, executor_banco))
+
+    registrar_assincrono('repo_personagens', repo_personagens)
+    registrar_assincrono('repo_itens', repo_itens)
+    registrar_assincrono('repo_inventario', repo_inventario)
+    registrar_assincrono('repo_config_servidor', repo_config_servidor) # Adicionado
+    registrar_assincrono('repo_estoque_loja', repo_estoque_loja) # Adicionado
+    # Hash dos comandos de aplicação já sincronizados (setup_hook e !sync_commands só sincronizam se mudar)
+    registrar_assincrono('repo_sincronizacao_comandos', RepositorioSincronizacaoComandos(db_session))
+    # Só o AdminCog usa o backup: criado no primeiro resolve (scripts e benchmarks não pagam por ele)
+    container.registrar_fabrica('backup_servidor', lambda: ProxyAssincrono(BackupServidor(
+        db_session,
+        cache_config=cache_config_servidor,
+        indice_nomes=indice_nomes_personagens,
+        tamanho_lote=configuracao.obter('backup.tamanho_lote', 1000),
+        buffer_escrita=buffer_escrita,
+        tabela_cooldowns=tabela_cooldowns,
+    ), executor_banco))
 
     # --- Casos de Uso ---
-    container.registrar('criar_personagem_uc', CriarPersonagem(repo_personagens))
-    container.registrar('obter_personagem_uc', ObterPersonagem(repo_personagens))
-    container.registrar('listar_personagens_uc', ListarPersonagens(repo_personagens))
-    container.registrar('realizar_trabalho_uc', RealizarTrabalho(repo_personagens)) # Pode precisar de outros repos no futuro
-    container.registrar('cometer_crime_uc', CometerCrime(repo_personagens, Configuracao('config.yaml'))) # Pode precisar de outros repos no futuro
-    container.registrar('listar_inventario_uc', ListarInventario(repo_inventario))
-    container.registrar('adicionar_item_inventario_uc', AdicionarItemInventario(repo_inventario, repo_itens)) # Ajustado para incluir repo_personagens
-    container.registrar('remover_item_inventario_uc', RemoverItemInventario(repo_inventario)) # Ajustado para incluir repo_personagens
-    container.registrar('obter_item_uc', ObterItem(repo_itens))
-    container.registrar('listar_itens_uc', ListarItens(repo_itens))
-
-    print("Container de injeção de dependência configurado.")
+    registrar_assincrono('criar_personagem_uc', CriarPersonagem(repo_personagens))
+    registrar_assincrono('obter_personagem_uc', ObterPersonagem(repo_personagens))
+    registrar_assincrono('listar_personagens_uc', ListarPersonagens(repo_personagens))
+    registrar_assincrono('realizar_trabalho_uc', RealizarTrabalho(repo_personagens, tabela_cooldowns=tabela_cooldowns)) # Pode precisar de outros repos no futuro
+    registrar_assincrono('cometer_crime_uc', CometerCrime(repo_personagens, configuracao, tabela_cooldowns=tabela_cooldowns)) # Pode precisar de outros repos no futuro
+    registrar_assincrono('listar_inventario_uc', ListarInventario(repo_inventario))
+    registrar_assincrono('adicionar_item_inventario_uc', AdicionarItemInventario(repo_inventario, repo_itens)) # Ajustado para incluir repo_personagens
+    registrar_assincrono('remover_item_inventario_uc', RemoverItemInventario(repo_inventario)) # Ajustado para incluir repo_personagens
+    registrar_assincrono('obter_item_uc', ObterItem(repo_itens))
+    registrar_assincrono('listar_itens_uc', ListarItens(repo_itens))
+
+    if engine_leitura is not None:
+        print(f"Réplica de leitura configurada: {engine_leitura.url.render_as_string(hide_password=True)}")
+    print(f"Container de injeção de dependência configurado (modo de banco: {modo_banco}).")
     return container
 
 # Exemplo de uso (não executado aqui):
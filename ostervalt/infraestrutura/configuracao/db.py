@@ -1,22 +1,70 @@
 # -*- coding: utf-8 -*-
 import os
+from typing import Optional
+
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.orm import sessionmaker, scoped_session, Session
 from dotenv import load_dotenv
 
 from ostervalt.infraestrutura.persistencia.base import Base # Importa a Base dos modelos
+from ostervalt.infraestrutura.persistencia.roteamento_leitura import SessaoRoteada
+from ostervalt.infraestrutura.persistencia.unidade_trabalho import chave_escopo_atual
 
 load_dotenv()
 
 # Carrega a URL do banco de dados do .env ou usa um padrão SQLite
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./ostervalt.db")
+# Réplica opcional: as leituras dos comandos somente leitura vão para ela (ver roteamento_leitura.py)
+DATABASE_URL_LEITURA = os.getenv("DATABASE_URL_LEITURA") or None
+
+
+def _opcoes_engine(url: str) -> dict:
+    """
+    Opções de pool do engine, ajustáveis por variáveis de ambiente:
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE e DB_POOL_PRE_PING.
+    """
+    if url.startswith("sqlite"):
+        opcoes = {"connect_args": {"check_same_thread": False}}
+        if ":memory:" in url or url.rstrip("/") == "sqlite:":
+            return opcoes # Banco em memória: o SQLAlchemy escolhe um pool próprio
+        # Limitado mesmo no SQLite: cada conexão reserva o seu próprio cache de páginas (sqlite.cache_size_kib).
+        # O EscopoInteracao não deixa as interações pedirem mais conexões do que o pool tem (ver conexoes_maximas).
+        padrao = {"pool_size": 5, "max_overflow": 5, "pool_timeout": 30, "pool_recycle": -1, "pool_pre_ping": False}
+    else:
+        # Postgres e afins: a conexão pode cair (failover, timeout do servidor ou de um proxy);
+        # o pre-ping a testa na retirada do pool e o recycle a renova antes desses limites
+        opcoes = {}
+        padrao = {"pool_size": 10, "max_overflow": 20, "pool_timeout": 30, "pool_recycle": 1800, "pool_pre_ping": True}
+    opcoes.update(
+        pool_size=int(os.getenv("DB_POOL_SIZE", padrao["pool_size"])),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", padrao["max_overflow"])),
+        pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", padrao["pool_timeout"])),
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE", padrao["pool_recycle"])),
+        pool_pre_ping=os.getenv("DB_POOL_PRE_PING", str(padrao["pool_pre_ping"])).lower() in ("1", "true", "sim"),
+    )
+    return opcoes
+
+
+def conexoes_maximas(opcoes: dict) -> Optional[int]:
+    """Conexões que o pool abre no máximo (pool_size + max_overflow), ou None se não houver limite."""
+    if "pool_size" not in opcoes or opcoes["max_overflow"] < 0:
+        return None
+    return opcoes["pool_size"] + opcoes["max_overflow"]
+
 
 # Configuração do SQLAlchemy
 # echo=True para logar queries SQL (útil para debug)
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}, echo=False)
+_opcoes_engine_principal = _opcoes_engine(DATABASE_URL)
+engine = create_engine(DATABASE_URL, echo=False, **_opcoes_engine_principal)
+CONEXOES_MAXIMAS = conexoes_maximas(_opcoes_engine_principal)
+engine_leitura = create_engine(DATABASE_URL_LEITURA, echo=False, **_opcoes_engine(DATABASE_URL_LEITURA)) if DATABASE_URL_LEITURA else None
+
+# Cria uma fábrica de sessões (leituras somente leitura vão para engine_leitura, se configurado)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=SessaoRoteada, engine_leitura=engine_leitura)
 
-# Cria uma fábrica de sessões
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Sessão escopada por interação (ver persistencia/unidade_trabalho.py).
+# Os repositórios recebem este registro e cada interação enxerga a sua própria Session.
+SessaoEscopada = scoped_session(SessionLocal, scopefunc=chave_escopo_atual)
 
 def criar_tabelas():
     """Cria todas as tabelas no banco de dados definidas nos modelos."""
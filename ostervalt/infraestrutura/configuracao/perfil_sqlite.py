@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+import asyncio
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Valores aceitos por PRAGMA: os pragmas não aceitam parâmetros, então o texto é validado aqui
+JOURNAL_MODES = ("delete", "truncate", "persist", "memory", "wal", "off")
+SYNCHRONOUS = ("off", "normal", "full", "extra")
+TEMP_STORES = ("default", "file", "memory")
+MODOS_CHECKPOINT = ("passive", "full", "restart", "truncate")
+
+
+@dataclass(frozen=True)
+class PerfilSQLite:
+    """
+    PRAGMAs aplicados a cada conexão nova do SQLite (seção `sqlite` do config.yaml).
+
+    O padrão é o perfil de produção: WAL (leitores não bloqueiam o escritor),
+    synchronous=NORMAL (seguro em WAL; o fsync acontece nos checkpoints),
+    mmap e cache de páginas maiores, espera de até 5 s por um lock e tabelas
+    temporárias em memória.
+    """
+    journal_mode: str = "wal"
+    synchronous: str = "normal"
+    mmap_size: int = 268_435_456 # 256 MiB
+    cache_size: int = -65_536 # Negativo = KiB: 64 MiB por conexão
+    busy_timeout_ms: int = 5000
+    temp_store: str = "memory"
+
+    def __post_init__(self):
+        for nome, aceitos in (("journal_mode", JOURNAL_MODES), ("synchronous", SYNCHRONOUS), ("temp_store", TEMP_STORES)):
+            valor = str(getattr(self, nome)).lower()
+            if valor not in aceitos:
+                raise ValueError(f"sqlite.{nome} inválido: '{valor}'. Use um de: {', '.join(aceitos)}.")
+            object.__setattr__(self, nome, valor)
+        for nome in ("mmap_size", "cache_size", "busy_timeout_ms"):
+            object.__setattr__(self, nome, int(getattr(self, nome)))
+
+    @classmethod
+    def de_configuracao(cls, secao: Optional[Dict[str, Any]]) -> "PerfilSQLite":
+        """Cria o perfil a partir da seção `sqlite` do config.yaml; chaves ausentes usam o padrão."""
+        nomes = {campo.name for campo in fields(cls)}
+        return cls(**{chave: valor for chave, valor in (secao or {}).items() if chave in nomes})
+
+    def pragmas(self) -> Dict[str, Any]:
+        """PRAGMAs na ordem em que são executados."""
+        return {
+            "busy_timeout": self.busy_timeout_ms, # Primeiro: mudar o journal_mode pode esperar por um lock
+            "journal_mode": self.journal_mode,
+            "synchronous": self.synchronous,
+            "mmap_size": self.mmap_size,
+            "cache_size": self.cache_size,
+            "temp_store": self.temp_store,
+        }
+
+
+def aplicar_perfil_sqlite(engine: Engine, perfil: PerfilSQLite) -> bool:
+    """
+    Registra o perfil no evento `connect` do engine, para que toda conexão nova o receba,
+    e descarta as conexões já abertas no pool. Chamadas seguintes só trocam o perfil.
+    Retorna False (sem fazer nada) se o engine não for SQLite.
+    """
+    if engine.dialect.name != "sqlite":
+        return False
+
+    if getattr(engine, "_ostervalt_perfil_sqlite", None) is None:
+        @event.listens_for(engine, "connect")
+        def _aplicar_pragmas(conexao_dbapi, registro_conexao):
+            cursor = conexao_dbapi.cursor()
+            try:
+                for nome, valor in engine._ostervalt_perfil_sqlite.pragmas().items():
+                    cursor.execute(f"PRAGMA {nome} = {valor}")
+            finally:
+                cursor.close()
+
+    engine._ostervalt_perfil_sqlite = perfil
+    if engine.url.database not in (None, "", ":memory:"): # Descartar a conexão de um banco em memória apagaria os dados
+        engine.dispose() # As conexões abertas antes (ex: criar_tabelas) não têm o perfil
+    print(f"Perfil SQLite aplicado: {', '.join(f'{nome}={valor}' for nome, valor in perfil.pragmas().items())}")
+    return True
+
+
+def manutencao_sqlite(engine: Engine, modo_checkpoint: str = "passive") -> Dict[str, Any]:
+    """
+    Executa um checkpoint do WAL e `PRAGMA optimize`. Síncrona: rode no executor de banco.
+    Retorna o resultado do checkpoint (ocupado, páginas no WAL, páginas copiadas para o banco).
+    """
+    modo_checkpoint = modo_checkpoint.lower()
+    if modo_checkpoint not in MODOS_CHECKPOINT:
+        raise ValueError(f"Modo de checkpoint inválido: '{modo_checkpoint}'. Use um de: {', '.join(MODOS_CHECKPOINT)}.")
+    with engine.connect() as conexao:
+        ocupado, paginas_wal, paginas_copiadas = conexao.exec_driver_sql(f"PRAGMA wal_checkpoint({modo_checkpoint.upper()})").one()
+        conexao.exec_driver_sql("PRAGMA optimize")
+    return {"ocupado": bool(ocupado), "paginas_wal": paginas_wal, "paginas_copiadas": paginas_copiadas}
+
+
+class TarefaManutencaoSQLite:
+    """
+    Tarefa periódica do bot que chama `manutencao_sqlite` no executor de banco,
+    a cada `intervalo_segundos`. Iniciada no setup_hook e parada no close do bot.
+    """
+    def __init__(self, engine: Engine, executor_banco, intervalo_segundos: float = 3600, modo_checkpoint: str = "passive"):
+        self.engine = engine
+        self.executor_banco = executor_banco
+        self.intervalo_segundos = intervalo_segundos
+        self.modo_checkpoint = modo_checkpoint
+        self._tarefa: Optional[asyncio.Task] = None
+
+    async def executar_agora(self) -> Dict[str, Any]:
+        resultado = await self.executor_banco.executar(manutencao_sqlite, self.engine, self.modo_checkpoint)
+        if resultado["ocupado"]:
+            print(f"Checkpoint do WAL incompleto (leitores ativos): {resultado}")
+        return resultado
+
+    def iniciar(self) -> None:
+        if self._tarefa is None:
+            self._tarefa = asyncio.create_task(self._laco(), name="ostervalt-manutencao-sqlite")
+
+    async def parar(self) -> None:
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            try:
+                await self._tarefa
+            except asyncio.CancelledError:
+                pass
+            self._tarefa = None
+
+    async def _laco(self) -> None:
+        while True:
+            await asyncio.sleep(self.intervalo_segundos)
+            try:
+                await self.executar_agora()
+            except Exception as e:
+                print(f"Erro na manutenção do SQLite: {e}")
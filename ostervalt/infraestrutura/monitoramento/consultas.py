@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from ostervalt.infraestrutura.monitoramento.metricas import medicao_atual, registrar_consulta
+
+TAMANHO_MAXIMO_LOG = 500 # Caracteres de SQL/parâmetros mostrados no log de consultas lentas
+
+
+def _resumir(valor: Any) -> str:
+    texto = valor if isinstance(valor, str) else repr(valor)
+    texto = " ".join(texto.split())
+    return texto if len(texto) <= TAMANHO_MAXIMO_LOG else texto[:TAMANHO_MAXIMO_LOG] + "..."
+
+
+def instrumentar_engine(engine: Engine, limite_consulta_lenta: Optional[float] = None) -> None:
+    """
+    Mede cada instrução SQL do engine: soma contagem e duração na interação em andamento
+    (ver metricas.MedicaoInteracao) e registra no log as que passarem de
+    `limite_consulta_lenta` segundos, com os parâmetros vinculados.
+    """
+    if getattr(engine, "_ostervalt_instrumentado", False):
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def antes(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("ostervalt_inicio_consultas", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def depois(conn, cursor, statement, parameters, context, executemany):
+        duracao = time.perf_counter() - conn.info["ostervalt_inicio_consultas"].pop()
+        registrar_consulta(duracao)
+        if limite_consulta_lenta is not None and duracao >= limite_consulta_lenta:
+            medicao = medicao_atual()
+            origem = medicao.comando if medicao else "fora de interação"
+            print(f"🐢 Consulta lenta ({duracao * 1000:.1f} ms, {origem}): {_resumir(statement)} | parâmetros: {_resumir(parameters)}")
+
+    engine._ostervalt_instrumentado = True
+
+
+class OrcamentoConsultasExcedido(AssertionError):
+    """Um bloco executou mais instruções SQL do que o orçamento declarado."""
+    pass
+
+
+@dataclass
+class ContadorConsultas:
+    """Instruções SQL executadas dentro de um bloco contar_consultas."""
+    instrucoes: List[Tuple[str, Any]] = field(default_factory=list)
+
+    @property
+    def total(self) -> int:
+        return len(self.instrucoes)
+
+    def descrever(self) -> str:
+        return "\n".join(f"  {i}. {_resumir(sql)}" for i, (sql, _) in enumerate(self.instrucoes, start=1))
+
+
+@contextmanager
+def contar_consultas(engine: Engine) -> Iterator[ContadorConsultas]:
+    """Conta as instruções SQL executadas pelo engine durante o bloco."""
+    contador = ContadorConsultas()
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        contador.instrucoes.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", registrar)
+    try:
+        yield contador
+    finally:
+        event.remove(engine, "before_cursor_execute", registrar)
+
+
+@contextmanager
+def orcamento_consultas(engine: Engine, maximo: int, descricao: str = "bloco") -> Iterator[ContadorConsultas]:
+    """
+    Falha (OrcamentoConsultasExcedido) se o bloco executar mais de `maximo` instruções SQL.
+    Usado nos testes para transformar regressões N+1 em falhas.
+
+    Ex:
+        with orcamento_consultas(engine, 3, "/trabalhar"):
+            await cog.trabalhar.callback(cog, interaction, "Frodo")
+    """
+    with contar_consultas(engine) as contador:
+        yield contador
+    if contador.total > maximo:
+        raise OrcamentoConsultasExcedido(
+            f"{descricao} executou {contador.total} consultas SQL (orçamento: {maximo}):\n{contador.descrever()}"
+        )
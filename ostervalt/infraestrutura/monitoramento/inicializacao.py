@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+import importlib
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, Optional
+
+# Início da inicialização: o executar_bot importa este módulo antes de todos os outros
+INICIO_PROCESSO = time.perf_counter()
+
+# Módulos carregados pelo bot antes de conectar, na ordem em que são medidos.
+# As dependências vêm primeiro: o tempo de cada módulo da aplicação é só o que ele acrescenta.
+MODULOS_BOT = (
+    "yaml",
+    "sqlalchemy",
+    "sqlalchemy.orm",
+    "discord",
+    "discord.ext.commands",
+    "ostervalt.infraestrutura.configuracao.db",
+    "ostervalt.infraestrutura.configuracao.container",
+    "ostervalt.infraestrutura.bot_discord.definicao_bot",
+    "ostervalt.infraestrutura.bot_discord.carregador_cogs",
+    "ostervalt.infraestrutura.bot_discord.error_handler",
+    "ostervalt.infraestrutura.bot_discord.sincronizacao_comandos",
+    "ostervalt.infraestrutura.monitoramento.servidor_metricas",
+)
+
+
+class RelatorioInicializacao:
+    """
+    Tempos da inicialização do bot, para o relatório impresso no primeiro on_ready:
+
+    - importacoes: segundos gastos importando cada módulo de `importar` (incremental:
+      o que já estava em sys.modules não é contado de novo);
+    - etapas: duração de cada bloco `with relatorio.etapa(nome)` (container, setup_hook...);
+    - marcos: segundos desde o início do processo em que cada marco foi atingido pela
+      primeira vez (ex: 'setup_hook', 'pronto').
+    """
+    def __init__(self, inicio: Optional[float] = None):
+        self.inicio = INICIO_PROCESSO if inicio is None else inicio
+        self.importacoes: Dict[str, float] = {}
+        self.etapas: Dict[str, float] = {}
+        self.marcos: Dict[str, float] = {}
+
+    def importar(self, modulos: Iterable[str]) -> None:
+        """Importa os módulos na ordem dada, medindo cada um."""
+        for nome in modulos:
+            inicio = time.perf_counter()
+            importlib.import_module(nome)
+            self.importacoes[nome] = self.importacoes.get(nome, 0.0) + time.perf_counter() - inicio
+
+    @contextmanager
+    def etapa(self, nome: str) -> Iterator[None]:
+        """Mede a duração do bloco e marca o seu fim."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.etapas[nome] = self.etapas.get(nome, 0.0) + time.perf_counter() - inicio
+            self.marcar(nome)
+
+    def marcar(self, nome: str) -> bool:
+        """Registra o momento do marco; retorna False se ele já tinha sido atingido (ex: on_ready após reconexão)."""
+        if nome in self.marcos:
+            return False
+        self.marcos[nome] = time.perf_counter() - self.inicio
+        return True
+
+    def resumo(self) -> Dict[str, Dict[str, float]]:
+        return {
+            "importacoes_segundos": {nome: round(segundos, 4) for nome, segundos in self.importacoes.items()},
+            "etapas_segundos": {nome: round(segundos, 4) for nome, segundos in self.etapas.items()},
+            "marcos_segundos": {nome: round(segundos, 4) for nome, segundos in self.marcos.items()},
+        }
+
+    def formatar(self) -> str:
+        linhas = ["Relatório de inicialização:"]
+        if self.importacoes:
+            linhas.append(f"  Importações ({sum(self.importacoes.values()):.3f}s):")
+            for nome, segundos in sorted(self.importacoes.items(), key=lambda par: -par[1]):
+                linhas.append(f"    {segundos:8.3f}s  {nome}")
+        if self.etapas:
+            linhas.append("  Etapas:")
+            for nome, segundos in self.etapas.items():
+                linhas.append(f"    {segundos:8.3f}s  {nome}")
+        if self.marcos:
+            linhas.append("  Desde o início do processo:")
+            for nome, segundos in sorted(self.marcos.items(), key=lambda par: par[1]):
+                linhas.append(f"    {segundos:8.3f}s  {nome}")
+        return "\n".join(linhas)
+
+
+def importacoes_por_modulo(saida_importtime: str) -> Dict[str, float]:
+    """
+    Tempo cumulativo (segundos) de cada módulo na saída de `python -X importtime`
+    (stderr). Linhas que não são do importtime são ignoradas.
+    """
+    tempos: Dict[str, float] = {}
+    for linha in saida_importtime.splitlines():
+        if not linha.startswith("import time:"):
+            continue
+        partes = linha[len("import time:"):].split("|")
+        if len(partes) != 3 or not partes[1].strip().isdigit():
+            continue # Cabeçalho ("self [us] | cumulative | imported package")
+        tempos[partes[2].strip()] = int(partes[1]) / 1_000_000
+    return tempos
+
+
+# Relatório do processo do bot (preenchido pelo executar_bot)
+relatorio_inicializacao = RelatorioInicializacao()
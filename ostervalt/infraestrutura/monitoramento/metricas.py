@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+import bisect
+import functools
+import threading
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+
+# Limites dos baldes (segundos) dos histogramas de tempo, no estilo do cliente Prometheus
+BALDES_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BALDES_CONSULTAS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Métrica -> (baldes, descrição)
+METRICAS = {
+    "duracao_segundos": (BALDES_SEGUNDOS, "Duração total da interação"),
+    "latencia_resposta_segundos": (BALDES_SEGUNDOS, "Tempo até a primeira resposta ao Discord (defer ou mensagem)"),
+    "tempo_banco_segundos": (BALDES_SEGUNDOS, "Tempo aguardando o executor de banco de dados"),
+    "tempo_discord_segundos": (BALDES_SEGUNDOS, "Tempo em chamadas à API do Discord"),
+    "tempo_sql_segundos": (BALDES_SEGUNDOS, "Tempo de execução das instruções SQL"),
+    "consultas_sql": (BALDES_CONSULTAS, "Instruções SQL executadas"),
+}
+PREFIXO = "ostervalt_"
+
+
+class Histograma:
+    """Histograma de baldes fixos (contagens cumulativas ao exportar), seguro entre threads."""
+    def __init__(self, limites: Sequence[float]):
+        self.limites: Tuple[float, ...] = tuple(sorted(limites))
+        self._contagens: List[int] = [0] * (len(self.limites) + 1) # Último balde: +Inf
+        self._soma = 0.0
+        self._lock = threading.Lock()
+
+    def observar(self, valor: float) -> None:
+        indice = bisect.bisect_left(self.limites, valor)
+        with self._lock:
+            self._contagens[indice] += 1
+            self._soma += valor
+
+    @property
+    def total(self) -> int:
+        with self._lock:
+            return sum(self._contagens)
+
+    def instantaneo(self) -> Tuple[List[int], float]:
+        """Contagens por balde (não cumulativas) e soma dos valores observados."""
+        with self._lock:
+            return list(self._contagens), self._soma
+
+    def quantil(self, q: float) -> Optional[float]:
+        """
+        Estima o quantil q (0-1) interpolando dentro do balde, como o histogram_quantile
+        do Prometheus. Valores acima do último limite são reportados como o último limite.
+        """
+        contagens, _ = self.instantaneo()
+        total = sum(contagens)
+        if total == 0:
+            return None
+        alvo = q * total
+        acumulado = 0
+        for indice, contagem in enumerate(contagens):
+            if acumulado + contagem >= alvo and contagem > 0:
+                if indice == len(self.limites):
+                    return self.limites[-1]
+                inicio = self.limites[indice - 1] if indice > 0 else min(0.0, self.limites[0])
+                fim = self.limites[indice]
+                return inicio + (fim - inicio) * (alvo - acumulado) / contagem
+            acumulado += contagem
+        return self.limites[-1]
+
+
+@dataclass
+class MedicaoInteracao:
+    """Tempos acumulados de uma interação, preenchidos pelos ganchos de banco e do Discord."""
+    comando: str
+    inicio: float
+    tempo_banco: float = 0.0
+    tempo_discord: float = 0.0
+    tempo_sql: float = 0.0
+    consultas: int = 0
+    latencia_resposta: Optional[float] = None
+
+
+_medicao_atual: ContextVar[Optional[MedicaoInteracao]] = ContextVar("ostervalt_medicao_interacao", default=None)
+
+
+def medicao_atual() -> Optional[MedicaoInteracao]:
+    """Medição da interação em andamento, ou None fora de uma interação medida."""
+    return _medicao_atual.get()
+
+
+def registrar_tempo_banco(segundos: float) -> None:
+    medicao = _medicao_atual.get()
+    if medicao is not None:
+        medicao.tempo_banco += segundos
+
+
+def registrar_consulta(segundos: float = 0.0) -> None:
+    # Roda na thread do executor, que recebe uma cópia do contexto com a mesma medição
+    medicao = _medicao_atual.get()
+    if medicao is not None:
+        medicao.consultas += 1
+        medicao.tempo_sql += segundos
+
+
+def registrar_tempo_discord(segundos: float) -> None:
+    medicao = _medicao_atual.get()
+    if medicao is not None:
+        medicao.tempo_discord += segundos
+
+
+def registrar_resposta(timer: Callable[[], float] = time.perf_counter) -> None:
+    """Marca a primeira resposta da interação ao Discord (defer, mensagem ou edição)."""
+    medicao = _medicao_atual.get()
+    if medicao is not None and medicao.latencia_resposta is None:
+        medicao.latencia_resposta = timer() - medicao.inicio
+
+
+class RegistroMetricas:
+    """
+    Histogramas por comando das interações medidas pela ArvoreComandos.
+
+    Cada interação abre uma MedicaoInteracao (ContextVar); o executor de banco, o
+    contador de consultas do engine e o adaptador HTTP do Discord somam nela os seus
+    tempos, e ao fim da interação os totais viram observações nos histogramas.
+    """
+    def __init__(self, timer: Callable[[], float] = time.perf_counter):
+        self._timer = timer
+        self._histogramas: Dict[Tuple[str, str], Histograma] = {}
+        self._lock = threading.Lock()
+
+    def _histograma(self, metrica: str, comando: str) -> Histograma:
+        chave = (metrica, comando)
+        with self._lock:
+            histograma = self._histogramas.get(chave)
+            if histograma is None:
+                histograma = self._histogramas[chave] = Histograma(METRICAS[metrica][0])
+            return histograma
+
+    def observar(self, metrica: str, comando: str, valor: float) -> None:
+        self._histograma(metrica, comando).observar(valor)
+
+    @asynccontextmanager
+    async def medir(self, comando: str):
+        """Mede a interação do bloco e registra seus tempos ao final, mesmo em caso de erro."""
+        medicao = MedicaoInteracao(comando=comando, inicio=self._timer())
+        token = _medicao_atual.set(medicao)
+        try:
+            yield medicao
+        finally:
+            _medicao_atual.reset(token)
+            self.observar("duracao_segundos", comando, self._timer() - medicao.inicio)
+            self.observar("tempo_banco_segundos", comando, medicao.tempo_banco)
+            self.observar("tempo_discord_segundos", comando, medicao.tempo_discord)
+            self.observar("tempo_sql_segundos", comando, medicao.tempo_sql)
+            self.observar("consultas_sql", comando, medicao.consultas)
+            if medicao.latencia_resposta is not None:
+                self.observar("latencia_resposta_segundos", comando, medicao.latencia_resposta)
+
+    def comandos(self) -> List[str]:
+        with self._lock:
+            return sorted({comando for _, comando in self._histogramas})
+
+    def resumo(self) -> Dict[str, Dict[str, Dict[str, Optional[float]]]]:
+        """{comando: {métrica: {'total', 'p50', 'p99'}}} para o /metricas."""
+        with self._lock:
+            itens = list(self._histogramas.items())
+        resumo: Dict[str, Dict[str, Dict[str, Optional[float]]]] = {}
+        for (metrica, comando), histograma in itens:
+            resumo.setdefault(comando, {})[metrica] = {
+                "total": histograma.total,
+                "p50": histograma.quantil(0.50),
+                "p99": histograma.quantil(0.99),
+            }
+        return resumo
+
+    def formato_prometheus(self) -> str:
+        """Exporta os histogramas no formato de texto do Prometheus."""
+        with self._lock:
+            itens = sorted(self._histogramas.items())
+        linhas = []
+        for metrica, (_, descricao) in METRICAS.items():
+            nome = PREFIXO + metrica
+            linhas.append(f"# HELP {nome} {descricao}")
+            linhas.append(f"# TYPE {nome} histogram")
+            for (metrica_item, comando), histograma in itens:
+                if metrica_item != metrica:
+                    continue
+                rotulo = _escapar_rotulo(comando)
+                contagens, soma = histograma.instantaneo()
+                acumulado = 0
+                for limite, contagem in zip((*histograma.limites, "+Inf"), contagens):
+                    acumulado += contagem
+                    linhas.append(f'{nome}_bucket{{comando="{rotulo}",le="{limite}"}} {acumulado}')
+                linhas.append(f'{nome}_sum{{comando="{rotulo}"}} {soma}')
+                linhas.append(f'{nome}_count{{comando="{rotulo}"}} {acumulado}')
+        return "\n".join(linhas) + "\n"
+
+
+def _escapar_rotulo(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _medir_discord(funcao, marcar_resposta: bool = False):
+    @functools.wraps(funcao)
+    async def medida(*args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return await funcao(*args, **kwargs)
+        finally:
+            if marcar_resposta:
+                registrar_resposta()
+            else:
+                registrar_tempo_discord(time.perf_counter() - inicio)
+    medida._ostervalt_medida = True
+    return medida
+
+
+def instrumentar_discord(bot) -> None:
+    """
+    Mede o tempo gasto na API do Discord: as chamadas REST do bot (bot.http.request) e
+    as respostas de interação, que passam pelo adaptador de webhooks do discord.py.
+    """
+    # Importado aqui: o container importa este módulo e não deve carregar o discord.py
+    from discord.webhook.async_ import AsyncWebhookAdapter
+
+    if not getattr(bot.http.request, "_ostervalt_medida", False):
+        bot.http.request = _medir_discord(bot.http.request)
+    # O adaptador de webhooks é compartilhado pelo processo: instrumenta a classe uma única vez
+    if not getattr(AsyncWebhookAdapter.request, "_ostervalt_medida", False):
+        AsyncWebhookAdapter.request = _medir_discord(AsyncWebhookAdapter.request)
+        AsyncWebhookAdapter.create_interaction_response = _medir_discord(
+            AsyncWebhookAdapter.create_interaction_response, marcar_resposta=True
+        )
+
+
+def nome_interacao(interaction) -> str:
+    """Nome do comando da interação, com subcomandos; autocompletes recebem o prefixo 'autocomplete:'."""
+    dados = interaction.data or {}
+    partes = [dados.get("name") or "desconhecido"]
+    opcoes = dados.get("options") or []
+    while opcoes and opcoes[0].get("type") in (1, 2): # SUB_COMMAND, SUB_COMMAND_GROUP
+        partes.append(opcoes[0]["name"])
+        opcoes = opcoes[0].get("options") or []
+    nome = " ".join(partes)
+    if interaction.type.value == 4: # InteractionType.autocomplete
+        return f"autocomplete:{nome}"
+    return nome
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+from aiohttp import web
+
+from ostervalt.infraestrutura.monitoramento.metricas import RegistroMetricas
+
+CONTENT_TYPE_PROMETHEUS = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def criar_app_metricas(registro: RegistroMetricas) -> web.Application:
+    """Aplicação HTTP com GET /metrics no formato de texto do Prometheus."""
+    async def metrics(request: web.Request) -> web.Response:
+        return web.Response(body=registro.formato_prometheus().encode("utf-8"), headers={"Content-Type": CONTENT_TYPE_PROMETHEUS})
+
+    app = web.Application()
+    app.router.add_get("/metrics", metrics)
+    return app
+
+
+async def iniciar_servidor_metricas(registro: RegistroMetricas, host: str = "127.0.0.1", porta: int = 9108) -> web.AppRunner:
+    """
+    Sobe o endpoint de métricas no event loop do bot (aiohttp já é dependência do discord.py).
+    Retorna o runner, que deve ser encerrado com `await runner.cleanup()`.
+    """
+    runner = web.AppRunner(criar_app_metricas(registro))
+    await runner.setup()
+    await web.TCPSite(runner, host, porta).start()
+    print(f"Endpoint de métricas disponível em http://{host}:{porta}/metrics")
+    return runner
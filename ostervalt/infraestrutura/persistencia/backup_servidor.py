@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+import datetime
+import gzip
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from ostervalt.infraestrutura.persistencia.buffer_escrita import BufferEscrita
+from ostervalt.infraestrutura.persistencia.cache_configuracao_servidor import CacheConfiguracaoServidor
+from ostervalt.infraestrutura.persistencia.indice_nomes_personagens import IndiceNomesPersonagens
+from ostervalt.infraestrutura.persistencia.roteamento_leitura import leitura_replica
+from ostervalt.infraestrutura.persistencia.tabela_cooldowns import TabelaCooldowns
+from ostervalt.infraestrutura.persistencia.models import (
+    ConfiguracaoServidorModel,
+    EstoqueLojaItemModel,
+    ItemInventarioModel,
+    PersonagemModel,
+    StatusPersonagem,
+)
+
+VERSAO_FORMATO = 1
+TAMANHO_LOTE_PADRAO = 1000
+
+# Ordem dos registros no arquivo: o importador precisa dos personagens antes dos inventários
+TIPOS_REGISTRO = ("configuracao", "estoque", "personagem", "inventario")
+
+
+class BackupInvalidoError(Exception):
+    """O arquivo de backup está corrompido ou em um formato desconhecido."""
+    pass
+
+
+@dataclass
+class ResumoBackup:
+    """Resultado de uma exportação ou importação."""
+    servidor_id: int
+    caminho: str
+    contagens: Dict[str, int] = field(default_factory=lambda: {tipo: 0 for tipo in TIPOS_REGISTRO})
+    tamanho_comprimido: int = 0
+
+
+def _data_iso(valor: Optional[datetime.datetime]) -> Optional[str]:
+    return valor.isoformat() if valor else None
+
+
+def _data(valor: Optional[str]) -> Optional[datetime.datetime]:
+    return datetime.datetime.fromisoformat(valor) if valor else None
+
+
+class BackupServidor:
+    """
+    Exporta e importa os dados de um servidor como NDJSON comprimido com gzip.
+
+    Cada linha do arquivo é um registro {"tipo": ..., "dados": {...}}, precedido por um
+    cabeçalho com a versão do formato. A exportação lê o banco em lotes (yield_per) e
+    escreve linha a linha; a importação lê o arquivo linha a linha e insere em lotes.
+    Assim o consumo de memória não depende do tamanho do servidor, apenas do tamanho do lote
+    (e, na importação, do mapa de IDs antigos para novos dos personagens).
+    """
+    def __init__(
+        self,
+        session: Session,
+        cache_config: Optional[CacheConfiguracaoServidor] = None,
+        indice_nomes: Optional[IndiceNomesPersonagens] = None,
+        tamanho_lote: int = TAMANHO_LOTE_PADRAO,
+        buffer_escrita: Optional[BufferEscrita] = None,
+        tabela_cooldowns: Optional[TabelaCooldowns] = None,
+    ):
+        self.session = session
+        self.cache_config = cache_config
+        self.indice_nomes = indice_nomes
+        self.tamanho_lote = tamanho_lote
+        # Escritas de personagens ainda no buffer são gravadas antes de exportar ou importar
+        self.buffer_escrita = buffer_escrita
+        self.tabela_cooldowns = tabela_cooldowns
+
+    # --- Exportação ---
+
+    def exportar(self, servidor_id: int, caminho: str) -> ResumoBackup:
+        """
+        Grava o backup do servidor em `caminho` (.ndjson.gz) e retorna as contagens e o tamanho final.
+        Com uma réplica de leitura configurada, os dados são lidos dela (e refletem o seu atraso).
+        """
+        if self.buffer_escrita is not None:
+            self.buffer_escrita.descarregar()
+        resumo = ResumoBackup(servidor_id=servidor_id, caminho=caminho)
+        try:
+            with leitura_replica(), gzip.open(caminho, "wt", encoding="utf-8") as arquivo:
+                cabecalho = {
+                    "versao": VERSAO_FORMATO,
+                    "servidor_id": servidor_id,
+                    "timestamp": datetime.datetime.now().isoformat(),
+                }
+                arquivo.write(json.dumps({"tipo": "cabecalho", "dados": cabecalho}, ensure_ascii=False) + "\n")
+                for tipo, dados in self._registros(servidor_id):
+                    arquivo.write(json.dumps({"tipo": tipo, "dados": dados}, ensure_ascii=False) + "\n")
+                    resumo.contagens[tipo] += 1
+        finally:
+            self.session.rollback() # Encerra a transação de leitura
+        resumo.tamanho_comprimido = os.path.getsize(caminho)
+        return resumo
+
+    def _linhas(self, consulta) -> Iterator:
+        """Executa a consulta trazendo as linhas em lotes, sem carregá-las todas na memória."""
+        return self.session.execute(consulta.execution_options(yield_per=self.tamanho_lote))
+
+    def _registros(self, servidor_id: int) -> Iterator[tuple]:
+        configuracoes = select(ConfiguracaoServidorModel.chave, ConfiguracaoServidorModel.valor).where(
+            ConfiguracaoServidorModel.servidor_id == servidor_id
+        ).order_by(ConfiguracaoServidorModel.id)
+        for linha in self._linhas(configuracoes):
+            yield "configuracao", {"chave": linha.chave, "valor": linha.valor}
+
+        estoque = select(
+            EstoqueLojaItemModel.item_id, EstoqueLojaItemModel.quantidade, EstoqueLojaItemModel.preco_especifico
+        ).where(EstoqueLojaItemModel.servidor_id == servidor_id).order_by(EstoqueLojaItemModel.id)
+        for linha in self._linhas(estoque):
+            yield "estoque", {"item_id": linha.item_id, "quantidade": linha.quantidade, "preco": linha.preco_especifico}
+
+        personagens = select(
+            PersonagemModel.id, PersonagemModel.nome, PersonagemModel.usuario_id, PersonagemModel.marcos,
+            PersonagemModel.dinheiro, PersonagemModel.nivel, PersonagemModel.ultimo_trabalho,
+            PersonagemModel.ultimo_crime, PersonagemModel.status,
+        ).where(PersonagemModel.servidor_id == servidor_id).order_by(PersonagemModel.id)
+        for linha in self._linhas(personagens):
+            yield "personagem", {
+                "id": linha.id,
+                "nome": linha.nome,
+                "usuario_id": linha.usuario_id,
+                "marcos": linha.marcos,
+                "dinheiro": linha.dinheiro,
+                "nivel": linha.nivel,
+                "ultimo_trabalho": _data_iso(linha.ultimo_trabalho),
+                "ultimo_crime": _data_iso(linha.ultimo_crime),
+                "status": linha.status.value if linha.status else None,
+            }
+
+        inventarios = select(
+            ItemInventarioModel.personagem_id, ItemInventarioModel.item_id, ItemInventarioModel.quantidade
+        ).join(PersonagemModel, PersonagemModel.id == ItemInventarioModel.personagem_id).where(
+            PersonagemModel.servidor_id == servidor_id
+        ).order_by(ItemInventarioModel.personagem_id, ItemInventarioModel.id)
+        for linha in self._linhas(inventarios):
+            yield "inventario", {"personagem_id": linha.personagem_id, "item_id": linha.item_id, "quantidade": linha.quantidade}
+
+    # --- Importação ---
+
+    def importar(self, servidor_id: int, caminho: str) -> ResumoBackup:
+        """
+        Substitui os dados do servidor pelos do backup em `caminho`, em uma única transação.
+        O backup pode ter sido gerado em outro servidor: os registros são gravados em
+        `servidor_id` e os personagens recebem novos IDs.
+
+        Raises:
+            BackupInvalidoError: Se o arquivo não for um backup válido (nada é alterado).
+        """
+        if self.buffer_escrita is not None:
+            self.buffer_escrita.descarregar()
+        resumo = ResumoBackup(servidor_id=servidor_id, caminho=caminho, tamanho_comprimido=os.path.getsize(caminho))
+        novos_ids: Dict[int, int] = {} # ID do personagem no backup -> ID gravado
+        lotes: Dict[str, List[dict]] = {tipo: [] for tipo in TIPOS_REGISTRO}
+        try:
+            self._limpar_servidor(servidor_id)
+            for tipo, dados in self._ler_registros(caminho):
+                if tipo == "inventario" and lotes["personagem"]:
+                    # Grava os personagens pendentes antes: o inventário precisa dos novos IDs
+                    self._inserir_lote("personagem", lotes["personagem"], novos_ids)
+                    lotes["personagem"] = []
+                try:
+                    lotes[tipo].append(self._linha_importacao(servidor_id, tipo, dados))
+                except (KeyError, TypeError, ValueError) as e:
+                    raise BackupInvalidoError(f"Registro de {tipo} inválido: {e}") from e
+                resumo.contagens[tipo] += 1
+                if len(lotes[tipo]) >= self.tamanho_lote:
+                    self._inserir_lote(tipo, lotes[tipo], novos_ids)
+                    lotes[tipo] = []
+            for tipo in TIPOS_REGISTRO:
+                if lotes[tipo]:
+                    self._inserir_lote(tipo, lotes[tipo], novos_ids)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        finally:
+            self._invalidar_caches(servidor_id)
+        return resumo
+
+    def _ler_registros(self, caminho: str) -> Iterator[tuple]:
+        try:
+            with gzip.open(caminho, "rt", encoding="utf-8") as arquivo:
+                cabecalho = json.loads(arquivo.readline() or "null")
+                if not isinstance(cabecalho, dict) or cabecalho.get("tipo") != "cabecalho":
+                    raise BackupInvalidoError("Arquivo sem cabeçalho de backup.")
+                versao = cabecalho.get("dados", {}).get("versao")
+                if versao != VERSAO_FORMATO:
+                    raise BackupInvalidoError(f"Versão de backup não suportada: {versao}.")
+                for numero, linha in enumerate(arquivo, start=2):
+                    if not linha.strip():
+                        continue
+                    registro = json.loads(linha)
+                    if registro.get("tipo") not in TIPOS_REGISTRO:
+                        raise BackupInvalidoError(f"Tipo de registro desconhecido na linha {numero}: {registro.get('tipo')}")
+                    yield registro["tipo"], registro["dados"]
+        except (OSError, EOFError, UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise BackupInvalidoError(f"Não foi possível ler o backup: {e}") from e
+
+    def _linha_importacao(self, servidor_id: int, tipo: str, dados: dict) -> dict:
+        if tipo == "configuracao":
+            return {"servidor_id": servidor_id, "chave": dados["chave"], "valor": dados["valor"]}
+        if tipo == "estoque":
+            return {"servidor_id": servidor_id, "item_id": dados["item_id"], "quantidade": dados["quantidade"], "preco_especifico": dados.get("preco")}
+        if tipo == "personagem":
+            return {
+                "id_backup": dados["id"],
+                "nome": dados["nome"],
+                "usuario_id": dados["usuario_id"],
+                "servidor_id": servidor_id,
+                "marcos": dados.get("marcos", 0),
+                "dinheiro": dados.get("dinheiro", 0),
+                "nivel": dados.get("nivel", 1),
+                "ultimo_trabalho": _data(dados.get("ultimo_trabalho")),
+                "ultimo_crime": _data(dados.get("ultimo_crime")),
+                "status": StatusPersonagem(dados.get("status") or StatusPersonagem.ATIVO.value),
+            }
+        return {"personagem_id": dados["personagem_id"], "item_id": dados["item_id"], "quantidade": dados["quantidade"]}
+
+    def _inserir_lote(self, tipo: str, lote: List[dict], novos_ids: Dict[int, int]) -> None:
+        if tipo == "configuracao":
+            self.session.execute(insert(ConfiguracaoServidorModel), lote)
+        elif tipo == "estoque":
+            self.session.execute(insert(EstoqueLojaItemModel), lote)
+        elif tipo == "personagem":
+            ids_backup = [linha.pop("id_backup") for linha in lote]
+            for id_backup, id_novo in zip(ids_backup, self._inserir_personagens(lote)):
+                novos_ids[id_backup] = id_novo
+        else:
+            for linha in lote:
+                if linha["personagem_id"] not in novos_ids:
+                    raise BackupInvalidoError(f"Inventário referencia personagem inexistente no backup: {linha['personagem_id']}")
+                linha["personagem_id"] = novos_ids[linha["personagem_id"]]
+            self.session.execute(insert(ItemInventarioModel), lote)
+
+    def _inserir_personagens(self, lote: List[dict]) -> List[int]:
+        """Insere um lote de personagens e retorna os IDs gerados, na ordem do lote."""
+        if self.session.get_bind().dialect.insert_executemany_returning_sort_by_parameter_order:
+            resultado = self.session.execute(
+                insert(PersonagemModel).returning(PersonagemModel.id, sort_by_parameter_order=True), lote
+            )
+            return list(resultado.scalars())
+        return [self.session.execute(insert(PersonagemModel).values(linha)).inserted_primary_key[0] for linha in lote]
+
+    def _limpar_servidor(self, servidor_id: int) -> None:
+        ids_personagens = select(PersonagemModel.id).where(PersonagemModel.servidor_id == servidor_id)
+        self.session.execute(delete(ItemInventarioModel).where(ItemInventarioModel.personagem_id.in_(ids_personagens)))
+        self.session.execute(delete(PersonagemModel).where(PersonagemModel.servidor_id == servidor_id))
+        self.session.execute(delete(EstoqueLojaItemModel).where(EstoqueLojaItemModel.servidor_id == servidor_id))
+        self.session.execute(delete(ConfiguracaoServidorModel).where(ConfiguracaoServidorModel.servidor_id == servidor_id))
+
+    def _invalidar_caches(self, servidor_id: int) -> None:
+        if self.cache_config is not None:
+            self.cache_config.invalidar(servidor_id)
+        if self.indice_nomes is not None:
+            self.indice_nomes.invalidar_servidor(servidor_id)
+        if self.tabela_cooldowns is not None:
+            self.tabela_cooldowns.limpar() # Os IDs dos personagens removidos podem ser reutilizados pelos importados
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+# Operação de escrita: recebe a sessão do lote, executa suas instruções (sem commit) e devolve o resultado
+Operacao = Callable[[Session], Any]
+
+
+class BufferEscritaEncerradoError(RuntimeError):
+    """O buffer de escrita foi encerrado e não aceita novas operações."""
+    pass
+
+
+class BufferEscrita:
+    """
+    Agrupa as escritas de várias interações em uma única transação (group commit).
+
+    Após a primeira operação pendente, a thread de escrita espera até `janela_segundos`
+    (ou até juntar `tamanho_maximo_lote` operações), executa o lote em uma sessão própria
+    e faz um único commit: o fsync passa a ser dividido entre todas as operações do lote.
+
+    O resultado de cada operação só é entregue depois do commit do lote que a contém,
+    então quem escreve sempre lê a própria escrita em seguida. Se o lote falhar, as
+    operações são refeitas uma a uma, cada uma em sua transação, e só a que falhou
+    recebe a exceção.
+
+    No bot, o repositório usa `enfileirar` e o event loop aguarda o Future (ver
+    ResultadoPendente e ProxyAssincrono): nenhuma thread do executor fica parada
+    esperando o commit, e o tamanho do lote é limitado pelas interações simultâneas,
+    não pelo número de workers. `executar` bloqueia a thread chamadora (scripts e testes).
+
+    A thread de escrita usa uma conexão própria, concorrente com as sessões das
+    interações (inventário, itens, estoque...): no SQLite, requer o perfil com
+    journal_mode=wal e busy_timeout_ms > 0 (ver configurar_container).
+    """
+    def __init__(
+        self,
+        fabrica_sessao: Callable[[], Session],
+        janela_segundos: float = 0.005,
+        tamanho_maximo_lote: int = 200,
+    ):
+        self.fabrica_sessao = fabrica_sessao
+        self.janela_segundos = janela_segundos
+        self.tamanho_maximo_lote = tamanho_maximo_lote
+        self._pendentes: List[Tuple[Optional[Operacao], Future]] = []
+        self._condicao = threading.Condition()
+        self._urgente = False # Um descarregar() pediu a gravação sem esperar a janela
+        self._encerrado = False
+        # Estatísticas (lidas pelos testes e pelo benchmark)
+        self.lotes = 0
+        self.operacoes = 0
+        self._thread = threading.Thread(target=self._laco, name="ostervalt-escrita", daemon=True)
+        self._thread.start()
+
+    def enfileirar(self, operacao: Operacao) -> Future:
+        """Agenda a operação para o próximo lote e devolve o Future do seu resultado."""
+        futuro: Future = Future()
+        with self._condicao:
+            if self._encerrado:
+                raise BufferEscritaEncerradoError("O buffer de escrita foi encerrado.")
+            self._pendentes.append((operacao, futuro))
+            self._condicao.notify_all()
+        return futuro
+
+    def executar(self, operacao: Operacao) -> Any:
+        """Executa a operação no próximo lote e aguarda o commit (bloqueia a thread chamadora)."""
+        return self.enfileirar(operacao).result()
+
+    def descarregar(self) -> None:
+        """Grava agora, sem esperar a janela, tudo o que foi enfileirado até aqui e aguarda o commit."""
+        futuro: Future = Future()
+        with self._condicao:
+            if self._encerrado and not self._thread.is_alive():
+                return
+            self._pendentes.append((None, futuro)) # Marcador: resolvido quando o lote que o contém termina
+            self._urgente = True
+            self._condicao.notify_all()
+        futuro.result()
+
+    def encerrar(self) -> None:
+        """Recusa novas operações, grava as pendentes e encerra a thread de escrita."""
+        with self._condicao:
+            self._encerrado = True
+            self._condicao.notify_all()
+        self._thread.join()
+
+    # --- Thread de escrita ---
+
+    def _laco(self) -> None:
+        while True:
+            with self._condicao:
+                while not self._pendentes and not self._encerrado:
+                    self._condicao.wait()
+                if not self._pendentes:
+                    return # Encerrado e sem nada pendente
+                limite = time.monotonic() + self.janela_segundos
+                while len(self._pendentes) < self.tamanho_maximo_lote and not (self._urgente or self._encerrado):
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        break
+                    self._condicao.wait(restante)
+                lote = self._pendentes[:self.tamanho_maximo_lote]
+                del self._pendentes[:self.tamanho_maximo_lote]
+                if not self._pendentes:
+                    self._urgente = False
+            self._gravar_lote(lote)
+
+    def _gravar_lote(self, lote: List[Tuple[Optional[Operacao], Future]]) -> None:
+        operacoes = [(operacao, futuro) for operacao, futuro in lote if operacao is not None]
+        if operacoes:
+            try:
+                resultados = self._executar_transacao([operacao for operacao, _ in operacoes])
+            except Exception as e:
+                print(f"Lote de {len(operacoes)} escritas falhou ({e}); refazendo uma a uma.")
+                for operacao, futuro in operacoes:
+                    try:
+                        futuro.set_result(self._executar_transacao([operacao])[0])
+                    except Exception as erro:
+                        futuro.set_exception(erro)
+            else:
+                for (_, futuro), resultado in zip(operacoes, resultados):
+                    futuro.set_result(resultado)
+            self.lotes += 1
+            self.operacoes += len(operacoes)
+        for operacao, futuro in lote:
+            if operacao is None:
+                futuro.set_result(None)
+
+    def _executar_transacao(self, operacoes: List[Operacao]) -> List[Any]:
+        sessao = self.fabrica_sessao()
+        try:
+            resultados = [operacao(sessao) for operacao in operacoes]
+            sessao.commit()
+            return resultados
+        except Exception:
+            sessao.rollback()
+            raise
+        finally:
+            sessao.close()
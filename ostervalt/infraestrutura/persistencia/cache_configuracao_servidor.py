@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+import copy
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import cached_property
+from types import MappingProxyType
+from typing import Any, Callable, Dict, FrozenSet, List, Mapping, Optional, Tuple
+
+from cachetools import LRUCache, TTLCache
+
+from ostervalt.nucleo.utilitarios import ModeloProgressao, compilar_progressao
+
+
+@dataclass(frozen=True)
+class ConfiguracaoServidorSnapshot:
+    """
+    Retrato imutável e já desserializado das configurações de um servidor.
+
+    Os valores são lidos do banco uma única vez (json.loads por linha) e expostos
+    por acessores tipados com os mesmos padrões usados pelos Cogs.
+    Os acessores retornam cópias, para que o chamador possa alterá-las sem afetar o cache.
+    """
+    servidor_id: int
+    valores: Mapping[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self):
+        object.__setattr__(self, 'valores', MappingProxyType(dict(self.valores)))
+
+    def obter(self, chave: str, default: Optional[Any] = None) -> Any:
+        """Retorna uma cópia do valor da chave, ou o default se ausente."""
+        if chave not in self.valores:
+            return default
+        return copy.deepcopy(self.valores[chave])
+
+    def como_dict(self) -> Dict[str, Any]:
+        """Retorna todas as configurações como um dicionário independente do snapshot."""
+        return copy.deepcopy(dict(self.valores))
+
+    def _limite(self, nome: str, default: int) -> int:
+        limites = self.valores.get('limites')
+        if isinstance(limites, dict) and nome in limites:
+            return int(limites[nome])
+        return default
+
+    @property
+    def intervalo_trabalhar(self) -> int:
+        """Intervalo mínimo entre trabalhos, em segundos (padrão 1h)."""
+        return self._limite('intervalo_trabalhar', 3600)
+
+    @property
+    def intervalo_crime(self) -> int:
+        """Intervalo mínimo entre crimes, em segundos (padrão 1h)."""
+        return self._limite('intervalo_crime', 3600)
+
+    @property
+    def tiers(self) -> Dict[str, Dict[str, Any]]:
+        """Tiers de recompensa configurados (nome -> nivel_min/nivel_max/recompensa)."""
+        tiers = self.obter('tiers', {})
+        return tiers if isinstance(tiers, dict) else {}
+
+    @cached_property
+    def progressao(self) -> ModeloProgressao:
+        """
+        Tiers e progressao.marcos_por_nivel compilados em tabelas por nível.
+        Montado uma vez por snapshot: uma nova configuração gera um novo snapshot.
+        """
+        progressao = self.valores.get('progressao')
+        marcos_por_nivel = progressao.get('marcos_por_nivel') if isinstance(progressao, dict) else None
+        try:
+            return compilar_progressao(self.tiers, marcos_por_nivel)
+        except (AttributeError, TypeError, ValueError) as e:
+            print(f"Progressão inválida no servidor {self.servidor_id} ({e}); usando marcos_por_nivel padrão.")
+            return compilar_progressao(self.tiers)
+
+    def mensagens(self, tipo: str, default: Optional[List[str]] = None) -> List[str]:
+        """Mensagens configuradas para uma ação (ex: 'trabalho', 'crime')."""
+        mensagens = self.valores.get('messages')
+        if isinstance(mensagens, dict) and mensagens.get(tipo):
+            return list(mensagens[tipo])
+        return list(default or [])
+
+    def cargos_ids(self, tipo_permissao: str) -> FrozenSet[int]:
+        """IDs dos cargos autorizados para um tipo de permissão (chave 'cargos_{tipo}_ids')."""
+        cargos = self.valores.get(f"cargos_{tipo_permissao}_ids") or []
+        return frozenset(int(cargo_id) for cargo_id in cargos)
+
+
+class CacheConfiguracaoServidor:
+    """
+    Cache em memória de ConfiguracaoServidorSnapshot por servidor_id.
+
+    Tem tamanho máximo (LRU) e TTL opcional, e conta acertos e falhas.
+    Cada invalidação incrementa a geração do servidor: um snapshot lido do banco
+    antes de uma escrita concorrente não é armazenado depois dela.
+    É acessado pelas threads do executor de banco, por isso todas as operações usam lock.
+    """
+    def __init__(
+        self,
+        tamanho_maximo: int = 1024,
+        ttl_segundos: Optional[float] = None,
+        timer: Callable[[], float] = time.monotonic,
+    ):
+        if ttl_segundos:
+            self._cache = TTLCache(maxsize=tamanho_maximo, ttl=ttl_segundos, timer=timer)
+        else:
+            self._cache = LRUCache(maxsize=tamanho_maximo)
+        self._geracoes: Dict[int, int] = {}
+        self._geracao_global = 0
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    def obter(self, servidor_id: int) -> Optional[ConfiguracaoServidorSnapshot]:
+        """Retorna o snapshot em cache do servidor, contabilizando acerto ou falha."""
+        with self._lock:
+            snapshot = self._cache.get(servidor_id)
+            if snapshot is None:
+                self.falhas += 1
+            else:
+                self.acertos += 1
+            return snapshot
+
+    def geracao(self, servidor_id: int) -> Tuple[int, int]:
+        """Geração atual do servidor; deve ser lida antes de consultar o banco."""
+        with self._lock:
+            return self._geracao_atual(servidor_id)
+
+    def _geracao_atual(self, servidor_id: int) -> Tuple[int, int]:
+        return (self._geracao_global, self._geracoes.get(servidor_id, 0))
+
+    def armazenar(self, snapshot: ConfiguracaoServidorSnapshot, geracao: Tuple[int, int]) -> None:
+        """Armazena o snapshot, a menos que o servidor tenha sido invalidado desde a leitura."""
+        with self._lock:
+            if self._geracao_atual(snapshot.servidor_id) == geracao:
+                self._cache[snapshot.servidor_id] = snapshot
+
+    def invalidar(self, servidor_id: Optional[int] = None) -> None:
+        """Descarta o snapshot de um servidor, ou de todos se servidor_id for None."""
+        with self._lock:
+            if servidor_id is None:
+                self._cache.clear()
+                self._geracao_global += 1
+                return
+            self._cache.pop(servidor_id, None)
+            self._geracoes[servidor_id] = self._geracoes.get(servidor_id, 0) + 1
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Acertos, falhas, taxa de acerto e ocupação atual do cache."""
+        with self._lock:
+            total = self.acertos + self.falhas
+            return {
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'taxa_acerto': (self.acertos / total) if total else 0.0,
+                'tamanho': len(self._cache),
+                'tamanho_maximo': self._cache.maxsize,
+            }
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from ostervalt.nucleo.entidades.item import Item
+from ostervalt.nucleo.utilitarios import normalizar_texto
+
+# Resultado de uma busca: (conhecido, item). conhecido=False significa "pergunte ao banco"
+ResultadoCache = Tuple[bool, Optional[Item]]
+
+
+class CacheItens:
+    """
+    Cache read-through dos itens mestres (tabela `itens`), por ID e por nome normalizado.
+
+    O RepositorioItensSQLAlchemy consulta o cache antes do banco e guarda o que leu; o
+    catálogo inteiro é carregado de uma vez por `listar_todos` (chamado na inicialização).
+    Enquanto todos os itens couberem no cache ele está "completo", e um item ausente é
+    respondido como inexistente sem consultar o banco. Passando do tamanho máximo, os
+    menos usados são descartados (LRU) e as faltas voltam a ir ao banco.
+
+    As escritas do repositório (adicionar/atualizar/remover) atualizam o cache após o commit;
+    como no índice de nomes de personagens, um contador de geração impede que uma leitura
+    do banco anterior a uma escrita seja guardada depois dela.
+    """
+    def __init__(self, tamanho_maximo: int = 10000):
+        self.tamanho_maximo = tamanho_maximo
+        self._por_id: "OrderedDict[int, Item]" = OrderedDict()
+        self._por_nome: Dict[str, Dict[int, Item]] = {}
+        self._completo = False
+        self._geracao = 0
+        self._lock = threading.Lock()
+        # Estatísticas (expostas por estatisticas())
+        self.acertos = 0
+        self.faltas = 0
+
+    @property
+    def completo(self) -> bool:
+        return self._completo
+
+    def geracao(self) -> int:
+        """Geração atual do cache; deve ser lida antes de consultar o banco."""
+        with self._lock:
+            return self._geracao
+
+    def carregar(self, itens: Iterable[Item], geracao: int) -> None:
+        """Substitui o conteúdo pelo catálogo inteiro lido do banco, se nenhuma escrita ocorreu desde a leitura."""
+        itens = [item for item in itens if item.id is not None]
+        with self._lock:
+            if self._geracao != geracao:
+                return
+            self._por_id.clear()
+            self._por_nome.clear()
+            for item in itens:
+                self._inserir(item)
+            self._completo = len(itens) <= self.tamanho_maximo
+
+    def guardar(self, item: Item, geracao: int) -> None:
+        """Guarda um item lido do banco, se nenhuma escrita ocorreu desde a leitura."""
+        with self._lock:
+            if self._geracao == geracao:
+                self._inserir(item)
+
+    def registrar(self, item: Item) -> None:
+        """Insere ou substitui um item após adicionar/atualizar no banco."""
+        with self._lock:
+            self._geracao += 1
+            self._remover(item.id)
+            self._inserir(item)
+
+    def remover(self, item_id: int) -> None:
+        """Remove um item após removê-lo do banco."""
+        with self._lock:
+            self._geracao += 1
+            self._remover(item_id)
+
+    def invalidar(self) -> None:
+        """Esvazia o cache (ex: itens alterados fora do repositório)."""
+        with self._lock:
+            self._geracao += 1
+            self._por_id.clear()
+            self._por_nome.clear()
+            self._completo = False
+
+    def obter_por_id(self, item_id: int) -> ResultadoCache:
+        with self._lock:
+            item = self._por_id.get(item_id)
+            if item is not None:
+                self._por_id.move_to_end(item_id)
+            return self._contar(item is not None or self._completo, item)
+
+    def obter_por_nome(self, nome: str) -> ResultadoCache:
+        """Mesma regra do banco: nome exato primeiro; senão, ignorando maiúsculas (o de menor ID)."""
+        with self._lock:
+            candidatos = self._por_nome.get(normalizar_texto(nome), {})
+            item = next((c for c in candidatos.values() if c.nome == nome), None)
+            if item is None and self._completo:
+                # Sem o catálogo inteiro, um item com o nome exato pode não estar no cache
+                item = min((c for c in candidatos.values() if c.nome.lower() == nome.lower()), key=lambda c: c.id, default=None)
+            if item is not None:
+                self._por_id.move_to_end(item.id)
+            return self._contar(item is not None or self._completo, item)
+
+    def estatisticas(self) -> Dict[str, float]:
+        with self._lock:
+            consultas = self.acertos + self.faltas
+            return {
+                "itens": len(self._por_id),
+                "completo": self._completo,
+                "acertos": self.acertos,
+                "faltas": self.faltas,
+                "taxa_acertos": self.acertos / consultas if consultas else 0.0,
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._por_id)
+
+    # --- Internos (chamados com o lock) ---
+
+    def _contar(self, conhecido: bool, item: Optional[Item]) -> ResultadoCache:
+        if conhecido:
+            self.acertos += 1
+        else:
+            self.faltas += 1
+        return conhecido, item
+
+    def _inserir(self, item: Item) -> None:
+        self._por_id[item.id] = item
+        self._por_id.move_to_end(item.id)
+        self._por_nome.setdefault(normalizar_texto(item.nome), {})[item.id] = item
+        while len(self._por_id) > self.tamanho_maximo:
+            _, descartado = self._por_id.popitem(last=False)
+            self._remover_nome(descartado)
+            self._completo = False
+
+    def _remover(self, item_id: int) -> None:
+        item = self._por_id.pop(item_id, None)
+        if item is not None:
+            self._remover_nome(item)
+
+    def _remover_nome(self, item: Item) -> None:
+        chave = normalizar_texto(item.nome)
+        itens = self._por_nome.get(chave, {})
+        itens.pop(item.id, None)
+        if not itens:
+            self._por_nome.pop(chave, None)
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+import bisect
+import csv
+import threading
+from dataclasses import dataclass
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+from ostervalt.nucleo.entidades.item import Item
+from ostervalt.nucleo.utilitarios import normalizar_texto
+
+
+@dataclass(frozen=True)
+class _Particao:
+    """Itens de uma raridade (ou de todo o catálogo), ordenados pelo nome normalizado."""
+    chaves: Tuple[str, ...]
+    itens: Tuple[Item, ...]
+
+    @classmethod
+    def criar(cls, itens: Iterable[Item]) -> "_Particao":
+        ordenados = sorted(((normalizar_texto(item.nome), item) for item in itens), key=lambda par: par[0])
+        return cls(chaves=tuple(chave for chave, _ in ordenados), itens=tuple(item for _, item in ordenados))
+
+    def buscar(self, termo: str, limite: int) -> List[Item]:
+        if not termo:
+            return list(self.itens[:limite])
+
+        # 1. Prefixo: busca binária sobre os nomes ordenados
+        resultado = []
+        inicio = bisect.bisect_left(self.chaves, termo)
+        fim = inicio
+        while fim < len(self.chaves) and self.chaves[fim].startswith(termo) and len(resultado) < limite:
+            resultado.append(self.itens[fim])
+            fim += 1
+        if len(resultado) >= limite:
+            return resultado
+
+        # 2. Substring: varredura linear, só enquanto faltarem resultados
+        for indice, chave in enumerate(self.chaves):
+            if inicio <= indice < fim:
+                continue # Já incluído como prefixo
+            if termo in chave:
+                resultado.append(self.itens[indice])
+                if len(resultado) >= limite:
+                    break
+        return resultado
+
+
+@dataclass(frozen=True)
+class _Indice:
+    todos: _Particao
+    por_raridade: Dict[str, _Particao]
+
+
+class CatalogoItens:
+    """
+    Índice em memória do catálogo de itens, usado pelos autocompletes.
+
+    Particionado por raridade, com busca por prefixo e por substring sobre nomes
+    normalizados (sem acentos, sem diferenciar maiúsculas). O índice é imutável e
+    trocado atomicamente a cada mudança, então as buscas rodam no event loop sem lock;
+    as escritas (vindas do repositório de itens, nas threads do executor) são serializadas.
+    """
+    def __init__(self):
+        self._itens: Dict[Hashable, Item] = {}
+        self._indice = _Indice(todos=_Particao.criar([]), por_raridade={})
+        self._lock = threading.Lock()
+        self.carregado = False
+
+    def carregar(self, itens: Iterable[Item]) -> None:
+        """Substitui todo o catálogo pelos itens informados."""
+        with self._lock:
+            self._itens = {self._chave(item, posicao): item for posicao, item in enumerate(itens)}
+            self._reconstruir()
+            self.carregado = True
+        print(f"Catálogo de itens indexado: {len(self._itens)} itens.")
+
+    def atualizar_item(self, item: Item) -> None:
+        """Insere ou substitui um item (pelo id) no catálogo."""
+        with self._lock:
+            self._itens[item.id] = item
+            self._reconstruir()
+
+    def remover_item(self, item_id: int) -> None:
+        """Remove um item do catálogo, se presente."""
+        with self._lock:
+            if self._itens.pop(item_id, None) is not None:
+                self._reconstruir()
+
+    def buscar(self, termo: str, raridade: Optional[str] = None, limite: int = 25) -> List[Item]:
+        """
+        Busca itens pelo nome, opcionalmente restrita a uma raridade.
+        Correspondências por prefixo vêm primeiro, seguidas das por substring, ambas em ordem alfabética.
+        """
+        indice = self._indice
+        if raridade:
+            particao = indice.por_raridade.get(normalizar_texto(raridade))
+            if particao is None:
+                return []
+        else:
+            particao = indice.todos
+        return particao.buscar(normalizar_texto(termo), limite)
+
+    def __len__(self) -> int:
+        return len(self._indice.todos.itens)
+
+    @staticmethod
+    def _chave(item: Item, posicao: int) -> Hashable:
+        # Itens lidos de CSV não têm id; a posição no arquivo os mantém distintos
+        return item.id if item.id is not None else ('sem_id', posicao)
+
+    def _reconstruir(self) -> None:
+        por_raridade: Dict[str, List[Item]] = {}
+        for item in self._itens.values():
+            por_raridade.setdefault(normalizar_texto(item.raridade), []).append(item)
+        self._indice = _Indice(
+            todos=_Particao.criar(self._itens.values()),
+            por_raridade={raridade: _Particao.criar(itens) for raridade, itens in por_raridade.items()},
+        )
+
+
+def ler_itens_csv(caminho: str) -> List[Item]:
+    """
+    Lê itens de um CSV no formato legado (colunas Name, Rarity e, opcionalmente, Value e Description).
+    Itens sem nome ou raridade são ignorados.
+    """
+    itens = []
+    with open(caminho, newline='', encoding='utf-8') as arquivo:
+        for linha in csv.DictReader(arquivo):
+            nome = (linha.get('Name') or '').strip()
+            raridade = (linha.get('Rarity') or '').strip()
+            if not nome or not raridade or nome == 'undefined':
+                continue
+            try:
+                valor = int(float(linha.get('Value') or 0))
+            except ValueError:
+                valor = 0
+            itens.append(Item(id=None, nome=nome, raridade=raridade, valor=valor, descricao=linha.get('Description') or ''))
+    return itens
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import contextvars
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from ostervalt.infraestrutura.monitoramento.metricas import registrar_tempo_banco
+from ostervalt.infraestrutura.persistencia.unidade_trabalho import executar_no_escopo
+from ostervalt.nucleo.resultado_pendente import ResultadoPendente, aceitando_pendentes
+
+
+class ExecutorBancoDados:
+    """
+    Executa operações síncronas de banco de dados (repositórios e casos de uso)
+    em threads dedicadas, fora do event loop do Discord.
+
+    Para SQLite, o padrão de 1 worker serializa as escritas sem travar o loop;
+    para Postgres, pode-se aumentar o número de workers.
+    """
+    def __init__(self, max_workers: int = 1):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ostervalt-db")
+
+    async def executar(self, funcao: Callable[..., Any], *args, **kwargs) -> Any:
+        """Submete a função ao executor e aguarda o resultado sem bloquear o loop."""
+        loop = asyncio.get_running_loop()
+        # Copia o contexto para que variáveis de contexto (ex: escopo da interação) cheguem à thread
+        contexto = contextvars.copy_context()
+        chamada = functools.partial(contexto.run, funcao, *args, **kwargs)
+        inicio = time.perf_counter()
+        try:
+            return await loop.run_in_executor(self._executor, chamada)
+        finally:
+            # Inclui a espera na fila do executor: é o tempo que a interação passa aguardando o banco
+            registrar_tempo_banco(time.perf_counter() - inicio)
+
+    def encerrar(self) -> None:
+        """Aguarda as operações pendentes e libera as threads do executor."""
+        self._executor.shutdown(wait=True)
+
+
+class ExecutorBancoDadosSincrono:
+    """
+    Executor que roda as operações diretamente na thread do chamador.
+    Útil para testes e scripts, onde não há event loop concorrente a proteger.
+    """
+    async def executar(self, funcao: Callable[..., Any], *args, **kwargs) -> Any:
+        inicio = time.perf_counter()
+        try:
+            return funcao(*args, **kwargs)
+        finally:
+            registrar_tempo_banco(time.perf_counter() - inicio)
+
+    def encerrar(self) -> None:
+        pass
+
+
+class ProxyAssincrono:
+    """
+    Envolve um repositório ou caso de uso, expondo os mesmos métodos da interface
+    original como corrotinas executadas pelo executor de banco de dados.
+
+    Ex: `await repo_personagens.listar_por_usuario(usuario_id, servidor_id)`
+
+    Dentro de um EscopoInteracao, cada chamada ocupa uma vaga de conexão e encerra a
+    transação que só leu (ver executar_no_escopo).
+
+    Se o método devolver um ResultadoPendente (ex: escrita no buffer de escrita), o Future
+    é aguardado no event loop, sem ocupar uma thread do executor, e a continuação roda
+    de volta no executor com o mesmo contexto da interação.
+    """
+    def __init__(self, alvo: Any, executor):
+        self._alvo = alvo
+        self._executor = executor
+
+    @property
+    def alvo(self) -> Any:
+        """Instância síncrona envolvida pelo proxy."""
+        return self._alvo
+
+    def __getattr__(self, nome: str) -> Any:
+        atributo = getattr(self._alvo, nome)
+        if not callable(atributo):
+            return atributo
+
+        async def chamada(*args, **kwargs):
+            with aceitando_pendentes():
+                resultado = await executar_no_escopo(self._executor, atributo, *args, **kwargs)
+                while isinstance(resultado, ResultadoPendente):
+                    inicio = time.perf_counter()
+                    try:
+                        # shield: cancelar a interação não cancela o Future que o buffer ainda vai resolver
+                        valor = await asyncio.shield(asyncio.wrap_future(resultado.futuro))
+                    finally:
+                        registrar_tempo_banco(time.perf_counter() - inicio)
+                    resultado = await executar_no_escopo(self._executor, resultado.continuacao, valor)
+            return resultado
+
+        chamada.__name__ = nome
+        return chamada
+
+    def __repr__(self) -> str:
+        return f"<ProxyAssincrono de {self._alvo!r}>"
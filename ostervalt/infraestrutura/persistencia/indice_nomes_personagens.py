@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+import threading
+from dataclasses import dataclass
+from typing import Iterable, List, Tuple
+
+from cachetools import LRUCache
+
+from ostervalt.infraestrutura.persistencia.models import StatusPersonagem
+from ostervalt.nucleo.entidades.personagem import Personagem
+from ostervalt.nucleo.utilitarios import normalizar_texto
+
+ChaveUsuario = Tuple[int, int] # (servidor_id, usuario_id)
+
+
+@dataclass(frozen=True)
+class EntradaNomePersonagem:
+    """Nome de um personagem como guardado no índice."""
+    personagem_id: int
+    nome: str
+    nome_normalizado: str
+    status: StatusPersonagem
+
+    @property
+    def ativo(self) -> bool:
+        return self.status == StatusPersonagem.ATIVO
+
+
+def _entrada(personagem: Personagem) -> EntradaNomePersonagem:
+    return EntradaNomePersonagem(
+        personagem_id=personagem.id,
+        nome=personagem.nome,
+        nome_normalizado=normalizar_texto(personagem.nome),
+        status=personagem.status,
+    )
+
+
+def _relevancia(entrada: EntradaNomePersonagem, termo: str) -> int:
+    """0 = nome exato, 1 = prefixo, 2 = início de palavra, 3 = substring, -1 = não corresponde."""
+    nome = entrada.nome_normalizado
+    if not termo or nome == termo:
+        return 0
+    if nome.startswith(termo):
+        return 1
+    if f" {termo}" in nome:
+        return 2
+    if termo in nome:
+        return 3
+    return -1
+
+
+class IndiceNomesPersonagens:
+    """
+    Índice em memória dos nomes de personagens por (servidor, usuário), para os autocompletes.
+
+    Cada usuário tem poucos personagens, então o índice guarda os nomes já normalizados
+    e ranqueia com uma varredura do próprio usuário, sem ir ao banco.
+    Os usuários são carregados sob demanda (LRU com tamanho máximo) e mantidos em dia
+    pelo RepositorioPersonagensSQLAlchemy em adicionar/atualizar/remover. Como no
+    cache de itens, um contador de geração impede que uma leitura do banco anterior a
+    uma escrita seja armazenada depois dela. O contador é único para o índice (e não
+    por usuário), para que a memória fique limitada pelo LRU: uma escrita de qualquer
+    usuário só faz uma carga concorrente ser descartada e refeita no próximo uso.
+    """
+    def __init__(self, tamanho_maximo: int = 10000):
+        self._usuarios: LRUCache = LRUCache(maxsize=tamanho_maximo)
+        self._geracao = 0
+        self._lock = threading.Lock()
+
+    def usuario_carregado(self, servidor_id: int, usuario_id: int) -> bool:
+        with self._lock:
+            return (servidor_id, usuario_id) in self._usuarios
+
+    def geracao(self) -> int:
+        """Geração atual do índice (a mesma para todos os usuários); deve ser lida antes de consultar o banco."""
+        with self._lock:
+            return self._geracao
+
+    def carregar_usuario(self, servidor_id: int, usuario_id: int, personagens: Iterable[Personagem], geracao: int) -> None:
+        """Guarda os personagens lidos do banco, se nenhuma escrita do usuário ocorreu desde a leitura."""
+        chave = (servidor_id, usuario_id)
+        entradas = {p.id: _entrada(p) for p in personagens}
+        with self._lock:
+            if self._geracao == geracao:
+                self._usuarios[chave] = entradas
+
+    def registrar(self, personagem: Personagem) -> None:
+        """Insere ou atualiza o nome/status de um personagem (chamado após adicionar/atualizar)."""
+        chave = (personagem.servidor_id, personagem.usuario_id)
+        with self._lock:
+            self._geracao += 1
+            entradas = self._usuarios.get(chave)
+            if entradas is not None: # Usuários ainda não carregados serão lidos do banco no próximo uso
+                self._usuarios[chave] = {**entradas, personagem.id: _entrada(personagem)}
+
+    def remover(self, servidor_id: int, usuario_id: int, personagem_id: int) -> None:
+        """Remove um personagem do índice (chamado após remover)."""
+        chave = (servidor_id, usuario_id)
+        with self._lock:
+            self._geracao += 1
+            entradas = self._usuarios.get(chave)
+            if entradas is not None and personagem_id in entradas:
+                self._usuarios[chave] = {pid: e for pid, e in entradas.items() if pid != personagem_id}
+
+    def invalidar_servidor(self, servidor_id: int) -> None:
+        """Descarta os usuários carregados de um servidor (ex: após restaurar um backup)."""
+        with self._lock:
+            self._geracao += 1
+            for chave in [chave for chave in self._usuarios.keys() if chave[0] == servidor_id]:
+                self._usuarios.pop(chave, None)
+
+    def buscar(
+        self,
+        servidor_id: int,
+        usuario_id: int,
+        termo: str,
+        apenas_ativos: bool = False,
+        limite: int = 25,
+    ) -> List[EntradaNomePersonagem]:
+        """
+        Retorna os personagens do usuário que correspondem ao termo, ranqueados:
+        nome exato, prefixo, início de palavra e substring; ativos antes de aposentados;
+        e então em ordem alfabética. O usuário precisa ter sido carregado antes.
+        """
+        with self._lock:
+            entradas = self._usuarios.get((servidor_id, usuario_id), {})
+        termo = normalizar_texto(termo)
+        ranqueadas = []
+        for entrada in entradas.values():
+            if apenas_ativos and not entrada.ativo:
+                continue
+            relevancia = _relevancia(entrada, termo)
+            if relevancia >= 0:
+                ranqueadas.append(((relevancia, not entrada.ativo, entrada.nome_normalizado), entrada))
+        ranqueadas.sort(key=lambda par: par[0])
+        return [entrada for _, entrada in ranqueadas[:limite]]
@@ -0,0 +1,56 @@
+"""Adiciona índices para as consultas mais frequentes
+
+Revision ID: c7f3a9d2e41b
+Revises: b985a3560792
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7f3a9d2e41b'
+down_revision: Union[str, None] = 'b985a3560792'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Consolida registros duplicados de inventário antes do índice único (personagem_id, item_id)
+    op.execute("""
+        UPDATE itens_inventario
+        SET quantidade = (
+            SELECT SUM(i2.quantidade) FROM itens_inventario i2
+            WHERE i2.personagem_id = itens_inventario.personagem_id
+              AND i2.item_id = itens_inventario.item_id
+        )
+        WHERE id IN (
+            SELECT MIN(id) FROM itens_inventario
+            GROUP BY personagem_id, item_id
+            HAVING COUNT(*) > 1
+        )
+    """)
+    op.execute("""
+        DELETE FROM itens_inventario
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM itens_inventario
+            GROUP BY personagem_id, item_id
+        )
+    """)
+
+    op.create_index('ix_personagens_servidor_usuario', 'personagens', ['servidor_id', 'usuario_id'], unique=False)
+    op.create_index('ix_itens_inventario_personagem_item', 'itens_inventario', ['personagem_id', 'item_id'], unique=True)
+    op.create_index(op.f('ix_itens_nome'), 'itens', ['nome'], unique=False)
+    op.create_index('ix_itens_nome_lower', 'itens', [sa.text('lower(nome)')], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_itens_nome_lower', table_name='itens')
+    op.drop_index(op.f('ix_itens_nome'), table_name='itens')
+    op.drop_index('ix_itens_inventario_personagem_item', table_name='itens_inventario')
+    op.drop_index('ix_personagens_servidor_usuario', table_name='personagens')
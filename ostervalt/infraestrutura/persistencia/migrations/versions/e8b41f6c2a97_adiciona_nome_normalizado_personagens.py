@@ -0,0 +1,106 @@
+"""Adiciona nome_normalizado aos personagens, com índice único por usuário
+
+Revision ID: e8b41f6c2a97
+Revises: c7f3a9d2e41b
+Create Date: 2026-10-18 15:41:07.520913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from ostervalt.nucleo.utilitarios import normalizar_texto
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b41f6c2a97'
+down_revision: Union[str, None] = 'c7f3a9d2e41b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TAMANHO_LOTE = 1000
+
+personagens = sa.table(
+    'personagens',
+    sa.column('id', sa.Integer),
+    sa.column('nome', sa.String),
+    sa.column('nome_normalizado', sa.String),
+    sa.column('usuario_id', sa.Integer),
+    sa.column('servidor_id', sa.Integer),
+)
+
+
+def _nome_livre(nome: str, personagem_id: int, usados: set) -> str:
+    """Nome com o sufixo do ID (e um contador, se preciso) que o usuário ainda não usa."""
+    candidato = f"{nome} #{personagem_id}"
+    contador = 2
+    while normalizar_texto(candidato) in usados:
+        candidato = f"{nome} #{personagem_id}-{contador}"
+        contador += 1
+    return candidato
+
+
+def _preencher_nome_normalizado(conexao) -> None:
+    """
+    Lê os personagens em páginas de TAMANHO_LOTE, em ordem de (servidor, usuário, id), e grava
+    o nome normalizado de cada página em um executemany. Só os nomes do usuário atual ficam
+    em memória: os de um usuário não colidem com os de outro.
+    """
+    atualizacao = (
+        sa.update(personagens)
+        .where(personagens.c.id == sa.bindparam('b_id'))
+        .values(nome=sa.bindparam('b_nome'), nome_normalizado=sa.bindparam('b_nome_normalizado'))
+    )
+    chave = sa.tuple_(personagens.c.servidor_id, personagens.c.usuario_id, personagens.c.id)
+    ultima = None
+    usuario_atual, usados = None, set()
+    while True:
+        consulta = (
+            sa.select(personagens.c.servidor_id, personagens.c.usuario_id, personagens.c.id, personagens.c.nome)
+            .order_by(personagens.c.servidor_id, personagens.c.usuario_id, personagens.c.id)
+            .limit(TAMANHO_LOTE)
+        )
+        if ultima is not None:
+            consulta = consulta.where(chave > sa.tuple_(*ultima))
+        linhas = conexao.execute(consulta).all()
+        if not linhas:
+            return
+        lote = []
+        for servidor_id, usuario_id, personagem_id, nome in linhas:
+            if (servidor_id, usuario_id) != usuario_atual:
+                usuario_atual, usados = (servidor_id, usuario_id), set()
+            nome_normalizado = normalizar_texto(nome)
+            if nome_normalizado in usados:
+                # Um nome com sufixo também pode já existir: procura um que o usuário não use
+                nome = _nome_livre(nome, personagem_id, usados)
+                nome_normalizado = normalizar_texto(nome)
+                print(f"Personagem {personagem_id} renomeado para '{nome}' (nome repetido do mesmo usuário).")
+            usados.add(nome_normalizado)
+            lote.append({'b_id': personagem_id, 'b_nome': nome, 'b_nome_normalizado': nome_normalizado})
+        conexao.execute(atualizacao, lote)
+        ultima = linhas[-1][:3]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('personagens', sa.Column('nome_normalizado', sa.String(), nullable=True))
+
+    # Backfill em Python: a normalização (sem acentos, casefold) não tem equivalente em SQL portável.
+    # Nomes repetidos do mesmo usuário violariam o índice único: o mais antigo mantém o nome
+    # e os demais recebem o próprio ID como sufixo (ex: "Frodo #42").
+    _preencher_nome_normalizado(op.get_bind())
+
+    with op.batch_alter_table('personagens') as batch_op:
+        batch_op.alter_column('nome_normalizado', existing_type=sa.String(), nullable=False)
+    # O índice único começa por (servidor_id, usuario_id): substitui o índice de listar_por_usuario
+    op.drop_index('ix_personagens_servidor_usuario', table_name='personagens')
+    op.create_index('ix_personagens_servidor_usuario_nome', 'personagens', ['servidor_id', 'usuario_id', 'nome_normalizado'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_personagens_servidor_usuario_nome', table_name='personagens')
+    op.create_index('ix_personagens_servidor_usuario', 'personagens', ['servidor_id', 'usuario_id'], unique=False)
+    with op.batch_alter_table('personagens') as batch_op:
+        batch_op.drop_column('nome_normalizado')
@@ -0,0 +1,33 @@
+"""Adiciona tabela sincronizacao_comandos (hash dos comandos de aplicação sincronizados)
+
+Revision ID: f3a7c91d5b20
+Revises: e8b41f6c2a97
+Create Date: 2026-10-18 17:05:33.184620
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a7c91d5b20'
+down_revision: Union[str, None] = 'e8b41f6c2a97'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('sincronizacao_comandos',
+    sa.Column('escopo', sa.String(), nullable=False),
+    sa.Column('hash', sa.String(), nullable=False),
+    sa.Column('sincronizado_em', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('escopo')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('sincronizacao_comandos')
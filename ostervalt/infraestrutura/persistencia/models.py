@@ -1,20 +1,29 @@
 import enum
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, UniqueConstraint
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, UniqueConstraint, Index, func
 from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
 
 from sqlalchemy.orm import relationship
 from .base import Base
+from ostervalt.nucleo.utilitarios import normalizar_texto
 
 
 class StatusPersonagem(enum.Enum):
     ATIVO = "ativo"
     APOSENTADO = "aposentado"
 
+def _nome_normalizado_padrao(contexto) -> str:
+    # Preenche nome_normalizado em todo INSERT (ORM, backup, benchmarks) a partir do nome
+    return normalizar_texto(contexto.get_current_parameters()["nome"])
+
+
 class PersonagemModel(Base):
     __tablename__ = "personagens"
+    # Um nome por usuário e servidor; o índice serve a obter_por_nome e, pelo prefixo, a listar_por_usuario
+    __table_args__ = (Index('ix_personagens_servidor_usuario_nome', 'servidor_id', 'usuario_id', 'nome_normalizado', unique=True),)
 
     id = Column(Integer, primary_key=True, index=True)
     nome = Column(String, nullable=False)
+    nome_normalizado = Column(String, nullable=False, default=_nome_normalizado_padrao) # normalizar_texto(nome)
     usuario_id = Column(Integer, nullable=False)
     servidor_id = Column(Integer, nullable=False)
     marcos = Column(Integer, default=0)
@@ -30,13 +39,15 @@ class ItemModel(Base):
     __tablename__ = "itens"
 
     id = Column(Integer, primary_key=True, index=True)
-    nome = Column(String, nullable=False)
+    nome = Column(String, nullable=False, index=True) # obter_por_nome
     raridade = Column(String, nullable=False)
     valor = Column(Integer, nullable=False)
     descricao = Column(String)
 
 class ItemInventarioModel(Base):
     __tablename__ = "itens_inventario"
+    # Um registro por item e personagem (adicionar_item soma as quantidades)
+    __table_args__ = (Index('ix_itens_inventario_personagem_item', 'personagem_id', 'item_id', unique=True),)
 
     id = Column(Integer, primary_key=True, index=True)
     personagem_id = Column(Integer, ForeignKey("personagens.id"))
@@ -46,6 +57,9 @@ class ItemInventarioModel(Base):
     personagem = relationship("PersonagemModel", back_populates="inventario")
     item = relationship("ItemModel")
 
+# Busca de itens por nome sem diferenciar maiúsculas (fallback de obter_por_nome)
+Index('ix_itens_nome_lower', func.lower(ItemModel.nome))
+
 
 class EstoqueLojaItemModel(Base):
     __tablename__ = "estoque_loja"
@@ -68,3 +82,11 @@ class ConfiguracaoServidorModel(Base):
     servidor_id = Column(Integer, nullable=False, index=True)
     chave = Column(String, nullable=False) # Ex: 'cargo_saldo', 'msg_trabalho', 'prob_crime'
     valor = Column(String, nullable=False) # Armazena como string, conversão na aplicação
+
+
+class SincronizacaoComandosModel(Base):
+    __tablename__ = "sincronizacao_comandos"
+
+    escopo = Column(String, primary_key=True) # 'global' ou o ID do servidor (sync por guild)
+    hash = Column(String, nullable=False) # SHA-256 dos comandos enviados na última sincronização
+    sincronizado_em = Column(DateTime, nullable=False)
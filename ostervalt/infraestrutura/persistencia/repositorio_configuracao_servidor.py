@@ -3,10 +3,14 @@ from typing import List, Optional, Dict, Any
 import json
 
 from .models import ConfiguracaoServidorModel
+from .cache_configuracao_servidor import CacheConfiguracaoServidor, ConfiguracaoServidorSnapshot
+from .roteamento_leitura import lendo_da_replica
 
 class RepositorioConfiguracaoServidor:
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, cache: Optional[CacheConfiguracaoServidor] = None):
         self.session = session
+        # Snapshots por servidor; invalidados a cada escrita feita por este repositório
+        self.cache = cache
 
     def adicionar_ou_atualizar(self, servidor_id: int, chave: str, valor: Any) -> ConfiguracaoServidorModel:
         """Adiciona ou atualiza uma configuração. Converte o valor para JSON string."""
@@ -24,6 +28,7 @@ class RepositorioConfiguracaoServidor:
             self.session.add(config)
 
         self.session.commit()
+        self.invalidar_cache(servidor_id)
         self.session.refresh(config)
         return config
 
@@ -32,15 +37,8 @@ class RepositorioConfiguracaoServidor:
         return self.session.query(ConfiguracaoServidorModel).filter_by(servidor_id=servidor_id, chave=chave).first()
 
     def obter_valor(self, servidor_id: int, chave: str, default: Optional[Any] = None) -> Any:
-        """Obtém o valor de uma configuração, desserializando o JSON."""
-        config = self.obter(servidor_id, chave)
-        if config:
-            try:
-                return json.loads(config.valor)
-            except json.JSONDecodeError:
-                # Retorna o valor bruto se não for JSON válido (fallback)
-                return config.valor
-        return default
+        """Obtém o valor de uma configuração, desserializado, a partir do snapshot do servidor."""
+        return self.obter_snapshot(servidor_id).obter(chave, default)
 
     def listar_por_servidor(self, servidor_id: int) -> List[ConfiguracaoServidorModel]:
         """Lista todas as configurações de um servidor."""
@@ -48,14 +46,40 @@ class RepositorioConfiguracaoServidor:
 
     def listar_por_servidor_como_dict(self, servidor_id: int) -> Dict[str, Any]:
         """Lista todas as configurações de um servidor como um dicionário chave/valor."""
-        configs = self.listar_por_servidor(servidor_id)
-        config_dict = {}
-        for config in configs:
-             try:
-                config_dict[config.chave] = json.loads(config.valor)
-             except json.JSONDecodeError:
-                 config_dict[config.chave] = config.valor # Fallback
-        return config_dict
+        return self.obter_snapshot(servidor_id).como_dict()
+
+    def obter_snapshot(self, servidor_id: int) -> ConfiguracaoServidorSnapshot:
+        """
+        Retorna o snapshot tipado das configurações do servidor.
+        Usa o cache quando disponível; caso contrário, lê e desserializa todas as linhas do servidor.
+        """
+        if self.cache is None:
+            return self._carregar_snapshot(servidor_id)
+        snapshot = self.cache.obter(servidor_id)
+        if snapshot is None:
+            geracao = self.cache.geracao(servidor_id) # Lida antes da consulta, ver CacheConfiguracaoServidor
+            snapshot = self._carregar_snapshot(servidor_id)
+            if not lendo_da_replica(self.session): # A réplica pode não ter a última alteração
+                self.cache.armazenar(snapshot, geracao)
+        return snapshot
+
+    def _carregar_snapshot(self, servidor_id: int) -> ConfiguracaoServidorSnapshot:
+        valores = {}
+        for config in self.listar_por_servidor(servidor_id):
+            try:
+                valores[config.chave] = json.loads(config.valor)
+            except json.JSONDecodeError:
+                valores[config.chave] = config.valor # Fallback
+        return ConfiguracaoServidorSnapshot(servidor_id=servidor_id, valores=valores)
+
+    def invalidar_cache(self, servidor_id: Optional[int] = None) -> None:
+        """Descarta o snapshot em cache de um servidor (ou de todos, se None)."""
+        if self.cache is not None:
+            self.cache.invalidar(servidor_id)
+
+    def estatisticas_cache(self) -> Dict[str, Any]:
+        """Acertos/falhas do cache de configurações (vazio se o cache estiver desativado)."""
+        return self.cache.estatisticas() if self.cache is not None else {}
 
     def remover(self, servidor_id: int, chave: str) -> bool:
         """Remove uma configuração específica."""
@@ -63,5 +87,6 @@ class RepositorioConfiguracaoServidor:
         if config:
             self.session.delete(config)
             self.session.commit()
+            self.invalidar_cache(servidor_id)
             return True
         return False
\ No newline at end of file
@@ -1,6 +1,8 @@
+from sqlalchemy import delete, func, insert, select
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
+from ostervalt.nucleo.casos_de_uso.dtos import ItemLojaDTO, PaginaLojaDTO
 from .models import EstoqueLojaItemModel, ItemModel
 
 class RepositorioEstoqueLoja:
@@ -39,3 +41,95 @@ class RepositorioEstoqueLoja:
         """Remove todos os itens do estoque de um servidor específico."""
         self.session.query(EstoqueLojaItemModel).filter_by(servidor_id=servidor_id).delete()
         self.session.commit()
+
+    def substituir_estoque_servidor(self, servidor_id: int, itens: Sequence[Dict[str, Any]]) -> int:
+        """
+        Substitui todo o estoque de um servidor em uma única transação: um DELETE e um
+        INSERT em lote. Se algo falhar, o estoque anterior é mantido.
+
+        Args:
+            servidor_id: ID do servidor.
+            itens: Dicionários com 'item_id', 'quantidade' e, opcionalmente, 'preco_especifico'.
+
+        Returns:
+            Quantidade de itens inseridos.
+        """
+        linhas = [
+            {
+                'servidor_id': servidor_id,
+                'item_id': item['item_id'],
+                'quantidade': item['quantidade'],
+                'preco_especifico': item.get('preco_especifico'),
+            }
+            for item in itens
+        ]
+        try:
+            self.session.execute(delete(EstoqueLojaItemModel).where(EstoqueLojaItemModel.servidor_id == servidor_id))
+            if linhas:
+                self.session.execute(insert(EstoqueLojaItemModel).values(linhas))
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        return len(linhas)
+
+    def listar_pagina_loja(
+        self,
+        servidor_id: int,
+        limite: int,
+        apos_id: Optional[int] = None,
+        antes_id: Optional[int] = None,
+        pagina: int = 1,
+    ) -> PaginaLojaDTO:
+        """
+        Lista uma página do estoque da loja já com os dados dos itens, em uma única consulta.
+
+        A paginação é por cursor (keyset) sobre o ID do estoque: `apos_id` avança a partir
+        do último item da página atual e `antes_id` volta a partir do primeiro. A consulta
+        usa o índice de servidor_id e lê só `limite + 1` linhas, qualquer que seja a página.
+        """
+        consulta = (
+            select(
+                EstoqueLojaItemModel.id,
+                EstoqueLojaItemModel.item_id,
+                EstoqueLojaItemModel.quantidade,
+                func.coalesce(EstoqueLojaItemModel.preco_especifico, ItemModel.valor).label("preco"),
+                ItemModel.nome,
+                ItemModel.raridade,
+                ItemModel.descricao,
+            )
+            .join(ItemModel, ItemModel.id == EstoqueLojaItemModel.item_id)
+            .where(EstoqueLojaItemModel.servidor_id == servidor_id)
+            .limit(limite + 1) # Uma linha a mais indica se há outra página na mesma direção
+        )
+        voltando = antes_id is not None
+        if voltando:
+            consulta = consulta.where(EstoqueLojaItemModel.id < antes_id).order_by(EstoqueLojaItemModel.id.desc())
+        else:
+            if apos_id is not None:
+                consulta = consulta.where(EstoqueLojaItemModel.id > apos_id)
+            consulta = consulta.order_by(EstoqueLojaItemModel.id)
+
+        linhas = list(self.session.execute(consulta).all())
+        mais_linhas = len(linhas) > limite
+        linhas = linhas[:limite]
+        if voltando:
+            linhas.reverse()
+
+        itens = [
+            ItemLojaDTO(
+                estoque_id=linha.id,
+                item_id=linha.item_id,
+                nome_item=linha.nome,
+                preco=linha.preco,
+                quantidade=linha.quantidade,
+                raridade_item=linha.raridade,
+                descricao_item=linha.descricao,
+            )
+            for linha in linhas
+        ]
+        if voltando:
+            tem_anterior, tem_proxima = mais_linhas, True # A página de onde se voltou vem depois
+        else:
+            tem_anterior, tem_proxima = apos_id is not None, mais_linhas
+        return PaginaLojaDTO(itens=itens, pagina=pagina, tem_anterior=tem_anterior, tem_proxima=tem_proxima)
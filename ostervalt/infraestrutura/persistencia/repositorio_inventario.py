@@ -1,8 +1,10 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from ostervalt.infraestrutura.persistencia.models import ItemInventarioModel as InventarioItemEntity # Renomeado alias para clareza
 from ostervalt.nucleo.repositorios import RepositorioInventario
 from ostervalt.nucleo.entidades.item import ItemInventario # Importar entidade do núcleo
+from ostervalt.nucleo.casos_de_uso.dtos import ItemInventarioDTO
 from .models import ItemInventarioModel, PersonagemModel, ItemModel
 # from .base import Database # Removido
 
@@ -76,6 +78,50 @@ class RepositorioInventarioSQLAlchemy(RepositorioInventario):
             else: # Se quantidade for 0 ou menos, remover o item
                 self.remover_item(item_id, personagem_id)
 
+    def listar_itens_detalhados(self, personagem_id: int, limite: int, deslocamento: int = 0) -> Tuple[List[ItemInventarioDTO], int]:
+        """
+        Read model do inventário: uma única consulta com JOIN em itens, paginada no banco.
+        O total de itens distintos vem na própria consulta (COUNT(*) OVER ()), sem uma ida extra ao banco.
+        """
+        consulta = (
+            select(
+                ItemInventarioModel.item_id,
+                ItemInventarioModel.quantidade,
+                ItemModel.nome,
+                ItemModel.descricao,
+                ItemModel.raridade,
+                ItemModel.valor,
+                func.count().over().label("total"),
+            )
+            .join(ItemModel, ItemModel.id == ItemInventarioModel.item_id)
+            .where(ItemInventarioModel.personagem_id == personagem_id)
+            .order_by(ItemModel.nome, ItemInventarioModel.item_id)
+            .limit(limite)
+            .offset(deslocamento)
+        )
+        linhas = self.session.execute(consulta).all()
+        itens = [
+            ItemInventarioDTO(
+                item_id=linha.item_id,
+                nome_item=linha.nome,
+                quantidade=linha.quantidade,
+                descricao_item=linha.descricao,
+                raridade_item=linha.raridade,
+                valor_item=linha.valor,
+            )
+            for linha in linhas
+        ]
+        return itens, (linhas[0].total if linhas else 0)
+
+    def contar_itens(self, personagem_id: int) -> int:
+        consulta = (
+            select(func.count())
+            .select_from(ItemInventarioModel)
+            .join(ItemModel, ItemModel.id == ItemInventarioModel.item_id)
+            .where(ItemInventarioModel.personagem_id == personagem_id)
+        )
+        return self.session.execute(consulta).scalar_one()
+
     # --- Métodos Adicionais (não na interface, podem ser úteis internamente ou removidos) ---
 
     # def obter_por_id(self, inventario_item_id: int) -> Optional[ItemInventarioModel]: # Retorna Modelo, não Entidade
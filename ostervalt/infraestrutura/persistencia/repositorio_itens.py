@@ -1,8 +1,12 @@
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from ostervalt.nucleo.entidades.item import Item
 from ostervalt.nucleo.repositorios import RepositorioItens
 from .models import ItemModel
+from .catalogo_itens import CatalogoItens
+from .cache_itens import CacheItens
+from .roteamento_leitura import lendo_da_replica
 # from .base import Database # Removido
 
 def _para_entidade_item(model: ItemModel) -> Item:
@@ -24,24 +28,45 @@ def _para_modelo_item(item: Item) -> ItemModel:
     )
 
 class RepositorioItensSQLAlchemy(RepositorioItens):
-    def __init__(self, session: Session): # Modificado para receber Session
+    def __init__(self, session: Session, catalogo: Optional[CatalogoItens] = None, cache: Optional[CacheItens] = None): # Modificado para receber Session
         self.session = session # Modificado para usar self.session
+        self.catalogo = catalogo # Índice dos autocompletes, mantido em dia a cada escrita
+        self.cache = cache # Opcional: obter_por_id/obter_por_nome consultam o cache antes do banco
 
     def obter_por_id(self, item_id: int) -> Optional[Item]:
+        geracao = 0
+        if self.cache is not None:
+            geracao = self.cache.geracao() # Lida antes do cache: uma escrita no meio impede guardar a leitura
+            conhecido, item = self.cache.obter_por_id(item_id)
+            if conhecido:
+                return item
         # Removido db = self.db.SessionLocal() e try/finally
         model = self.session.query(ItemModel).filter(ItemModel.id == item_id).first() # Usa self.session
-        return _para_entidade_item(model) if model else None
+        return self._guardar(_para_entidade_item(model), geracao) if model else None
 
     def listar_todos(self) -> List[Item]: # Adicionado método que faltava na interface? (Verificar repositorios.py)
+        geracao = self.cache.geracao() if self.cache is not None else 0
         # Removido db = self.db.SessionLocal() e try/finally
         modelos = self.session.query(ItemModel).all() # Usa self.session
-        return [_para_entidade_item(model) for model in modelos]
+        itens = [_para_entidade_item(model) for model in modelos]
+        if self.cache is not None and not lendo_da_replica(self.session):
+            self.cache.carregar(itens, geracao) # Catálogo inteiro: o cache passa a responder também pelos ausentes
+        return itens
 
     def listar_por_raridade(self, raridade: str) -> List[Item]:
         # Removido db = self.db.SessionLocal() e try/finally
         modelos = self.session.query(ItemModel).filter(ItemModel.raridade == raridade).all() # Usa self.session
         return [_para_entidade_item(modelo) for modelo in modelos]
 
+    def listar_por_raridades(self, raridades: Iterable[str]) -> Dict[str, List[Item]]:
+        """Lista os itens de várias raridades com uma única consulta, agrupados por raridade."""
+        raridades = list(raridades)
+        agrupados: Dict[str, List[Item]] = {raridade: [] for raridade in raridades}
+        modelos = self.session.query(ItemModel).filter(ItemModel.raridade.in_(raridades)).all()
+        for modelo in modelos:
+            agrupados[modelo.raridade].append(_para_entidade_item(modelo))
+        return agrupados
+
     def adicionar(self, item: Item) -> None:
         # Removido db = self.db.SessionLocal() e try/finally
         model = _para_modelo_item(item)
@@ -49,6 +74,10 @@ class RepositorioItensSQLAlchemy(RepositorioItens):
         self.session.commit() # Usa self.session
         self.session.refresh(model) # Usa self.session
         item.id = model.id
+        if self.catalogo is not None:
+            self.catalogo.atualizar_item(item)
+        if self.cache is not None:
+            self.cache.registrar(item)
 
     def atualizar(self, item: Item) -> None:
         # Removido db = self.db.SessionLocal() e try/finally
@@ -59,6 +88,10 @@ class RepositorioItensSQLAlchemy(RepositorioItens):
             model.valor = item.valor
             model.descricao = item.descricao
             self.session.commit() # Usa self.session
+            if self.catalogo is not None:
+                self.catalogo.atualizar_item(item)
+            if self.cache is not None:
+                self.cache.registrar(item)
 
     def remover(self, item_id: int) -> None:
         # Removido db = self.db.SessionLocal() e try/finally
@@ -66,8 +99,27 @@ class RepositorioItensSQLAlchemy(RepositorioItens):
         if model:
             self.session.delete(model) # Usa self.session
             self.session.commit() # Usa self.session
+            if self.catalogo is not None:
+                self.catalogo.remover_item(item_id)
+            if self.cache is not None:
+                self.cache.remover(item_id)
 
     # Método adicional não presente na interface RepositorioItens, mas usado em AdminCog
     def obter_por_nome(self, nome: str) -> Optional[Item]:
+        geracao = 0
+        if self.cache is not None:
+            geracao = self.cache.geracao()
+            conhecido, item = self.cache.obter_por_nome(nome)
+            if conhecido:
+                return item
         model = self.session.query(ItemModel).filter(ItemModel.nome == nome).first()
-        return _para_entidade_item(model) if model else None
\ No newline at end of file
+        if model is None:
+            # Sem correspondência exata: tenta ignorando maiúsculas (usa ix_itens_nome_lower)
+            model = self.session.query(ItemModel).filter(func.lower(ItemModel.nome) == nome.lower()).first()
+        return self._guardar(_para_entidade_item(model), geracao) if model else None
+
+    def _guardar(self, item: Item, geracao: int) -> Item:
+        # Itens lidos da réplica podem ser anteriores à última alteração: não vão para o cache
+        if self.cache is not None and not lendo_da_replica(self.session):
+            self.cache.guardar(item, geracao)
+        return item
\ No newline at end of file
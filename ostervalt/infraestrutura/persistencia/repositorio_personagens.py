@@ -1,10 +1,18 @@
-from typing import List, Optional
+import datetime
+from typing import List, Optional, Sequence, Tuple, Union
+from sqlalchemy import update, case, literal, or_, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from sqlalchemy.orm import joinedload
 from .models import ItemInventarioModel # Adicionado
 from ostervalt.nucleo.entidades.personagem import Personagem
-from ostervalt.nucleo.repositorios import RepositorioPersonagens
-from .models import PersonagemModel
+from ostervalt.nucleo.repositorios import NomePersonagemEmUsoError, RepositorioPersonagens
+from .models import PersonagemModel, StatusPersonagem
+from ostervalt.nucleo.utilitarios import normalizar_texto
+from .indice_nomes_personagens import IndiceNomesPersonagens
+from .buffer_escrita import BufferEscrita
+from ostervalt.nucleo.resultado_pendente import ResultadoPendente, adiar_ou_resolver, encadear
+from .tabela_cooldowns import TabelaCooldowns
+from .roteamento_leitura import lendo_da_replica
 # from .base import Database # Removido - Não precisamos mais de Database aqui
 
 def _para_entidade_personagem(model: PersonagemModel) -> Personagem:
@@ -36,35 +44,32 @@ def _para_modelo_personagem(personagem: Personagem) -> PersonagemModel:
     )
 
 
-def _para_dict_backup(model: PersonagemModel) -> dict:
-    """Converte um PersonagemModel (com inventário carregado) para um dict para backup."""
-    inventario_formatado = [
-        {"item_id": item_inv.item_id, "quantidade": item_inv.quantidade}
-        for item_inv in model.inventario # Assume que inventario foi pré-carregado
-    ]
-    return {
-        "id": model.id,
-        "nome": model.nome,
-        "usuario_id": model.usuario_id,
-        "servidor_id": model.servidor_id,
-        "marcos": model.marcos,
-        "dinheiro": model.dinheiro,
-        "nivel": model.nivel,
-        "ultimo_trabalho": model.ultimo_trabalho.isoformat() if model.ultimo_trabalho else None,
-        "ultimo_crime": model.ultimo_crime.isoformat() if model.ultimo_crime else None,
-        "status": model.status.value if model.status else None, # Usar .value para o enum
-        "inventario": inventario_formatado
-    }
+# Coluna de cooldown de cada ação com recompensa
+_COLUNAS_COOLDOWN = {
+    'trabalho': PersonagemModel.ultimo_trabalho,
+    'crime': PersonagemModel.ultimo_crime,
+}
 
 
 class RepositorioPersonagensSQLAlchemy(RepositorioPersonagens):
-    def __init__(self, session: Session): # Modificado para receber Session
+    def __init__(
+        self,
+        session: Session,
+        indice_nomes: Optional[IndiceNomesPersonagens] = None,
+        buffer_escrita: Optional[BufferEscrita] = None,
+        tabela_cooldowns: Optional[TabelaCooldowns] = None,
+    ): # Modificado para receber Session
         self.session = session # Modificado para usar self.session
+        self.indice_nomes = indice_nomes # Índice dos autocompletes, mantido em dia a cada escrita
+        # Opcional: as atualizações de personagens são gravadas em lote (group commit) pelo buffer
+        self.buffer_escrita = buffer_escrita
+        # Opcional: cada linha lida ou escrita atualiza os cooldowns em memória de /trabalhar e /crime
+        self.tabela_cooldowns = tabela_cooldowns
 
     def obter_por_id(self, personagem_id: int) -> Optional[Personagem]:
         # Removido db = self.db.SessionLocal() e try/finally
         model = self.session.query(PersonagemModel).filter(PersonagemModel.id == personagem_id).first() # Usa self.session
-        return _para_entidade_personagem(model) if model else None
+        return self._aquecer_leitura(_para_entidade_personagem(model)) if model else None
 
     def listar_por_usuario(self, usuario_id: int, servidor_id: int) -> List[Personagem]:
         # Removido db = self.db.SessionLocal() e try/finally
@@ -72,43 +77,209 @@ class RepositorioPersonagensSQLAlchemy(RepositorioPersonagens):
             PersonagemModel.usuario_id == usuario_id,
             PersonagemModel.servidor_id == servidor_id
         ).all()
-        return [_para_entidade_personagem(model) for model in modelos]
+        return [self._aquecer_leitura(_para_entidade_personagem(model)) for model in modelos]
+
+    def carregar_nomes_usuario(self, usuario_id: int, servidor_id: int) -> List[Personagem]:
+        """
+        listar_por_usuario para os autocompletes: também carrega o usuário no índice de nomes,
+        a menos que a leitura tenha vindo da réplica (ver lendo_da_replica).
+        """
+        if self.indice_nomes is None:
+            return self.listar_por_usuario(usuario_id, servidor_id)
+        geracao = self.indice_nomes.geracao() # Lida antes da consulta
+        personagens = self.listar_por_usuario(usuario_id, servidor_id)
+        if not lendo_da_replica(self.session):
+            self.indice_nomes.carregar_usuario(servidor_id, usuario_id, personagens, geracao)
+        return personagens
+
+    def obter_por_nome(
+        self,
+        usuario_id: int,
+        servidor_id: int,
+        nome: str,
+        status: Optional[StatusPersonagem] = None,
+    ) -> Optional[Personagem]:
+        """Busca pelo nome normalizado (sem acentos e maiúsculas): uma linha, pelo índice único do usuário."""
+        consulta = self.session.query(PersonagemModel).filter(
+            PersonagemModel.servidor_id == servidor_id,
+            PersonagemModel.usuario_id == usuario_id,
+            PersonagemModel.nome_normalizado == normalizar_texto(nome),
+        )
+        if status is not None:
+            consulta = consulta.filter(PersonagemModel.status == status)
+        model = consulta.first()
+        return self._aquecer_leitura(_para_entidade_personagem(model)) if model else None
 
     def adicionar(self, personagem: Personagem) -> None:
         # Removido db = self.db.SessionLocal() e try/finally
         model = _para_modelo_personagem(personagem)
         self.session.add(model) # Usa self.session
-        self.session.commit() # Usa self.session
+        try:
+            self.session.commit() # Usa self.session
+        except IntegrityError:
+            self.session.rollback()
+            # Outro /criar com o mesmo nome passou pela verificação ao mesmo tempo (ix_personagens_servidor_usuario_nome)
+            if self.obter_por_nome(personagem.usuario_id, personagem.servidor_id, personagem.nome) is not None:
+                raise NomePersonagemEmUsoError(personagem.nome)
+            raise
         self.session.refresh(model) # Usa self.session
         personagem.id = model.id
+        self._aquecer(personagem) # O ID pode ser de um personagem removido: substitui o que houver na tabela
+        if self.indice_nomes is not None:
+            self.indice_nomes.registrar(_para_entidade_personagem(model))
 
-    def atualizar(self, personagem: Personagem) -> None:
-        # Removido db = self.db.SessionLocal() e try/finally
-        model = self.session.query(PersonagemModel).filter(PersonagemModel.id == personagem.id).first() # Usa self.session
-        if model:
-            model.nome = personagem.nome
-            model.marcos = personagem.marcos
-            model.dinheiro = personagem.dinheiro
-            model.nivel = personagem.nivel
-            model.ultimo_trabalho = personagem.ultimo_trabalho
-            model.ultimo_crime = personagem.ultimo_crime
-            model.status = personagem.status # Adicionado
-            self.session.commit() # Usa self.session
+    def atualizar(self, personagem: Personagem) -> Union[Optional[Personagem], ResultadoPendente]:
+        """
+        UPDATE de todas as colunas pelo ID, sem reler a linha antes. Sobrescreve dinheiro e
+        cooldowns com os valores da entidade: os comandos que alteram só uma parte do
+        personagem usam alterar_progressao, alterar_status ou definir_dinheiro, para não
+        desfazer um /trabalhar ou /crime concluído entre a leitura e a escrita.
+        """
+        return self._alterar(
+            personagem.id,
+            nome=personagem.nome,
+            nome_normalizado=normalizar_texto(personagem.nome),
+            marcos=personagem.marcos,
+            dinheiro=personagem.dinheiro,
+            nivel=personagem.nivel,
+            ultimo_trabalho=personagem.ultimo_trabalho,
+            ultimo_crime=personagem.ultimo_crime,
+            status=personagem.status, # Adicionado
+        )
+
+    def alterar_progressao(self, personagem_id: int, marcos: int, nivel: int) -> Union[Optional[Personagem], ResultadoPendente]:
+        """UPDATE só de marcos e nível (usado por /up)."""
+        return self._alterar(personagem_id, marcos=marcos, nivel=nivel)
+
+    def alterar_status(self, personagem_id: int, status: StatusPersonagem) -> Union[Optional[Personagem], ResultadoPendente]:
+        """UPDATE só do status (usado por /inss)."""
+        return self._alterar(personagem_id, status=status)
+
+    def definir_dinheiro(self, personagem_id: int, dinheiro: int) -> Union[Optional[Personagem], ResultadoPendente]:
+        """UPDATE só do dinheiro, com um valor absoluto (usado pelo /dinheiro de admin)."""
+        return self._alterar(personagem_id, dinheiro=dinheiro)
+
+    def _alterar(self, personagem_id: int, **valores) -> Union[Optional[Personagem], ResultadoPendente]:
+        instrucao = update(PersonagemModel).where(PersonagemModel.id == personagem_id).values(**valores)
+        # O índice de nomes guarda nome e status: mantido em dia com a linha gravada
+        return encadear(self._executar_atualizacao(instrucao, personagem_id), self._registrar_nome)
+
+    def _registrar_nome(self, atualizado: Optional[Personagem]) -> Optional[Personagem]:
+        if atualizado and self.indice_nomes is not None:
+            self.indice_nomes.registrar(atualizado)
+        return atualizado
 
     def remover(self, personagem_id: int) -> None:
         # Removido db = self.db.SessionLocal() e try/finally
         model = self.session.query(PersonagemModel).filter(PersonagemModel.id == personagem_id).first() # Usa self.session
         if model:
+            chave_indice = (model.servidor_id, model.usuario_id)
             self.session.delete(model) # Usa self.session
             self.session.commit() # Usa self.session
+            if self.indice_nomes is not None:
+                self.indice_nomes.remover(*chave_indice, personagem_id)
+            if self.tabela_cooldowns is not None:
+                self.tabela_cooldowns.descartar(personagem_id)
 
-    def listar_por_servidor_para_backup(self, servidor_id: int) -> List[dict]:
-        """Lista todos os personagens de um servidor com seus inventários para backup."""
-        # Removido db = self.db.SessionLocal() e try/finally
-        modelos = self.session.query(PersonagemModel).filter( # Usa self.session
-            PersonagemModel.servidor_id == servidor_id
-        ).options(
-            joinedload(PersonagemModel.inventario) # Carrega o inventário junto
-            # joinedload(PersonagemModel.inventario).joinedload(ItemInventarioModel.item) # Opcional: carregar detalhes do item se necessário, mas para backup só precisamos do ID
-        ).all()
-        return [_para_dict_backup(model) for model in modelos]
+    def aplicar_recompensa_com_cooldown(
+        self,
+        personagem_id: int,
+        acao: str,
+        tempo_atual: datetime.datetime,
+        intervalo_segundos: int,
+        delta_dinheiro: int = 0,
+        faixas_por_nivel: Optional[Sequence[Tuple[int, int, int]]] = None,
+    ) -> Union[Optional[Personagem], ResultadoPendente]:
+        """
+        UPDATE condicional único: verifica o cooldown e paga a recompensa na mesma instrução,
+        sem corrida entre dois comandos simultâneos do mesmo personagem.
+        A recompensa por nível é um CASE sobre a coluna nivel, na ordem das faixas.
+        """
+        coluna_cooldown = _COLUNAS_COOLDOWN[acao]
+        limite = tempo_atual - datetime.timedelta(seconds=intervalo_segundos)
+
+        incremento = literal(delta_dinheiro)
+        if faixas_por_nivel:
+            recompensa_nivel = case(
+                *[(PersonagemModel.nivel.between(nivel_min, nivel_max), literal(recompensa))
+                  for nivel_min, nivel_max, recompensa in faixas_por_nivel],
+                else_=literal(0),
+            )
+            incremento = incremento + recompensa_nivel
+
+        instrucao = (
+            update(PersonagemModel)
+            .where(
+                PersonagemModel.id == personagem_id,
+                or_(coluna_cooldown.is_(None), coluna_cooldown <= limite),
+            )
+            .values({PersonagemModel.dinheiro: PersonagemModel.dinheiro + incremento, coluna_cooldown: tempo_atual})
+        )
+        return self._executar_atualizacao(instrucao, personagem_id)
+
+    def alterar_dinheiro(self, personagem_id: int, delta: int) -> Union[Optional[int], ResultadoPendente]:
+        """UPDATE único de saldo (dinheiro = dinheiro + delta), usado por /saldo."""
+        instrucao = (
+            update(PersonagemModel)
+            .where(PersonagemModel.id == personagem_id)
+            .values({PersonagemModel.dinheiro: PersonagemModel.dinheiro + delta})
+        )
+        return encadear(
+            self._executar_atualizacao(instrucao, personagem_id),
+            lambda personagem: personagem.dinheiro if personagem else None,
+        )
+
+    def _executar_atualizacao(self, instrucao, personagem_id: int) -> Union[Optional[Personagem], ResultadoPendente]:
+        """
+        Executa o UPDATE e devolve a linha resultante. Com o buffer de escrita, a instrução
+        entra no próximo lote e o resultado só existe após o commit do lote: dentro do
+        ProxyAssincrono, devolve um ResultadoPendente (o event loop aguarda o commit sem
+        ocupar a thread do executor); fora dele, bloqueia até o commit. Sem o buffer, é
+        executada e confirmada na sessão da interação.
+        """
+        instrucao = instrucao.execution_options(synchronize_session=False)
+        if self.buffer_escrita is not None:
+            futuro = self.buffer_escrita.enfileirar(
+                lambda sessao: _executar_instrucao_personagem(sessao, instrucao, personagem_id)
+            )
+            return adiar_ou_resolver(ResultadoPendente(futuro, lambda linha: self._concluir_escrita_buffer(linha, personagem_id)))
+        try:
+            linha = _executar_instrucao_personagem(self.session, instrucao, personagem_id)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        return self._aquecer(_para_entidade_personagem(linha)) if linha else None
+
+    def _concluir_escrita_buffer(self, linha, personagem_id: int) -> Optional[Personagem]:
+        # A escrita foi confirmada em outra sessão: expira a cópia que a sessão da
+        # interação já tenha carregado, para que a próxima leitura veja o valor novo
+        modelo = self.session.identity_map.get(self.session.identity_key(PersonagemModel, personagem_id))
+        if modelo is not None:
+            self.session.expire(modelo)
+        return self._aquecer(_para_entidade_personagem(linha)) if linha else None
+
+    def _aquecer(self, personagem: Personagem) -> Personagem:
+        """Registra os últimos usos de /trabalhar e /crime do personagem na tabela de cooldowns."""
+        if self.tabela_cooldowns is not None:
+            self.tabela_cooldowns.aquecer(personagem)
+        return personagem
+
+    def _aquecer_leitura(self, personagem: Personagem) -> Personagem:
+        # Uma linha da réplica pode ser anterior ao último /trabalhar ou /crime: não vai para a tabela
+        return personagem if lendo_da_replica(self.session) else self._aquecer(personagem)
+
+
+def _executar_instrucao_personagem(sessao: Session, instrucao, personagem_id: int):
+    """
+    Executa o UPDATE na sessão, sem commit, e devolve a linha resultante: via RETURNING
+    quando o banco suporta (SQLite >= 3.35, Postgres), ou com um SELECT na mesma transação.
+    """
+    if sessao.get_bind().dialect.update_returning:
+        return sessao.execute(instrucao.returning(*PersonagemModel.__table__.c)).first()
+    resultado = sessao.execute(instrucao)
+    if not resultado.rowcount:
+        return None
+    return sessao.execute(
+        select(*PersonagemModel.__table__.c).where(PersonagemModel.id == personagem_id)
+    ).first()
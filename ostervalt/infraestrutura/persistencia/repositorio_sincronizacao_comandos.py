@@ -0,0 +1,25 @@
+import datetime
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from .models import SincronizacaoComandosModel
+
+class RepositorioSincronizacaoComandos:
+    """Hash dos comandos de aplicação enviados ao Discord na última sincronização, por escopo."""
+    def __init__(self, session: Session):
+        self.session = session
+
+    def obter_hash(self, escopo: str) -> Optional[str]:
+        registro = self.session.get(SincronizacaoComandosModel, escopo)
+        return registro.hash if registro else None
+
+    def registrar_hash(self, escopo: str, hash_comandos: str) -> None:
+        registro = self.session.get(SincronizacaoComandosModel, escopo)
+        agora = datetime.datetime.now()
+        if registro:
+            registro.hash = hash_comandos
+            registro.sincronizado_em = agora
+        else:
+            self.session.add(SincronizacaoComandosModel(escopo=escopo, hash=hash_comandos, sincronizado_em=agora))
+        self.session.commit()
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, scoped_session
+from sqlalchemy.sql.dml import UpdateBase
+
+# Marca o código atual como somente leitura: as consultas podem ir para a réplica
+_somente_leitura: ContextVar[bool] = ContextVar("ostervalt_somente_leitura", default=False)
+
+
+def em_leitura_replica() -> bool:
+    """Indica se o código atual está em um trecho somente leitura (ver leitura_replica)."""
+    return _somente_leitura.get()
+
+
+def lendo_da_replica(sessao) -> bool:
+    """
+    Indica se as consultas da sessão (Session ou scoped_session) vão agora para a réplica.
+
+    A réplica pode estar atrasada, e os caches em memória (índice de nomes, snapshots de
+    configuração, tabela de cooldowns...) só são invalidados pelas escritas no primário:
+    uma leitura da réplica não deve preenchê-los, ou um valor antigo ficaria guardado
+    depois da escrita que o substituiu.
+    """
+    if not _somente_leitura.get():
+        return False
+    if isinstance(sessao, scoped_session):
+        sessao = sessao()
+    return getattr(sessao, "engine_leitura", None) is not None
+
+
+@contextmanager
+def leitura_replica(ativo: bool = True):
+    """
+    Marca o bloco como somente leitura: as consultas das sessões roteadas vão para a réplica,
+    se houver uma configurada. Escritas continuam indo para o primário.
+    Como o executor de banco copia o contexto, a marcação vale também dentro dele.
+    """
+    token = _somente_leitura.set(ativo)
+    try:
+        yield
+    finally:
+        _somente_leitura.reset(token)
+
+
+class SessaoRoteada(Session):
+    """
+    Session que envia as leituras dos trechos somente leitura para o engine da réplica.
+    INSERT/UPDATE/DELETE e os flushes sempre usam o primário (o `bind` da sessão),
+    mesmo dentro de leitura_replica. Sem `engine_leitura`, tudo vai para o primário.
+    """
+    def __init__(self, *args, engine_leitura: Optional[Engine] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.engine_leitura = engine_leitura
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if (
+            self.engine_leitura is not None
+            and _somente_leitura.get()
+            and not self._flushing
+            and not isinstance(clause, UpdateBase)
+        ):
+            return self.engine_leitura
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
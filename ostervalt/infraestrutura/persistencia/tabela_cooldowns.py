@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+import datetime
+import math
+import threading
+import time
+from typing import Dict, Optional
+
+from ostervalt.nucleo.entidades.personagem import Personagem
+
+# Ações com cooldown e o atributo da entidade com o último uso de cada uma
+ACOES_COOLDOWN = {
+    'trabalho': 'ultimo_trabalho',
+    'crime': 'ultimo_crime',
+}
+
+
+def _epoca(momento: datetime.datetime) -> int:
+    # Arredonda para baixo: a tabela nunca considera o cooldown mais longo do que o banco
+    return int(momento.timestamp())
+
+
+class TabelaCooldowns:
+    """
+    Último uso de /trabalhar e /crime por personagem, em segundos desde a época (int),
+    para recusar as tentativas em cooldown sem consultar o banco.
+
+    É aquecida pelo RepositorioPersonagensSQLAlchemy com o `ultimo_trabalho`/`ultimo_crime`
+    de toda linha lida ou escrita (inclusive a devolvida pelo UPDATE de recompensa), e por
+    isso recebe também personagens que já saíram do cooldown. Uma entrada vencida é
+    descartada quando consultada e, quando a tabela dobra de tamanho desde a última
+    varredura, todas as que já venceram pelo maior intervalo consultado da ação são
+    removidas: a tabela fica proporcional a quem ainda pode estar em cooldown (com o
+    mínimo de `tamanho_minimo_varredura` entradas antes da primeira varredura).
+
+    O intervalo é informado na consulta, então mudar o intervalo do servidor vale na hora.
+    Na dúvida (personagem ausente ou cooldown vencido) a decisão fica com o UPDATE
+    condicional do banco, que continua sendo a verificação definitiva.
+    """
+    def __init__(self, tamanho_minimo_varredura: int = 1024):
+        self._ultimos: Dict[str, Dict[int, int]] = {acao: {} for acao in ACOES_COOLDOWN}
+        # Maior intervalo já consultado por ação: só depois dele uma entrada não serve para nenhum servidor
+        self._maior_intervalo: Dict[str, int] = {}
+        self._tamanho_minimo_varredura = tamanho_minimo_varredura
+        self._limite_varredura = tamanho_minimo_varredura
+        self._lock = threading.Lock()
+
+    def registrar(self, personagem_id: int, acao: str, ultimo: Optional[datetime.datetime]) -> None:
+        """Guarda o último uso da ação pelo personagem (None = nunca usou)."""
+        with self._lock:
+            if ultimo is None:
+                self._ultimos[acao].pop(personagem_id, None)
+                return
+            self._ultimos[acao][personagem_id] = _epoca(ultimo)
+            if len(self._ultimos[acao]) > self._limite_varredura:
+                self._remover_vencidas(time.time())
+
+    def _remover_vencidas(self, agora: float) -> None:
+        # Chamado com o lock; ações ainda não consultadas não têm intervalo conhecido e são mantidas
+        for acao, ultimos in self._ultimos.items():
+            maior_intervalo = self._maior_intervalo.get(acao)
+            if maior_intervalo is not None:
+                for personagem_id in [pid for pid, ultimo in ultimos.items() if ultimo + maior_intervalo <= agora]:
+                    del ultimos[personagem_id]
+        maior = max(len(ultimos) for ultimos in self._ultimos.values())
+        self._limite_varredura = max(self._tamanho_minimo_varredura, 2 * maior)
+
+    def aquecer(self, personagem: Personagem) -> None:
+        """Registra os últimos usos de todas as ações a partir da entidade lida do banco."""
+        if personagem.id is None:
+            return
+        for acao, atributo in ACOES_COOLDOWN.items():
+            self.registrar(personagem.id, acao, getattr(personagem, atributo))
+
+    def restante(self, personagem_id: int, acao: str, intervalo_segundos: int, tempo_atual: datetime.datetime) -> int:
+        """Segundos de cooldown restantes, ou 0 se o personagem não está (ou não se sabe se está) em cooldown."""
+        agora = tempo_atual.timestamp()
+        with self._lock:
+            if intervalo_segundos > self._maior_intervalo.get(acao, -1):
+                self._maior_intervalo[acao] = intervalo_segundos
+            ultimo = self._ultimos[acao].get(personagem_id)
+            if ultimo is None:
+                return 0
+            restante = ultimo + intervalo_segundos - agora
+            if restante <= 0:
+                del self._ultimos[acao][personagem_id]
+                return 0
+        return math.ceil(restante)
+
+    def descartar(self, personagem_id: int) -> None:
+        """Esquece o personagem (chamado ao removê-lo: o ID pode ser reutilizado)."""
+        with self._lock:
+            for ultimos in self._ultimos.values():
+                ultimos.pop(personagem_id, None)
+
+    def limpar(self) -> None:
+        """Esquece todos os personagens (ex: após restaurar um backup)."""
+        with self._lock:
+            for ultimos in self._ultimos.values():
+                ultimos.clear()
+            self._limite_varredura = self._tamanho_minimo_varredura
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(ultimos) for ultimos in self._ultimos.values())
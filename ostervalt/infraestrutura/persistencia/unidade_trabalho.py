@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import threading
+from contextlib import contextmanager, asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, scoped_session
+
+from ostervalt.infraestrutura.persistencia.roteamento_leitura import leitura_replica
+
+# Chave em Session.info: a transação atual da sessão já escreveu no banco
+_ESCREVEU = "ostervalt_escreveu"
+
+
+@event.listens_for(Session, "after_flush")
+def _marcar_flush(sessao, contexto_flush):
+    sessao.info[_ESCREVEU] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _marcar_instrucao_de_escrita(estado):
+    # UPDATE/DELETE em massa e SQL textual (que pode escrever) mantêm a transação aberta
+    if not estado.is_select:
+        estado.session.info[_ESCREVEU] = True
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _limpar_marca_de_escrita(sessao, transacao):
+    if transacao.parent is None:
+        sessao.info.pop(_ESCREVEU, None)
+
+# Identificador do escopo (interação) atual. Cada interação recebe um objeto novo,
+# e a sessão escopada usa esse objeto como chave no seu registro.
+_escopo_atual: ContextVar[Optional[object]] = ContextVar("ostervalt_escopo_sessao", default=None)
+
+
+def chave_escopo_atual() -> Any:
+    """
+    Função de escopo para o scoped_session.
+    Dentro de uma unidade de trabalho, retorna o identificador do escopo;
+    fora dela, recai em uma sessão por thread (comportamento de scripts e tarefas de fundo).
+    """
+    escopo = _escopo_atual.get()
+    return escopo if escopo is not None else threading.get_ident()
+
+
+def em_unidade_de_trabalho() -> bool:
+    """Indica se o código atual está rodando dentro de uma unidade de trabalho."""
+    return _escopo_atual.get() is not None
+
+
+def _finalizar(sessao_escopada: scoped_session, sucesso: bool) -> None:
+    """Confirma ou desfaz a sessão do escopo atual e a descarta do registro."""
+    try:
+        if sucesso:
+            sessao_escopada.commit()
+        else:
+            sessao_escopada.rollback()
+    except Exception:
+        sessao_escopada.rollback()
+        raise
+    finally:
+        sessao_escopada.remove()
+
+
+@contextmanager
+def unidade_de_trabalho(sessao_escopada: scoped_session):
+    """
+    Abre uma sessão nova para o bloco, confirma ao final ou desfaz em caso de erro.
+    Versão síncrona, para scripts, testes e tarefas fora do Discord.
+
+    Ex:
+        with unidade_de_trabalho(SessaoEscopada):
+            repo_personagens.adicionar(personagem)
+    """
+    token = _escopo_atual.set(object())
+    try:
+        try:
+            yield sessao_escopada()
+        except BaseException:
+            _finalizar(sessao_escopada, sucesso=False)
+            raise
+        _finalizar(sessao_escopada, sucesso=True)
+    finally:
+        _escopo_atual.reset(token)
+
+
+class ResultadoEscopo:
+    """
+    Desfecho da interação, entregue pelo `async with escopo_interacao() as resultado`.
+
+    A árvore de comandos do discord.py captura os erros dos comandos (e marca
+    `interaction.command_failed`) antes que cheguem ao escopo: quem a envolve marca
+    `falhou = True` para que a sessão seja desfeita em vez de confirmada.
+    """
+    def __init__(self):
+        self.falhou = False
+
+
+def _encerrar_transacao_de_leitura(sessao_escopada: scoped_session) -> bool:
+    """
+    Encerra a transação da sessão do escopo atual se ela só leu, devolvendo a conexão ao
+    pool. Os objetos carregados não expiram: continuam valendo como antes do commit.
+
+    Returns:
+        True se a sessão continua com uma transação aberta (e a sua conexão).
+    """
+    if not sessao_escopada.registry.has():
+        return False
+    sessao = sessao_escopada()
+    if not sessao.in_transaction():
+        return False
+    if sessao.info.get(_ESCREVEU) or sessao.new or sessao.dirty or sessao.deleted:
+        return True
+    expirar = sessao.expire_on_commit
+    sessao.expire_on_commit = False
+    try:
+        sessao.commit()
+    finally:
+        sessao.expire_on_commit = expirar
+    return False
+
+
+def _executar_e_encerrar_leitura(sessao_escopada: scoped_session, funcao: Callable[..., Any], args, kwargs) -> Tuple[Any, bool]:
+    resultado = funcao(*args, **kwargs)
+    return resultado, _encerrar_transacao_de_leitura(sessao_escopada)
+
+
+class _EscopoAtivo:
+    """Chave da sessão de uma interação aberta pelo EscopoInteracao e a vaga de conexão que ela ocupa."""
+    def __init__(self, escopo_interacao: "EscopoInteracao"):
+        self.escopo_interacao = escopo_interacao
+        self.com_vaga = False
+
+    async def ocupar_vaga(self) -> None:
+        vagas = self.escopo_interacao.vagas
+        if vagas is None or self.com_vaga:
+            return
+        await vagas.acquire()
+        if self.com_vaga: # Outra chamada concorrente da mesma interação chegou primeiro
+            vagas.release()
+        else:
+            self.com_vaga = True
+
+    def liberar_vaga(self) -> None:
+        if self.com_vaga:
+            self.com_vaga = False
+            self.escopo_interacao.vagas.release()
+
+
+async def executar_no_escopo(executor_banco, funcao: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Executa `funcao` no executor de banco. Dentro de um EscopoInteracao, a interação
+    primeiro ocupa uma vaga de conexão (aguardando no event loop, não em uma thread do
+    executor) e, ao final da chamada, a transação é encerrada se só leu, liberando a
+    conexão e a vaga enquanto a interação aguarda o Discord. Usado pelo ProxyAssincrono.
+    """
+    escopo = _escopo_atual.get()
+    if not isinstance(escopo, _EscopoAtivo):
+        return await executor_banco.executar(funcao, *args, **kwargs)
+    await escopo.ocupar_vaga()
+    com_conexao = True # Se a chamada falhar, a vaga fica com a interação até a finalização
+    try:
+        resultado, com_conexao = await executor_banco.executar(
+            _executar_e_encerrar_leitura, escopo.escopo_interacao.sessao_escopada, funcao, args, kwargs,
+        )
+    finally:
+        if not com_conexao:
+            escopo.liberar_vaga()
+    return resultado
+
+
+class EscopoInteracao:
+    """
+    Unidade de trabalho por interação do Discord.
+
+    Abre uma sessão isolada para cada interação (comando ou autocomplete) e,
+    ao final, a confirma ou desfaz uma única vez e a descarta. A finalização roda
+    no executor de banco, na mesma thread das demais operações da interação.
+
+    Com `somente_leitura=True`, as consultas da interação podem ir para a réplica
+    de leitura (ver roteamento_leitura.py); escritas continuam no primário.
+
+    A sessão é desfeita se o bloco levantar uma exceção ou marcar o ResultadoEscopo
+    como falho; senão, é confirmada.
+
+    Conexões: depois de cada chamada do ProxyAssincrono, a transação que só leu é
+    encerrada, e a conexão não fica presa à interação enquanto ela aguarda o Discord.
+    Uma sessão que escreveu mantém a conexão até a finalização; com `max_conexoes`
+    (o tamanho do pool), no máximo esse número de interações segura uma conexão e as
+    demais aguardam no event loop. Sem esse limite, as threads do executor ficariam
+    paradas na retirada do pool e as interações que seguram as conexões não teriam
+    thread para continuar nem para finalizar (impasse até o pool_timeout).
+    """
+    def __init__(self, sessao_escopada: scoped_session, executor_banco, max_conexoes: Optional[int] = None):
+        self.sessao_escopada = sessao_escopada
+        self.executor_banco = executor_banco
+        self.vagas = asyncio.Semaphore(max_conexoes) if max_conexoes else None
+
+    @asynccontextmanager
+    async def __call__(self, somente_leitura: bool = False):
+        escopo = _EscopoAtivo(self)
+        token = _escopo_atual.set(escopo)
+        resultado = ResultadoEscopo()
+        try:
+            with leitura_replica(somente_leitura):
+                try:
+                    yield resultado
+                except BaseException:
+                    await self._finalizar_se_aberta(escopo, sucesso=False)
+                    raise
+                await self._finalizar_se_aberta(escopo, sucesso=not resultado.falhou)
+        finally:
+            _escopo_atual.reset(token)
+
+    async def _finalizar_se_aberta(self, escopo: _EscopoAtivo, sucesso: bool) -> None:
+        try:
+            # Interações que não tocaram o banco (ex: autocomplete servido de cache) não pagam a ida ao executor
+            if self.sessao_escopada.registry.has():
+                await self.executor_banco.executar(_finalizar, self.sessao_escopada, sucesso)
+        finally:
+            escopo.liberar_vaga()
@@ -2,30 +2,27 @@ import datetime
 import random
 from ostervalt.nucleo.repositorios import RepositorioPersonagens
 from ostervalt.nucleo.entidades.personagem import Personagem
-from ostervalt.nucleo.utilitarios import verificar_cooldown, executar_logica_crime
+from ostervalt.nucleo.utilitarios import executar_logica_crime, mensagem_cooldown
+from ostervalt.nucleo.resultado_pendente import encadear
 from ostervalt.infraestrutura.configuracao.configuracao import Configuracao # Importa a classe do módulo
 from .dtos import ResultadoCrimeDTO
 
 class CometerCrime:
-    def __init__(self, repositorio_personagens: RepositorioPersonagens, configuracao: Configuracao):
+    def __init__(self, repositorio_personagens: RepositorioPersonagens, configuracao: Configuracao, tabela_cooldowns=None):
         self.repositorio_personagens = repositorio_personagens
         self.configuracao = configuracao
+        self.tabela_cooldowns = tabela_cooldowns # Opcional: recusa tentativas em cooldown sem ir ao banco
 
     def executar(self, personagem_id: int, tempo_atual=None) -> ResultadoCrimeDTO: # Adicionado tempo_atual como argumento opcional
-        personagem = self.repositorio_personagens.obter_por_id(personagem_id)
-        if not personagem:
-            raise ValueError(f"Personagem com ID {personagem_id} não encontrado.")
-
         intervalo_crime = self.configuracao.obter("limites").get("intervalo_crime")
-        ultimo_crime = personagem.ultimo_crime
         if tempo_atual is None: # Se tempo_atual não foi passado, usa datetime.now()
             tempo_atual = datetime.datetime.now()
 
-        if not verificar_cooldown(ultimo_crime, intervalo_crime, tempo_atual): # Passar tempo_atual posicionalmente
-            delta = tempo_atual - ultimo_crime # Calcular delta aqui
-            tempo_restante = intervalo_crime - delta.total_seconds()
-            tempo_restante_formatado = datetime.timedelta(seconds=tempo_restante)
-            raise ValueError(f"Ação de crime está em cooldown. Tempo restante: {tempo_restante_formatado}.") # Melhorar mensagem de erro
+        # A maior parte das chamadas de /crime é recusada pelo cooldown: responde sem consultar o banco
+        if self.tabela_cooldowns is not None:
+            restante = self.tabela_cooldowns.restante(personagem_id, 'crime', intervalo_crime, tempo_atual)
+            if restante:
+                raise ValueError(mensagem_cooldown('crime', restante))
 
         probabilidade_crime = self.configuracao.obter("probabilidades").get("crime") or 50 # Default probability
         ganho_min_crime = 100
@@ -33,13 +30,35 @@ class CometerCrime:
         perda_min_crime = 50
         perda_max_crime = 250
 
+        # O resultado do crime não depende do estado do personagem: sorteia antes
+        # e aplica junto com a verificação de cooldown em um único UPDATE atômico
         crime_bem_sucedido, resultado_financeiro = executar_logica_crime(
             probabilidade_crime, ganho_min_crime, ganho_max_crime, perda_min_crime, perda_max_crime
         )
 
-        personagem.dinheiro += resultado_financeiro
-        personagem.ultimo_crime = tempo_atual
-        self.repositorio_personagens.atualizar(personagem) # Assuming 'atualizar' method exists
+        personagem = self.repositorio_personagens.aplicar_recompensa_com_cooldown(
+            personagem_id, 'crime', tempo_atual, intervalo_crime, delta_dinheiro=resultado_financeiro
+        )
+        # Com o buffer de escrita, o UPDATE só termina no commit do lote: o restante roda depois dele
+        return encadear(personagem, lambda personagem: self._concluir(
+            personagem_id, personagem, tempo_atual, intervalo_crime, crime_bem_sucedido, resultado_financeiro,
+        ))
+
+    def _concluir(
+        self,
+        personagem_id: int,
+        personagem: Personagem | None,
+        tempo_atual,
+        intervalo_crime: int,
+        crime_bem_sucedido: bool,
+        resultado_financeiro: int,
+    ) -> ResultadoCrimeDTO:
+        if not personagem:
+            personagem_atual = self.repositorio_personagens.obter_por_id(personagem_id)
+            if not personagem_atual:
+                raise ValueError(f"Personagem com ID {personagem_id} não encontrado.")
+            delta = tempo_atual - personagem_atual.ultimo_crime # Calcular delta aqui
+            raise ValueError(mensagem_cooldown('crime', intervalo_crime - delta.total_seconds()))
 
         mensagens_crime = self.configuracao.obter("messages").get("crime") or ["Você tentou cometer um crime..."]
         mensagem_base = random.choice(mensagens_crime)
@@ -1,4 +1,4 @@
-from ostervalt.nucleo.repositorios import RepositorioPersonagens
+from ostervalt.nucleo.repositorios import NomePersonagemEmUsoError, RepositorioPersonagens
 from ostervalt.nucleo.entidades.personagem import Personagem
 
 class CriarPersonagem:
@@ -6,6 +6,12 @@ class CriarPersonagem:
         self.repositorio_personagens = repositorio_personagens
 
     def executar(self, nome: str, usuario_id: int, servidor_id: int) -> Personagem:
+        # O nome é único por usuário (sem diferenciar acentos e maiúsculas), como no índice do banco
+        if self.repositorio_personagens.obter_por_nome(usuario_id, servidor_id, nome):
+            raise ValueError(f"Você já tem um personagem chamado '{nome}'.")
         personagem = Personagem(nome=nome, usuario_id=usuario_id, servidor_id=servidor_id)
-        self.repositorio_personagens.adicionar(personagem)
-        return personagem
\ No newline at end of file
+        try:
+            self.repositorio_personagens.adicionar(personagem)
+        except NomePersonagemEmUsoError as e: # Criado por outro /criar simultâneo depois da verificação
+            raise ValueError(f"Você já tem um personagem chamado '{nome}'.") from e
+        return personagem
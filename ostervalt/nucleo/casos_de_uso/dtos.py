@@ -46,17 +46,41 @@ class ComandoDTO:
 
 @dataclass
 class ItemInventarioDTO:
-    """DTO para um item dentro do inventário."""
+    """DTO para um item dentro do inventário, já com os dados do item mestre."""
     item_id: int
     nome_item: str
     quantidade: int
     descricao_item: str | None = None
+    raridade_item: str | None = None
+    valor_item: int | None = None
 
 @dataclass
 class InventarioDTO:
-    """DTO para o resultado do caso de uso ListarInventario."""
+    """DTO para o resultado do caso de uso ListarInventario (uma página do inventário)."""
     nome_personagem: str
     itens: list[ItemInventarioDTO]
+    total_itens: int = 0 # Itens distintos no inventário inteiro, não só nesta página
+    pagina: int = 1
+    total_paginas: int = 1
+
+@dataclass
+class ItemLojaDTO:
+    """DTO para um item à venda no estoque da loja de um servidor."""
+    estoque_id: int
+    item_id: int
+    nome_item: str
+    preco: int # preco_especifico do estoque ou, na falta dele, o valor padrão do item
+    quantidade: int
+    raridade_item: str | None = None
+    descricao_item: str | None = None
+
+@dataclass
+class PaginaLojaDTO:
+    """DTO para uma página da loja (paginação por cursor sobre o ID do estoque)."""
+    itens: list[ItemLojaDTO]
+    pagina: int = 1
+    tem_anterior: bool = False
+    tem_proxima: bool = False
 
 @dataclass
 class PersonagemDTO:
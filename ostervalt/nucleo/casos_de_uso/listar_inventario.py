@@ -1,10 +1,44 @@
+import math
+
 from ostervalt.nucleo.repositorios import RepositorioInventario
 from ostervalt.nucleo.entidades.item import ItemInventario
+from ostervalt.nucleo.casos_de_uso.dtos import InventarioDTO
 from typing import List
 
+ITENS_POR_PAGINA = 10
+
 class ListarInventario:
     def __init__(self, repositorio_inventario: RepositorioInventario):
         self.repositorio_inventario = repositorio_inventario
 
     def executar(self, personagem_id: int) -> List[ItemInventario]:
-        return self.repositorio_inventario.obter_itens(personagem_id)
\ No newline at end of file
+        return self.repositorio_inventario.obter_itens(personagem_id)
+
+    def executar_detalhado(self, personagem_id: int, nome_personagem: str, pagina: int = 1, itens_por_pagina: int = ITENS_POR_PAGINA) -> InventarioDTO:
+        """
+        Retorna uma página do inventário com nome, descrição, raridade e valor de cada item,
+        lida pelo repositório em uma única consulta.
+        """
+        pagina = max(1, pagina)
+        itens, total = self.repositorio_inventario.listar_itens_detalhados(
+            personagem_id, limite=itens_por_pagina, deslocamento=(pagina - 1) * itens_por_pagina
+        )
+        if not itens and pagina > 1:
+            # Página além do fim: o COUNT(*) OVER () não vem sem linhas, então conta à parte e lê a última página
+            total = self.repositorio_inventario.contar_itens(personagem_id)
+            pagina = self._total_paginas(total, itens_por_pagina)
+            if total:
+                itens, total = self.repositorio_inventario.listar_itens_detalhados(
+                    personagem_id, limite=itens_por_pagina, deslocamento=(pagina - 1) * itens_por_pagina
+                )
+        return InventarioDTO(
+            nome_personagem=nome_personagem,
+            itens=itens,
+            total_itens=total,
+            pagina=pagina,
+            total_paginas=self._total_paginas(total, itens_por_pagina),
+        )
+
+    @staticmethod
+    def _total_paginas(total_itens: int, itens_por_pagina: int) -> int:
+        return max(1, math.ceil(total_itens / itens_por_pagina))
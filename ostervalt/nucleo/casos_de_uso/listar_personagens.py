@@ -1,10 +1,14 @@
 from ostervalt.nucleo.repositorios import RepositorioPersonagens
 from ostervalt.nucleo.entidades.personagem import Personagem
-from typing import List
+from ostervalt.infraestrutura.persistencia.models import StatusPersonagem
+from typing import List, Optional
 
 class ListarPersonagens:
     def __init__(self, repositorio_personagens: RepositorioPersonagens):
         self.repositorio_personagens = repositorio_personagens
 
-    def executar(self, usuario_id: int, servidor_id: int) -> List[Personagem]:
+    def executar(self, usuario_id: int, servidor_id: int, nome: Optional[str] = None, status: Optional[StatusPersonagem] = None) -> List[Personagem]:
+        if nome is not None: # Só o personagem com o nome: busca de uma linha pelo índice, sem listar os demais
+            personagem = self.repositorio_personagens.obter_por_nome(usuario_id, servidor_id, nome, status=status)
+            return [personagem] if personagem else []
         return self.repositorio_personagens.listar_por_usuario(usuario_id, servidor_id)
\ No newline at end of file
@@ -2,45 +2,68 @@ import datetime
 import random
 from ostervalt.nucleo.repositorios import RepositorioPersonagens
 from ostervalt.nucleo.entidades.personagem import Personagem
-from ostervalt.nucleo.utilitarios import verificar_cooldown, calcular_recompensa_trabalho
+from ostervalt.nucleo.utilitarios import ModeloProgressao, compilar_progressao, mensagem_cooldown
+from ostervalt.nucleo.resultado_pendente import encadear
 from ostervalt.infraestrutura.configuracao.configuracao import Configuracao  # Importa a classe do módulo
 from .dtos import ResultadoTrabalhoDTO
 
 class RealizarTrabalho:
-    def __init__(self, repositorio_personagens: RepositorioPersonagens):
+    def __init__(self, repositorio_personagens: RepositorioPersonagens, tabela_cooldowns=None):
         self.repositorio_personagens = repositorio_personagens
+        self.tabela_cooldowns = tabela_cooldowns # Opcional: recusa tentativas em cooldown sem ir ao banco
 
 
     def executar(
         self,
         personagem_id: int,
         intervalo_trabalhar: int,
-        tiers_config: dict,
+        tiers_config: dict | None,
         mensagens_trabalho: list[str],
-        tempo_atual=None
+        tempo_atual=None,
+        progressao: ModeloProgressao | None = None,
     ) -> ResultadoTrabalhoDTO: # Adicionado tempo_atual como argumento opcional
-        personagem = self.repositorio_personagens.obter_por_id(personagem_id)
-        if not personagem:
-            raise ValueError(f"Personagem com ID {personagem_id} não encontrado.")
-
-        ultimo_trabalho = personagem.ultimo_trabalho
         if tempo_atual is None: # Se tempo_atual não foi passado, usa datetime.datetime.now()
             tempo_atual = datetime.datetime.now()
+        # O Cog passa a progressão já compilada do servidor; sem ela, compila a partir dos tiers
+        if progressao is None:
+            progressao = compilar_progressao(tiers_config)
 
-        if not verificar_cooldown(ultimo_trabalho, intervalo_trabalhar, tempo_atual=tempo_atual): # Passar tempo_atual para verificar_cooldown
-            # Calcular tempo restante corretamente
-            delta_segundos = (tempo_atual - ultimo_trabalho).total_seconds()
-            tempo_restante = intervalo_trabalhar - delta_segundos
-            # Formatar para hh:mm:ss (aproximado)
-            tempo_restante_formatado = str(datetime.timedelta(seconds=int(tempo_restante)))
-            raise ValueError(f"Ação de trabalho está em cooldown. Tempo restante: {tempo_restante_formatado}.")
+        if self.tabela_cooldowns is not None:
+            restante = self.tabela_cooldowns.restante(personagem_id, 'trabalho', intervalo_trabalhar, tempo_atual)
+            if restante:
+                raise ValueError(mensagem_cooldown('trabalho', restante))
 
-        nivel_personagem = personagem.nivel
-        recompensa = calcular_recompensa_trabalho(nivel_personagem, tiers_config)
+        # Cooldown e pagamento em um único UPDATE atômico; a recompensa sai do nível gravado no banco
+        personagem = self.repositorio_personagens.aplicar_recompensa_com_cooldown(
+            personagem_id,
+            'trabalho',
+            tempo_atual,
+            intervalo_trabalhar,
+            faixas_por_nivel=list(progressao.faixas_recompensa),
+        )
+        # Com o buffer de escrita, o UPDATE só termina no commit do lote: o restante roda depois dele
+        return encadear(personagem, lambda personagem: self._concluir(
+            personagem_id, personagem, tempo_atual, intervalo_trabalhar, progressao, mensagens_trabalho,
+        ))
+
+    def _concluir(
+        self,
+        personagem_id: int,
+        personagem: Personagem | None,
+        tempo_atual,
+        intervalo_trabalhar: int,
+        progressao: ModeloProgressao,
+        mensagens_trabalho: list[str],
+    ) -> ResultadoTrabalhoDTO:
+        if not personagem:
+            # Só no caminho de falha: descobre se o personagem não existe ou se está em cooldown
+            personagem_atual = self.repositorio_personagens.obter_por_id(personagem_id)
+            if not personagem_atual:
+                raise ValueError(f"Personagem com ID {personagem_id} não encontrado.")
+            delta_segundos = (tempo_atual - personagem_atual.ultimo_trabalho).total_seconds()
+            raise ValueError(mensagem_cooldown('trabalho', intervalo_trabalhar - delta_segundos))
 
-        personagem.dinheiro += recompensa
-        personagem.ultimo_trabalho = tempo_atual
-        self.repositorio_personagens.atualizar(personagem) # Assuming 'atualizar' method exists
+        recompensa = progressao.recompensa(personagem.nivel)
 
         mensagem = random.choice(mensagens_trabalho)
         
@@ -1,10 +1,17 @@
+import datetime
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 from .entidades.usuario import Usuario
 from .entidades.transacao import Transacao
 # from .entidades.relatorio import Relatorio # Removido - Entidade não encontrada
 from .entidades.personagem import Personagem
+from ostervalt.infraestrutura.persistencia.models import StatusPersonagem
 from .entidades.item import Item, ItemInventario
+from .casos_de_uso.dtos import ItemInventarioDTO
+
+class NomePersonagemEmUsoError(ValueError):
+    """O usuário já tem um personagem com esse nome no servidor (levantado por RepositorioPersonagens.adicionar)."""
+    pass
 
 class RepositorioPersonagens(ABC):
     @abstractmethod
@@ -17,14 +24,34 @@ class RepositorioPersonagens(ABC):
         """Lista todos os personagens de um usuário em um servidor."""
         pass
 
+    @abstractmethod
+    def obter_por_nome(self, usuario_id: int, servidor_id: int, nome: str, status: Optional[StatusPersonagem] = None) -> Optional[Personagem]:
+        """Obtém o personagem do usuário com o nome (sem diferenciar acentos e maiúsculas), opcionalmente só com o status."""
+        pass
+
     @abstractmethod
     def adicionar(self, personagem: Personagem) -> None:
-        """Adiciona um novo personagem ao repositório."""
+        """Adiciona um novo personagem ao repositório; NomePersonagemEmUsoError se o usuário já tem o nome."""
         pass
 
     @abstractmethod
-    def atualizar(self, personagem: Personagem) -> None:
-        """Atualiza os dados de um personagem existente."""
+    def atualizar(self, personagem: Personagem) -> Optional[Personagem]:
+        """Grava todos os dados de um personagem existente (inclusive dinheiro e cooldowns); retorna-o como gravado."""
+        pass
+
+    @abstractmethod
+    def alterar_progressao(self, personagem_id: int, marcos: int, nivel: int) -> Optional[Personagem]:
+        """Grava só os marcos e o nível; retorna o personagem atualizado, ou None se não existe."""
+        pass
+
+    @abstractmethod
+    def alterar_status(self, personagem_id: int, status: StatusPersonagem) -> Optional[Personagem]:
+        """Grava só o status; retorna o personagem atualizado, ou None se não existe."""
+        pass
+
+    @abstractmethod
+    def definir_dinheiro(self, personagem_id: int, dinheiro: int) -> Optional[Personagem]:
+        """Grava só o dinheiro (valor absoluto); retorna o personagem atualizado, ou None se não existe."""
         pass
 
     @abstractmethod
@@ -32,6 +59,28 @@ class RepositorioPersonagens(ABC):
         """Remove um personagem pelo ID."""
         pass
 
+    @abstractmethod
+    def aplicar_recompensa_com_cooldown(
+        self,
+        personagem_id: int,
+        acao: str,
+        tempo_atual: datetime.datetime,
+        intervalo_segundos: int,
+        delta_dinheiro: int = 0,
+        faixas_por_nivel: Optional[Sequence[Tuple[int, int, int]]] = None,
+    ) -> Optional[Personagem]:
+        """
+        Em uma única operação atômica: se o cooldown da ação ('trabalho' ou 'crime') expirou,
+        soma ao dinheiro o delta mais a recompensa da faixa do nível atual e registra o horário.
+        Retorna o personagem atualizado, ou None se o cooldown não expirou ou o personagem não existe.
+        """
+        pass
+
+    @abstractmethod
+    def alterar_dinheiro(self, personagem_id: int, delta: int) -> Optional[int]:
+        """Soma delta ao dinheiro do personagem de forma atômica; retorna o novo saldo, ou None se não existe."""
+        pass
+
 class RepositorioItens(ABC):
     @abstractmethod
     def obter_por_id(self, item_id: int) -> Optional[Item]:
@@ -43,6 +92,11 @@ class RepositorioItens(ABC):
         """Lista itens por raridade."""
         pass
 
+    @abstractmethod
+    def listar_por_raridades(self, raridades: Iterable[str]) -> Dict[str, List[Item]]:
+        """Lista itens de várias raridades de uma vez, agrupados por raridade."""
+        pass
+
     @abstractmethod
     def adicionar(self, item: Item) -> None:
         """Adiciona um novo item ao repositório."""
@@ -73,6 +127,20 @@ class RepositorioInventario(ABC):
     def atualizar_quantidade(self, item_id: int, personagem_id: int, quantidade: int) -> None:
         """Atualiza a quantidade de um item no inventário."""
         pass
+
+    @abstractmethod
+    def listar_itens_detalhados(self, personagem_id: int, limite: int, deslocamento: int = 0) -> Tuple[List[ItemInventarioDTO], int]:
+        """
+        Lista uma página do inventário já com nome, raridade, valor e descrição de cada item,
+        junto com o total de itens distintos do inventário.
+        """
+        pass
+
+    @abstractmethod
+    def contar_itens(self, personagem_id: int) -> int:
+        """Conta os itens distintos do inventário, com o mesmo critério de listar_itens_detalhados."""
+        pass
+
 class RepositorioUsuarios(ABC):
     @abstractmethod
     def obter_por_id(self, usuario_id: int) -> Optional[Usuario]:
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator
+
+# Verdadeiro dentro das chamadas do ProxyAssincrono, que sabe aguardar um ResultadoPendente
+_aceita_pendente: ContextVar[bool] = ContextVar("ostervalt_aceita_resultado_pendente", default=False)
+
+
+class ResultadoPendente:
+    """
+    Resultado de uma operação concluída em outra thread (ex: um UPDATE no buffer de escrita,
+    que só termina no commit do lote): o Future dessa operação e a continuação síncrona a
+    aplicar ao seu valor.
+
+    Dentro de uma chamada do ProxyAssincrono, repositórios e casos de uso devolvem o
+    ResultadoPendente em vez de bloquear a thread do executor esperando o Future: o proxy
+    o aguarda no event loop e executa a continuação de volta no executor. Fora dele
+    (scripts e testes síncronos), `adiar_ou_resolver` bloqueia até o resultado.
+    """
+    def __init__(self, futuro: Future, continuacao: Callable[[Any], Any] = lambda valor: valor):
+        self.futuro = futuro
+        self.continuacao = continuacao
+
+    def depois(self, funcao: Callable[[Any], Any]) -> "ResultadoPendente":
+        """Novo ResultadoPendente que aplica `funcao` ao resultado desta continuação."""
+        continuacao = self.continuacao
+        return ResultadoPendente(self.futuro, lambda valor: encadear(continuacao(valor), funcao))
+
+    def resolver(self) -> Any:
+        """Bloqueia a thread atual até o resultado final."""
+        resultado = self.continuacao(self.futuro.result())
+        return resultado.resolver() if isinstance(resultado, ResultadoPendente) else resultado
+
+
+def encadear(valor: Any, funcao: Callable[[Any], Any]) -> Any:
+    """Aplica `funcao` ao valor agora ou, se ele for um ResultadoPendente, quando ficar pronto."""
+    if isinstance(valor, ResultadoPendente):
+        return valor.depois(funcao)
+    return funcao(valor)
+
+
+def adiar_ou_resolver(pendente: ResultadoPendente) -> Any:
+    """Devolve o pendente a quem sabe aguardá-lo (ProxyAssincrono) ou bloqueia até o resultado."""
+    return pendente if _aceita_pendente.get() else pendente.resolver()
+
+
+@contextmanager
+def aceitando_pendentes() -> Iterator[None]:
+    """Marca o contexto atual (copiado para o executor) como capaz de aguardar um ResultadoPendente."""
+    token = _aceita_pendente.set(True)
+    try:
+        yield
+    finally:
+        _aceita_pendente.reset(token)
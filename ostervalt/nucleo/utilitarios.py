@@ -1,6 +1,11 @@
+import csv
 import datetime
+import io
+import json
 import random
 import math
+import unicodedata
+from dataclasses import dataclass
 
 def verificar_cooldown(ultimo_tempo: datetime.datetime | None, intervalo_segundos: int, tempo_atual: datetime.datetime) -> bool:
     """
@@ -41,6 +46,25 @@ def calcular_recompensa_trabalho(nivel_personagem: int, tiers_config: dict) -> i
     return 0
 
 
+def faixas_recompensa_trabalho(tiers_config: dict) -> list[tuple[int, int, int]]:
+    """
+    Converte a configuração de tiers em faixas (nivel_min, nivel_max, recompensa), na mesma
+    ordem e com as mesmas regras de calcular_recompensa_trabalho. Usada para calcular a
+    recompensa no próprio UPDATE atômico do repositório, a partir do nível gravado no banco.
+
+    Args:
+        tiers_config (dict): Dicionário de configuração dos tiers.
+
+    Returns:
+        list[tuple[int, int, int]]: Faixas de nível e a recompensa de cada uma (0 se o tier não a define).
+    """
+    faixas = []
+    for dados_tier in tiers_config.values():
+        if isinstance(dados_tier, dict) and "nivel_min" in dados_tier and "nivel_max" in dados_tier:
+            faixas.append((dados_tier["nivel_min"], dados_tier["nivel_max"], dados_tier.get("recompensa", 0)))
+    return faixas
+
+
 def executar_logica_crime(probabilidade_sucesso: int, ganho_min: int, ganho_max: int, perda_min: int, perda_max: int) -> tuple[bool, int]:
     """
     Executa a lógica para simular a ação de cometer um crime, determinando se foi bem-sucedido e o resultado financeiro.
@@ -65,6 +89,151 @@ def executar_logica_crime(probabilidade_sucesso: int, ganho_min: int, ganho_max:
         perda = random.randint(perda_min, perda_max)
         return False, -perda
 
+def mensagem_cooldown(acao: str, segundos_restantes: float) -> str:
+    """Mensagem de recusa de /trabalhar e /crime em cooldown, com o tempo restante em h:mm:ss."""
+    tempo_restante = datetime.timedelta(seconds=int(max(0, segundos_restantes)))
+    return f"Ação de {acao} está em cooldown. Tempo restante: {tempo_restante}."
+
+# --- Progressão (marcos, níveis e tiers) ---
+
+NIVEL_MAXIMO = 20
+PARTES_POR_MARCO = 16 # Os marcos são gravados em partes: 16 partes = 1 marco = 1 nível
+
+# Partes de marco ganhas por /up em cada faixa de níveis (mesmo formato de progressao.marcos_por_nivel)
+MARCOS_POR_NIVEL_PADRAO = {"1-4": 16, "5-12": 4, "13-16": 2, "17-20": 1}
+
+
+def _faixa_niveis(chave) -> range:
+    """Converte uma chave de progressao.marcos_por_nivel ("5-12" ou "7") no intervalo de níveis."""
+    texto = str(chave).strip()
+    inicio, _, fim = texto.partition("-")
+    try:
+        nivel_min, nivel_max = int(inicio), int(fim or inicio)
+    except ValueError:
+        raise ValueError(f"Faixa de níveis inválida em progressao.marcos_por_nivel: '{chave}'.") from None
+    if nivel_min < 1 or nivel_min > nivel_max:
+        raise ValueError(f"Faixa de níveis inválida em progressao.marcos_por_nivel: '{chave}'.")
+    return range(nivel_min, nivel_max + 1)
+
+
+@dataclass(frozen=True)
+class ModeloProgressao:
+    """
+    Progressão compilada de um servidor: tabelas indexadas pelo nível, montadas uma vez
+    a partir dos tiers e de progressao.marcos_por_nivel (ver compilar_progressao).
+    Recompensa, tier, ganho por /up e nível a partir das partes são consultas O(1).
+
+    Attributes:
+        tier_por_nivel: Nome do tier de cada nível até NIVEL_MAXIMO (None se nenhum tier o cobre).
+        recompensa_por_nivel: Recompensa do /trabalhar em cada nível até NIVEL_MAXIMO.
+        partes_por_up: Partes de marco ganhas por /up em cada nível (índice 0 não usado).
+        limiares: Partes acumuladas necessárias para atingir cada nível (limiares[1] == 0).
+        faixas_recompensa: Faixas (nivel_min, nivel_max, recompensa) dos tiers, para o UPDATE atômico.
+    """
+    tier_por_nivel: tuple
+    recompensa_por_nivel: tuple
+    partes_por_up: tuple
+    limiares: tuple
+    faixas_recompensa: tuple
+
+    def recompensa(self, nivel: int) -> int:
+        """Recompensa do /trabalhar para o nível (0 fora dos tiers)."""
+        if 0 <= nivel <= NIVEL_MAXIMO:
+            return self.recompensa_por_nivel[nivel]
+        # Fora da tabela (nível gravado acima do máximo): mesma regra, percorrendo as faixas
+        return next((recompensa for nivel_min, nivel_max, recompensa in self.faixas_recompensa if nivel_min <= nivel <= nivel_max), 0)
+
+    def tier(self, nivel: int) -> str | None:
+        """Nome do tier do nível, ou None (só níveis de 0 a NIVEL_MAXIMO)."""
+        return self.tier_por_nivel[nivel] if 0 <= nivel <= NIVEL_MAXIMO else None
+
+    def partes_ganhas(self, nivel: int) -> int:
+        """Partes de marco ganhas por um /up no nível (acima do máximo, as do último nível)."""
+        return self.partes_por_up[min(max(nivel, 1), NIVEL_MAXIMO)]
+
+    def nivel(self, partes: int) -> int:
+        """Nível correspondente às partes de marco acumuladas."""
+        if partes <= 0:
+            return 1
+        return min(partes // PARTES_POR_MARCO + 1, NIVEL_MAXIMO)
+
+    def aplicar_ups(self, partes: int, quantidade: int = 1) -> int:
+        """
+        Partes de marco após `quantidade` usos de /up, cada um ganhando as partes do nível
+        em que o personagem está. Salta nível a nível (no máximo NIVEL_MAXIMO iterações),
+        em vez de um /up por vez.
+        """
+        partes = max(partes, 0)
+        while quantidade > 0:
+            nivel = self.nivel(partes)
+            ganho = self.partes_por_up[nivel]
+            if nivel == NIVEL_MAXIMO:
+                return partes + quantidade * ganho
+            necessarios = -(-(self.limiares[nivel + 1] - partes) // ganho) # Ups até o próximo nível (teto da divisão)
+            usados = min(necessarios, quantidade)
+            partes += usados * ganho
+            quantidade -= usados
+        return partes
+
+    def formatar_marcos(self, partes: int) -> str:
+        """
+        Marcos para exibição. As partes só aparecem (em /16) nos níveis em que um /up
+        vale menos que um marco inteiro.
+        """
+        if not isinstance(partes, int) or partes < 0:
+            return "0 Marcos"
+        inteiros, restantes = divmod(partes, PARTES_POR_MARCO)
+        if restantes == 0 or self.partes_ganhas(self.nivel(partes)) >= PARTES_POR_MARCO:
+            return f"{inteiros} Marcos"
+        return f"{inteiros} e {restantes}/{PARTES_POR_MARCO} Marcos"
+
+
+def compilar_progressao(tiers_config: dict | None = None, marcos_por_nivel: dict | None = None) -> ModeloProgressao:
+    """
+    Monta o ModeloProgressao de um servidor.
+
+    Args:
+        tiers_config (dict | None): Tiers (nome -> nivel_min/nivel_max/recompensa). Como em
+            calcular_recompensa_trabalho, o primeiro tier que cobre o nível vence.
+        marcos_por_nivel (dict | None): progressao.marcos_por_nivel ("1-4": 16, ...). Níveis
+            não cobertos usam MARCOS_POR_NIVEL_PADRAO.
+
+    Raises:
+        ValueError: Se uma faixa de marcos_por_nivel for inválida ou o ganho não for positivo.
+    """
+    faixas = tuple(faixas_recompensa_trabalho(tiers_config or {}))
+    tier_por_nivel = [None] * (NIVEL_MAXIMO + 1)
+    recompensa_por_nivel = [0] * (NIVEL_MAXIMO + 1)
+    nomes_tiers = [nome for nome, dados in (tiers_config or {}).items()
+                   if isinstance(dados, dict) and "nivel_min" in dados and "nivel_max" in dados]
+    for nome, (nivel_min, nivel_max, recompensa) in reversed(list(zip(nomes_tiers, faixas))):
+        for nivel in range(max(nivel_min, 0), min(nivel_max, NIVEL_MAXIMO) + 1): # Em ordem reversa: o primeiro tier sobrescreve os seguintes
+            tier_por_nivel[nivel] = nome
+            recompensa_por_nivel[nivel] = recompensa
+
+    partes_por_up = [0] * (NIVEL_MAXIMO + 1)
+    for tabela in (MARCOS_POR_NIVEL_PADRAO, marcos_por_nivel or {}):
+        for chave, partes in tabela.items():
+            if int(partes) <= 0:
+                raise ValueError(f"Ganho por /up deve ser positivo em progressao.marcos_por_nivel: '{chave}'.")
+            for nivel in _faixa_niveis(chave):
+                if nivel <= NIVEL_MAXIMO:
+                    partes_por_up[nivel] = int(partes)
+
+    limiares = tuple(max(nivel - 1, 0) * PARTES_POR_MARCO for nivel in range(NIVEL_MAXIMO + 1))
+    return ModeloProgressao(
+        tier_por_nivel=tuple(tier_por_nivel),
+        recompensa_por_nivel=tuple(recompensa_por_nivel),
+        partes_por_up=tuple(partes_por_up),
+        limiares=limiares,
+        faixas_recompensa=faixas,
+    )
+
+
+# Progressão padrão (sem tiers), usada pelas funções abaixo quando o servidor não é informado
+PROGRESSAO_PADRAO = compilar_progressao()
+
+
 # Função calculate_level
 def calculate_level(marcos_val: int | float) -> int:
     """Calcula o nível com base nos marcos (assumindo marcos_val = total_partes / 16)."""
@@ -73,48 +242,108 @@ def calculate_level(marcos_val: int | float) -> int:
     return max(1, min(level, 20))
 
 # Função formatar_marcos (lógica de fração corrigida para passar nos testes)
-def formatar_marcos(marcos_partes: int) -> str:
+def formatar_marcos(marcos_partes: int, progressao: ModeloProgressao | None = None) -> str:
     """
     Formata a representação dos marcos para exibição.
 
     Args:
         marcos_partes (int): Partes de marcos.
+        progressao (ModeloProgressao | None): Progressão do servidor (padrão: PROGRESSAO_PADRAO).
 
     Returns:
         str: String formatada com a representação dos marcos.
     """
-    if not isinstance(marcos_partes, int) or marcos_partes < 0: return "0 Marcos"
-    full_marcos = marcos_partes // 16
-    remaining_parts = marcos_partes % 16
-    level = calculate_level(marcos_partes / 16.0)
-
-    if remaining_parts == 0:
-        return f"{full_marcos} Marcos"
-
-    # Testes esperam que níveis > 4 mostrem sempre /16
-    if level <= 4:
-        return f"{full_marcos} Marcos" # Níveis 1-4 não mostram partes
-    else:
-        return f"{full_marcos} e {remaining_parts}/16 Marcos"
+    return (progressao or PROGRESSAO_PADRAO).formatar_marcos(marcos_partes)
 
 
 # Função marcos_to_gain
-def marcos_to_gain(level: int) -> int:
+def marcos_to_gain(level: int, progressao: ModeloProgressao | None = None) -> int:
     """
     Determina quantos marcos um personagem ganha ao usar o comando /up.
-    A lógica de progressão está definida aqui.
+    A lógica de progressão está no ModeloProgressao (progressao.marcos_por_nivel).
 
     Args:
         level (int): Nível atual do personagem.
+        progressao (ModeloProgressao | None): Progressão do servidor (padrão: PROGRESSAO_PADRAO).
 
     Returns:
         int: Quantidade de marcos a ganhar.
     """
-    if level <= 4:
-        return 16
-    elif level <= 12:
-        return 4
-    elif level <= 16:
-        return 2
-    else: # Nível 17-20 (e acima, por segurança)
-        return 1
+    return (progressao or PROGRESSAO_PADRAO).partes_ganhas(level)
+
+def normalizar_texto(texto: str) -> str:
+    """
+    Normaliza um texto para buscas e comparações: remove acentos e ignora maiúsculas/minúsculas.
+
+    Args:
+        texto (str): Texto original (ex: "Poção de Cura").
+
+    Returns:
+        str: Texto normalizado (ex: "pocao de cura").
+    """
+    if not texto:
+        return ""
+    decomposto = unicodedata.normalize("NFKD", texto)
+    sem_acentos = "".join(c for c in decomposto if not unicodedata.combining(c))
+    return " ".join(sem_acentos.casefold().split())
+
+
+def ler_planilha_precos(conteudo: bytes, nome_arquivo: str) -> dict[str, int]:
+    """
+    Lê uma planilha de preços (CSV ou JSON) enviada como anexo no /estoque.
+
+    Formatos aceitos:
+        - CSV com cabeçalho contendo uma coluna de nome ("nome"/"name"/"item") e uma de
+          preço ("preco"/"preço"/"price"/"valor"/"value").
+        - JSON como objeto {"Nome do Item": preco} ou lista de objetos com as mesmas colunas do CSV.
+
+    Args:
+        conteudo (bytes): Conteúdo bruto do arquivo.
+        nome_arquivo (str): Nome do arquivo; a extensão define o formato.
+
+    Returns:
+        dict[str, int]: Preços indexados pelo nome normalizado do item (ver normalizar_texto).
+
+    Raises:
+        ValueError: Se o formato não for suportado, faltar alguma coluna ou algum preço for inválido.
+    """
+    texto = conteudo.decode("utf-8-sig")
+    extensao = nome_arquivo.rsplit(".", 1)[-1].lower() if "." in nome_arquivo else ""
+
+    if extensao == "json":
+        try:
+            dados = json.loads(texto)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"JSON inválido: {e}") from e
+        linhas = list(dados.items()) if isinstance(dados, dict) else [_linha_planilha(d) for d in dados]
+    elif extensao == "csv":
+        linhas = [_linha_planilha(d) for d in csv.DictReader(io.StringIO(texto))]
+    else:
+        raise ValueError("Formato de planilha não suportado. Envie um arquivo .csv ou .json.")
+
+    precos = {}
+    for nome, preco in linhas:
+        try:
+            preco_int = int(str(preco).strip())
+        except ValueError:
+            raise ValueError(f"Preço inválido para '{nome}': {preco}") from None
+        if preco_int < 0:
+            raise ValueError(f"O preço de '{nome}' não pode ser negativo.")
+        precos[normalizar_texto(str(nome))] = preco_int
+    return precos
+
+
+_COLUNAS_NOME = ("nome", "name", "item")
+_COLUNAS_PRECO = ("preco", "price", "valor", "value")
+
+
+def _linha_planilha(linha) -> tuple[str, object]:
+    """Extrai (nome, preço) de uma linha da planilha, aceitando variações de cabeçalho."""
+    if not isinstance(linha, dict):
+        raise ValueError("Cada linha da planilha deve ter as colunas de nome e preço.")
+    colunas = {normalizar_texto(str(chave)): valor for chave, valor in linha.items() if chave is not None}
+    nome = next((colunas[c] for c in _COLUNAS_NOME if colunas.get(c) not in (None, "")), None)
+    preco = next((colunas[c] for c in _COLUNAS_PRECO if colunas.get(c) not in (None, "")), None)
+    if nome is None or preco is None:
+        raise ValueError("A planilha precisa das colunas 'nome' e 'preco'.")
+    return nome, preco
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+import discord
+import pytest
+from sqlalchemy import func, select
+
+from ostervalt.benchmarks.cenarios import percentis
+from ostervalt.benchmarks.interacao_falsa import InteracaoFalsa
+from ostervalt.benchmarks.servidor_sintetico import nome_personagem, popular_catalogo, popular_servidor
+from ostervalt.infraestrutura.persistencia.models import EstoqueLojaItemModel, ItemInventarioModel, PersonagemModel
+from ostervalt.infraestrutura.persistencia.repositorio_personagens import RepositorioPersonagensSQLAlchemy
+
+
+def _contar(engine, modelo, **filtros):
+    with engine.connect() as conexao:
+        return conexao.execute(select(func.count()).select_from(modelo).filter_by(**filtros)).scalar()
+
+
+def test_servidores_sinteticos_sao_independentes_e_deterministicos(engine, sessao):
+    popular_catalogo(engine, 50)
+    primeiro = popular_servidor(engine, 1, 11, estoque=20, itens_por_personagem=3)
+    segundo = popular_servidor(engine, 2, 4, estoque=200, itens_por_personagem=3)
+
+    assert (primeiro.usuarios, primeiro.itens_inventario, primeiro.estoque) == (6, 33, 20)
+    assert segundo.estoque == 50 # Limitado ao tamanho do catálogo
+    assert _contar(engine, PersonagemModel, servidor_id=1) == 11
+    assert _contar(engine, PersonagemModel, servidor_id=2) == 4
+    assert _contar(engine, ItemInventarioModel) == 45
+    assert _contar(engine, EstoqueLojaItemModel, servidor_id=2) == 50
+
+    # O dono calculado pelo servidor sintético é quem enxerga o personagem
+    repo = RepositorioPersonagensSQLAlchemy(sessao)
+    personagens = repo.listar_por_usuario(primeiro.usuario_do_personagem(10), 1)
+    assert [p.nome for p in personagens] == [nome_personagem(10)]
+
+
+def test_popular_servidor_exige_catalogo(engine):
+    with pytest.raises(ValueError):
+        popular_servidor(engine, 1, 10)
+
+
+def test_percentis_por_posicao():
+    resultado = percentis([float(i) for i in range(1, 101)])
+
+    assert (resultado["p50"], resultado["p90"], resultado["p99"], resultado["max"]) == (50.0, 90.0, 99.0, 100.0)
+    assert resultado["media"] == 50.5
+    assert percentis([]) == {}
+
+
+@pytest.mark.asyncio
+async def test_interacao_falsa_registra_mensagens_e_falhas():
+    interacao = InteracaoFalsa(usuario_id=1, servidor_id=2)
+    await interacao.response.defer(ephemeral=True)
+    await interacao.followup.send("❌ Personagem não encontrado.", ephemeral=True)
+
+    assert interacao.response.is_done()
+    assert interacao.falhou
+    with pytest.raises(discord.InteractionResponded):
+        await interacao.response.send_message("de novo")
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+import discord
+import pytest
+import pytest_asyncio
+from discord import app_commands
+from discord.ext import commands
+
+from ostervalt.benchmarks.ambiente import simular_login
+from ostervalt.benchmarks.gerador_carga import (
+    Amostra,
+    Despachante,
+    GeradorMix,
+    RequisicaoCarga,
+    ler_trafego,
+    resumir_amostras,
+)
+from ostervalt.benchmarks.servidor_sintetico import ServidorSintetico
+from ostervalt.infraestrutura.bot_discord.definicao_bot import RPGBot
+
+
+class CogEco(commands.Cog):
+    def __init__(self):
+        self.recebidos = []
+
+    @app_commands.command(name="eco", description="Repete o personagem")
+    async def eco(self, interaction: discord.Interaction, character: str, vezes: int = 1):
+        self.recebidos.append((interaction.user.id, interaction.guild_id, character, vezes))
+        await interaction.response.defer(ephemeral=True)
+        if character == "ninguém":
+            await interaction.followup.send("❌ Personagem não encontrado.", ephemeral=True)
+            return
+        await interaction.followup.send(character * vezes, ephemeral=True)
+
+    @eco.autocomplete("character")
+    async def eco_autocomplete(self, interaction: discord.Interaction, current: str):
+        return [app_commands.Choice(name=f"{current}!", value=f"{current}!")]
+
+    @app_commands.command(name="ajustar", description="Comando com opção sem gerador")
+    async def ajustar(self, interaction: discord.Interaction, fator: float):
+        await interaction.response.send_message("ok")
+
+
+@pytest_asyncio.fixture
+async def bot():
+    bot = RPGBot(command_prefix="!", intents=discord.Intents.default())
+    simular_login(bot)
+    await bot.add_cog(CogEco())
+    yield bot
+    await bot.close()
+
+
+def _servidor():
+    return ServidorSintetico(servidor_id=5, personagens=10, estoque=0, itens_inventario=0, usuario_base=500, nomes_itens=["Espada"])
+
+
+@pytest.mark.asyncio
+async def test_despacha_comando_pela_arvore_com_opcoes_tipadas(bot):
+    despachante = Despachante(bot)
+    requisicao = RequisicaoCarga(t=0, comando="eco", usuario_id=42, servidor_id=5, opcoes={"character": "Frodo", "vezes": 2})
+
+    amostra = await despachante.despachar(requisicao)
+
+    assert bot.get_cog("CogEco").recebidos == [(42, 5, "Frodo", 2)]
+    assert not amostra.falhou and amostra.erro is None
+    assert 0 <= amostra.primeira_resposta <= amostra.latencia
+
+
+@pytest.mark.asyncio
+async def test_despacha_autocomplete_e_detecta_falhas(bot):
+    despachante = Despachante(bot)
+
+    await despachante.despachar(RequisicaoCarga(t=0, comando="eco", usuario_id=1, servidor_id=5, opcoes={"character": "Fro"}, autocomplete=True, foco="character"))
+    falha = await despachante.despachar(RequisicaoCarga(t=0, comando="eco", usuario_id=1, servidor_id=5, opcoes={"character": "ninguém"}))
+
+    assert [a.rotulo for a in despachante.amostras] == ["autocomplete:eco", "eco"]
+    assert bot.get_cog("CogEco").recebidos == [(1, 5, "ninguém", 1)] # O autocomplete não executa o comando
+    assert falha.falhou
+
+
+@pytest.mark.asyncio
+async def test_gerador_mix_usa_personagens_do_servidor_e_exige_geradores(bot):
+    gerador = GeradorMix(bot.tree, _servidor(), {"eco": 1, "autocomplete:eco": 1}, semente=3)
+    requisicoes = [gerador.proxima(t=i) for i in range(20)]
+
+    assert {r.rotulo for r in requisicoes} == {"eco", "autocomplete:eco"}
+    for requisicao in requisicoes:
+        assert "vezes" not in requisicao.opcoes # Opções opcionais ficam de fora
+        if requisicao.autocomplete:
+            assert requisicao.foco == "character"
+        else:
+            indice = int(requisicao.opcoes["character"].split()[-1])
+            assert _servidor().usuario_do_personagem(indice) == requisicao.usuario_id
+    with pytest.raises(ValueError, match="fator"):
+        GeradorMix(bot.tree, _servidor(), {"ajustar": 1})
+    with pytest.raises(ValueError, match="inexistente"):
+        GeradorMix(bot.tree, _servidor(), {"inexistente": 1})
+
+
+def test_trafego_gravado_e_relido():
+    requisicao = RequisicaoCarga(t=1.5, comando="eco", usuario_id=1, servidor_id=2, opcoes={"character": "Sam"}, autocomplete=True, foco="character")
+
+    assert ler_trafego([requisicao.para_json(), "\n"]) == [requisicao]
+
+
+def test_resumo_por_comando_com_lag():
+    amostras = [Amostra("eco", 0.010, 0.001, False), Amostra("eco", 0.030, 0.002, True), Amostra("autocomplete:eco", 0.002, 0.002, False, erro="KeyError: 'x'")]
+
+    resumo = resumir_amostras(amostras, duracao=2.0, lags=[0.0, 0.004])
+
+    assert resumo["vazao_por_s"] == 1.5
+    assert (resumo["total"], resumo["falhas"], resumo["erros"]) == (3, 1, 1)
+    assert resumo["por_comando"]["eco"]["latencia_ms"]["max"] == 30.0
+    assert resumo["lag_loop_ms"]["max"] == 4.0
+    assert resumo["exemplos_erros"] == {"KeyError: 'x'": 1}
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+import subprocess
+import sys
+
+from ostervalt.benchmarks.inicializacao import medir_inicializacao
+
+# Inicialização a frio (importações, tabelas, container e setup_hook, sem rede): ~1 s hoje.
+# Folga para máquinas de CI lentas; passar disso indica uma importação ou etapa nova cara.
+ORCAMENTO_INICIALIZACAO_SEGUNDOS = 5.0
+
+
+def test_inicializacao_a_frio_dentro_do_orcamento():
+    relatorio = medir_inicializacao()
+
+    marcos = relatorio["marcos_segundos"]
+    assert list(marcos) == ["criar_tabelas", "configurar_container", "setup_hook", "pronto"]
+    assert marcos["pronto"] < ORCAMENTO_INICIALIZACAO_SEGUNDOS, relatorio
+    assert "ostervalt.infraestrutura.configuracao.container" in relatorio["importacoes_segundos"]
+    assert relatorio["importtime_cumulativo_segundos"]
+
+
+def test_container_nao_importa_o_discord():
+    # Scripts, migrações e benchmarks usam o container sem o bot: o discord.py (~0,3 s) fica de fora
+    codigo = (
+        "import sys\n"
+        "import ostervalt.infraestrutura.configuracao.container\n"
+        "print(sorted(m for m in ('discord', 'aiohttp') if m in sys.modules))\n"
+    )
+    saida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, check=True).stdout
+    assert saida.strip() == "[]"
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from ostervalt.infraestrutura.configuracao.db import Base
+from ostervalt.infraestrutura.persistencia.unidade_trabalho import chave_escopo_atual
+
+
+@pytest.fixture
+def engine():
+    """Banco SQLite em memória com todas as tabelas; uma única conexão, usável de qualquer thread."""
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def sessao(engine):
+    sessao = sessionmaker(bind=engine)()
+    yield sessao
+    sessao.close()
+
+
+@pytest.fixture
+def sessao_escopada(engine):
+    """Sessão escopada por interação, como a SessaoEscopada do bot."""
+    sessao = scoped_session(sessionmaker(bind=engine), scopefunc=chave_escopo_atual)
+    yield sessao
+    sessao.remove()
@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from ostervalt.infraestrutura.bot_discord.cogs.admin_cog import AdminCog
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("dono", [True, False])
+async def test_metricas_restrito_ao_dono_do_bot(dono):
+    interaction = MagicMock()
+    interaction.client.is_owner = AsyncMock(return_value=dono)
+
+    # Administrador de um servidor qualquer não basta: as métricas são do processo inteiro
+    resultados = [await check(interaction) for check in AdminCog.metricas_comando.checks]
+
+    assert all(resultados) is dono
+    interaction.client.is_owner.assert_awaited_once_with(interaction.user)
@@ -3,8 +3,8 @@ from unittest.mock import AsyncMock, MagicMock
 from ostervalt.infraestrutura.bot_discord.cogs.item_cog import ItemCog
 from discord.ext import commands # Import necessário
 from ostervalt.nucleo.casos_de_uso.obter_item import ObterItem       # Import necessário
-from ostervalt.nucleo.casos_de_uso.listar_itens import ListarItens     # Import necessário
-from ostervalt.nucleo.casos_de_uso.dtos import ItemDTO, ListaItensDTO # Importar DTOs
+from ostervalt.nucleo.casos_de_uso.dtos import ItemDTO, ItemLojaDTO, PaginaLojaDTO # Importar DTOs
+from ostervalt.infraestrutura.persistencia.unidade_trabalho import EscopoInteracao
 
 @pytest.mark.asyncio
 async def test_ver_item_info_sucesso():
@@ -15,30 +15,55 @@ async def test_ver_item_info_sucesso():
     # Retornar um DTO válido (sem o campo 'tipo')
     item_dto_mock = ItemDTO(id=1, nome="Espada Curta", descricao="Uma espada simples.", raridade="comum", valor=50)
     caso_uso_obter_item.executar.return_value = item_dto_mock
-    caso_uso_listar_itens = AsyncMock(spec=ListarItens) # Mock para o segundo argumento
-    caso_uso_listar_itens = AsyncMock(spec=ListarItens) # Mock para o segundo argumento
     bot_mock = AsyncMock(spec=commands.Bot) # Mock do bot
-    bot_mock = AsyncMock(spec=commands.Bot) # Mock do bot
-    cog = ItemCog(bot_mock, obter_item_uc=caso_uso_obter_item, listar_itens_uc=caso_uso_listar_itens) # bot como primeiro argumento posicional
+    cog = ItemCog(bot_mock, obter_item_uc=caso_uso_obter_item, repo_estoque_loja=AsyncMock(), escopo_interacao=MagicMock()) # bot como primeiro argumento posicional
     await cog.ver_item_info.callback(cog, interaction, item_id=1) # Chamar o callback do comando
     # Verificar followup.send pois defer foi usado
     assert interaction.followup.send.called
 
+def _pagina_loja(ids, pagina=1, tem_anterior=False, tem_proxima=False):
+    itens = [ItemLojaDTO(estoque_id=i, item_id=100 + i, nome_item=f"item{i}", preco=10 * i, quantidade=1, raridade_item="common") for i in ids]
+    return PaginaLojaDTO(itens=itens, pagina=pagina, tem_anterior=tem_anterior, tem_proxima=tem_proxima)
+
+def _escopo_mock():
+    escopo = MagicMock()
+    escopo.return_value.__aenter__ = AsyncMock()
+    escopo.return_value.__aexit__ = AsyncMock(return_value=False)
+    return escopo
+
 @pytest.mark.asyncio
 async def test_ver_loja_sucesso():
     interaction = AsyncMock()
     interaction.user.id = 123
+    interaction.guild_id = 42
     interaction.response = AsyncMock()
-    caso_uso_listar_itens = AsyncMock(spec=ListarItens)
-    # Corrigir valor de retorno para ser um ListaItensDTO
-    item1_dto = ItemDTO(id=1, nome="item1", descricao="desc1", raridade="comum", valor=10)
-    item2_dto = ItemDTO(id=2, nome="item2", descricao="desc2", raridade="incomum", valor=20)
-    caso_uso_listar_itens.executar.return_value = ListaItensDTO(itens=[item1_dto, item2_dto])
+    repo_estoque_loja = AsyncMock()
+    repo_estoque_loja.listar_pagina_loja.return_value = _pagina_loja([1, 2], tem_proxima=True)
     caso_uso_obter_item = AsyncMock(spec=ObterItem) # Mock para o primeiro argumento
-    caso_uso_obter_item = AsyncMock(spec=ObterItem) # Mock para o primeiro argumento
-    bot_mock = AsyncMock(spec=commands.Bot) # Mock do bot
     bot_mock = AsyncMock(spec=commands.Bot) # Mock do bot
-    cog = ItemCog(bot_mock, obter_item_uc=caso_uso_obter_item, listar_itens_uc=caso_uso_listar_itens) # bot como primeiro argumento posicional
+    cog = ItemCog(bot_mock, obter_item_uc=caso_uso_obter_item, repo_estoque_loja=repo_estoque_loja, escopo_interacao=_escopo_mock())
     await cog.ver_loja.callback(cog, interaction) # Chamar o callback do comando
-    # Verificar followup.send pois defer foi usado
-    assert interaction.followup.send.called
\ No newline at end of file
+    # Só a primeira página é buscada; as demais, sob demanda pelos botões
+    repo_estoque_loja.listar_pagina_loja.assert_awaited_once_with(42, limite=10)
+    kwargs = interaction.followup.send.call_args.kwargs
+    assert [campo.name for campo in kwargs["embed"].fields] == ["item1 (ID: 101)", "item2 (ID: 102)"]
+    anterior, proxima = kwargs["view"].children
+    assert anterior.item.disabled and not proxima.item.disabled
+    assert proxima.custom_id == "loja:prox:2:2"
+
+@pytest.mark.asyncio
+async def test_pagina_loja_avanca_pelo_cursor_e_recomeca_se_o_estoque_mudou():
+    repo_estoque_loja = AsyncMock()
+    cog = ItemCog(AsyncMock(spec=commands.Bot), obter_item_uc=AsyncMock(), repo_estoque_loja=repo_estoque_loja, escopo_interacao=_escopo_mock())
+
+    repo_estoque_loja.listar_pagina_loja.return_value = _pagina_loja([11, 12], pagina=2, tem_anterior=True)
+    pagina = await cog.pagina_loja(42, "prox", 10, 2)
+    assert pagina.pagina == 2
+    repo_estoque_loja.listar_pagina_loja.assert_awaited_once_with(42, 10, apos_id=10, pagina=2)
+
+    # Estoque regenerado: o cursor não encontra mais nada e a loja volta à primeira página
+    repo_estoque_loja.listar_pagina_loja.reset_mock()
+    repo_estoque_loja.listar_pagina_loja.side_effect = [_pagina_loja([]), _pagina_loja([50])]
+    pagina = await cog.pagina_loja(42, "prox", 10, 2)
+    assert pagina.pagina == 1
+    assert [i.estoque_id for i in pagina.itens] == [50]
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+from contextlib import asynccontextmanager
+
+import discord
+import pytest
+import pytest_asyncio
+from discord import app_commands
+from discord.ext import commands
+from sqlalchemy import select
+
+from ostervalt.benchmarks.ambiente import simular_login
+from ostervalt.benchmarks.gerador_carga import Despachante, RequisicaoCarga
+from ostervalt.infraestrutura.bot_discord.arvore_comandos import EXTRA_SOMENTE_LEITURA
+from ostervalt.infraestrutura.bot_discord.definicao_bot import RPGBot
+from ostervalt.infraestrutura.persistencia.executor_banco import ExecutorBancoDadosSincrono
+from ostervalt.infraestrutura.persistencia.models import ItemModel
+from ostervalt.infraestrutura.persistencia.unidade_trabalho import EscopoInteracao, ResultadoEscopo
+
+
+class CogLeitura(commands.Cog):
+    @app_commands.command(name="ver", description="Só lê", extras={EXTRA_SOMENTE_LEITURA: True})
+    async def ver(self, interaction: discord.Interaction, character: str):
+        await interaction.response.send_message(character)
+
+    @app_commands.command(name="mudar", description="Escreve")
+    async def mudar(self, interaction: discord.Interaction, character: str):
+        await interaction.response.send_message(character)
+
+    @mudar.autocomplete("character")
+    async def mudar_autocomplete(self, interaction: discord.Interaction, current: str):
+        return []
+
+
+@pytest_asyncio.fixture
+async def bot():
+    bot = RPGBot(command_prefix="!", intents=discord.Intents.default())
+    simular_login(bot)
+    await bot.add_cog(CogLeitura())
+    escopos = []
+
+    @asynccontextmanager
+    async def escopo(somente_leitura=False):
+        escopos.append(somente_leitura)
+        yield ResultadoEscopo()
+
+    bot.tree.escopo_interacao = escopo
+    bot.escopos = escopos
+    yield bot
+    await bot.close()
+
+
+@pytest.mark.asyncio
+async def test_escopo_somente_leitura_para_comandos_marcados_e_autocompletes(bot):
+    despachante = Despachante(bot)
+
+    for comando, autocomplete in (("ver", False), ("mudar", False), ("mudar", True)):
+        await despachante.despachar(RequisicaoCarga(
+            t=0, comando=comando, usuario_id=1, servidor_id=2, opcoes={"character": "Frodo"},
+            autocomplete=autocomplete, foco="character" if autocomplete else None,
+        ))
+
+    assert bot.escopos == [True, False, True]
+
+
+class CogEscrita(commands.Cog):
+    def __init__(self, sessao_escopada):
+        self.sessao_escopada = sessao_escopada
+
+    @app_commands.command(name="criar", description="Cria um item e, se pedido, falha depois")
+    async def criar(self, interaction: discord.Interaction, character: str, falhar: bool = False):
+        self.sessao_escopada().add(ItemModel(nome=character, raridade="common", valor=1))
+        self.sessao_escopada().flush()
+        if falhar:
+            raise ValueError("falha depois da escrita")
+        await interaction.response.send_message("ok")
+
+
+@pytest.mark.asyncio
+async def test_comando_que_falha_desfaz_a_sessao_da_interacao(engine, sessao_escopada):
+    bot = RPGBot(command_prefix="!", intents=discord.Intents.default())
+    simular_login(bot)
+    await bot.add_cog(CogEscrita(sessao_escopada))
+    bot.tree.escopo_interacao = EscopoInteracao(sessao_escopada, ExecutorBancoDadosSincrono())
+    despachante = Despachante(bot)
+
+    for nome, falhar in (("Espada", False), ("Escudo", True)):
+        await despachante.despachar(RequisicaoCarga(
+            t=0, comando="criar", usuario_id=1, servidor_id=2, opcoes={"character": nome, "falhar": falhar},
+        ))
+
+    # O discord.py captura o ValueError (on_error); o escopo ainda assim desfaz o "Escudo"
+    with engine.connect() as conexao:
+        assert conexao.execute(select(ItemModel.nome)).scalars().all() == ["Espada"]
+    await bot.close()
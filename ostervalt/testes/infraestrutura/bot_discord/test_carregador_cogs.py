@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from ostervalt.infraestrutura.bot_discord.carregador_cogs import carregar_cogs
+
+COGS = {"AdminCog", "EconomiaCog", "InventarioCog", "ItemCog", "PersonagemCog", "UtilCog"}
+
+
+@pytest.mark.asyncio
+async def test_todos_os_cogs_recebem_as_dependencias_do_construtor():
+    bot = MagicMock()
+    bot.add_cog = AsyncMock()
+    container = MagicMock()
+    container.resolve.side_effect = lambda nome: MagicMock(name=nome)
+
+    await carregar_cogs(bot, container)
+
+    carregados = {chamada.args[0].__class__.__name__ for chamada in bot.add_cog.await_args_list}
+    assert carregados == COGS
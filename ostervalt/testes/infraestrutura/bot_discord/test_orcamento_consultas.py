@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+Orçamento de consultas SQL por comando: roda os callbacks dos Cogs com os repositórios
+e casos de uso reais sobre SQLite em memória e falha se algum comando passar do número
+de instruções declarado. Uma regressão N+1 nos repositórios aparece aqui, não em produção.
+"""
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from ostervalt.infraestrutura.bot_discord.cogs.economia_cog import EconomiaCog
+from ostervalt.infraestrutura.bot_discord.cogs.inventario_cog import InventarioCog
+from ostervalt.infraestrutura.bot_discord.cogs.item_cog import ItemCog
+from ostervalt.infraestrutura.monitoramento.consultas import OrcamentoConsultasExcedido, orcamento_consultas
+from ostervalt.infraestrutura.persistencia.cache_configuracao_servidor import CacheConfiguracaoServidor
+from ostervalt.infraestrutura.persistencia.executor_banco import ExecutorBancoDadosSincrono, ProxyAssincrono
+from ostervalt.infraestrutura.persistencia.indice_nomes_personagens import IndiceNomesPersonagens
+from ostervalt.infraestrutura.persistencia.models import EstoqueLojaItemModel, ItemInventarioModel, ItemModel
+from ostervalt.infraestrutura.persistencia.repositorio_configuracao_servidor import RepositorioConfiguracaoServidor
+from ostervalt.infraestrutura.persistencia.repositorio_estoque_loja import RepositorioEstoqueLoja
+from ostervalt.infraestrutura.persistencia.repositorio_inventario import RepositorioInventarioSQLAlchemy
+from ostervalt.infraestrutura.persistencia.repositorio_personagens import RepositorioPersonagensSQLAlchemy
+from ostervalt.infraestrutura.persistencia.tabela_cooldowns import TabelaCooldowns
+from ostervalt.nucleo.casos_de_uso.cometer_crime import CometerCrime
+from ostervalt.nucleo.casos_de_uso.listar_inventario import ListarInventario
+from ostervalt.nucleo.casos_de_uso.listar_personagens import ListarPersonagens
+from ostervalt.nucleo.casos_de_uso.realizar_trabalho import RealizarTrabalho
+from ostervalt.nucleo.entidades.personagem import Personagem
+
+USUARIO_ID = 10
+SERVIDOR_ID = 20
+
+# Comando -> máximo de instruções SQL por execução
+ORCAMENTOS = {
+    "/trabalhar": 3, # snapshot de configuração (cache frio), personagens do usuário, UPDATE atômico
+    "/crime": 2,     # personagens do usuário, UPDATE atômico
+    "/crime em cooldown": 0, # nome pelo índice dos autocompletes, recusa pela tabela de cooldowns
+    "/inventario": 2, # personagens do usuário, página do inventário com JOIN
+    "/loja": 1,      # primeira página do estoque com JOIN
+}
+
+
+@pytest.fixture
+def servicos(sessao):
+    # Vários personagens e itens: um acesso por linha estouraria o orçamento
+    for i in range(5):
+        RepositorioPersonagensSQLAlchemy(sessao).adicionar(
+            Personagem(nome=f"Personagem {i}", nivel=3, dinheiro=500, usuario_id=USUARIO_ID, servidor_id=SERVIDOR_ID)
+        )
+    for i in range(30):
+        sessao.add(ItemModel(id=i + 1, nome=f"Item {i:02d}", raridade="common", valor=10 + i, descricao="Descrição"))
+        sessao.add(ItemInventarioModel(personagem_id=1, item_id=i + 1, quantidade=1))
+        sessao.add(EstoqueLojaItemModel(servidor_id=SERVIDOR_ID, item_id=i + 1, quantidade=2))
+    sessao.commit()
+    sessao.expunge_all() # Os comandos medidos partem de uma sessão sem nada carregado
+    executor = ExecutorBancoDadosSincrono()
+    configuracao = MagicMock()
+    configuracao.obter.side_effect = lambda chave, default=None: {
+        "limites": {"intervalo_crime": 3600},
+        "probabilidades": {"crime": 50},
+        "messages": {"crime": ["Você tentou um crime."]},
+    }.get(chave, default)
+    repo_personagens = RepositorioPersonagensSQLAlchemy(sessao)
+    repo_config = RepositorioConfiguracaoServidor(sessao, cache=CacheConfiguracaoServidor())
+    yield {
+        'repo_personagens': ProxyAssincrono(repo_personagens, executor),
+        'repo_config_servidor': ProxyAssincrono(repo_config, executor),
+        'listar_personagens_uc': ProxyAssincrono(ListarPersonagens(repo_personagens), executor),
+        'realizar_trabalho_uc': ProxyAssincrono(RealizarTrabalho(repo_personagens), executor),
+        'cometer_crime_uc': ProxyAssincrono(CometerCrime(repo_personagens, configuracao), executor),
+        'listar_inventario_uc': ProxyAssincrono(ListarInventario(RepositorioInventarioSQLAlchemy(sessao)), executor),
+        'repo_estoque_loja': ProxyAssincrono(RepositorioEstoqueLoja(sessao), executor),
+    }
+
+
+def _interacao():
+    interaction = AsyncMock()
+    interaction.user.id = USUARIO_ID
+    interaction.guild_id = SERVIDOR_ID
+    return interaction
+
+
+def _economia(servicos):
+    return EconomiaCog(
+        MagicMock(),
+        realizar_trabalho_uc=servicos['realizar_trabalho_uc'],
+        cometer_crime_uc=servicos['cometer_crime_uc'],
+        obter_personagem_uc=AsyncMock(),
+        listar_personagens_uc=servicos['listar_personagens_uc'],
+        repo_config_servidor=servicos['repo_config_servidor'],
+        repo_personagens=servicos['repo_personagens'],
+    )
+
+
+def _escopo_mock():
+    escopo = MagicMock()
+    escopo.return_value.__aenter__ = AsyncMock()
+    escopo.return_value.__aexit__ = AsyncMock(return_value=False)
+    return escopo
+
+
+def _enviado(interaction) -> str:
+    """Texto ou descrição do embed enviado pelo comando (para confirmar que ele deu certo)."""
+    chamada = interaction.followup.send.call_args
+    if "embed" in chamada.kwargs:
+        embed = chamada.kwargs["embed"]
+        return embed.title or ""
+    return chamada.args[0]
+
+
+@pytest.mark.asyncio
+async def test_trabalhar_cabe_no_orcamento(engine, servicos):
+    cog = _economia(servicos)
+    interaction = _interacao()
+
+    with orcamento_consultas(engine, ORCAMENTOS["/trabalhar"], "/trabalhar"):
+        await cog.trabalhar.callback(cog, interaction, "Personagem 2")
+
+    assert "Trabalho Concluído" in _enviado(interaction)
+
+
+@pytest.mark.asyncio
+async def test_crime_cabe_no_orcamento(engine, servicos):
+    cog = _economia(servicos)
+    interaction = _interacao()
+
+    with orcamento_consultas(engine, ORCAMENTOS["/crime"], "/crime"):
+        await cog.crime.callback(cog, interaction, "Personagem 2")
+
+    assert "Crime" in _enviado(interaction)
+
+
+@pytest.mark.asyncio
+async def test_crime_em_cooldown_e_recusado_sem_consultas(engine, sessao, servicos):
+    executor = ExecutorBancoDadosSincrono()
+    tabela = TabelaCooldowns()
+    repo_personagens = RepositorioPersonagensSQLAlchemy(sessao, indice_nomes=IndiceNomesPersonagens(), tabela_cooldowns=tabela)
+    crime_uc = CometerCrime(repo_personagens, servicos['cometer_crime_uc'].alvo.configuracao, tabela_cooldowns=tabela)
+    cog = _economia({**servicos, 'repo_personagens': ProxyAssincrono(repo_personagens, executor), 'cometer_crime_uc': ProxyAssincrono(crime_uc, executor)})
+    await cog.crime.callback(cog, _interacao(), "Personagem 2") # Primeira tentativa: carrega o índice e grava o cooldown
+
+    interaction = _interacao()
+    with orcamento_consultas(engine, ORCAMENTOS["/crime em cooldown"], "/crime em cooldown"):
+        for _ in range(3):
+            await cog.crime.callback(cog, interaction, "Personagem 2")
+
+    assert "Ação de crime está em cooldown" in _enviado(interaction)
+
+
+@pytest.mark.asyncio
+async def test_inventario_cabe_no_orcamento(engine, servicos):
+    cog = InventarioCog(
+        MagicMock(),
+        listar_inventario_uc=servicos['listar_inventario_uc'],
+        adicionar_item_uc=AsyncMock(),
+        remover_item_uc=AsyncMock(),
+        listar_personagens_uc=servicos['listar_personagens_uc'],
+        repo_personagens=servicos['repo_personagens'],
+        repo_itens=AsyncMock(),
+        catalogo_itens=MagicMock(),
+    )
+    interaction = _interacao()
+
+    with orcamento_consultas(engine, ORCAMENTOS["/inventario"], "/inventario"):
+        await cog.ver_inventario.callback(cog, interaction, "Personagem 0", pagina=2)
+
+    assert "Inventário de Personagem 0" in _enviado(interaction)
+
+
+@pytest.mark.asyncio
+async def test_loja_cabe_no_orcamento(engine, servicos):
+    cog = ItemCog(MagicMock(), obter_item_uc=AsyncMock(), repo_estoque_loja=servicos['repo_estoque_loja'], escopo_interacao=_escopo_mock())
+    interaction = _interacao()
+
+    with orcamento_consultas(engine, ORCAMENTOS["/loja"], "/loja"):
+        await cog.ver_loja.callback(cog, interaction)
+
+    assert len(interaction.followup.send.call_args.kwargs["embed"].fields) == 10
+
+
+@pytest.mark.asyncio
+async def test_orcamento_excedido_lista_as_instrucoes(engine, servicos):
+    cog = _economia(servicos)
+
+    with pytest.raises(OrcamentoConsultasExcedido, match=r"/trabalhar executou 3 consultas SQL \(orçamento: 1\)") as erro:
+        with orcamento_consultas(engine, 1, "/trabalhar"):
+            await cog.trabalhar.callback(cog, _interacao(), "Personagem 2")
+
+    assert "UPDATE personagens" in str(erro.value)
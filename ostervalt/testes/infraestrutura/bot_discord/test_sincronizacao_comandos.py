@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+import discord
+import pytest
+from discord import app_commands
+
+from ostervalt.benchmarks.ambiente import simular_login
+from ostervalt.infraestrutura.bot_discord.definicao_bot import RPGBot
+from ostervalt.infraestrutura.bot_discord.sincronizacao_comandos import hash_arvore, sincronizar_se_alterada
+from ostervalt.infraestrutura.persistencia.executor_banco import ExecutorBancoDadosSincrono, ProxyAssincrono
+from ostervalt.infraestrutura.persistencia.repositorio_sincronizacao_comandos import RepositorioSincronizacaoComandos
+from ostervalt.infraestrutura.persistencia.unidade_trabalho import EscopoInteracao
+
+
+def _comando(nome: str, descricao: str) -> app_commands.Command:
+    async def callback(interaction: discord.Interaction):
+        pass
+    return app_commands.Command(name=nome, description=descricao, callback=callback)
+
+
+async def _bot(*comandos):
+    bot = RPGBot(command_prefix="!", intents=discord.Intents.default())
+    simular_login(bot)
+    for comando in comandos:
+        bot.tree.add_command(comando)
+    return bot
+
+
+@pytest.fixture
+def dependencias(sessao_escopada):
+    executor = ExecutorBancoDadosSincrono()
+    return ProxyAssincrono(RepositorioSincronizacaoComandos(sessao_escopada), executor), EscopoInteracao(sessao_escopada, executor)
+
+
+@pytest.mark.asyncio
+async def test_hash_independe_da_ordem_e_muda_com_os_comandos():
+    bot_a = await _bot(_comando("trabalhar", "Trabalha"), _comando("crime", "Comete um crime"))
+    bot_b = await _bot(_comando("crime", "Comete um crime"), _comando("trabalhar", "Trabalha"))
+    bot_c = await _bot(_comando("crime", "Comete um crime"), _comando("trabalhar", "Trabalha duro"))
+
+    assert await hash_arvore(bot_a.tree) == await hash_arvore(bot_b.tree)
+    assert await hash_arvore(bot_a.tree) != await hash_arvore(bot_c.tree)
+    assert await hash_arvore(bot_a.tree) != await hash_arvore(bot_a.tree, guild=discord.Object(id=1)) # Sem comandos no servidor
+
+    bot_a._connection.application_id += 1 # Outra aplicação (outro token)
+    assert await hash_arvore(bot_a.tree) != await hash_arvore(bot_b.tree)
+    for bot in (bot_a, bot_b, bot_c):
+        await bot.close()
+
+
+@pytest.mark.asyncio
+async def test_sincroniza_so_quando_a_arvore_muda(dependencias, monkeypatch):
+    repo, escopo = dependencias
+    bot = await _bot(_comando("trabalhar", "Trabalha"))
+    chamadas = []
+
+    async def sync_falso(guild=None):
+        chamadas.append(guild)
+        return bot.tree.get_commands(guild=guild)
+    monkeypatch.setattr(bot.tree, "sync", sync_falso)
+
+    assert len(await sincronizar_se_alterada(bot.tree, repo, escopo)) == 1
+    assert await sincronizar_se_alterada(bot.tree, repo, escopo) is None # Reinício sem mudanças
+    assert len(chamadas) == 1
+
+    bot.tree.add_command(_comando("crime", "Comete um crime"))
+    assert len(await sincronizar_se_alterada(bot.tree, repo, escopo)) == 2
+    assert await sincronizar_se_alterada(bot.tree, repo, escopo, forcar=True) is not None
+
+    # O hash de cada servidor é guardado à parte do global
+    servidor = discord.Object(id=42)
+    assert await sincronizar_se_alterada(bot.tree, repo, escopo, guild=servidor) == []
+    assert await sincronizar_se_alterada(bot.tree, repo, escopo, guild=servidor) is None
+    assert await sincronizar_se_alterada(bot.tree, repo, escopo) is None
+    assert chamadas == [None, None, None, servidor]
+    await bot.close()
+
+
+@pytest.mark.asyncio
+async def test_falha_na_sincronizacao_nao_guarda_o_hash(dependencias, monkeypatch):
+    repo, escopo = dependencias
+    bot = await _bot(_comando("trabalhar", "Trabalha"))
+
+    async def sync_com_falha(guild=None):
+        raise RuntimeError("429 Too Many Requests")
+    monkeypatch.setattr(bot.tree, "sync", sync_com_falha)
+
+    with pytest.raises(RuntimeError):
+        await sincronizar_se_alterada(bot.tree, repo, escopo)
+    assert await repo.obter_hash("global") is None
+    await bot.close()
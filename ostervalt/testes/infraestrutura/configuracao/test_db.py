@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+from ostervalt.infraestrutura.configuracao.db import _opcoes_engine, conexoes_maximas
+
+
+def test_pool_padrao_por_banco():
+    sqlite = _opcoes_engine("sqlite:///./ostervalt.db")
+    postgres = _opcoes_engine("postgresql://usuario@localhost/ostervalt")
+
+    assert sqlite["connect_args"] == {"check_same_thread": False}
+    assert (sqlite["pool_size"], sqlite["max_overflow"]) == (5, 5) # Limitado: cada conexão tem o seu cache de páginas
+    assert (postgres["pool_size"], postgres["max_overflow"], postgres["pool_recycle"], postgres["pool_pre_ping"]) == (10, 20, 1800, True)
+    assert _opcoes_engine("sqlite:///:memory:") == {"connect_args": {"check_same_thread": False}}
+
+
+def test_pool_ajustavel_por_variaveis_de_ambiente(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "40")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "0")
+    monkeypatch.setenv("DB_POOL_TIMEOUT", "2.5")
+    monkeypatch.setenv("DB_POOL_RECYCLE", "300")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "false")
+
+    opcoes = _opcoes_engine("postgresql://usuario@localhost/ostervalt")
+
+    assert opcoes == {"pool_size": 40, "max_overflow": 0, "pool_timeout": 2.5, "pool_recycle": 300, "pool_pre_ping": False}
+
+
+def test_conexoes_maximas_do_pool():
+    assert conexoes_maximas(_opcoes_engine("postgresql://usuario@localhost/ostervalt")) == 30
+    assert conexoes_maximas(_opcoes_engine("sqlite:///./ostervalt.db")) == 10
+    assert conexoes_maximas(_opcoes_engine("sqlite:///:memory:")) is None
+    assert conexoes_maximas({"pool_size": 5, "max_overflow": -1}) is None
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+
+from ostervalt.infraestrutura.configuracao.perfil_sqlite import (
+    PerfilSQLite,
+    TarefaManutencaoSQLite,
+    aplicar_perfil_sqlite,
+    manutencao_sqlite,
+)
+from ostervalt.infraestrutura.persistencia.executor_banco import ExecutorBancoDadosSincrono
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'perfil.db'}")
+    yield engine
+    engine.dispose()
+
+
+def _pragma(engine, nome):
+    with engine.connect() as conexao:
+        return conexao.exec_driver_sql(f"PRAGMA {nome}").scalar()
+
+
+def test_perfil_padrao_e_aplicado_em_cada_conexao_nova(engine):
+    with engine.connect() as conexao: # Aberta antes do perfil: é descartada do pool
+        conexao.exec_driver_sql("CREATE TABLE t (x INTEGER)")
+
+    assert aplicar_perfil_sqlite(engine, PerfilSQLite())
+
+    assert _pragma(engine, "journal_mode") == "wal"
+    assert _pragma(engine, "synchronous") == 1 # NORMAL
+    assert _pragma(engine, "busy_timeout") == 5000
+    assert _pragma(engine, "cache_size") == -65536
+    assert _pragma(engine, "temp_store") == 2 # MEMORY
+    assert _pragma(engine, "mmap_size") == 268435456
+
+
+def test_perfil_lido_do_config_e_reaplicado_sem_duplicar_o_evento(engine):
+    aplicar_perfil_sqlite(engine, PerfilSQLite())
+    eventos_connect = len(engine.pool.dispatch.connect)
+    perfil = PerfilSQLite.de_configuracao({"journal_mode": "DELETE", "busy_timeout_ms": "250", "manutencao": {"intervalo_segundos": 60}})
+
+    aplicar_perfil_sqlite(engine, perfil)
+
+    assert (perfil.journal_mode, perfil.busy_timeout_ms, perfil.synchronous) == ("delete", 250, "normal")
+    assert _pragma(engine, "journal_mode") == "delete"
+    assert _pragma(engine, "busy_timeout") == 250
+    assert len(engine.pool.dispatch.connect) == eventos_connect
+
+
+def test_valores_invalidos_sao_recusados():
+    with pytest.raises(ValueError, match="synchronous"):
+        PerfilSQLite(synchronous="normal; DROP TABLE personagens")
+    with pytest.raises(ValueError):
+        PerfilSQLite(cache_size="muito")
+
+
+def test_manutencao_faz_checkpoint_do_wal(engine):
+    aplicar_perfil_sqlite(engine, PerfilSQLite())
+    with engine.begin() as conexao:
+        conexao.exec_driver_sql("CREATE TABLE t (x INTEGER)")
+        conexao.exec_driver_sql("INSERT INTO t VALUES (1)")
+
+    resultado = manutencao_sqlite(engine, "truncate")
+
+    assert resultado["ocupado"] is False
+    assert resultado["paginas_wal"] == resultado["paginas_copiadas"]
+    with pytest.raises(ValueError, match="checkpoint"):
+        manutencao_sqlite(engine, "agressivo")
+
+
+@pytest.mark.asyncio
+async def test_tarefa_periodica_roda_no_executor_ate_ser_parada(engine):
+    aplicar_perfil_sqlite(engine, PerfilSQLite())
+    tarefa = TarefaManutencaoSQLite(engine, ExecutorBancoDadosSincrono(), intervalo_segundos=0.01)
+    execucoes = []
+    executar_original = tarefa.executar_agora
+
+    async def contar():
+        execucoes.append(await executar_original())
+
+    tarefa.executar_agora = contar
+    tarefa.iniciar()
+    await asyncio.sleep(0.1)
+    await tarefa.parar()
+    quantidade = len(execucoes)
+    await asyncio.sleep(0.05)
+
+    assert quantidade >= 1
+    assert len(execucoes) == quantidade
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+import pytest
+from sqlalchemy import text
+
+from ostervalt.infraestrutura.monitoramento.consultas import (
+    OrcamentoConsultasExcedido,
+    contar_consultas,
+    instrumentar_engine,
+    orcamento_consultas,
+)
+from ostervalt.infraestrutura.monitoramento.metricas import RegistroMetricas
+
+
+@pytest.mark.asyncio
+async def test_consulta_lenta_vai_para_o_log_com_parametros(engine, capsys):
+    instrumentar_engine(engine, limite_consulta_lenta=0)
+
+    async with RegistroMetricas().medir("trabalhar") as medicao:
+        with engine.connect() as conexao:
+            conexao.execute(text("SELECT :valor"), {"valor": 42})
+
+    saida = capsys.readouterr().out
+    assert "Consulta lenta" in saida
+    assert "trabalhar" in saida
+    assert "SELECT ?" in saida and "42" in saida
+    assert medicao.consultas == 1
+    assert medicao.tempo_sql > 0
+
+
+def test_consultas_rapidas_nao_vao_para_o_log(engine, capsys):
+    instrumentar_engine(engine, limite_consulta_lenta=60)
+    with engine.connect() as conexao:
+        conexao.execute(text("SELECT 1"))
+
+    assert "Consulta lenta" not in capsys.readouterr().out
+
+
+def test_contador_so_conta_dentro_do_bloco(engine):
+    with engine.connect() as conexao:
+        with contar_consultas(engine) as contador:
+            conexao.execute(text("SELECT 1"))
+            conexao.execute(text("SELECT 2"))
+        conexao.execute(text("SELECT 3"))
+
+    assert contador.total == 2
+    assert [sql for sql, _ in contador.instrucoes] == ["SELECT 1", "SELECT 2"]
+
+
+def test_orcamento_excedido_falha_com_as_instrucoes(engine):
+    with pytest.raises(OrcamentoConsultasExcedido) as erro:
+        with orcamento_consultas(engine, 1, "/saldo"), engine.connect() as conexao:
+            conexao.execute(text("SELECT 1"))
+            conexao.execute(text("SELECT 2"))
+
+    assert "/saldo executou 2 consultas SQL (orçamento: 1)" in str(erro.value)
+    assert "2. SELECT 2" in str(erro.value)
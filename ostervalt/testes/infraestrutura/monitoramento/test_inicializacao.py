@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+from ostervalt.infraestrutura.monitoramento.inicializacao import RelatorioInicializacao, importacoes_por_modulo
+
+
+def test_etapas_e_marcos():
+    relatorio = RelatorioInicializacao()
+    relatorio.importar(["json"])
+    with relatorio.etapa("container"):
+        pass
+
+    assert relatorio.marcar("pronto")
+    assert not relatorio.marcar("pronto") # on_ready repetido (reconexão) não conta de novo
+    resumo = relatorio.resumo()
+    assert set(resumo["importacoes_segundos"]) == {"json"}
+    assert set(resumo["etapas_segundos"]) == {"container"}
+    assert list(resumo["marcos_segundos"]) == ["container", "pronto"]
+    assert "pronto" in relatorio.formatar()
+
+
+def test_importacoes_por_modulo_le_a_saida_do_importtime():
+    saida = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   _json\n"
+        "import time:      1500 |       1620 | json\n"
+        "Aviso qualquer no stderr\n"
+    )
+    assert importacoes_por_modulo(saida) == {"_json": 0.00012, "json": 0.00162}
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+import pytest
+import discord
+from types import SimpleNamespace
+from aiohttp.test_utils import TestClient, TestServer
+from sqlalchemy import text
+
+from ostervalt.infraestrutura.monitoramento.metricas import (
+    Histograma,
+    RegistroMetricas,
+    nome_interacao,
+    registrar_resposta,
+    registrar_tempo_discord,
+)
+from ostervalt.infraestrutura.monitoramento.consultas import instrumentar_engine
+from ostervalt.infraestrutura.monitoramento.servidor_metricas import criar_app_metricas
+from ostervalt.infraestrutura.persistencia.executor_banco import ExecutorBancoDados
+
+
+class Relogio:
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+
+def test_quantis_interpolam_dentro_do_balde():
+    histograma = Histograma((0.1, 0.2, 0.5))
+    for valor in [0.05] * 50 + [0.15] * 49 + [0.4]:
+        histograma.observar(valor)
+
+    assert histograma.quantil(0.5) == pytest.approx(0.1)
+    assert 0.1 < histograma.quantil(0.99) <= 0.2
+    assert Histograma((1,)).quantil(0.5) is None
+
+
+def test_valores_acima_do_ultimo_balde_reportam_o_ultimo_limite():
+    histograma = Histograma((0.1, 0.2))
+    histograma.observar(30)
+    assert histograma.quantil(0.99) == 0.2
+
+
+@pytest.mark.asyncio
+async def test_medicao_registra_tempos_e_consultas_da_interacao(engine):
+    relogio = Relogio()
+    registro = RegistroMetricas(timer=relogio)
+    instrumentar_engine(engine)
+    executor = ExecutorBancoDados()
+
+    def consultar():
+        with engine.connect() as conexao:
+            conexao.execute(text("SELECT 1"))
+            conexao.execute(text("SELECT 2"))
+
+    try:
+        async with registro.medir("trabalhar") as medicao:
+            await executor.executar(consultar)
+            registrar_tempo_discord(0.2)
+            relogio.agora = 0.03
+            registrar_resposta(timer=relogio)
+            relogio.agora = 0.5
+    finally:
+        executor.encerrar()
+
+    assert medicao.consultas == 2
+    assert medicao.tempo_banco > 0
+    resumo = registro.resumo()["trabalhar"]
+    assert resumo["consultas_sql"]["p50"] == pytest.approx(2, abs=1)
+    assert resumo["duracao_segundos"]["total"] == 1
+    assert 0.25 < resumo["duracao_segundos"]["p50"] <= 0.5
+    assert 0.025 < resumo["latencia_resposta_segundos"]["p50"] <= 0.05
+    assert 0.1 < resumo["tempo_discord_segundos"]["p50"] <= 0.25
+
+
+@pytest.mark.asyncio
+async def test_consultas_fora_de_interacao_nao_sao_contadas(engine):
+    registro = RegistroMetricas()
+    instrumentar_engine(engine)
+    with engine.connect() as conexao:
+        conexao.execute(text("SELECT 1"))
+
+    async with registro.medir("saldo") as medicao:
+        pass
+
+    assert medicao.consultas == 0
+
+
+def test_formato_prometheus_tem_baldes_cumulativos():
+    registro = RegistroMetricas()
+    registro.observar("duracao_segundos", 'crime "raro"', 0.003)
+    registro.observar("duracao_segundos", 'crime "raro"', 0.3)
+
+    texto = registro.formato_prometheus()
+
+    assert "# TYPE ostervalt_duracao_segundos histogram" in texto
+    assert 'ostervalt_duracao_segundos_bucket{comando="crime \\"raro\\"",le="0.005"} 1' in texto
+    assert 'ostervalt_duracao_segundos_bucket{comando="crime \\"raro\\"",le="+Inf"} 2' in texto
+    assert 'ostervalt_duracao_segundos_count{comando="crime \\"raro\\""} 2' in texto
+
+
+def test_nome_interacao_inclui_subcomandos_e_marca_autocomplete():
+    comando = SimpleNamespace(
+        type=discord.InteractionType.application_command,
+        data={"name": "personagem", "options": [{"type": 1, "name": "criar", "options": [{"type": 3, "name": "nome"}]}]},
+    )
+    autocomplete = SimpleNamespace(type=discord.InteractionType.autocomplete, data={"name": "inventario"})
+
+    assert nome_interacao(comando) == "personagem criar"
+    assert nome_interacao(autocomplete) == "autocomplete:inventario"
+
+
+@pytest.mark.asyncio
+async def test_endpoint_expoe_metricas():
+    registro = RegistroMetricas()
+    registro.observar("consultas_sql", "loja", 1)
+
+    async with TestClient(TestServer(criar_app_metricas(registro))) as cliente:
+        resposta = await cliente.get("/metrics")
+        corpo = await resposta.text()
+
+    assert resposta.status == 200
+    assert resposta.headers["Content-Type"].startswith("text/plain")
+    assert 'ostervalt_consultas_sql_count{comando="loja"} 1' in corpo
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+import datetime
+import gzip
+import json
+import pytest
+from sqlalchemy import select
+
+from ostervalt.infraestrutura.persistencia.backup_servidor import BackupInvalidoError, BackupServidor
+from ostervalt.infraestrutura.persistencia.cache_configuracao_servidor import CacheConfiguracaoServidor
+from ostervalt.infraestrutura.persistencia.models import (
+    ConfiguracaoServidorModel,
+    EstoqueLojaItemModel,
+    ItemInventarioModel,
+    ItemModel,
+    PersonagemModel,
+    StatusPersonagem,
+)
+
+SERVIDOR_ID = 1
+OUTRO_SERVIDOR_ID = 2
+ULTIMO_TRABALHO = datetime.datetime(2025, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def dados(sessao):
+    espada = ItemModel(nome="Espada", raridade="common", valor=10)
+    sessao.add(espada)
+    sessao.flush()
+    for i in range(5):
+        personagem = PersonagemModel(
+            nome=f"Personagem {i}", usuario_id=100 + i, servidor_id=SERVIDOR_ID, dinheiro=i * 10,
+            ultimo_trabalho=ULTIMO_TRABALHO, status=StatusPersonagem.APOSENTADO if i == 4 else StatusPersonagem.ATIVO,
+        )
+        sessao.add(personagem)
+        sessao.flush()
+        sessao.add(ItemInventarioModel(personagem_id=personagem.id, item_id=espada.id, quantidade=i + 1))
+    sessao.add(PersonagemModel(nome="Intruso", usuario_id=999, servidor_id=OUTRO_SERVIDOR_ID))
+    sessao.add(EstoqueLojaItemModel(servidor_id=SERVIDOR_ID, item_id=espada.id, quantidade=3, preco_especifico=15))
+    sessao.add(ConfiguracaoServidorModel(servidor_id=SERVIDOR_ID, chave="tiers", valor='{"t1": {}}'))
+    sessao.commit()
+    return espada
+
+
+def _estado(sessao, servidor_id):
+    """Dados do servidor sem IDs de personagem, para comparar antes e depois da restauração."""
+    personagens = sessao.execute(
+        select(PersonagemModel.nome, PersonagemModel.usuario_id, PersonagemModel.dinheiro,
+               PersonagemModel.ultimo_trabalho, PersonagemModel.status)
+        .where(PersonagemModel.servidor_id == servidor_id).order_by(PersonagemModel.nome)
+    ).all()
+    inventarios = sessao.execute(
+        select(PersonagemModel.nome, ItemInventarioModel.item_id, ItemInventarioModel.quantidade)
+        .join(PersonagemModel, PersonagemModel.id == ItemInventarioModel.personagem_id)
+        .where(PersonagemModel.servidor_id == servidor_id).order_by(PersonagemModel.nome)
+    ).all()
+    estoque = sessao.execute(
+        select(EstoqueLojaItemModel.item_id, EstoqueLojaItemModel.quantidade, EstoqueLojaItemModel.preco_especifico)
+        .where(EstoqueLojaItemModel.servidor_id == servidor_id)
+    ).all()
+    configuracoes = sessao.execute(
+        select(ConfiguracaoServidorModel.chave, ConfiguracaoServidorModel.valor)
+        .where(ConfiguracaoServidorModel.servidor_id == servidor_id)
+    ).all()
+    return personagens, inventarios, estoque, configuracoes
+
+
+def test_exporta_ndjson_comprimido_apenas_do_servidor(sessao, dados, tmp_path):
+    caminho = str(tmp_path / "backup.ndjson.gz")
+
+    resumo = BackupServidor(sessao, tamanho_lote=2).exportar(SERVIDOR_ID, caminho)
+
+    assert resumo.contagens == {"configuracao": 1, "estoque": 1, "personagem": 5, "inventario": 5}
+    assert resumo.tamanho_comprimido > 0
+    with gzip.open(caminho, "rt", encoding="utf-8") as arquivo:
+        registros = [json.loads(linha) for linha in arquivo]
+    assert registros[0]["tipo"] == "cabecalho"
+    assert [r["tipo"] for r in registros[1:]] == ["configuracao", "estoque"] + ["personagem"] * 5 + ["inventario"] * 5
+    assert "Intruso" not in {r["dados"].get("nome") for r in registros}
+
+
+def test_restauracao_reproduz_os_dados_exportados(sessao, dados, tmp_path):
+    caminho = str(tmp_path / "backup.ndjson.gz")
+    backup = BackupServidor(sessao, tamanho_lote=2) # Lotes pequenos para cruzar limites de lote
+    antes = _estado(sessao, SERVIDOR_ID)
+    backup.exportar(SERVIDOR_ID, caminho)
+
+    resumo = backup.importar(SERVIDOR_ID, caminho)
+
+    assert resumo.contagens["personagem"] == 5
+    assert _estado(sessao, SERVIDOR_ID) == antes
+    assert sessao.execute(select(PersonagemModel.nome).where(PersonagemModel.servidor_id == OUTRO_SERVIDOR_ID)).scalars().all() == ["Intruso"]
+
+
+def test_restaura_em_outro_servidor_com_novos_ids(sessao, dados, tmp_path):
+    caminho = str(tmp_path / "backup.ndjson.gz")
+    backup = BackupServidor(sessao, tamanho_lote=3)
+    backup.exportar(SERVIDOR_ID, caminho)
+
+    backup.importar(OUTRO_SERVIDOR_ID, caminho)
+
+    assert _estado(sessao, OUTRO_SERVIDOR_ID) == _estado(sessao, SERVIDOR_ID)
+    ids_origem = set(sessao.execute(select(PersonagemModel.id).where(PersonagemModel.servidor_id == SERVIDOR_ID)).scalars())
+    ids_destino = set(sessao.execute(select(PersonagemModel.id).where(PersonagemModel.servidor_id == OUTRO_SERVIDOR_ID)).scalars())
+    assert ids_origem.isdisjoint(ids_destino)
+
+
+def test_backup_invalido_nao_altera_dados(sessao, dados, tmp_path):
+    caminho = tmp_path / "backup.ndjson.gz"
+    with gzip.open(caminho, "wt", encoding="utf-8") as arquivo:
+        arquivo.write(json.dumps({"tipo": "cabecalho", "dados": {"versao": 1}}) + "\n")
+        arquivo.write(json.dumps({"tipo": "personagem", "dados": {"nome": "Sem ID"}}) + "\n")
+    antes = _estado(sessao, SERVIDOR_ID)
+
+    with pytest.raises(BackupInvalidoError):
+        BackupServidor(sessao).importar(SERVIDOR_ID, str(caminho))
+
+    assert _estado(sessao, SERVIDOR_ID) == antes
+
+
+def test_restauracao_invalida_cache_de_configuracoes(sessao, dados, tmp_path):
+    caminho = str(tmp_path / "backup.ndjson.gz")
+    cache = CacheConfiguracaoServidor()
+    backup = BackupServidor(sessao, cache_config=cache)
+    backup.exportar(SERVIDOR_ID, caminho)
+    geracao = cache.geracao(SERVIDOR_ID)
+
+    backup.importar(SERVIDOR_ID, caminho)
+
+    assert cache.geracao(SERVIDOR_ID) != geracao
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import datetime
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import create_engine, event, select, text, update
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+from ostervalt.infraestrutura.configuracao.db import Base
+from ostervalt.infraestrutura.persistencia.backup_servidor import BackupServidor
+from ostervalt.infraestrutura.persistencia.buffer_escrita import BufferEscrita, BufferEscritaEncerradoError
+from ostervalt.infraestrutura.persistencia.executor_banco import ExecutorBancoDados, ProxyAssincrono
+from ostervalt.infraestrutura.persistencia.models import PersonagemModel
+from ostervalt.infraestrutura.persistencia.repositorio_personagens import RepositorioPersonagensSQLAlchemy
+from ostervalt.infraestrutura.persistencia.unidade_trabalho import EscopoInteracao, chave_escopo_atual
+from ostervalt.nucleo.entidades.personagem import Personagem
+
+AGORA = datetime.datetime(2025, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    # Arquivo (e não :memory:): a thread do buffer usa sua própria conexão, como no bot
+    engine = create_engine(f"sqlite:///{tmp_path / 'buffer.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def fabrica(engine):
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture
+def personagens(fabrica):
+    with fabrica() as sessao:
+        modelos = [PersonagemModel(nome=f"P{i}", usuario_id=i, servidor_id=1, dinheiro=0) for i in range(20)]
+        sessao.add_all(modelos)
+        sessao.commit()
+        return [modelo.id for modelo in modelos]
+
+
+def _somar(personagem_id, valor):
+    def operacao(sessao):
+        return sessao.execute(
+            update(PersonagemModel).where(PersonagemModel.id == personagem_id)
+            .values(dinheiro=PersonagemModel.dinheiro + valor)
+            .returning(PersonagemModel.dinheiro)
+        ).scalar_one()
+    return operacao
+
+
+def _contar_commits(engine):
+    commits = []
+    event.listen(engine, "commit", lambda conexao: commits.append(1))
+    return commits
+
+
+def test_escritas_simultaneas_sao_gravadas_em_um_unico_commit(engine, fabrica, personagens):
+    buffer = BufferEscrita(fabrica, janela_segundos=0.2)
+    commits = _contar_commits(engine)
+    resultados = {}
+    barreira = threading.Barrier(len(personagens))
+
+    def escrever(personagem_id):
+        barreira.wait()
+        resultados[personagem_id] = buffer.executar(_somar(personagem_id, 10))
+
+    threads = [threading.Thread(target=escrever, args=(personagem_id,)) for personagem_id in personagens]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    buffer.encerrar()
+
+    assert resultados == {personagem_id: 10 for personagem_id in personagens}
+    assert (buffer.lotes, buffer.operacoes, len(commits)) == (1, len(personagens), 1)
+
+
+def test_resultado_so_e_entregue_apos_o_commit(engine, fabrica, personagens):
+    buffer = BufferEscrita(fabrica)
+
+    buffer.executar(_somar(personagens[0], 5))
+
+    # Lido em uma conexão nova, sem passar pelo buffer: a escrita já está no banco
+    with engine.connect() as conexao:
+        assert conexao.execute(select(PersonagemModel.dinheiro).where(PersonagemModel.id == personagens[0])).scalar_one() == 5
+    buffer.encerrar()
+
+
+def test_falha_de_uma_operacao_nao_desfaz_as_demais_do_lote(fabrica, personagens):
+    buffer = BufferEscrita(fabrica, janela_segundos=0.2)
+
+    def falhar(sessao):
+        sessao.execute(text("UPDATE personagens SET dinheiro = 999"))
+        raise ValueError("operação inválida")
+
+    futuros = [buffer.enfileirar(_somar(personagens[0], 1)), buffer.enfileirar(falhar), buffer.enfileirar(_somar(personagens[1], 2))]
+    buffer.descarregar()
+
+    assert futuros[0].result() == 1 and futuros[2].result() == 2
+    with pytest.raises(ValueError, match="operação inválida"):
+        futuros[1].result()
+    with fabrica() as sessao:
+        assert sessao.get(PersonagemModel, personagens[2]).dinheiro == 0 # A instrução da operação que falhou foi desfeita
+    buffer.encerrar()
+
+
+def test_descarregar_nao_espera_a_janela_e_encerrar_grava_o_pendente(fabrica, personagens):
+    buffer = BufferEscrita(fabrica, janela_segundos=60)
+    pendente = buffer.enfileirar(_somar(personagens[0], 3))
+
+    buffer.descarregar()
+    assert pendente.done() and pendente.result() == 3
+
+    ultimo = buffer.enfileirar(_somar(personagens[0], 4))
+    buffer.encerrar()
+    assert ultimo.result() == 7
+    with pytest.raises(BufferEscritaEncerradoError):
+        buffer.enfileirar(_somar(personagens[0], 1))
+    buffer.descarregar() # Depois de encerrado, não há o que esperar
+
+
+def test_repositorio_com_buffer_le_a_propria_escrita(fabrica):
+    buffer = BufferEscrita(fabrica)
+    repo = RepositorioPersonagensSQLAlchemy(fabrica(), buffer_escrita=buffer)
+    personagem = Personagem(nome="Frodo", nivel=6, dinheiro=100, usuario_id=1, servidor_id=2)
+    repo.adicionar(personagem)
+    repo.listar_por_usuario(1, 2) # Deixa o modelo carregado na sessão da interação
+
+    atualizado = repo.aplicar_recompensa_com_cooldown(personagem.id, 'trabalho', AGORA, 3600, faixas_por_nivel=[(5, 8, 40)])
+    assert atualizado.dinheiro == 140
+    assert repo.aplicar_recompensa_com_cooldown(personagem.id, 'trabalho', AGORA, 3600) is None
+    assert repo.alterar_dinheiro(personagem.id, -40) == 100
+
+    personagem.nivel = 7
+    repo.atualizar(personagem)
+    relido = repo.obter_por_id(personagem.id)
+    buffer.encerrar()
+
+    assert (relido.nivel, relido.dinheiro) == (7, 100) # atualizar grava a entidade inteira
+    assert relido.ultimo_trabalho is None
+    assert buffer.operacoes == 4
+
+
+@pytest.mark.asyncio
+async def test_lote_pelo_proxy_nao_e_limitado_pelos_workers_do_executor(engine, fabrica, personagens):
+    executor = ExecutorBancoDados(max_workers=2)
+    buffer = BufferEscrita(fabrica, janela_segundos=0.3)
+    sessao_escopada = scoped_session(fabrica, scopefunc=chave_escopo_atual)
+    repo = ProxyAssincrono(RepositorioPersonagensSQLAlchemy(sessao_escopada, buffer_escrita=buffer), executor)
+    escopo_interacao = EscopoInteracao(sessao_escopada, executor)
+    commits = _contar_commits(engine)
+
+    async def interacao(personagem_id):
+        async with escopo_interacao():
+            return await repo.alterar_dinheiro(personagem_id, 7)
+
+    # As 20 escritas esperam o commit no event loop, sem prender os 2 workers
+    saldos = await asyncio.wait_for(asyncio.gather(*(interacao(personagem_id) for personagem_id in personagens)), timeout=10)
+    buffer.encerrar()
+    executor.encerrar()
+
+    assert saldos == [7] * len(personagens)
+    assert (buffer.lotes, buffer.operacoes, len(commits)) == (1, len(personagens), 1)
+
+
+def test_backup_esvazia_o_buffer_antes_de_exportar(tmp_path, fabrica):
+    buffer = MagicMock()
+    backup = BackupServidor(fabrica(), buffer_escrita=buffer)
+
+    backup.exportar(1, str(tmp_path / "backup.ndjson.gz"))
+
+    buffer.descarregar.assert_called_once_with()
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from ostervalt.infraestrutura.monitoramento.consultas import contar_consultas
+from ostervalt.infraestrutura.persistencia.cache_itens import CacheItens
+from ostervalt.infraestrutura.persistencia.models import ItemModel
+from ostervalt.infraestrutura.persistencia.repositorio_itens import RepositorioItensSQLAlchemy
+from ostervalt.nucleo.entidades.item import Item
+
+
+@pytest.fixture
+def itens(sessao):
+    sessao.add_all([
+        ItemModel(id=1, nome="Espada", raridade="common", valor=10),
+        ItemModel(id=2, nome="Poção de Cura", raridade="common", valor=5),
+        ItemModel(id=3, nome="ESPADA", raridade="rare", valor=50),
+    ])
+    sessao.commit()
+    sessao.expunge_all() # Sem o mapa de identidade, cada leitura fora do cache vai ao banco
+
+
+def _repo(sessao, cache):
+    return RepositorioItensSQLAlchemy(sessao, cache=cache)
+
+
+def test_catalogo_carregado_responde_sem_consultas(engine, sessao, itens):
+    cache = CacheItens()
+    repo = _repo(sessao, cache)
+    repo.listar_todos()
+
+    with contar_consultas(engine) as contador:
+        assert repo.obter_por_id(2).nome == "Poção de Cura"
+        assert repo.obter_por_nome("ESPADA").id == 3 # Nome exato primeiro
+        assert repo.obter_por_nome("espada").id == 1 # Senão, ignorando maiúsculas (menor ID)
+        assert repo.obter_por_id(99) is None
+        assert repo.obter_por_nome("Pocao de Cura") is None # Como no banco: acentos diferenciam
+
+    assert contador.total == 0
+    assert cache.estatisticas()["taxa_acertos"] == 1.0
+
+
+def test_escritas_do_repositorio_atualizam_o_cache(engine, sessao, itens):
+    cache = CacheItens()
+    repo = _repo(sessao, cache)
+    repo.listar_todos()
+
+    repo.atualizar(Item(id=1, nome="Espada Longa", raridade="common", valor=12, descricao=None))
+    repo.adicionar(Item(id=None, nome="Escudo", raridade="common", valor=8, descricao=None))
+    repo.remover(2)
+
+    with contar_consultas(engine) as contador:
+        assert repo.obter_por_nome("Espada Longa").valor == 12
+        assert repo.obter_por_nome("Espada").id == 3 # O antigo nome do item 1 saiu do cache
+        assert repo.obter_por_nome("escudo").nome == "Escudo"
+        assert repo.obter_por_id(2) is None
+    assert contador.total == 0
+
+
+def test_lru_incompleto_le_do_banco_e_guarda(engine, sessao, itens):
+    cache = CacheItens(tamanho_maximo=2)
+    repo = _repo(sessao, cache)
+    repo.listar_todos() # 3 itens não cabem: o cache deixa de responder pelos ausentes
+    assert not cache.completo and len(cache) == 2
+
+    with contar_consultas(engine) as contador:
+        assert repo.obter_por_id(1).nome == "Espada" # Descartado pelo LRU: vem do banco
+        assert repo.obter_por_id(1).nome == "Espada" # E agora do cache
+    assert contador.total == 1
+    assert cache.estatisticas()["faltas"] == 1
+
+
+def test_leitura_anterior_a_uma_escrita_nao_e_guardada():
+    cache = CacheItens()
+    geracao = cache.geracao()
+    cache.registrar(Item(id=1, nome="Espada Nova", raridade="common", valor=1, descricao=None))
+
+    cache.guardar(Item(id=1, nome="Espada", raridade="common", valor=1, descricao=None), geracao)
+
+    assert cache.obter_por_id(1)[1].nome == "Espada Nova"
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+import time
+import pytest
+
+from ostervalt.infraestrutura.persistencia.catalogo_itens import CatalogoItens, ler_itens_csv
+from ostervalt.infraestrutura.persistencia.repositorio_itens import RepositorioItensSQLAlchemy
+from ostervalt.nucleo.entidades.item import Item
+
+
+def _item(id, nome, raridade="comum", valor=10):
+    return Item(id=id, nome=nome, raridade=raridade, valor=valor, descricao="")
+
+
+@pytest.fixture
+def catalogo():
+    catalogo = CatalogoItens()
+    catalogo.carregar([
+        _item(1, "Poção de Cura"),
+        _item(2, "Poção Maior", raridade="Raro"),
+        _item(3, "Espada Longa"),
+        _item(4, "Escudo de Poção", raridade="raro"),
+    ])
+    return catalogo
+
+
+def test_busca_ignora_acentos_e_maiusculas(catalogo):
+    assert [i.nome for i in catalogo.buscar("POCAO")] == ["Poção de Cura", "Poção Maior", "Escudo de Poção"]
+
+
+def test_prefixo_vem_antes_de_substring(catalogo):
+    nomes = [i.nome for i in catalogo.buscar("poç")]
+    assert nomes[:2] == ["Poção de Cura", "Poção Maior"]
+    assert nomes[2] == "Escudo de Poção"
+
+
+def test_busca_por_raridade_usa_particao(catalogo):
+    assert [i.nome for i in catalogo.buscar("", raridade="RARO")] == ["Escudo de Poção", "Poção Maior"]
+    assert catalogo.buscar("espada", raridade="raro") == []
+    assert catalogo.buscar("x", raridade="lendário") == []
+
+
+def test_limite_de_resultados(catalogo):
+    assert len(catalogo.buscar("", limite=2)) == 2
+
+
+def test_atualizacao_e_remocao_reindexam(catalogo):
+    catalogo.atualizar_item(_item(3, "Machado Longo"))
+    catalogo.remover_item(1)
+
+    assert catalogo.buscar("espada") == []
+    assert [i.nome for i in catalogo.buscar("mach")] == ["Machado Longo"]
+    assert [i.nome for i in catalogo.buscar("cura")] == []
+    assert len(catalogo) == 3
+
+
+def test_repositorio_mantem_catalogo_em_dia(sessao):
+    catalogo = CatalogoItens()
+    repo = RepositorioItensSQLAlchemy(sessao, catalogo=catalogo)
+
+    item = Item(id=None, nome="Anel Mágico", raridade="raro", valor=500, descricao="")
+    repo.adicionar(item)
+    assert [i.id for i in catalogo.buscar("magico")] == [item.id]
+
+    item.nome = "Anel Amaldiçoado"
+    repo.atualizar(item)
+    assert catalogo.buscar("magico") == []
+    assert [i.nome for i in catalogo.buscar("amaldicoado")] == ["Anel Amaldiçoado"]
+
+    repo.remover(item.id)
+    assert len(catalogo) == 0
+
+
+def test_ler_itens_csv(tmp_path):
+    arquivo = tmp_path / "items.csv"
+    arquivo.write_text("Name,Rarity,Value\nPoção,comum,50\nundefined,comum,1\nSem Raridade,,3\n", encoding="utf-8")
+
+    itens = ler_itens_csv(str(arquivo))
+
+    assert [(i.nome, i.raridade, i.valor) for i in itens] == [("Poção", "comum", 50)]
+
+
+def test_busca_em_catalogo_grande_fica_abaixo_de_um_milissegundo():
+    raridades = ["comum", "incomum", "raro", "muito raro", "lendário"]
+    catalogo = CatalogoItens()
+    catalogo.carregar([_item(i, f"Item Número {i}", raridade=raridades[i % 5]) for i in range(5000)])
+    termos = ["item", "item número 42", "número 4999", "inexistente", ""]
+
+    inicio = time.perf_counter()
+    for _ in range(50):
+        for termo in termos:
+            catalogo.buscar(termo, raridade="raro")
+    media = (time.perf_counter() - inicio) / (50 * len(termos))
+
+    assert media < 0.001
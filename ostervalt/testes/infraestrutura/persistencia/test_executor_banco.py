@@ -0,0 +1,43 @@
+import pytest
+import threading
+from unittest.mock import MagicMock
+
+from ostervalt.infraestrutura.persistencia.executor_banco import (
+    ExecutorBancoDados,
+    ExecutorBancoDadosSincrono,
+    ProxyAssincrono,
+)
+
+@pytest.mark.asyncio
+async def test_executor_roda_fora_da_thread_do_loop():
+    executor = ExecutorBancoDados(max_workers=1)
+    try:
+        thread_loop = threading.get_ident()
+        thread_execucao = await executor.executar(threading.get_ident)
+        assert thread_execucao != thread_loop
+    finally:
+        executor.encerrar()
+
+@pytest.mark.asyncio
+async def test_proxy_delega_metodos_como_corrotinas():
+    repo_mock = MagicMock()
+    repo_mock.listar_por_usuario.return_value = ["personagem"]
+    proxy = ProxyAssincrono(repo_mock, ExecutorBancoDadosSincrono())
+
+    resultado = await proxy.listar_por_usuario(1, servidor_id=2)
+
+    assert resultado == ["personagem"]
+    repo_mock.listar_por_usuario.assert_called_once_with(1, servidor_id=2)
+    assert proxy.alvo is repo_mock
+
+@pytest.mark.asyncio
+async def test_proxy_propaga_excecoes_do_repositorio():
+    repo_mock = MagicMock()
+    repo_mock.obter_por_id.side_effect = ValueError("falhou")
+    executor = ExecutorBancoDados()
+    try:
+        proxy = ProxyAssincrono(repo_mock, executor)
+        with pytest.raises(ValueError, match="falhou"):
+            await proxy.obter_por_id(1)
+    finally:
+        executor.encerrar()
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from ostervalt.infraestrutura.persistencia.indice_nomes_personagens import IndiceNomesPersonagens
+from ostervalt.infraestrutura.persistencia.models import StatusPersonagem
+from ostervalt.infraestrutura.persistencia.repositorio_personagens import RepositorioPersonagensSQLAlchemy
+from ostervalt.infraestrutura.bot_discord.discord_helpers import buscar_nomes_personagens
+from ostervalt.nucleo.entidades.personagem import Personagem
+
+SERVIDOR_ID = 10
+USUARIO_ID = 20
+
+
+def _personagem(id, nome, status=StatusPersonagem.ATIVO):
+    return Personagem(id=id, nome=nome, usuario_id=USUARIO_ID, servidor_id=SERVIDOR_ID, status=status)
+
+
+@pytest.fixture
+def indice():
+    indice = IndiceNomesPersonagens()
+    indice.carregar_usuario(SERVIDOR_ID, USUARIO_ID, [
+        _personagem(1, "Aragorn"),
+        _personagem(2, "Arwen", status=StatusPersonagem.APOSENTADO),
+        _personagem(3, "Sir Ar"),
+        _personagem(4, "Éowyn"),
+        _personagem(5, "Gimli"),
+    ], geracao=0)
+    return indice
+
+
+def _nomes(entradas):
+    return [e.nome for e in entradas]
+
+
+def test_ranking_exato_prefixo_palavra_substring(indice):
+    indice.registrar(_personagem(6, "Ar"))
+    indice.registrar(_personagem(7, "Bardo"))
+
+    assert _nomes(indice.buscar(SERVIDOR_ID, USUARIO_ID, "ar")) == ["Ar", "Aragorn", "Arwen", "Sir Ar", "Bardo"]
+
+
+def test_busca_ignora_acentos_e_filtra_ativos(indice):
+    assert _nomes(indice.buscar(SERVIDOR_ID, USUARIO_ID, "EOW")) == ["Éowyn"]
+    assert "Arwen" not in _nomes(indice.buscar(SERVIDOR_ID, USUARIO_ID, "ar", apenas_ativos=True))
+
+
+def test_termo_vazio_lista_ativos_antes_de_aposentados(indice):
+    assert _nomes(indice.buscar(SERVIDOR_ID, USUARIO_ID, "")) == ["Aragorn", "Éowyn", "Gimli", "Sir Ar", "Arwen"]
+
+
+def test_indice_nao_mistura_usuarios_nem_servidores(indice):
+    assert indice.buscar(SERVIDOR_ID, 999, "") == []
+    assert indice.buscar(999, USUARIO_ID, "") == []
+
+
+def test_leitura_anterior_a_escrita_nao_e_armazenada():
+    indice = IndiceNomesPersonagens()
+    geracao = indice.geracao()
+    indice.registrar(_personagem(1, "Novo")) # Escrita entre a leitura do banco e o carregamento
+
+    indice.carregar_usuario(SERVIDOR_ID, USUARIO_ID, [], geracao)
+
+    assert not indice.usuario_carregado(SERVIDOR_ID, USUARIO_ID)
+
+
+def test_memoria_limitada_pelo_lru_mesmo_com_escritas_de_muitos_usuarios():
+    indice = IndiceNomesPersonagens(tamanho_maximo=2)
+    for usuario_id in range(1000):
+        indice.registrar(Personagem(id=usuario_id, nome="Frodo", usuario_id=usuario_id, servidor_id=SERVIDOR_ID))
+        indice.carregar_usuario(SERVIDOR_ID, usuario_id, [], indice.geracao())
+
+    # Nenhum estado por usuário fora do LRU (antes, um contador de geração por usuário escrito)
+    assert len(indice._usuarios) == 2
+    assert not any(isinstance(valor, dict) for valor in vars(indice).values())
+
+
+def test_repositorio_mantem_indice_em_dia(sessao):
+    indice = IndiceNomesPersonagens()
+    repo = RepositorioPersonagensSQLAlchemy(sessao, indice_nomes=indice)
+    indice.carregar_usuario(SERVIDOR_ID, USUARIO_ID, [], indice.geracao())
+
+    personagem = Personagem(nome="Legolas", usuario_id=USUARIO_ID, servidor_id=SERVIDOR_ID)
+    repo.adicionar(personagem)
+    assert _nomes(indice.buscar(SERVIDOR_ID, USUARIO_ID, "leg")) == ["Legolas"]
+
+    personagem.nome = "Legolas Verdefolha"
+    personagem.status = StatusPersonagem.APOSENTADO
+    repo.atualizar(personagem)
+    assert indice.buscar(SERVIDOR_ID, USUARIO_ID, "verde", apenas_ativos=True) == []
+    assert _nomes(indice.buscar(SERVIDOR_ID, USUARIO_ID, "verde")) == ["Legolas Verdefolha"]
+
+    repo.remover(personagem.id)
+    assert indice.buscar(SERVIDOR_ID, USUARIO_ID, "") == []
+
+
+@pytest.mark.asyncio
+async def test_autocomplete_consulta_o_banco_so_na_primeira_vez():
+    indice = IndiceNomesPersonagens()
+    repo = MagicMock()
+    repo.indice_nomes = indice
+
+    async def carregar_nomes_usuario(usuario_id, servidor_id):
+        personagens = [_personagem(1, "Aragorn")]
+        indice.carregar_usuario(servidor_id, usuario_id, personagens, geracao=0)
+        return personagens
+    repo.carregar_nomes_usuario = AsyncMock(side_effect=carregar_nomes_usuario)
+
+    for termo in ("a", "ar", "ara"):
+        entradas = await buscar_nomes_personagens(repo, SERVIDOR_ID, USUARIO_ID, termo)
+        assert _nomes(entradas) == ["Aragorn"]
+
+    repo.carregar_nomes_usuario.assert_awaited_once_with(USUARIO_ID, SERVIDOR_ID)
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Regressão de plano de consultas: as buscas quentes dos repositórios devem usar índice.
+Captura o SQL realmente emitido por cada método e roda EXPLAIN QUERY PLAN no SQLite;
+o teste falha se alguma tabela consultada for lida por varredura completa (SCAN sem índice).
+"""
+import pytest
+from sqlalchemy import event
+
+from ostervalt.infraestrutura.persistencia.repositorio_personagens import RepositorioPersonagensSQLAlchemy
+from ostervalt.infraestrutura.persistencia.repositorio_itens import RepositorioItensSQLAlchemy
+from ostervalt.infraestrutura.persistencia.repositorio_inventario import RepositorioInventarioSQLAlchemy
+from ostervalt.infraestrutura.persistencia.repositorio_estoque_loja import RepositorioEstoqueLoja
+
+
+@pytest.fixture
+def ambiente(engine, sessao):
+    consultas = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def capturar(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            consultas.append((statement, parameters))
+
+    return engine, sessao, consultas
+
+
+def _varreduras_completas(engine, consultas):
+    """Retorna as linhas de plano que leem uma tabela inteira, sem índice."""
+    varreduras = []
+    with engine.connect() as conexao:
+        for statement, parameters in consultas:
+            plano = conexao.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+            for linha in plano:
+                detalhe = linha[-1]
+                # SCAN de subconsulta percorre linhas já filtradas (ex: janela do COUNT(*) OVER ()), não uma tabela
+                if detalhe.startswith("SCAN") and "USING" not in detalhe and "subquery" not in detalhe:
+                    varreduras.append((detalhe, statement))
+    return varreduras
+
+
+def test_listar_por_usuario_usa_indice_servidor_usuario(ambiente):
+    engine, sessao, consultas = ambiente
+    RepositorioPersonagensSQLAlchemy(sessao).listar_por_usuario(usuario_id=1, servidor_id=2)
+
+    assert consultas
+    assert _varreduras_completas(engine, consultas) == []
+
+
+def test_obter_personagem_por_nome_usa_indice_unico(ambiente):
+    engine, sessao, consultas = ambiente
+    RepositorioPersonagensSQLAlchemy(sessao).obter_por_nome(usuario_id=1, servidor_id=2, nome="Frodo")
+
+    with engine.connect() as conexao:
+        statement, parameters = consultas[0]
+        plano = " ".join(linha[-1] for linha in conexao.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+    assert "ix_personagens_servidor_usuario_nome" in plano
+    assert _varreduras_completas(engine, consultas) == []
+
+
+def test_item_do_inventario_por_personagem_usa_indice_composto(ambiente):
+    engine, sessao, consultas = ambiente
+    repo = RepositorioInventarioSQLAlchemy(sessao)
+    repo._obter_modelo_por_item_e_personagem(item_id=3, personagem_id=4)
+    repo.obter_itens(personagem_id=4)
+    repo.listar_itens_detalhados(personagem_id=4, limite=10)
+
+    assert len(consultas) == 3
+    assert _varreduras_completas(engine, consultas) == []
+
+
+def test_obter_item_por_nome_usa_indices_de_nome(ambiente):
+    engine, sessao, consultas = ambiente
+    # Sem itens cadastrados, obter_por_nome faz a busca exata e a busca sem diferenciar maiúsculas
+    assert RepositorioItensSQLAlchemy(sessao).obter_por_nome("Espada Longa") is None
+
+    assert len(consultas) == 2
+    assert _varreduras_completas(engine, consultas) == []
+
+
+def test_paginas_da_loja_usam_indice_de_servidor(ambiente):
+    engine, sessao, consultas = ambiente
+    repo = RepositorioEstoqueLoja(sessao)
+    repo.listar_pagina_loja(servidor_id=1, limite=10)
+    repo.listar_pagina_loja(servidor_id=1, limite=10, apos_id=20)
+    repo.listar_pagina_loja(servidor_id=1, limite=10, antes_id=20)
+
+    assert len(consultas) == 3
+    assert _varreduras_completas(engine, consultas) == []
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from ostervalt.infraestrutura.persistencia.cache_configuracao_servidor import (
+    CacheConfiguracaoServidor, ConfiguracaoServidorSnapshot,
+)
+from ostervalt.infraestrutura.persistencia.repositorio_configuracao_servidor import RepositorioConfiguracaoServidor
+
+SERVIDOR_ID = 123
+
+
+@pytest.fixture
+def repo(sessao):
+    return RepositorioConfiguracaoServidor(sessao, cache=CacheConfiguracaoServidor(tamanho_maximo=8))
+
+
+def test_snapshot_tipado_com_padroes(repo):
+    repo.adicionar_ou_atualizar(SERVIDOR_ID, 'limites', {'intervalo_trabalhar': 600})
+    repo.adicionar_ou_atualizar(SERVIDOR_ID, 'messages', {'trabalho': ["Trabalhou!"]})
+    repo.adicionar_ou_atualizar(SERVIDOR_ID, 'cargos_saldo_ids', [1, 2])
+
+    snapshot = repo.obter_snapshot(SERVIDOR_ID)
+
+    assert snapshot.intervalo_trabalhar == 600
+    assert snapshot.intervalo_crime == 3600
+    assert snapshot.tiers == {}
+    assert snapshot.mensagens('trabalho') == ["Trabalhou!"]
+    assert snapshot.mensagens('crime', ["Padrão"]) == ["Padrão"]
+    assert snapshot.cargos_ids('saldo') == frozenset({1, 2})
+    assert snapshot.cargos_ids('marcos') == frozenset()
+
+
+def test_leituras_repetidas_sao_servidas_do_cache(repo, sessao):
+    repo.adicionar_ou_atualizar(SERVIDOR_ID, 'tiers', {'A': {'recompensa': 10}})
+    consultas = []
+    listar_original = repo.listar_por_servidor
+    repo.listar_por_servidor = lambda servidor_id: consultas.append(servidor_id) or listar_original(servidor_id)
+
+    assert repo.obter_valor(SERVIDOR_ID, 'tiers') == {'A': {'recompensa': 10}}
+    assert repo.listar_por_servidor_como_dict(SERVIDOR_ID) == {'tiers': {'A': {'recompensa': 10}}}
+    assert repo.obter_valor(SERVIDOR_ID, 'ausente', default=[]) == []
+
+    assert consultas == [SERVIDOR_ID]
+    estatisticas = repo.estatisticas_cache()
+    assert estatisticas['falhas'] == 1
+    assert estatisticas['acertos'] == 2
+
+
+def test_escrita_e_remocao_invalidam_o_snapshot(repo):
+    repo.adicionar_ou_atualizar(SERVIDOR_ID, 'probabilidade_crime', 50)
+    assert repo.obter_valor(SERVIDOR_ID, 'probabilidade_crime') == 50
+
+    repo.adicionar_ou_atualizar(SERVIDOR_ID, 'probabilidade_crime', 70)
+    assert repo.obter_valor(SERVIDOR_ID, 'probabilidade_crime') == 70
+
+    assert repo.remover(SERVIDOR_ID, 'probabilidade_crime') is True
+    assert repo.obter_valor(SERVIDOR_ID, 'probabilidade_crime', default=None) is None
+
+
+def test_valores_retornados_nao_alteram_o_cache(repo):
+    repo.adicionar_ou_atualizar(SERVIDOR_ID, 'mensagens_trabalho', ["a"])
+
+    mensagens = repo.obter_valor(SERVIDOR_ID, 'mensagens_trabalho')
+    mensagens.append("b")
+
+    assert repo.obter_valor(SERVIDOR_ID, 'mensagens_trabalho') == ["a"]
+
+
+def test_cache_respeita_ttl_e_tamanho_maximo():
+    agora = [0.0]
+    cache = CacheConfiguracaoServidor(tamanho_maximo=2, ttl_segundos=10, timer=lambda: agora[0])
+    for servidor_id in (1, 2, 3):
+        cache.armazenar(ConfiguracaoServidorSnapshot(servidor_id), cache.geracao(servidor_id))
+
+    assert cache.obter(1) is None # Removido pelo limite de tamanho
+    assert cache.obter(3) is not None
+
+    agora[0] = 11.0
+    assert cache.obter(3) is None # Expirado pelo TTL
+
+
+def test_snapshot_lido_antes_de_invalidacao_nao_e_armazenado():
+    cache = CacheConfiguracaoServidor()
+    geracao = cache.geracao(SERVIDOR_ID)
+
+    cache.invalidar(SERVIDOR_ID) # Escrita concorrente entre a leitura e o armazenamento
+    cache.armazenar(ConfiguracaoServidorSnapshot(SERVIDOR_ID), geracao)
+
+    assert cache.obter(SERVIDOR_ID) is None
+
+
+def test_progressao_compilada_uma_vez_por_snapshot(repo):
+    repo.adicionar_ou_atualizar(SERVIDOR_ID, 'tiers', {'A': {'nivel_min': 1, 'nivel_max': 4, 'recompensa': 10}})
+    repo.adicionar_ou_atualizar(SERVIDOR_ID, 'progressao', {'marcos_por_nivel': {'1-4': 8}})
+
+    snapshot = repo.obter_snapshot(SERVIDOR_ID)
+
+    assert snapshot.progressao is repo.obter_snapshot(SERVIDOR_ID).progressao # Mesmo snapshot em cache
+    assert (snapshot.progressao.recompensa(2), snapshot.progressao.partes_ganhas(2)) == (10, 8)
+    repo.adicionar_ou_atualizar(SERVIDOR_ID, 'progressao', {'marcos_por_nivel': {'1-4': 4}})
+    assert repo.obter_snapshot(SERVIDOR_ID).progressao.partes_ganhas(2) == 4
+
+
+def test_progressao_invalida_usa_tabela_padrao():
+    snapshot = ConfiguracaoServidorSnapshot(SERVIDOR_ID, {'progressao': {'marcos_por_nivel': {'x-y': 3}}})
+
+    assert snapshot.progressao.partes_ganhas(1) == 16
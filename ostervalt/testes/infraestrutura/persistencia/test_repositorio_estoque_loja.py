@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+
+from ostervalt.infraestrutura.persistencia.models import EstoqueLojaItemModel
+from ostervalt.infraestrutura.persistencia.repositorio_estoque_loja import RepositorioEstoqueLoja
+from ostervalt.infraestrutura.persistencia.repositorio_itens import RepositorioItensSQLAlchemy
+from ostervalt.nucleo.entidades.item import Item
+
+
+@pytest.fixture
+def itens(sessao):
+    repo = RepositorioItensSQLAlchemy(sessao)
+    itens = [
+        Item(id=None, nome="Adaga", valor=10, descricao="", raridade="common"),
+        Item(id=None, nome="Espada", valor=50, descricao="", raridade="common"),
+        Item(id=None, nome="Anel", valor=500, descricao="", raridade="rare"),
+    ]
+    for item in itens:
+        repo.adicionar(item)
+    return repo.listar_todos()
+
+
+def _estoque(repo, servidor_id):
+    return sorted((e.item_id, e.quantidade, e.preco_especifico) for e in repo.listar_por_servidor(servidor_id))
+
+
+def test_substituir_estoque_troca_itens_e_preserva_outros_servidores(sessao, itens):
+    repo = RepositorioEstoqueLoja(sessao)
+    repo.adicionar(EstoqueLojaItemModel(servidor_id=1, item_id=itens[0].id, quantidade=3))
+    repo.adicionar(EstoqueLojaItemModel(servidor_id=2, item_id=itens[0].id, quantidade=7))
+
+    inseridos = repo.substituir_estoque_servidor(1, [
+        {'item_id': itens[1].id, 'quantidade': 1, 'preco_especifico': 60},
+        {'item_id': itens[2].id, 'quantidade': 1},
+    ])
+
+    assert inseridos == 2
+    assert _estoque(repo, 1) == [(itens[1].id, 1, 60), (itens[2].id, 1, None)]
+    assert _estoque(repo, 2) == [(itens[0].id, 7, None)]
+
+
+def test_substituir_estoque_usa_um_delete_e_um_insert(engine, sessao, itens):
+    repo = RepositorioEstoqueLoja(sessao)
+    instrucoes = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: instrucoes.append(statement))
+
+    repo.substituir_estoque_servidor(1, [{'item_id': item.id, 'quantidade': 1} for item in itens])
+
+    comandos = [s.lstrip().split()[0].upper() for s in instrucoes]
+    assert comandos == ["DELETE", "INSERT"]
+
+
+def test_falha_mantem_estoque_anterior(sessao, itens):
+    repo = RepositorioEstoqueLoja(sessao)
+    repo.adicionar(EstoqueLojaItemModel(servidor_id=1, item_id=itens[0].id, quantidade=3))
+
+    # Item repetido viola _servidor_item_uc no meio do INSERT em lote
+    with pytest.raises(IntegrityError):
+        repo.substituir_estoque_servidor(1, [
+            {'item_id': itens[1].id, 'quantidade': 1},
+            {'item_id': itens[1].id, 'quantidade': 1},
+        ])
+
+    assert _estoque(repo, 1) == [(itens[0].id, 3, None)]
+
+
+def test_listar_por_raridades_agrupa_com_uma_consulta(engine, sessao, itens):
+    repo = RepositorioItensSQLAlchemy(sessao)
+    consultas = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: consultas.append(statement))
+
+    agrupados = repo.listar_por_raridades(['common', 'rare', 'very rare'])
+
+    assert len(consultas) == 1
+    assert sorted(i.nome for i in agrupados['common']) == ["Adaga", "Espada"]
+    assert [i.nome for i in agrupados['rare']] == ["Anel"]
+    assert agrupados['very rare'] == []
+
+
+def test_pagina_loja_navega_por_cursor(sessao, itens):
+    repo = RepositorioEstoqueLoja(sessao)
+    repo.substituir_estoque_servidor(1, [
+        {'item_id': itens[0].id, 'quantidade': 1, 'preco_especifico': 99},
+        {'item_id': itens[1].id, 'quantidade': 2},
+        {'item_id': itens[2].id, 'quantidade': 3},
+    ])
+
+    primeira = repo.listar_pagina_loja(1, limite=2)
+    assert [(i.nome_item, i.preco) for i in primeira.itens] == [("Adaga", 99), ("Espada", 50)] # Sem preço específico, usa o valor do item
+    assert (primeira.tem_anterior, primeira.tem_proxima) == (False, True)
+
+    segunda = repo.listar_pagina_loja(1, limite=2, apos_id=primeira.itens[-1].estoque_id, pagina=2)
+    assert [i.nome_item for i in segunda.itens] == ["Anel"]
+    assert (segunda.pagina, segunda.tem_anterior, segunda.tem_proxima) == (2, True, False)
+
+    de_volta = repo.listar_pagina_loja(1, limite=2, antes_id=segunda.itens[0].estoque_id)
+    assert [i.nome_item for i in de_volta.itens] == ["Adaga", "Espada"]
+    assert (de_volta.tem_anterior, de_volta.tem_proxima) == (False, True)
+
+    assert repo.listar_pagina_loja(2, limite=2).itens == []
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+import pytest
+from sqlalchemy import event
+
+from ostervalt.infraestrutura.persistencia.models import ItemInventarioModel, ItemModel
+from ostervalt.infraestrutura.persistencia.repositorio_inventario import RepositorioInventarioSQLAlchemy
+
+PERSONAGEM_ID = 1
+
+
+@pytest.fixture
+def repo(sessao):
+    for i in range(250):
+        sessao.add(ItemModel(id=i + 1, nome=f"Item {i:03d}", raridade="common", valor=i, descricao=f"Descrição {i}"))
+        sessao.add(ItemInventarioModel(personagem_id=PERSONAGEM_ID, item_id=i + 1, quantidade=2))
+    sessao.add(ItemInventarioModel(personagem_id=2, item_id=1, quantidade=1))
+    sessao.commit()
+    return RepositorioInventarioSQLAlchemy(sessao)
+
+
+def test_itens_detalhados_trazem_dados_do_item_em_uma_consulta(engine, repo):
+    consultas = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: consultas.append(statement))
+
+    itens, total = repo.listar_itens_detalhados(PERSONAGEM_ID, limite=300)
+
+    assert len(consultas) == 1
+    assert total == 250
+    assert len(itens) == 250
+    primeiro = itens[0]
+    assert (primeiro.nome_item, primeiro.descricao_item, primeiro.raridade_item, primeiro.valor_item, primeiro.quantidade) == (
+        "Item 000", "Descrição 0", "common", 0, 2
+    )
+
+
+def test_itens_detalhados_paginam_no_banco(repo):
+    itens, total = repo.listar_itens_detalhados(PERSONAGEM_ID, limite=10, deslocamento=240)
+
+    assert total == 250
+    assert [item.nome_item for item in itens] == [f"Item {i:03d}" for i in range(240, 250)]
+
+
+def test_itens_detalhados_de_inventario_vazio(repo):
+    assert repo.listar_itens_detalhados(999, limite=10) == ([], 0)
+
+
+def test_contar_itens_usa_o_mesmo_criterio_da_listagem(repo):
+    assert repo.contar_itens(PERSONAGEM_ID) == 250
+    assert repo.contar_itens(2) == 1
+    assert repo.contar_itens(999) == 0
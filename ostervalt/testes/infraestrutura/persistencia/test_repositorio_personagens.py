@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+import datetime
+import pytest
+from sqlalchemy import event
+
+from ostervalt.infraestrutura.persistencia.models import StatusPersonagem
+from ostervalt.infraestrutura.persistencia.repositorio_personagens import RepositorioPersonagensSQLAlchemy
+from ostervalt.nucleo.entidades.personagem import Personagem
+from ostervalt.nucleo.repositorios import NomePersonagemEmUsoError
+
+AGORA = datetime.datetime(2025, 1, 1, 12, 0, 0)
+FAIXAS = [(1, 4, 25), (5, 8, 40)]
+
+
+@pytest.fixture
+def repo(sessao):
+    return RepositorioPersonagensSQLAlchemy(sessao)
+
+
+@pytest.fixture
+def personagem(repo):
+    personagem = Personagem(nome="Frodo", nivel=6, dinheiro=100, usuario_id=1, servidor_id=2)
+    repo.adicionar(personagem)
+    return personagem
+
+
+def test_trabalho_paga_recompensa_da_faixa_e_registra_horario(repo, personagem):
+    atualizado = repo.aplicar_recompensa_com_cooldown(personagem.id, 'trabalho', AGORA, 3600, faixas_por_nivel=FAIXAS)
+
+    assert atualizado.dinheiro == 140
+    assert atualizado.ultimo_trabalho == AGORA
+    assert repo.obter_por_id(personagem.id).dinheiro == 140
+
+
+def test_cooldown_bloqueia_segunda_execucao(repo, personagem):
+    assert repo.aplicar_recompensa_com_cooldown(personagem.id, 'trabalho', AGORA, 3600, faixas_por_nivel=FAIXAS)
+
+    meia_hora_depois = AGORA + datetime.timedelta(minutes=30)
+    assert repo.aplicar_recompensa_com_cooldown(personagem.id, 'trabalho', meia_hora_depois, 3600, faixas_por_nivel=FAIXAS) is None
+
+    uma_hora_depois = AGORA + datetime.timedelta(hours=1)
+    assert repo.aplicar_recompensa_com_cooldown(personagem.id, 'trabalho', uma_hora_depois, 3600, faixas_por_nivel=FAIXAS).dinheiro == 180
+
+
+def test_cooldowns_de_trabalho_e_crime_sao_independentes(repo, personagem):
+    repo.aplicar_recompensa_com_cooldown(personagem.id, 'trabalho', AGORA, 3600, faixas_por_nivel=FAIXAS)
+
+    atualizado = repo.aplicar_recompensa_com_cooldown(personagem.id, 'crime', AGORA, 3600, delta_dinheiro=-50)
+
+    assert atualizado.dinheiro == 90
+    assert atualizado.ultimo_crime == AGORA
+
+
+def test_personagem_inexistente_retorna_none(repo):
+    assert repo.aplicar_recompensa_com_cooldown(999, 'crime', AGORA, 3600, delta_dinheiro=10) is None
+    assert repo.alterar_dinheiro(999, 10) is None
+
+
+def test_recompensa_usa_uma_unica_instrucao(engine, repo, personagem):
+    instrucoes = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: instrucoes.append(statement))
+
+    repo.aplicar_recompensa_com_cooldown(personagem.id, 'trabalho', AGORA, 3600, faixas_por_nivel=FAIXAS)
+
+    assert len(instrucoes) == 1
+    assert instrucoes[0].lstrip().startswith("UPDATE personagens")
+
+
+def test_alterar_dinheiro_e_atomico(repo, personagem):
+    assert repo.alterar_dinheiro(personagem.id, -30) == 70
+    assert repo.alterar_dinheiro(personagem.id, 5) == 75
+    assert repo.obter_por_id(personagem.id).dinheiro == 75
+
+
+def test_alteracoes_parciais_nao_desfazem_um_trabalho_concluido_no_meio(repo, personagem):
+    lido = repo.obter_por_id(personagem.id) # /up, /inss e /dinheiro leem antes de gravar
+    repo.aplicar_recompensa_com_cooldown(personagem.id, 'trabalho', AGORA, 3600, faixas_por_nivel=FAIXAS)
+
+    assert repo.alterar_progressao(lido.id, marcos=lido.marcos + 4, nivel=7).dinheiro == 140
+    assert repo.alterar_status(lido.id, StatusPersonagem.APOSENTADO).ultimo_trabalho == AGORA
+    atualizado = repo.definir_dinheiro(lido.id, 500)
+
+    assert (atualizado.nivel, atualizado.status, atualizado.dinheiro, atualizado.ultimo_trabalho) == (
+        7, StatusPersonagem.APOSENTADO, 500, AGORA,
+    )
+    assert repo.alterar_status(9999, StatusPersonagem.ATIVO) is None
+
+
+def test_obter_por_nome_ignora_acentos_e_maiusculas_e_filtra_status(repo, personagem):
+    assert repo.obter_por_nome(1, 2, "  FRÔDO ").id == personagem.id
+    assert repo.obter_por_nome(1, 3, "Frodo") is None # Outro servidor
+
+    personagem.status = StatusPersonagem.APOSENTADO
+    repo.atualizar(personagem)
+    assert repo.obter_por_nome(1, 2, "frodo", status=StatusPersonagem.ATIVO) is None
+    assert repo.obter_por_nome(1, 2, "frodo", status=StatusPersonagem.APOSENTADO).id == personagem.id
+
+
+def test_nome_normalizado_acompanha_renomeacao_e_e_unico_por_usuario(repo, personagem):
+    personagem.nome = "Bolseiro"
+    repo.atualizar(personagem)
+    assert repo.obter_por_nome(1, 2, "bolseiro").id == personagem.id
+    assert repo.obter_por_nome(1, 2, "frodo") is None
+
+    repo.adicionar(Personagem(nome="Bolseiro", usuario_id=99, servidor_id=2)) # Outro usuário pode repetir o nome
+    with pytest.raises(NomePersonagemEmUsoError):
+        repo.adicionar(Personagem(nome="BOLSEIRO", usuario_id=1, servidor_id=2))
+    assert repo.obter_por_nome(1, 2, "bolseiro").id == personagem.id # A sessão foi desfeita e continua utilizável
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+import datetime
+import json
+
+import pytest
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+from ostervalt.infraestrutura.configuracao.db import Base
+from ostervalt.infraestrutura.persistencia.cache_configuracao_servidor import CacheConfiguracaoServidor
+from ostervalt.infraestrutura.persistencia.cache_itens import CacheItens
+from ostervalt.infraestrutura.persistencia.indice_nomes_personagens import IndiceNomesPersonagens
+from ostervalt.infraestrutura.persistencia.models import ConfiguracaoServidorModel, ItemModel, PersonagemModel
+from ostervalt.infraestrutura.persistencia.repositorio_configuracao_servidor import RepositorioConfiguracaoServidor
+from ostervalt.infraestrutura.persistencia.repositorio_itens import RepositorioItensSQLAlchemy
+from ostervalt.infraestrutura.persistencia.repositorio_personagens import RepositorioPersonagensSQLAlchemy
+from ostervalt.infraestrutura.persistencia.roteamento_leitura import SessaoRoteada, leitura_replica, lendo_da_replica
+from ostervalt.infraestrutura.persistencia.tabela_cooldowns import TabelaCooldowns
+from ostervalt.infraestrutura.persistencia.unidade_trabalho import chave_escopo_atual, unidade_de_trabalho
+
+
+def _engine(caminho, nome_item):
+    engine = create_engine(f"sqlite:///{caminho}")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as sessao:
+        sessao.add(ItemModel(id=1, nome=nome_item, raridade="common", valor=10))
+        sessao.commit()
+    return engine
+
+
+@pytest.fixture
+def engines(tmp_path):
+    primario, replica = _engine(tmp_path / "primario.db", "Primário"), _engine(tmp_path / "replica.db", "Réplica")
+    yield primario, replica
+    primario.dispose()
+    replica.dispose()
+
+
+def _nome(sessao):
+    return sessao.execute(select(ItemModel.nome).where(ItemModel.id == 1)).scalar_one()
+
+
+def test_leituras_marcadas_vao_para_a_replica(engines):
+    primario, replica = engines
+    sessao = sessionmaker(bind=primario, class_=SessaoRoteada, engine_leitura=replica)()
+
+    assert _nome(sessao) == "Primário"
+    with leitura_replica():
+        assert _nome(sessao) == "Réplica"
+        assert sessao.get(ItemModel, 1).nome == "Réplica"
+    sessao.close()
+
+
+def test_escritas_ficam_no_primario_mesmo_em_trecho_de_leitura(engines):
+    primario, replica = engines
+    sessao = sessionmaker(bind=primario, class_=SessaoRoteada, engine_leitura=replica)()
+
+    with leitura_replica():
+        sessao.execute(update(ItemModel).where(ItemModel.id == 1).values(valor=99))
+        sessao.add(ItemModel(id=2, nome="Escudo", raridade="common", valor=5))
+        sessao.commit()
+
+    for engine, esperado in ((primario, [(1, 99), (2, 5)]), (replica, [(1, 10)])):
+        with engine.connect() as conexao:
+            assert [tuple(linha) for linha in conexao.execute(select(ItemModel.id, ItemModel.valor).order_by(ItemModel.id))] == esperado
+    sessao.close()
+
+
+def test_sem_replica_tudo_vai_para_o_primario(engines):
+    primario, _ = engines
+    sessao = sessionmaker(bind=primario, class_=SessaoRoteada)()
+
+    with leitura_replica():
+        assert _nome(sessao) == "Primário"
+    sessao.close()
+
+
+def test_lendo_da_replica_so_com_replica_configurada(engines):
+    primario, replica = engines
+    com_replica = sessionmaker(bind=primario, class_=SessaoRoteada, engine_leitura=replica)()
+    sem_replica = sessionmaker(bind=primario, class_=SessaoRoteada)()
+
+    assert not lendo_da_replica(com_replica)
+    with leitura_replica():
+        assert lendo_da_replica(com_replica)
+        assert not lendo_da_replica(sem_replica)
+    com_replica.close()
+    sem_replica.close()
+
+
+def test_replica_atrasada_nao_preenche_os_caches(engines):
+    primario, replica = engines
+    with sessionmaker(bind=primario)() as sessao: # Escritas que a réplica ainda não recebeu
+        sessao.add(PersonagemModel(id=1, nome="Legolas", usuario_id=2, servidor_id=3, ultimo_trabalho=datetime.datetime.now()))
+        sessao.add(ConfiguracaoServidorModel(servidor_id=3, chave="intervalo_trabalhar", valor=json.dumps(60)))
+        sessao.execute(update(ItemModel).where(ItemModel.id == 1).values(nome="Arco Élfico"))
+        sessao.commit()
+    with sessionmaker(bind=replica)() as sessao:
+        sessao.add(PersonagemModel(id=1, nome="Legolas Antigo", usuario_id=2, servidor_id=3))
+        sessao.commit()
+    sessao_escopada = scoped_session(
+        sessionmaker(bind=primario, class_=SessaoRoteada, engine_leitura=replica), scopefunc=chave_escopo_atual,
+    )
+    indice, tabela, cache_config, cache_itens = IndiceNomesPersonagens(), TabelaCooldowns(), CacheConfiguracaoServidor(), CacheItens()
+    repo_personagens = RepositorioPersonagensSQLAlchemy(sessao_escopada, indice_nomes=indice, tabela_cooldowns=tabela)
+    repo_config = RepositorioConfiguracaoServidor(sessao_escopada, cache=cache_config)
+    repo_itens = RepositorioItensSQLAlchemy(sessao_escopada, cache=cache_itens)
+
+    with unidade_de_trabalho(sessao_escopada), leitura_replica():
+        assert [p.nome for p in repo_personagens.carregar_nomes_usuario(2, 3)] == ["Legolas Antigo"]
+        assert repo_personagens.obter_por_id(1).ultimo_trabalho is None
+        assert repo_config.obter_valor(3, "intervalo_trabalhar") is None
+        assert repo_itens.obter_por_id(1).nome == "Réplica"
+    # A leitura atrasada foi usada pela interação, mas não ficou guardada
+    assert not indice.usuario_carregado(3, 2)
+    assert len(tabela) == 0
+    assert cache_config.obter(3) is None
+    assert cache_itens.obter_por_id(1) == (False, None)
+
+    with unidade_de_trabalho(sessao_escopada):
+        repo_personagens.carregar_nomes_usuario(2, 3)
+        repo_config.obter_snapshot(3)
+        repo_itens.obter_por_id(1)
+    assert [e.nome for e in indice.buscar(3, 2, "")] == ["Legolas"]
+    assert len(tabela) == 1
+    assert cache_config.obter(3).obter("intervalo_trabalhar") == 60
+    assert cache_itens.obter_por_id(1)[1].nome == "Arco Élfico"
+    sessao_escopada.remove()
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+import datetime
+
+import pytest
+
+from ostervalt.infraestrutura.persistencia.repositorio_personagens import RepositorioPersonagensSQLAlchemy
+from ostervalt.infraestrutura.persistencia.tabela_cooldowns import TabelaCooldowns
+from ostervalt.nucleo.entidades.personagem import Personagem
+
+AGORA = datetime.datetime(2025, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def tabela():
+    return TabelaCooldowns()
+
+
+@pytest.fixture
+def repo(sessao, tabela):
+    return RepositorioPersonagensSQLAlchemy(sessao, tabela_cooldowns=tabela)
+
+
+def test_restante_usa_o_intervalo_informado_e_descarta_vencidos(tabela):
+    tabela.registrar(1, 'trabalho', AGORA)
+
+    assert tabela.restante(1, 'trabalho', 3600, AGORA + datetime.timedelta(minutes=15)) == 2700
+    assert tabela.restante(1, 'trabalho', 600, AGORA + datetime.timedelta(minutes=15)) == 0 # Intervalo reduzido vale na hora
+    assert len(tabela) == 0 # A entrada vencida foi descartada
+    assert tabela.restante(1, 'trabalho', 3600, AGORA) == 0 # Sem entrada, a decisão fica com o banco
+
+
+def test_acoes_independentes_e_nunca_usada(tabela):
+    tabela.aquecer(Personagem(id=1, nome="Frodo", ultimo_trabalho=AGORA, ultimo_crime=None))
+
+    assert tabela.restante(1, 'trabalho', 3600, AGORA) == 3600
+    assert tabela.restante(1, 'crime', 3600, AGORA) == 0
+
+
+def test_segundos_fracionarios_nao_alongam_o_cooldown(tabela):
+    tabela.registrar(1, 'crime', AGORA + datetime.timedelta(microseconds=900_000))
+
+    # O último uso é arredondado para baixo: a tabela libera no máximo 1 s antes do banco, nunca depois
+    assert tabela.restante(1, 'crime', 10, AGORA + datetime.timedelta(seconds=10)) == 0
+    tabela.registrar(1, 'crime', AGORA)
+    assert tabela.restante(1, 'crime', 10, AGORA + datetime.timedelta(seconds=9, microseconds=500_000)) == 1
+
+
+def test_varredura_remove_os_vencidos_pelo_maior_intervalo_consultado():
+    tabela = TabelaCooldowns(tamanho_minimo_varredura=10)
+    agora = datetime.datetime.now()
+    tabela.restante(0, 'trabalho', 600, agora)
+    tabela.restante(0, 'trabalho', 3600, agora) # O maior intervalo consultado é o que vale
+
+    for personagem_id in range(1, 11): # Lidos pelo /perfil, fora do cooldown há muito tempo
+        tabela.registrar(personagem_id, 'trabalho', agora - datetime.timedelta(days=1))
+    tabela.registrar(11, 'trabalho', agora - datetime.timedelta(minutes=30)) # Em cooldown só no intervalo de 1 h
+    tabela.registrar(12, 'crime', agora - datetime.timedelta(days=1)) # /crime ainda não consultado: mantido
+
+    assert len(tabela) == 2
+    assert tabela.restante(11, 'trabalho', 3600, agora) == 1800
+    for personagem_id in range(13, 100):
+        tabela.registrar(personagem_id, 'trabalho', agora - datetime.timedelta(days=1))
+    assert len(tabela) <= 11 # Nunca mais que o dobro do que restou na varredura anterior (ou o mínimo)
+
+
+def test_repositorio_aquece_com_leituras_e_escritas(repo, tabela):
+    personagem = Personagem(nome="Sam", usuario_id=1, servidor_id=2)
+    repo.adicionar(personagem)
+    assert len(tabela) == 0
+
+    repo.aplicar_recompensa_com_cooldown(personagem.id, 'crime', AGORA, 3600, delta_dinheiro=10)
+    assert tabela.restante(personagem.id, 'crime', 3600, AGORA) == 3600 # Linha devolvida pelo UPDATE
+
+    tabela.limpar()
+    repo.listar_por_usuario(1, 2)
+    assert tabela.restante(personagem.id, 'crime', 3600, AGORA) == 3600 # Linha lida do banco
+
+    repo.remover(personagem.id)
+    assert len(tabela) == 0
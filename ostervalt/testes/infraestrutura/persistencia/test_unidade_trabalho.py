@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.pool import QueuePool
+
+from ostervalt.infraestrutura.configuracao.db import Base
+from ostervalt.infraestrutura.persistencia.models import ItemModel
+from ostervalt.infraestrutura.persistencia.executor_banco import ExecutorBancoDados, ProxyAssincrono
+from ostervalt.infraestrutura.persistencia.roteamento_leitura import em_leitura_replica
+from ostervalt.infraestrutura.persistencia.unidade_trabalho import (
+    chave_escopo_atual, em_unidade_de_trabalho, unidade_de_trabalho, EscopoInteracao,
+)
+
+
+def test_unidade_de_trabalho_confirma_e_descarta_sessao(sessao_escopada):
+    with unidade_de_trabalho(sessao_escopada) as sessao:
+        assert em_unidade_de_trabalho()
+        sessao.add(ItemModel(nome="Espada", raridade="comum", valor=10))
+        assert sessao_escopada() is sessao
+
+    assert not em_unidade_de_trabalho()
+    nomes = sessao_escopada.execute(select(ItemModel.nome)).scalars().all()
+    assert nomes == ["Espada"]
+
+
+def test_unidade_de_trabalho_desfaz_em_erro(sessao_escopada):
+    with pytest.raises(ValueError):
+        with unidade_de_trabalho(sessao_escopada) as sessao:
+            sessao.add(ItemModel(nome="Escudo", raridade="comum", valor=5))
+            sessao.flush()
+            raise ValueError("falha no comando")
+
+    assert sessao_escopada.execute(select(ItemModel)).first() is None
+
+
+@pytest.mark.asyncio
+async def test_escopo_interacao_isola_sessoes_concorrentes(sessao_escopada):
+    executor = ExecutorBancoDados()
+    escopo = EscopoInteracao(sessao_escopada, executor)
+    sessoes = []
+
+    async def interacao():
+        async with escopo():
+            sessao = await executor.executar(sessao_escopada)
+            await asyncio.sleep(0)
+            # A mesma interação continua enxergando a mesma sessão depois de ceder o loop
+            assert await executor.executar(sessao_escopada) is sessao
+            sessoes.append(sessao)
+
+    await asyncio.gather(interacao(), interacao())
+    executor.encerrar()
+
+    assert len(sessoes) == 2
+    assert sessoes[0] is not sessoes[1]
+
+
+@pytest.mark.asyncio
+async def test_escopo_interacao_sem_uso_do_banco_nao_abre_sessao(sessao_escopada):
+    executor = ExecutorBancoDados()
+    escopo = EscopoInteracao(sessao_escopada, executor)
+
+    async with escopo():
+        pass
+
+    executor.encerrar()
+    assert not em_unidade_de_trabalho()
+
+
+@pytest.mark.asyncio
+async def test_escopo_somente_leitura_chega_ao_executor(sessao_escopada):
+    executor = ExecutorBancoDados()
+    escopo = EscopoInteracao(sessao_escopada, executor)
+
+    async with escopo(somente_leitura=True):
+        assert await executor.executar(em_leitura_replica)
+    async with escopo():
+        assert not await executor.executar(em_leitura_replica)
+
+    executor.encerrar()
+    assert not em_leitura_replica()
+
+
+class _RepoItens:
+    def __init__(self, sessao_escopada):
+        self.sessao_escopada = sessao_escopada
+
+    def obter(self, nome):
+        return self.sessao_escopada.execute(select(ItemModel).where(ItemModel.nome == nome)).scalar_one()
+
+    def contar(self):
+        return len(self.sessao_escopada.execute(select(ItemModel.id)).all())
+
+    def contar_por_sql(self):
+        # SQL textual pode escrever: a sessão mantém a transação (e a conexão) até a finalização
+        return self.sessao_escopada.execute(text("SELECT COUNT(*) FROM itens")).scalar_one()
+
+    def criar(self, nome):
+        self.sessao_escopada.add(ItemModel(nome=nome, raridade="comum", valor=1))
+        self.sessao_escopada.commit()
+
+
+@pytest.mark.asyncio
+async def test_mais_interacoes_que_conexoes_no_pool_nao_travam_o_executor(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", connect_args={"check_same_thread": False},
+        poolclass=QueuePool, pool_size=2, max_overflow=1, pool_timeout=3,
+    )
+    Base.metadata.create_all(engine)
+    sessao_escopada = scoped_session(sessionmaker(bind=engine), scopefunc=chave_escopo_atual)
+    executor = ExecutorBancoDados(max_workers=2)
+    escopo = EscopoInteracao(sessao_escopada, executor, max_conexoes=3)
+    repo = ProxyAssincrono(_RepoItens(sessao_escopada), executor)
+
+    async def interacao(indice):
+        async with escopo():
+            await repo.contar()
+            await asyncio.sleep(0.02) # Resposta ao Discord: a leitura não segura a conexão
+            await repo.contar_por_sql()
+            await asyncio.sleep(0.02) # Esta sessão segura a conexão até a finalização
+            await repo.criar(f"Item {indice}")
+
+    # 20 interações, 3 conexões e 2 threads: sem as vagas, o executor pararia na retirada do pool
+    await asyncio.wait_for(asyncio.gather(*(interacao(indice) for indice in range(20))), timeout=10)
+    executor.encerrar()
+
+    assert engine.pool.checkedout() == 0
+    with engine.connect() as conexao:
+        assert len(conexao.execute(select(ItemModel.id)).all()) == 20
+    engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_leitura_pelo_proxy_devolve_a_conexao_sem_expirar_os_objetos(sessao_escopada):
+    executor = ExecutorBancoDados()
+    escopo = EscopoInteracao(sessao_escopada, executor)
+    repo = ProxyAssincrono(_RepoItens(sessao_escopada), executor)
+    with unidade_de_trabalho(sessao_escopada) as sessao:
+        sessao.add(ItemModel(nome="Arco", raridade="comum", valor=3))
+
+    async with escopo():
+        item = await repo.obter("Arco")
+        assert not await executor.executar(lambda: sessao_escopada().in_transaction())
+        assert "nome" in item.__dict__ # Carregado, não expirado: acessá-lo não consulta o banco
+        await repo.contar_por_sql()
+        assert await executor.executar(lambda: sessao_escopada().in_transaction())
+        await repo.criar("Flecha")
+        assert not await executor.executar(lambda: sessao_escopada().in_transaction()) # O commit já encerrou a escrita
+    executor.encerrar()
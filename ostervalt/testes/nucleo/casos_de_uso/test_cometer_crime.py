@@ -5,6 +5,18 @@ import datetime
 from ostervalt.nucleo.casos_de_uso.cometer_crime import CometerCrime
 from ostervalt.nucleo.entidades.personagem import Personagem
 from ostervalt.nucleo.casos_de_uso.dtos import ResultadoCrimeDTO
+from ostervalt.infraestrutura.persistencia.tabela_cooldowns import TabelaCooldowns
+
+def simular_recompensa_atomica(personagem):
+    """Simula o UPDATE condicional do repositório sobre o personagem em memória."""
+    def aplicar(personagem_id, acao, tempo_atual, intervalo_segundos, delta_dinheiro=0, faixas_por_nivel=None):
+        ultimo = personagem.ultimo_crime
+        if ultimo is not None and (tempo_atual - ultimo).total_seconds() < intervalo_segundos:
+            return None
+        personagem.dinheiro += delta_dinheiro
+        personagem.ultimo_crime = tempo_atual
+        return personagem
+    return aplicar
 
 def test_cometer_crime_sucesso():
     # Arrange
@@ -19,7 +31,7 @@ def test_cometer_crime_sucesso():
         100,     # dinheiro
         datetime.datetime.now() - datetime.timedelta(hours=2), # ultimo_tempo_crime
     )
-    repo_mock.obter_por_id.return_value = personagem
+    repo_mock.aplicar_recompensa_com_cooldown.side_effect = simular_recompensa_atomica(personagem)
     config_mock.obter.side_effect = lambda key: {
         "limites": {"intervalo_crime": 3600},  # 1 hora
         "probabilidades": {"crime": 100},  # 100% de sucesso
@@ -37,7 +49,10 @@ def test_cometer_crime_sucesso():
     assert resultado.sucesso is True
     assert resultado.personagem.dinheiro > 100  # Deve ter ganhado dinheiro
     assert "Você cometeu um crime!" in resultado.mensagem
-    repo_mock.atualizar.assert_called_once_with(personagem)
+    repo_mock.aplicar_recompensa_com_cooldown.assert_called_once_with(
+        1, 'crime', tempo_atual, 3600, delta_dinheiro=resultado.resultado_financeiro
+    )
+    repo_mock.atualizar.assert_not_called()
 
 def test_cometer_crime_falha():
     # Arrange
@@ -51,7 +66,7 @@ def test_cometer_crime_falha():
         100,     # dinheiro
         datetime.datetime.now() - datetime.timedelta(hours=2), # ultimo_tempo_crime
     )
-    repo_mock.obter_por_id.return_value = personagem
+    repo_mock.aplicar_recompensa_com_cooldown.side_effect = simular_recompensa_atomica(personagem)
     config_mock.obter.side_effect = lambda key: {
         "limites": {"intervalo_crime": 3600},
         "probabilidades": {"crime": 0},  # 0% de sucesso
@@ -72,13 +87,21 @@ def test_cometer_crime_falha():
     assert resultado.sucesso is False
     assert resultado.personagem.dinheiro < 100  # Deve ter perdido dinheiro
     assert "Você foi pego!" in resultado.mensagem
-    repo_mock.atualizar.assert_called_once_with(personagem)
+    repo_mock.aplicar_recompensa_com_cooldown.assert_called_once_with(
+        1, 'crime', tempo_atual, 3600, delta_dinheiro=resultado.resultado_financeiro
+    )
+    repo_mock.atualizar.assert_not_called()
 
 def test_cometer_crime_personagem_nao_encontrado():
     # Arrange
     repo_mock = MagicMock()
     config_mock = MagicMock()
+    repo_mock.aplicar_recompensa_com_cooldown.return_value = None
     repo_mock.obter_por_id.return_value = None
+    config_mock.obter.side_effect = lambda key: {
+        "limites": {"intervalo_crime": 3600},
+        "probabilidades": {"crime": 50},
+    }.get(key)
     caso_uso = CometerCrime(repo_mock, config_mock)
     
     # Act & Assert
@@ -98,6 +121,7 @@ def test_cometer_crime_cooldown_nao_terminou():
         ultimo_trabalho=None,
         ultimo_crime=datetime.datetime.now() - datetime.timedelta(minutes=30) # ultimo_crime
     )
+    repo_mock.aplicar_recompensa_com_cooldown.side_effect = simular_recompensa_atomica(personagem)
     repo_mock.obter_por_id.return_value = personagem
     # Configurar o mock para retornar o dicionário correto para cada chave esperada
     def config_side_effect(key):
@@ -118,6 +142,21 @@ def test_cometer_crime_cooldown_nao_terminou():
     personagem.ultimo_crime = tempo_atual_teste - datetime.timedelta(minutes=30)
     with pytest.raises(ValueError, match="Ação de crime está em cooldown"):
         caso_uso.executar(1, tempo_atual=tempo_atual_teste) # Passar tempo_atual fixo
+    assert personagem.dinheiro == 100 # Nada foi aplicado
+
+def test_cometer_crime_em_cooldown_na_tabela_nao_acessa_o_repositorio():
+    repo_mock = MagicMock()
+    config_mock = MagicMock()
+    config_mock.obter.side_effect = lambda key: {"limites": {"intervalo_crime": 3600}, "probabilidades": {"crime": 50}}.get(key)
+    tempo_atual_teste = datetime.datetime(2025, 1, 1, 12, 0, 0)
+    tabela = TabelaCooldowns()
+    tabela.registrar(1, 'crime', tempo_atual_teste - datetime.timedelta(minutes=45))
+    caso_uso = CometerCrime(repo_mock, config_mock, tabela_cooldowns=tabela)
+
+    with pytest.raises(ValueError, match=r"Ação de crime está em cooldown. Tempo restante: 0:15:00\."):
+        caso_uso.executar(1, tempo_atual=tempo_atual_teste)
+    repo_mock.aplicar_recompensa_com_cooldown.assert_not_called()
+    repo_mock.obter_por_id.assert_not_called()
 
 def test_cometer_crime_configuracao_faltando():
     # Arrange
@@ -131,7 +170,7 @@ def test_cometer_crime_configuracao_faltando():
         100,     # dinheiro
         datetime.datetime.now() - datetime.timedelta(hours=2), # ultimo_tempo_crime
     )
-    repo_mock.obter_por_id.return_value = personagem
+    repo_mock.aplicar_recompensa_com_cooldown.side_effect = simular_recompensa_atomica(personagem)
     config_mock.obter.side_effect = KeyError("Configuração não encontrada")
     
     caso_uso = CometerCrime(repo_mock, config_mock)
@@ -2,10 +2,12 @@ import pytest
 from unittest.mock import MagicMock, ANY
 from ostervalt.nucleo.casos_de_uso.criar_personagem import CriarPersonagem
 from ostervalt.nucleo.entidades.personagem import Personagem # Importar a entidade real
+from ostervalt.nucleo.repositorios import NomePersonagemEmUsoError
 
 def test_criar_personagem_sucesso():
     # Arrange
     repo_mock = MagicMock()
+    repo_mock.obter_por_nome.return_value = None
     caso_uso = CriarPersonagem(repo_mock)
     nome_personagem = "HeroiTeste"
     usuario_id = 123
@@ -28,5 +30,22 @@ def test_criar_personagem_sucesso():
     assert personagem_passado.usuario_id == usuario_id
     assert personagem_passado.servidor_id == servidor_id
 
-# O teste de nome existente foi removido pois a lógica não está no caso de uso atual.
-# Se a validação for adicionada ao caso de uso, este teste pode ser reintroduzido/adaptado.
\ No newline at end of file
+def test_criar_personagem_nome_existente():
+    repo_mock = MagicMock()
+    repo_mock.obter_por_nome.return_value = Personagem(nome="Heroi Teste", id=1, usuario_id=123, servidor_id=456)
+    caso_uso = CriarPersonagem(repo_mock)
+
+    with pytest.raises(ValueError, match="já tem um personagem chamado 'heroi teste'"):
+        caso_uso.executar("heroi teste", 123, 456)
+
+    repo_mock.obter_por_nome.assert_called_once_with(123, 456, "heroi teste")
+    repo_mock.adicionar.assert_not_called()
+
+def test_criar_personagem_nome_criado_por_outro_comando_simultaneo():
+    repo_mock = MagicMock()
+    repo_mock.obter_por_nome.return_value = None # A verificação passou nos dois /criar
+    repo_mock.adicionar.side_effect = NomePersonagemEmUsoError("Heroi")
+    caso_uso = CriarPersonagem(repo_mock)
+
+    with pytest.raises(ValueError, match="já tem um personagem chamado 'Heroi'"):
+        caso_uso.executar("Heroi", 123, 456)
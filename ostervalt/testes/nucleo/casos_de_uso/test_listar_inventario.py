@@ -2,6 +2,7 @@ import pytest
 from unittest.mock import MagicMock
 from ostervalt.nucleo.casos_de_uso.listar_inventario import ListarInventario
 from ostervalt.nucleo.entidades.item import ItemInventario
+from ostervalt.nucleo.casos_de_uso.dtos import InventarioDTO, ItemInventarioDTO
 
 def test_listar_inventario_sucesso():
     # Arrange
@@ -45,4 +46,50 @@ def test_listar_inventario_erro_repositorio():
     # Act & Assert
     with pytest.raises(Exception) as excinfo:
         caso_uso.executar(personagem_id)
-    assert excinfo.value is erro_esperado
\ No newline at end of file
+    assert excinfo.value is erro_esperado
+
+
+def test_listar_inventario_detalhado_pagina():
+    # Arrange
+    repo_mock = MagicMock()
+    itens = [ItemInventarioDTO(item_id=1, nome_item="Espada", quantidade=2)]
+    repo_mock.listar_itens_detalhados.return_value = (itens, 21)
+    caso_uso = ListarInventario(repo_mock)
+
+    # Act
+    inventario = caso_uso.executar_detalhado(1, "Frodo", pagina=3, itens_por_pagina=10)
+
+    # Assert
+    assert inventario == InventarioDTO(nome_personagem="Frodo", itens=itens, total_itens=21, pagina=3, total_paginas=3)
+    repo_mock.listar_itens_detalhados.assert_called_once_with(1, limite=10, deslocamento=20)
+
+def test_listar_inventario_detalhado_pagina_alem_do_fim_volta_para_ultima():
+    # Arrange
+    repo_mock = MagicMock()
+    itens = [ItemInventarioDTO(item_id=11, nome_item="Espada", quantidade=2)]
+    repo_mock.listar_itens_detalhados.side_effect = [([], 0), (itens, 11)]
+    repo_mock.contar_itens.return_value = 11
+    caso_uso = ListarInventario(repo_mock)
+
+    # Act
+    inventario = caso_uso.executar_detalhado(1, "Frodo", pagina=9, itens_por_pagina=10)
+
+    # Assert
+    assert inventario == InventarioDTO(nome_personagem="Frodo", itens=itens, total_itens=11, pagina=2, total_paginas=2)
+    repo_mock.contar_itens.assert_called_once_with(1)
+    assert repo_mock.listar_itens_detalhados.call_args_list[-1].kwargs == {"limite": 10, "deslocamento": 10}
+    assert repo_mock.listar_itens_detalhados.call_count == 2
+
+def test_listar_inventario_detalhado_pagina_alem_do_fim_de_inventario_vazio():
+    # Arrange
+    repo_mock = MagicMock()
+    repo_mock.listar_itens_detalhados.return_value = ([], 0)
+    repo_mock.contar_itens.return_value = 0
+    caso_uso = ListarInventario(repo_mock)
+
+    # Act
+    inventario = caso_uso.executar_detalhado(1, "Frodo", pagina=4)
+
+    # Assert
+    assert inventario == InventarioDTO(nome_personagem="Frodo", itens=[], total_itens=0, pagina=1, total_paginas=1)
+    repo_mock.listar_itens_detalhados.assert_called_once()
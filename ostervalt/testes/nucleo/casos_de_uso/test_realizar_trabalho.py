@@ -15,6 +15,18 @@ def criar_personagem_mock(id=1, nivel=5, dinheiro=100, ultimo_trabalho=None):
     p.ultimo_trabalho = ultimo_trabalho
     return p
 
+def simular_recompensa_atomica(personagem):
+    """Simula o UPDATE condicional do repositório sobre o personagem em memória."""
+    def aplicar(personagem_id, acao, tempo_atual, intervalo_segundos, delta_dinheiro=0, faixas_por_nivel=None):
+        ultimo = personagem.ultimo_trabalho
+        if ultimo is not None and (tempo_atual - ultimo).total_seconds() < intervalo_segundos:
+            return None
+        recompensa = next((r for nmin, nmax, r in (faixas_por_nivel or []) if nmin <= personagem.nivel <= nmax), 0)
+        personagem.dinheiro += delta_dinheiro + recompensa
+        personagem.ultimo_trabalho = tempo_atual
+        return personagem
+    return aplicar
+
 @pytest.fixture
 def repo_personagens_mock():
     return MagicMock(spec=RepositorioPersonagens)
@@ -37,7 +49,7 @@ def intervalo_trabalhar_mock():
 # Teste de sucesso
 def test_realizar_trabalho_sucesso(repo_personagens_mock, tiers_config_mock, mensagens_trabalho_mock, intervalo_trabalhar_mock):
     personagem = criar_personagem_mock(nivel=3, ultimo_trabalho=None)
-    repo_personagens_mock.obter_por_id.return_value = personagem
+    repo_personagens_mock.aplicar_recompensa_com_cooldown.side_effect = simular_recompensa_atomica(personagem)
 
     # Instancia o caso de uso apenas com o repositório
     caso_de_uso = RealizarTrabalho(repositorio_personagens=repo_personagens_mock)
@@ -50,8 +62,13 @@ def test_realizar_trabalho_sucesso(repo_personagens_mock, tiers_config_mock, men
         mensagens_trabalho=mensagens_trabalho_mock
     )
 
-    repo_personagens_mock.obter_por_id.assert_called_once_with(personagem.id)
-    repo_personagens_mock.atualizar.assert_called_once()
+    # Caminho feliz: uma única operação atômica, sem leitura prévia nem atualizar()
+    repo_personagens_mock.aplicar_recompensa_com_cooldown.assert_called_once()
+    args = repo_personagens_mock.aplicar_recompensa_com_cooldown.call_args
+    assert args.args[:2] == (personagem.id, 'trabalho')
+    assert args.kwargs['faixas_por_nivel'] == [(1, 5, 100), (6, 10, 200)]
+    repo_personagens_mock.obter_por_id.assert_not_called()
+    repo_personagens_mock.atualizar.assert_not_called()
     assert resultado.recompensa == 100 # Nível 3 cai no tier t1
     assert personagem.dinheiro == 100 + 100 # Dinheiro inicial + recompensa
     assert personagem.ultimo_trabalho is not None
@@ -59,6 +76,7 @@ def test_realizar_trabalho_sucesso(repo_personagens_mock, tiers_config_mock, men
 
 # Teste personagem não encontrado
 def test_realizar_trabalho_personagem_nao_encontrado(repo_personagens_mock, tiers_config_mock, mensagens_trabalho_mock, intervalo_trabalhar_mock):
+    repo_personagens_mock.aplicar_recompensa_com_cooldown.return_value = None
     repo_personagens_mock.obter_por_id.return_value = None
     caso_de_uso = RealizarTrabalho(repositorio_personagens=repo_personagens_mock)
 
@@ -75,6 +93,7 @@ def test_realizar_trabalho_cooldown_nao_terminou(repo_personagens_mock, tiers_co
     tempo_agora = datetime.datetime.now()
     ultimo_trabalho_recente = tempo_agora - datetime.timedelta(seconds=intervalo_trabalhar_mock / 2)
     personagem = criar_personagem_mock(ultimo_trabalho=ultimo_trabalho_recente)
+    repo_personagens_mock.aplicar_recompensa_com_cooldown.side_effect = simular_recompensa_atomica(personagem)
     repo_personagens_mock.obter_por_id.return_value = personagem
 
     caso_de_uso = RealizarTrabalho(repositorio_personagens=repo_personagens_mock)
@@ -87,11 +106,12 @@ def test_realizar_trabalho_cooldown_nao_terminou(repo_personagens_mock, tiers_co
             mensagens_trabalho=mensagens_trabalho_mock,
             tempo_atual=tempo_agora # Passa o tempo atual para o teste
         )
+    assert personagem.dinheiro == 100 # Nada foi pago
 
 # Teste com configuração de tier faltando ou inválida (deve retornar recompensa 0)
 def test_realizar_trabalho_configuracao_faltando(repo_personagens_mock, mensagens_trabalho_mock, intervalo_trabalhar_mock):
     personagem = criar_personagem_mock(nivel=7) # Nível que não está nos tiers vazios
-    repo_personagens_mock.obter_por_id.return_value = personagem
+    repo_personagens_mock.aplicar_recompensa_com_cooldown.side_effect = simular_recompensa_atomica(personagem)
     caso_de_uso = RealizarTrabalho(repositorio_personagens=repo_personagens_mock)
 
     resultado = caso_de_uso.executar(
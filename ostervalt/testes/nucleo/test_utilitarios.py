@@ -112,4 +112,93 @@ def test_marcos_to_gain_niveis_intermediarios():
     assert utilitarios.marcos_to_gain(3) == 16
     assert utilitarios.marcos_to_gain(8) == 4
     assert utilitarios.marcos_to_gain(15) == 2
-    assert utilitarios.marcos_to_gain(18) == 1
\ No newline at end of file
+    assert utilitarios.marcos_to_gain(18) == 1
+@pytest.mark.parametrize("texto, esperado", [
+    ("Poção de Cura", "pocao de cura"),
+    ("ESPADA  Longa", "espada longa"),
+    ("Maçã", "maca"),
+    ("", ""),
+])
+def test_normalizar_texto(texto, esperado):
+    assert utilitarios.normalizar_texto(texto) == esperado
+
+def test_faixas_recompensa_trabalho_segue_calcular_recompensa():
+    tiers = {
+        "t1": {"nivel_min": 1, "nivel_max": 4, "recompensa": 25},
+        "invalido": {"recompensa": 999},
+        "sem_recompensa": {"nivel_min": 5, "nivel_max": 8},
+    }
+    faixas = utilitarios.faixas_recompensa_trabalho(tiers)
+    assert faixas == [(1, 4, 25), (5, 8, 0)]
+    for nivel in range(1, 10):
+        esperado = next((r for nmin, nmax, r in faixas if nmin <= nivel <= nmax), 0)
+        assert utilitarios.calcular_recompensa_trabalho(nivel, tiers) == esperado
+
+# Testes para ler_planilha_precos
+@pytest.mark.parametrize("conteudo, nome_arquivo", [
+    ("Nome,Preço\nPoção de Cura,50\nEspada Longa,120\n".encode("utf-8"), "precos.csv"),
+    ('{"Poção de Cura": 50, "Espada Longa": "120"}'.encode("utf-8"), "precos.json"),
+    ('[{"name": "Poção de Cura", "price": 50}, {"item": "Espada Longa", "valor": 120}]'.encode("utf-8"), "PRECOS.JSON"),
+])
+def test_ler_planilha_precos(conteudo, nome_arquivo):
+    assert utilitarios.ler_planilha_precos(conteudo, nome_arquivo) == {"pocao de cura": 50, "espada longa": 120}
+
+@pytest.mark.parametrize("conteudo, nome_arquivo", [
+    (b"nome,preco\nAdaga,barato\n", "precos.csv"),
+    (b"nome,preco\nAdaga,-5\n", "precos.csv"),
+    (b"nome,quantidade\nAdaga,1\n", "precos.csv"),
+    (b"{invalido", "precos.json"),
+    (b"Adaga 10", "precos.txt"),
+])
+def test_ler_planilha_precos_invalida(conteudo, nome_arquivo):
+    with pytest.raises(ValueError):
+        utilitarios.ler_planilha_precos(conteudo, nome_arquivo)
+
+
+# Testes para o ModeloProgressao
+TIERS_PROGRESSAO = {
+    "Pequeno": {"nivel_min": 1, "nivel_max": 4, "recompensa": 25},
+    "Sobreposto": {"nivel_min": 3, "nivel_max": 8, "recompensa": 40}, # Níveis 3-4 ficam com o primeiro tier
+    "Alto": {"nivel_min": 17, "nivel_max": 30, "recompensa": 105},
+}
+
+
+def test_progressao_segue_calcular_recompensa_e_faixas():
+    progressao = utilitarios.compilar_progressao(TIERS_PROGRESSAO)
+
+    for nivel in range(-1, 32):
+        assert progressao.recompensa(nivel) == utilitarios.calcular_recompensa_trabalho(nivel, TIERS_PROGRESSAO)
+    assert [progressao.tier(nivel) for nivel in (1, 4, 5, 9, 20)] == ["Pequeno", "Pequeno", "Sobreposto", None, "Alto"]
+    assert list(progressao.faixas_recompensa) == utilitarios.faixas_recompensa_trabalho(TIERS_PROGRESSAO)
+    assert len(progressao.recompensa_por_nivel) == utilitarios.NIVEL_MAXIMO + 1
+
+
+def test_progressao_padrao_segue_regras_antigas():
+    progressao = utilitarios.PROGRESSAO_PADRAO
+
+    for nivel in range(1, 26):
+        assert progressao.partes_ganhas(nivel) == utilitarios.marcos_to_gain(nivel)
+    for partes in range(0, 400):
+        assert progressao.nivel(partes) == utilitarios.calculate_level(partes / 16)
+    assert progressao.limiares[1] == 0 and progressao.limiares[5] == 64
+
+
+def test_progressao_usa_marcos_por_nivel_do_config():
+    progressao = utilitarios.compilar_progressao({}, {"1-4": 8, "10": 2})
+
+    assert [progressao.partes_ganhas(nivel) for nivel in (1, 4, 5, 10, 11)] == [8, 8, 4, 2, 4] # Níveis fora da tabela: padrão
+    assert progressao.formatar_marcos(20) == "1 e 4/16 Marcos" # Com 8 partes por /up, as frações aparecem
+    with pytest.raises(ValueError):
+        utilitarios.compilar_progressao({}, {"4-1": 8})
+    with pytest.raises(ValueError):
+        utilitarios.compilar_progressao({}, {"1-4": 0})
+
+
+@pytest.mark.parametrize("partes, quantidade", [(0, 1), (0, 7), (15, 3), (60, 40), (250, 100), (320, 5), (0, 500)])
+def test_aplicar_ups_em_lote_equivale_a_ups_individuais(partes, quantidade):
+    progressao = utilitarios.compilar_progressao({}, {"1-4": 16, "5-12": 3, "13-16": 2, "17-20": 1})
+    esperado = partes
+    for _ in range(quantidade):
+        esperado += progressao.partes_ganhas(progressao.nivel(esperado))
+
+    assert progressao.aplicar_ups(partes, quantidade) == esperado